@@ -1,1320 +1,668 @@
 """
-
-
 AI Model Router - Unified interface for multiple AI models
 
-
-
-
-
 This module provides a unified interface for interacting with different AI models
-
-
 (DeepSeek, OpenAI, Claude). It allows for dynamic switching between models based
-
-
 on configuration or specific needs.
 
-
+Requests run on an asyncio event loop owned by the module, over the shared pooled
+HTTP client, with bounded concurrency per model. When hedge_delay is configured
+the router also asks the fallback model if a request is slow (each hedge is a
+second paid request), coalesces identical in-flight requests and keeps
+per-model latency and error histograms. Successful completions are kept in a
+persistent prompt cache (see prompt_cache.py) with a TTL per call site.
+Synchronous callers block on the loop; async callers await it directly.
 """
 
-
-
-
-
-import os
-
-
-import logging
-
-
 import json
-
-
 import time
+import asyncio
+import logging
+import threading
+from bisect import bisect_left
+from typing import Dict, Any, Optional, List, Tuple
 
+from connectors.http_client import get_http_client, HTTPError
+from ai_engine.prompt_cache import PromptCache, get_prompt_cache
 
-import requests
-
+# Set up logging
+logger = logging.getLogger(__name__)
 
-from typing import Dict, Any, Optional, List
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
 
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
 
 
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Get the event loop AI requests run on, starting its thread on first use"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="ai-model-router", daemon=True).start()
+        return _loop
 
 
-# Set up logging
+async def _run_on_loop(coro):
+    """Await a coroutine on the AI event loop from any event loop"""
+    loop = _get_loop()
+    if asyncio.get_running_loop() is loop:
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
 
 
-logger = logging.getLogger(__name__)
+def _run_sync(coro):
+    """Run a coroutine on the AI event loop and block until it finishes"""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
 
 
+class AIRequestError(Exception):
+    """A model request failed (HTTP error, timeout, bad response)"""
 
+    def __init__(self, message: str, kind: str = "error"):
+        super().__init__(message)
+        self.kind = kind  # Error category for the metrics, e.g. "http_429" or "timeout"
 
 
 class BaseAIAgent:
-
-
     """Base class for AI agents"""
 
-
-    
-
-
-    def __init__(self, api_key: str = "", base_url: str = ""):
-
-
+    def __init__(self, api_key: str = "", base_url: str = "", name: str = "", timeout: float = 60.0):
         self.api_key = api_key
-
-
         self.base_url = base_url
+        self.name = name or type(self).__name__
+        self.timeout = timeout
 
+    async def complete_async(self, messages: List[Dict[str, str]], temperature: float = 0.7) -> str:
+        """
+        Generate a completion from a list of messages
 
-        
-
-
-    def ask(self, prompt: str, system_prompt: str = "", temperature: float = 0.7) -> str:
+        Args:
+            messages: List of message dictionaries (role, content)
+            temperature: Sampling temperature
 
+        Returns:
+            Model completion as string
 
+        Raises:
+            AIRequestError: If the request fails
         """
+        raise NotImplementedError("Subclasses must implement complete_async()")
 
+    async def _post(self, path: str, headers: Dict[str, str], body: Dict[str, Any]) -> Dict[str, Any]:
+        """POST a JSON body to the API over the shared pooled HTTP client"""
+        try:
+            return await get_http_client().post_json(
+                f"{self.base_url}{path}", body, provider=self.name, headers=headers, timeout=self.timeout
+            )
+        except HTTPError as e:
+            raise AIRequestError(f"HTTP {e.status} - {e.message}", f"http_{e.status}") from e
+        except asyncio.TimeoutError as e:
+            raise AIRequestError(f"timed out after {self.timeout}s", "timeout") from e
+        except Exception as e:
+            raise AIRequestError(f"{type(e).__name__}: {str(e)}", "connection") from e
 
+    async def ask_async(self, prompt: str, system_prompt: str = "", temperature: float = 0.7) -> str:
+        """
         Send a prompt to the AI model and get a response
 
-
-        
-
-
         Args:
-
-
             prompt: The user prompt
-
-
             system_prompt: Optional system prompt
-
-
             temperature: Sampling temperature
 
-
-            
-
-
         Returns:
-
-
             Model response as string
 
-
+        Raises:
+            AIRequestError: If the request fails
         """
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        return await self.complete_async(messages, temperature)
 
+    def ask(self, prompt: str, system_prompt: str = "", temperature: float = 0.7) -> str:
+        """
+        Send a prompt to the AI model and get a response
 
-        raise NotImplementedError("Subclasses must implement ask()")
-
-
-        
+        Args:
+            prompt: The user prompt
+            system_prompt: Optional system prompt
+            temperature: Sampling temperature
 
+        Returns:
+            Model response as string ("Error: ..." on failure)
+        """
+        try:
+            return _run_sync(self.ask_async(prompt, system_prompt, temperature))
+        except Exception as e:
+            logger.error(f"Failed to get response from {self.name}: {str(e)}")
+            return f"Error: {str(e)}"
 
     def generate_completion(self, messages: List[Dict[str, str]], temperature: float = 0.7) -> str:
-
-
         """
-
-
         Generate a completion from a list of messages
 
-
-        
-
-
         Args:
-
-
             messages: List of message dictionaries (role, content)
-
-
             temperature: Sampling temperature
 
-
-            
-
-
         Returns:
+            Model completion as string ("Error: ..." on failure)
+        """
+        try:
+            return _run_sync(self.complete_async(messages, temperature))
+        except Exception as e:
+            logger.error(f"Failed to generate completion with {self.name}: {str(e)}")
+            return f"Error: {str(e)}"
 
 
-            Model completion as string
+class OpenAICompatibleAgent(BaseAIAgent):
+    """Agent for APIs speaking the OpenAI chat completions protocol"""
 
+    model = ""
 
-        """
+    async def complete_async(self, messages: List[Dict[str, str]], temperature: float = 0.7) -> str:
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}"
+        }
 
+        data = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature
+        }
 
-        raise NotImplementedError("Subclasses must implement generate_completion()")
+        result = await self._post("/chat/completions", headers, data)
+        try:
+            return result["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError) as e:
+            raise AIRequestError(f"unexpected response: {str(result)[:200]}", "bad_response") from e
 
 
+class DeepSeekAgent(OpenAICompatibleAgent):
+    """Agent for DeepSeek AI models"""
 
+    def __init__(self, api_key: str = "", base_url: str = "https://api.siliconflow.cn/v1", timeout: float = 60.0):
+        super().__init__(api_key, base_url, "deepseek", timeout)
+        self.model = "deepseek-ai/DeepSeek-V3"
 
 
-class DeepSeekAgent(BaseAIAgent):
+class OpenAIAgent(OpenAICompatibleAgent):
+    """Agent for OpenAI models"""
 
+    def __init__(self, api_key: str = "", base_url: str = "https://api.openai.com/v1", timeout: float = 60.0):
+        super().__init__(api_key, base_url, "openai", timeout)
+        self.model = "gpt-4-turbo"
 
-    """Agent for DeepSeek AI models"""
 
+class ClaudeAgent(BaseAIAgent):
+    """Agent for Anthropic Claude models"""
 
-    
+    def __init__(self, api_key: str = "", base_url: str = "https://api.anthropic.com/v1", timeout: float = 60.0):
+        super().__init__(api_key, base_url, "claude", timeout)
+        self.model = "claude-3-opus-20240229"
 
+    async def complete_async(self, messages: List[Dict[str, str]], temperature: float = 0.7) -> str:
+        # Extract system message if present
+        system_prompt = ""
+        user_messages = []
 
-    def __init__(self, api_key: str = "", base_url: str = "https://api.siliconflow.cn/v1"):
+        for msg in messages:
+            if msg["role"] == "system":
+                system_prompt = msg["content"]
+            else:
+                user_messages.append(msg)
 
+        if len(user_messages) == 1 and user_messages[0]["role"] == "user":
+            prompt = user_messages[0]["content"]
+        else:
+            # Combine the conversation into one prompt
+            prompt = ""
+            for msg in user_messages:
+                role_prefix = "Human: " if msg["role"] == "user" else "Assistant: "
+                prompt += f"{role_prefix}{msg['content']}\n\n"
 
-        super().__init__(api_key, base_url)
+            if not prompt:
+                prompt = "Please provide market analysis."
 
+        headers = {
+            "Content-Type": "application/json",
+            "x-api-key": self.api_key,
+            "anthropic-version": "2023-06-01"
+        }
 
-        self.model = "deepseek-ai/DeepSeek-V3"
+        data = {
+            "model": self.model,
+            "temperature": temperature,
+            "max_tokens": 4000,
+            "messages": [{"role": "user", "content": prompt}]
+        }
 
+        if system_prompt:
+            data["system"] = system_prompt
 
-        
+        result = await self._post("/messages", headers, data)
+        try:
+            return result["content"][0]["text"]
+        except (KeyError, IndexError, TypeError) as e:
+            raise AIRequestError(f"unexpected response: {str(result)[:200]}", "bad_response") from e
+
+
+class ModelStats:
+    """Request counters and latency/error histograms for one model"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.cancelled = 0
+        self.hedges = 0  # Requests started as a hedge for a slower model
+        self.wins = 0  # Requests whose answer was returned to the caller
+        self.total_time = 0.0
+        self.queue_time = 0.0
+        self.latency_histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.error_histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.error_types: Dict[str, int] = {}
+
+    def record(self, elapsed: float, error: Optional[str] = None):
+        bucket = bisect_left(LATENCY_BUCKETS_MS, elapsed * 1000)
+        self.requests += 1
+        self.total_time += elapsed
+        if error is None:
+            self.latency_histogram[bucket] += 1
+        else:
+            self.errors += 1
+            self.error_histogram[bucket] += 1
+            self.error_types[error] = self.error_types.get(error, 0) + 1
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Latency percentile of successful requests, as the upper bound (ms) of its bucket"""
+        total = sum(self.latency_histogram)
+        if not total:
+            return None
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS + (float("inf"),), self.latency_histogram):
+            seen += count
+            if seen >= p * total:
+                return bound
+        return float("inf")
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "cancelled": self.cancelled,
+            "hedges": self.hedges,
+            "wins": self.wins,
+            "avg_ms": self.total_time / self.requests * 1000 if self.requests else 0.0,
+            "avg_queue_ms": self.queue_time / self.requests * 1000 if self.requests else 0.0,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "latency_histogram": dict(zip(labels, self.latency_histogram)),
+            "error_histogram": dict(zip(labels, self.error_histogram)),
+            "error_types": dict(self.error_types)
+        }
 
 
-    def ask(self, prompt: str, system_prompt: str = "", temperature: float = 0.7) -> str:
+class AIModelRouter:
+    """Router for multiple AI models"""
 
+    def __init__(self, config: Dict[str, Any]):
+        """
+        Initialize the AI Model Router
 
+        Args:
+            config: Configuration dictionary. The "ai" section holds the API keys and
+                optional base_url/openai_base_url/claude_base_url, request_timeout,
+                max_retries, max_concurrency (int or per-model dict), hedge_delay
+                and hedge_delays (seconds before the fallback model is also asked,
+                default None = only after a failure; long completions often exceed
+                short delays and every hedge is billed), coalesce and prompt_cache
+                (PromptCache settings plus enabled, default True; with no path
+                the process-wide cache is shared)
         """
+        self.config = config
+        self.ai_config = config.get("ai", {})
+        self.request_timeout = self.ai_config.get("request_timeout", 60.0)
 
+        # Initialize agents
+        self.agents = {
+            "deepseek": DeepSeekAgent(
+                api_key=self.ai_config.get("api_key", ""),
+                base_url=self.ai_config.get("base_url", "https://api.siliconflow.cn/v1"),
+                timeout=self.request_timeout
+            ),
+            "openai": OpenAIAgent(
+                api_key=self.ai_config.get("fallback_api_key", ""),
+                base_url=self.ai_config.get("openai_base_url", "https://api.openai.com/v1"),
+                timeout=self.request_timeout
+            ),
+            "claude": ClaudeAgent(
+                api_key=self.ai_config.get("claude_api_key", ""),
+                base_url=self.ai_config.get("claude_base_url", "https://api.anthropic.com/v1"),
+                timeout=self.request_timeout
+            )
+        }
 
-        Send a prompt to DeepSeek and get a response
+        # Set default model from config
+        self.default_model = self.ai_config.get("provider", "deepseek")
+        self.fallback_model = self.ai_config.get("fallback_provider", "openai")
 
+        # Concurrency, hedging and coalescing
+        max_concurrency = self.ai_config.get("max_concurrency", 4)
+        if isinstance(max_concurrency, dict):
+            self.max_concurrency = {name: max_concurrency.get(name, 4) for name in self.agents}
+        else:
+            self.max_concurrency = {name: max_concurrency for name in self.agents}
+        # Hedging is opt-in: every hedge is a second paid completion
+        self.hedge_delay = self.ai_config.get("hedge_delay")
+        self.hedge_delays = self.ai_config.get("hedge_delays", {})
+        self.coalesce = self.ai_config.get("coalesce", True)
+
+        # Only touched on the AI event loop
+        self.semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.inflight: Dict[Tuple, asyncio.Future] = {}
+
+        self.stats = {name: ModelStats() for name in self.agents}
+        self.total_requests = 0
+        self.coalesced_requests = 0
+
+        cache_config = dict(self.ai_config.get("prompt_cache", {}))
+        self.prompt_cache: Optional[PromptCache] = None
+        if cache_config.pop("enabled", True):
+            try:
+                self.prompt_cache = PromptCache(cache_config) if "path" in cache_config \
+                    else get_prompt_cache(cache_config)
+            except Exception as e:
+                logger.error(f"Error opening prompt cache, caching disabled: {str(e)}")
+
+        client = get_http_client()
+        for name in self.agents:
+            client.configure_provider(name, max_retries=self.ai_config.get("max_retries", 1),
+                                      timeout=self.request_timeout)
 
-        
+        logger.info(f"AI Model Router initialized with default model: {self.default_model}")
 
+    def _model_chain(self, model: Optional[str]) -> List[str]:
+        """Models to try for a request, in order"""
+        model = model or self.default_model
+        if model not in self.agents:
+            logger.warning(f"Unknown model: {model}, using default: {self.default_model}")
+            model = self.default_model
+        chain = [model]
+        if self.fallback_model != model and self.fallback_model in self.agents:
+            chain.append(self.fallback_model)
+        return chain
+
+    async def _call_model(self, name: str, messages: List[Dict[str, str]], temperature: float,
+                          started: Optional[asyncio.Future] = None) -> str:
+        """
+        Call one model, within its concurrency limit, recording latency and errors
 
         Args:
+            started: Future set to the start time once the request leaves the queue
+        """
+        semaphore = self.semaphores.get(name)
+        if semaphore is None:
+            semaphore = self.semaphores[name] = asyncio.Semaphore(self.max_concurrency[name])
+        stats = self.stats[name]
+
+        queued = time.perf_counter()
+        async with semaphore:
+            start = time.perf_counter()
+            stats.queue_time += start - queued
+            if started is not None and not started.done():
+                started.set_result(time.monotonic())
+            try:
+                response = await self.agents[name].complete_async(messages, temperature)
+            except asyncio.CancelledError:
+                stats.cancelled += 1
+                raise
+            except AIRequestError as e:
+                stats.record(time.perf_counter() - start, e.kind)
+                raise
+            except Exception as e:
+                stats.record(time.perf_counter() - start, type(e).__name__)
+                raise AIRequestError(str(e), type(e).__name__) from e
+            stats.record(time.perf_counter() - start)
+            return response
 
+    async def _hedged_complete(self, chain: List[str], messages: List[Dict[str, str]], temperature: float) -> str:
+        """
+        Ask the models of a chain, hedging slow ones
 
-            prompt: The user prompt
+        The first model starts immediately. The next one starts as soon as a running
+        request fails, or when none has answered within the hedge delay of the
+        model started last, counted from when its request left the concurrency
+        queue. The first answer wins; the other requests are cancelled.
 
+        Raises:
+            AIRequestError: If every model fails
+        """
+        loop = asyncio.get_running_loop()
+        remaining = list(chain)
+        pending = {}
+        errors = []
+
+        def launch(hedge: bool = False):
+            name = remaining.pop(0)
+            if hedge:
+                self.stats[name].hedges += 1
+                logger.info(f"Hedging slow request with {name}")
+            started = loop.create_future()
+            pending[asyncio.ensure_future(self._call_model(name, messages, temperature, started))] = name
+            return name, started
 
-            system_prompt: Optional system prompt
+        try:
+            last, started = launch()
+            while pending:
+                hedge_delay = self.hedge_delays.get(last, self.hedge_delay)
+                if not (remaining and hedge_delay):
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                elif not started.done():
+                    # Still queued: the hedge delay starts with the request
+                    done, _ = await asyncio.wait(set(pending) | {started}, return_when=asyncio.FIRST_COMPLETED)
+                    done.discard(started)
+                    if not done:
+                        continue
+                else:
+                    timeout = max(0.0, hedge_delay - (time.monotonic() - started.result()))
+                    done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                    if not done:
+                        last, started = launch(hedge=True)
+                        continue
+
+                for task in done:
+                    name = pending.pop(task)
+                    try:
+                        response = task.result()
+                    except Exception as e:
+                        logger.warning(f"Model {name} failed: {str(e)}")
+                        errors.append(f"{name}: {str(e)}")
+                    else:
+                        self.stats[name].wins += 1
+                        return response
+
+                    if remaining and not pending:
+                        logger.warning(f"Trying fallback model: {remaining[0]}")
+                    if remaining:
+                        last, started = launch()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise AIRequestError("; ".join(errors) or "no model available")
+
+    async def _cached_complete(self, chain: List[str], messages: List[Dict[str, str]], temperature: float,
+                               cache_key: str, call_site: Optional[str]) -> str:
+        """Answer from the prompt cache, or ask the models and store the answer"""
+        response = self.prompt_cache.get(cache_key, call_site)
+        if response is not None:
+            return response
+        response = await self._hedged_complete(chain, messages, temperature)
+        self.prompt_cache.set(cache_key, response, chain[0], call_site)
+        return response
+
+    async def _complete(self, messages: List[Dict[str, str]], model: Optional[str], temperature: float,
+                        call_site: Optional[str] = None, use_cache: bool = True) -> str:
+        """Run a request on the AI event loop, joining an identical one already in flight"""
+        chain = self._model_chain(model)
+        self.total_requests += 1
+
+        if use_cache and self.prompt_cache is not None and self.prompt_cache.ttl(call_site):
+            key = self.prompt_cache.make_key(",".join(chain), messages, temperature, call_site)
+            request = self._cached_complete(chain, messages, temperature, key, call_site)
+        else:
+            key = (tuple(chain), json.dumps(messages, sort_keys=True, ensure_ascii=False), temperature)
+            request = self._hedged_complete(chain, messages, temperature)
 
+        if not self.coalesce:
+            return await request
 
-            temperature: Sampling temperature
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(request)
+            self.inflight[key] = task
+            task.add_done_callback(lambda finished: self.inflight.pop(key, None))
+        else:
+            request.close()
+            self.coalesced_requests += 1
 
+        # One caller giving up must not cancel the request for the others
+        return await asyncio.shield(task)
 
-            
+    async def generate_completion_async(self, messages: List[Dict[str, str]], model: str = None,
+                                        temperature: float = 0.7, call_site: str = None,
+                                        use_cache: bool = True) -> str:
+        """
+        Generate a completion from a list of messages without blocking the event loop
 
+        Args:
+            messages: List of message dictionaries (role, content)
+            model: Model to use (deepseek, openai, claude)
+            temperature: Sampling temperature
+            call_site: Caller name, selects the prompt cache TTL
+            use_cache: Whether the prompt cache may answer the request
 
         Returns:
+            Model completion as string ("Error: ..." if every model fails)
+        """
+        try:
+            return await _run_on_loop(self._complete(messages, model, temperature, call_site, use_cache))
+        except Exception as e:
+            logger.error(f"Error using model {model or self.default_model}: {str(e)}")
+            return f"Error: Unable to get completion from AI models - {str(e)}"
 
-
-            Model response as string
-
-
+    async def ask_async(self, prompt: str, model: str = None, system_prompt: str = "",
+                        temperature: float = 0.7, call_site: str = None, use_cache: bool = True) -> str:
         """
+        Send a prompt to an AI model and get a response without blocking the event loop
 
+        Args:
+            prompt: The user prompt
+            model: Model to use (deepseek, openai, claude)
+            system_prompt: Optional system prompt
+            temperature: Sampling temperature
+            call_site: Caller name, selects the prompt cache TTL
+            use_cache: Whether the prompt cache may answer the request
 
+        Returns:
+            Model response as string ("Error: ..." if every model fails)
+        """
         messages = []
-
-
-        
-
-
         if system_prompt:
-
-
             messages.append({"role": "system", "content": system_prompt})
-
-
-            
-
-
         messages.append({"role": "user", "content": prompt})
 
+        try:
+            return await _run_on_loop(self._complete(messages, model, temperature, call_site, use_cache))
+        except Exception as e:
+            logger.error(f"Error using model {model or self.default_model}: {str(e)}")
+            return f"Error: Unable to get response from AI models - {str(e)}"
 
-        
-
-
-        return self.generate_completion(messages, temperature)
-
-
-        
-
-
-    def generate_completion(self, messages: List[Dict[str, str]], temperature: float = 0.7) -> str:
-
-
+    def ask(self, prompt: str, model: str = None, system_prompt: str = "", temperature: float = 0.7,
+            call_site: str = None, use_cache: bool = True) -> str:
         """
-
-
-        Generate a completion from DeepSeek
-
-
-        
-
+        Send a prompt to an AI model and get a response
 
         Args:
-
-
-            messages: List of message dictionaries
-
-
+            prompt: The user prompt
+            model: Model to use (deepseek, openai, claude)
+            system_prompt: Optional system prompt
             temperature: Sampling temperature
+            call_site: Caller name, selects the prompt cache TTL
+            use_cache: Whether the prompt cache may answer the request
 
+        Returns:
+            Model response as string
+        """
+        return _run_sync(self.ask_async(prompt, model, system_prompt, temperature, call_site, use_cache))
 
-            
+    def generate_completion(self, messages: List[Dict[str, str]], model: str = None, temperature: float = 0.7,
+                            call_site: str = None, use_cache: bool = True) -> str:
+        """
+        Generate a completion from a list of messages
 
+        Args:
+            messages: List of message dictionaries (role, content)
+            model: Model to use (deepseek, openai, claude)
+            temperature: Sampling temperature
+            call_site: Caller name, selects the prompt cache TTL
+            use_cache: Whether the prompt cache may answer the request
 
         Returns:
-
-
             Model completion as string
-
-
         """
+        return _run_sync(self.generate_completion_async(messages, model, temperature, call_site, use_cache))
 
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get request metrics
 
-        try:
-
-
-            headers = {
-
-
-                "Content-Type": "application/json",
+        Returns:
+            Dictionary with request/coalescing counters, per-model statistics
+            (latency and error histograms, hedges, wins) and prompt cache hit rates
+        """
+        return {
+            "requests": self.total_requests,
+            "coalesced": self.coalesced_requests,
+            "models": {name: stats.to_dict() for name, stats in self.stats.items()},
+            "prompt_cache": self.prompt_cache.get_stats() if self.prompt_cache else None
+        }
 
+    def get_available_models(self) -> List[str]:
+        """
+        Get list of available models
 
-                "Authorization": f"Bearer {self.api_key}"
+        Returns:
+            List of model names
+        """
+        return list(self.agents.keys())
 
+    def switch_default_model(self, model: str) -> bool:
+        """
+        Switch the default model
 
-            }
-
-
-            
-
-
-            data = {
-
-
-                "model": self.model,
-
-
-                "messages": messages,
-
-
-                "temperature": temperature
-
-
-            }
-
-
-            
-
-
-            response = requests.post(
-
-
-                f"{self.base_url}/chat/completions",
-
-
-                headers=headers,
-
-
-                json=data,
-
-
-                timeout=60
-
-
-            )
-
-
-            
-
-
-            if response.status_code == 200:
-
-
-                result = response.json()
-
-
-                return result["choices"][0]["message"]["content"]
-
-
-            else:
-
-
-                logger.error(f"DeepSeek API error: {response.status_code} - {response.text}")
-
-
-                return f"Error: {response.status_code}"
-
-
-                
-
-
-        except Exception as e:
-
-
-            logger.error(f"Failed to generate completion with DeepSeek: {str(e)}")
-
-
-            return f"Error: {str(e)}"
-
-
-
-
-
-class OpenAIAgent(BaseAIAgent):
-
-
-    """Agent for OpenAI models"""
-
-
-    
-
-
-    def __init__(self, api_key: str = "", base_url: str = "https://api.openai.com/v1"):
-
-
-        super().__init__(api_key, base_url)
-
-
-        self.model = "gpt-4-turbo"
-
-
-        
-
-
-    def ask(self, prompt: str, system_prompt: str = "", temperature: float = 0.7) -> str:
-
-
-        """
-
-
-        Send a prompt to OpenAI and get a response
-
-
-        
-
-
-        Args:
-
-
-            prompt: The user prompt
-
-
-            system_prompt: Optional system prompt
-
-
-            temperature: Sampling temperature
-
-
-            
-
-
-        Returns:
-
-
-            Model response as string
-
-
-        """
-
-
-        messages = []
-
-
-        
-
-
-        if system_prompt:
-
-
-            messages.append({"role": "system", "content": system_prompt})
-
-
-            
-
-
-        messages.append({"role": "user", "content": prompt})
-
-
-        
-
-
-        return self.generate_completion(messages, temperature)
-
-
-        
-
-
-    def generate_completion(self, messages: List[Dict[str, str]], temperature: float = 0.7) -> str:
-
-
-        """
-
-
-        Generate a completion from OpenAI
-
-
-        
-
-
-        Args:
-
-
-            messages: List of message dictionaries
-
-
-            temperature: Sampling temperature
-
-
-            
-
-
-        Returns:
-
-
-            Model completion as string
-
-
-        """
-
-
-        try:
-
-
-            headers = {
-
-
-                "Content-Type": "application/json",
-
-
-                "Authorization": f"Bearer {self.api_key}"
-
-
-            }
-
-
-            
-
-
-            data = {
-
-
-                "model": self.model,
-
-
-                "messages": messages,
-
-
-                "temperature": temperature
-
-
-            }
-
-
-            
-
-
-            response = requests.post(
-
-
-                f"{self.base_url}/chat/completions",
-
-
-                headers=headers,
-
-
-                json=data,
-
-
-                timeout=60
-
-
-            )
-
-
-            
-
-
-            if response.status_code == 200:
-
-
-                result = response.json()
-
-
-                return result["choices"][0]["message"]["content"]
-
-
-            else:
-
-
-                logger.error(f"OpenAI API error: {response.status_code} - {response.text}")
-
-
-                return f"Error: {response.status_code}"
-
-
-                
-
-
-        except Exception as e:
-
-
-            logger.error(f"Failed to generate completion with OpenAI: {str(e)}")
-
-
-            return f"Error: {str(e)}"
-
-
-
-
-
-class ClaudeAgent(BaseAIAgent):
-
-
-    """Agent for Anthropic Claude models"""
-
-
-    
-
-
-    def __init__(self, api_key: str = "", base_url: str = "https://api.anthropic.com/v1"):
-
-
-        super().__init__(api_key, base_url)
-
-
-        self.model = "claude-3-opus-20240229"
-
-
-        
-
-
-    def ask(self, prompt: str, system_prompt: str = "", temperature: float = 0.7) -> str:
-
-
-        """
-
-
-        Send a prompt to Claude and get a response
-
-
-        
-
-
-        Args:
-
-
-            prompt: The user prompt
-
-
-            system_prompt: Optional system prompt
-
-
-            temperature: Sampling temperature
-
-
-            
-
-
-        Returns:
-
-
-            Model response as string
-
-
-        """
-
-
-        try:
-
-
-            headers = {
-
-
-                "Content-Type": "application/json",
-
-
-                "x-api-key": self.api_key,
-
-
-                "anthropic-version": "2023-06-01"
-
-
-            }
-
-
-            
-
-
-            data = {
-
-
-                "model": self.model,
-
-
-                "temperature": temperature,
-
-
-                "max_tokens": 4000,
-
-
-                "messages": [{"role": "user", "content": prompt}]
-
-
-            }
-
-
-            
-
-
-            if system_prompt:
-
-
-                data["system"] = system_prompt
-
-
-                
-
-
-            response = requests.post(
-
-
-                f"{self.base_url}/messages",
-
-
-                headers=headers,
-
-
-                json=data,
-
-
-                timeout=60
-
-
-            )
-
-
-            
-
-
-            if response.status_code == 200:
-
-
-                result = response.json()
-
-
-                return result["content"][0]["text"]
-
-
-            else:
-
-
-                logger.error(f"Claude API error: {response.status_code} - {response.text}")
-
-
-                return f"Error: {response.status_code}"
-
-
-                
-
-
-        except Exception as e:
-
-
-            logger.error(f"Failed to generate completion with Claude: {str(e)}")
-
-
-            return f"Error: {str(e)}"
-
-
-            
-
-
-    def generate_completion(self, messages: List[Dict[str, str]], temperature: float = 0.7) -> str:
-
-
-        """
-
-
-        Generate a completion from Claude
-
-
-        
-
-
-        Args:
-
-
-            messages: List of message dictionaries
-
-
-            temperature: Sampling temperature
-
-
-            
-
-
-        Returns:
-
-
-            Model completion as string
-
-
-        """
-
-
-        try:
-
-
-            # Extract system message if present
-
-
-            system_prompt = ""
-
-
-            user_messages = []
-
-
-            
-
-
-            for msg in messages:
-
-
-                if msg["role"] == "system":
-
-
-                    system_prompt = msg["content"]
-
-
-                else:
-
-
-                    user_messages.append(msg)
-
-
-                    
-
-
-            # Combine user messages
-
-
-            combined_prompt = ""
-
-
-            for msg in user_messages:
-
-
-                role_prefix = "Human: " if msg["role"] == "user" else "Assistant: "
-
-
-                combined_prompt += f"{role_prefix}{msg['content']}\n\n"
-
-
-                
-
-
-            if not combined_prompt:
-
-
-                combined_prompt = "Please provide market analysis."
-
-
-                
-
-
-            return self.ask(combined_prompt, system_prompt, temperature)
-
-
-            
-
-
-        except Exception as e:
-
-
-            logger.error(f"Failed to generate completion with Claude: {str(e)}")
-
-
-            return f"Error: {str(e)}"
-
-
-
-
-
-class AIModelRouter:
-
-
-    """Router for multiple AI models"""
-
-
-    
-
-
-    def __init__(self, config: Dict[str, Any]):
-
-
-        """
-
-
-        Initialize the AI Model Router
-
-
-        
-
-
-        Args:
-
-
-            config: Configuration dictionary
-
-
-        """
-
-
-        self.config = config
-
-
-        self.ai_config = config.get("ai", {})
-
-
-        
-
-
-        # Initialize agents
-
-
-        self.agents = {
-
-
-            "deepseek": DeepSeekAgent(
-
-
-                api_key=self.ai_config.get("api_key", ""),
-
-
-                base_url=self.ai_config.get("base_url", "https://api.siliconflow.cn/v1")
-
-
-            ),
-
-
-            "openai": OpenAIAgent(
-
-
-                api_key=self.ai_config.get("fallback_api_key", ""),
-
-
-                base_url="https://api.openai.com/v1"
-
-
-            ),
-
-
-            "claude": ClaudeAgent(
-
-
-                api_key=self.ai_config.get("claude_api_key", ""),
-
-
-                base_url="https://api.anthropic.com/v1"
-
-
-            )
-
-
-        }
-
-
-        
-
-
-        # Set default model from config
-
-
-        self.default_model = self.ai_config.get("provider", "deepseek")
-
-
-        self.fallback_model = self.ai_config.get("fallback_provider", "openai")
-
-
-        
-
-
-        logger.info(f"AI Model Router initialized with default model: {self.default_model}")
-
-
-        
-
-
-    def ask(self, prompt: str, model: str = None, system_prompt: str = "", temperature: float = 0.7) -> str:
-
-
-        """
-
-
-        Send a prompt to an AI model and get a response
-
-
-        
-
-
-        Args:
-
-
-            prompt: The user prompt
-
-
-            model: Model to use (deepseek, openai, claude)
-
-
-            system_prompt: Optional system prompt
-
-
-            temperature: Sampling temperature
-
-
-            
-
-
-        Returns:
-
-
-            Model response as string
-
-
-        """
-
-
-        # Use specified model or default
-
-
-        model = model or self.default_model
-
-
-        
-
-
-        # Get the agent
-
-
-        agent = self.agents.get(model)
-
-
-        
-
-
-        if not agent:
-
-
-            logger.warning(f"Unknown model: {model}, using default: {self.default_model}")
-
-
-            agent = self.agents.get(self.default_model)
-
-
-            
-
-
-        # Try primary model
-
-
-        try:
-
-
-            response = agent.ask(prompt, system_prompt, temperature)
-
-
-            
-
-
-            # If there's an error response, try fallback
-
-
-            if response.startswith("Error:") and model != self.fallback_model:
-
-
-                logger.warning(f"Primary model {model} failed, trying fallback: {self.fallback_model}")
-
-
-                fallback_agent = self.agents.get(self.fallback_model)
-
-
-                return fallback_agent.ask(prompt, system_prompt, temperature)
-
-
-                
-
-
-            return response
-
-
-            
-
-
-        except Exception as e:
-
-
-            logger.error(f"Error using model {model}: {str(e)}")
-
-
-            
-
-
-            # Try fallback if different from current model
-
-
-            if model != self.fallback_model:
-
-
-                logger.info(f"Trying fallback model: {self.fallback_model}")
-
-
-                try:
-
-
-                    fallback_agent = self.agents.get(self.fallback_model)
-
-
-                    return fallback_agent.ask(prompt, system_prompt, temperature)
-
-
-                except Exception as fallback_error:
-
-
-                    logger.error(f"Fallback model also failed: {str(fallback_error)}")
-
-
-                    
-
-
-            return f"Error: Unable to get response from AI models - {str(e)}"
-
-
-            
-
-
-    def generate_completion(self, messages: List[Dict[str, str]], model: str = None, temperature: float = 0.7) -> str:
-
-
-        """
-
-
-        Generate a completion from a list of messages
-
-
-        
-
-
-        Args:
-
-
-            messages: List of message dictionaries (role, content)
-
-
-            model: Model to use (deepseek, openai, claude)
-
-
-            temperature: Sampling temperature
-
-
-            
-
-
-        Returns:
-
-
-            Model completion as string
-
-
-        """
-
-
-        # Use specified model or default
-
-
-        model = model or self.default_model
-
-
-        
-
-
-        # Get the agent
-
-
-        agent = self.agents.get(model)
-
-
-        
-
-
-        if not agent:
-
-
-            logger.warning(f"Unknown model: {model}, using default: {self.default_model}")
-
-
-            agent = self.agents.get(self.default_model)
-
-
-            
-
-
-        # Try primary model
-
-
-        try:
-
-
-            response = agent.generate_completion(messages, temperature)
-
-
-            
-
-
-            # If there's an error response, try fallback
-
-
-            if response.startswith("Error:") and model != self.fallback_model:
-
-
-                logger.warning(f"Primary model {model} failed, trying fallback: {self.fallback_model}")
-
-
-                fallback_agent = self.agents.get(self.fallback_model)
-
-
-                return fallback_agent.generate_completion(messages, temperature)
-
-
-                
-
-
-            return response
-
-
-            
-
-
-        except Exception as e:
-
-
-            logger.error(f"Error using model {model}: {str(e)}")
-
-
-            
-
-
-            # Try fallback if different from current model
-
-
-            if model != self.fallback_model:
-
-
-                logger.info(f"Trying fallback model: {self.fallback_model}")
-
-
-                try:
-
-
-                    fallback_agent = self.agents.get(self.fallback_model)
-
-
-                    return fallback_agent.generate_completion(messages, temperature)
-
-
-                except Exception as fallback_error:
-
-
-                    logger.error(f"Fallback model also failed: {str(fallback_error)}")
-
-
-                    
-
-
-            return f"Error: Unable to get completion from AI models - {str(e)}"
-
-
-            
-
-
-    def get_available_models(self) -> List[str]:
-
-
-        """
-
-
-        Get list of available models
-
-
-        
-
-
-        Returns:
-
-
-            List of model names
-
-
-        """
-
-
-        return list(self.agents.keys())
-
-
-        
-
-
-    def switch_default_model(self, model: str) -> bool:
-
-
-        """
-
-
-        Switch the default model
-
-
-        
-
-
-        Args:
-
-
-            model: Model to set as default
-
-
-            
-
+        Args:
+            model: Model to set as default
 
         Returns:
-
-
             Success status
-
-
         """
-
-
         if model in self.agents:
-
-
             self.default_model = model
-
-
             logger.info(f"Default model switched to: {model}")
-
-
             return True
-
-
         else:
-
-
             logger.warning(f"Cannot switch to unknown model: {model}")
-
-
             return False
 
-
     async def start(self):
         """Async start method for compatibility with system startup."""
-        pass 
\ No newline at end of file
+        pass
@@ -0,0 +1,336 @@
+"""
+AI Prompt Cache
+
+Persistent prompt -> completion cache shared by the AI callers. Entries are
+content-addressed by a hash of (model, system prompt, normalised prompt,
+temperature bucket, max_tokens, top_p). Normalisation collapses whitespace and rounds numbers to a
+few significant digits, so prompts built from near-identical market snapshots map
+to the same entry. Each call site reads with its own TTL. The store is a SQLite
+file bounded by entry count and size, evicting the least recently used entries.
+"""
+
+import os
+import re
+import json
+import time
+import math
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, Optional, List
+
+logger = logging.getLogger(__name__)
+
+# Numbers standing on their own ("$187.43", "63.2%", "-0.0123", "1.5e6", "价格187.43美元"),
+# not part of identifiers such as MA20 or BTCUSDT2406. The guards are ASCII-only: \w would
+# also match CJK characters and leave numbers in Chinese prompts unquantised
+_NUMBER_PATTERN = re.compile(r"(?<![A-Za-z0-9_.])[-+]?[0-9]+(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?(?![A-Za-z0-9_])")
+
+# Dates and times are kept verbatim
+_DATETIME_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?|\d{1,2}:\d{2}(?::\d{2})?")
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def quantize_number(value: float, digits: int) -> str:
+    """
+    Round a number to significant digits and format it canonically
+
+    Args:
+        value: Number to round
+        digits: Significant digits to keep
+
+    Returns:
+        Canonical string (e.g. 187.4321 -> "187", 0.012345 -> "0.0123" for 3 digits)
+    """
+    if value == 0 or not math.isfinite(value):
+        return "0" if value == 0 else str(value)
+    rounded = round(value, digits - 1 - int(math.floor(math.log10(abs(value)))))
+    if rounded == int(rounded):
+        return str(int(rounded))
+    return repr(rounded)
+
+
+def normalize_prompt(text: str, digits: Optional[int] = 3) -> str:
+    """
+    Normalise a prompt for cache keying
+
+    Collapses whitespace and rounds free-standing numbers to significant digits;
+    dates and times are left as they are.
+
+    Args:
+        text: Prompt text
+        digits: Significant digits to keep (None = keep numbers as they are)
+
+    Returns:
+        Normalised text
+    """
+    text = _WHITESPACE_PATTERN.sub(" ", text).strip()
+    if digits is None:
+        return text
+
+    def quantize(match: re.Match) -> str:
+        return quantize_number(float(match.group(0)), digits)
+
+    parts = []
+    last = 0
+    for match in _DATETIME_PATTERN.finditer(text):
+        parts.append(_NUMBER_PATTERN.sub(quantize, text[last:match.start()]))
+        parts.append(match.group(0))
+        last = match.end()
+    parts.append(_NUMBER_PATTERN.sub(quantize, text[last:]))
+    return "".join(parts)
+
+
+class PromptCache:
+    """SQLite-backed LRU cache of AI completions with per-call-site TTLs"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the prompt cache
+
+        Args:
+            config: Dictionary with optional path, ttl (seconds, default 600),
+                call_sites ({name: {"ttl": seconds, "digits": n}}), digits
+                (significant digits kept in prompts, None = exact numbers),
+                temperature_bucket (width of temperature buckets), max_entries
+                and max_bytes
+        """
+        config = config or {}
+        self.path = config.get("path", "data/ai_cache/prompt_cache.sqlite")
+        self.default_ttl = config.get("ttl", 600)
+        self.call_sites: Dict[str, Dict[str, Any]] = dict(config.get("call_sites", {}))
+        self.digits = config.get("digits", 3)
+        self.temperature_bucket = config.get("temperature_bucket", 0.2)
+        self.max_entries = config.get("max_entries", 50000)
+        self.max_bytes = config.get("max_bytes", 256 * 1024 * 1024)
+
+        self.lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self.evictions = 0
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS completions ("
+            "key TEXT PRIMARY KEY, model TEXT, call_site TEXT, response TEXT, "
+            "created REAL, accessed REAL, size INTEGER)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS completions_accessed ON completions (accessed)")
+        self.entries, self.bytes = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions"
+        ).fetchone()
+
+    def configure_call_site(self, name: str, ttl: Optional[float] = None, digits: Optional[int] = None):
+        """
+        Set the TTL and number precision used for a call site
+
+        Args:
+            name: Call site name
+            ttl: Maximum age in seconds of entries this call site accepts (0 = no caching)
+            digits: Significant digits kept in its prompts
+        """
+        site = self.call_sites.setdefault(name, {})
+        if ttl is not None:
+            site["ttl"] = ttl
+        if digits is not None:
+            site["digits"] = digits
+
+    def _site(self, call_site: Optional[str]) -> Dict[str, Any]:
+        return self.call_sites.get(call_site or "default", {})
+
+    def ttl(self, call_site: Optional[str] = None) -> float:
+        """Maximum entry age accepted by a call site"""
+        return self._site(call_site).get("ttl", self.default_ttl)
+
+    def make_key(self, model: str, messages: List[Dict[str, str]], temperature: float,
+                 call_site: Optional[str] = None, max_tokens: Optional[int] = None,
+                 top_p: Optional[float] = None) -> str:
+        """
+        Build the content address of a request
+
+        Args:
+            model: Model (or model chain) answering the request
+            messages: Chat messages; system messages form the system prompt
+            temperature: Sampling temperature
+            call_site: Call site, for its number precision
+            max_tokens: Completion length limit, if the caller sets one
+            top_p: Nucleus sampling parameter, if the caller sets one
+
+        Returns:
+            Hex digest identifying the request
+        """
+        digits = self._site(call_site).get("digits", self.digits)
+        system = "\n".join(m["content"] for m in messages if m["role"] == "system")
+        prompt = [
+            [m["role"], normalize_prompt(m["content"], digits)]
+            for m in messages if m["role"] != "system"
+        ]
+        # Buckets are [0, w), [w, 2w), ...; the epsilon keeps 0.6 / 0.2 in bucket 3
+        bucket = math.floor(temperature / self.temperature_bucket + 1e-9) if self.temperature_bucket else temperature
+        payload = json.dumps([model, normalize_prompt(system, None), prompt, bucket, max_tokens, top_p],
+                             ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _count(self, call_site: Optional[str], counter: str):
+        site = self.stats.setdefault(call_site or "default",
+                                     {"hits": 0, "misses": 0, "stores": 0, "expired": 0})
+        site[counter] += 1
+
+    def get(self, key: str, call_site: Optional[str] = None) -> Optional[str]:
+        """
+        Look up a completion
+
+        Args:
+            key: Key from make_key
+            call_site: Call site reading the entry (selects the TTL)
+
+        Returns:
+            Cached completion, or None if missing or older than the call site's TTL
+        """
+        ttl = self.ttl(call_site)
+        now = time.time()
+        with self.lock:
+            if not ttl:
+                self._count(call_site, "misses")
+                return None
+            row = self.conn.execute("SELECT response, created FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._count(call_site, "misses")
+                return None
+            if now - row[1] > ttl:
+                self._count(call_site, "expired")
+                self._count(call_site, "misses")
+                return None
+            self.conn.execute("UPDATE completions SET accessed = ? WHERE key = ?", (now, key))
+            self._count(call_site, "hits")
+            return row[0]
+
+    def set(self, key: str, response: str, model: str = "", call_site: Optional[str] = None):
+        """
+        Store a completion, evicting least recently used entries beyond the limits
+
+        Args:
+            key: Key from make_key
+            response: Completion text
+            model: Model that produced it
+            call_site: Call site that requested it
+        """
+        size = len(response.encode("utf-8")) + len(key)
+        now = time.time()
+        with self.lock:
+            if not self.ttl(call_site):
+                return
+            try:
+                old = self.conn.execute("SELECT size FROM completions WHERE key = ?", (key,)).fetchone()
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, model, call_site or "default", response, now, now, size)
+                )
+                if old:
+                    self.bytes += size - old[0]
+                else:
+                    self.entries += 1
+                    self.bytes += size
+                self._count(call_site, "stores")
+                self._evict()
+            except sqlite3.Error as e:
+                logger.error(f"Error storing prompt cache entry: {str(e)}")
+
+    def _evict(self):
+        """Drop least recently used entries until the cache is within its limits"""
+        while self.entries > self.max_entries or self.bytes > self.max_bytes:
+            excess = max(self.entries - self.max_entries, 1)
+            rows = self.conn.execute(
+                "SELECT key, size FROM completions ORDER BY accessed LIMIT ?", (max(excess, 16),)
+            ).fetchall()
+            if not rows:
+                self.entries, self.bytes = 0, 0
+                return
+            for key, size in rows:
+                if self.entries <= self.max_entries and self.bytes <= self.max_bytes:
+                    break
+                self.conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                self.entries -= 1
+                self.bytes -= size
+                self.evictions += 1
+
+    def purge_expired(self, max_age: Optional[float] = None) -> int:
+        """
+        Delete entries older than every call site accepts
+
+        Args:
+            max_age: Age in seconds (defaults to the longest configured TTL)
+
+        Returns:
+            Number of entries deleted
+        """
+        if max_age is None:
+            max_age = max([self.default_ttl] + [site.get("ttl", 0) for site in self.call_sites.values()])
+        with self.lock:
+            cursor = self.conn.execute("DELETE FROM completions WHERE created < ?", (time.time() - max_age,))
+            self.entries, self.bytes = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions"
+            ).fetchone()
+            return cursor.rowcount
+
+    def clear(self):
+        """Delete every entry"""
+        with self.lock:
+            self.conn.execute("DELETE FROM completions")
+            self.entries, self.bytes = 0, 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            Entry count, size, evictions and hit rates overall and per call site
+        """
+        with self.lock:
+            sites = {}
+            for name, counts in self.stats.items():
+                lookups = counts["hits"] + counts["misses"]
+                sites[name] = dict(counts, hit_rate=counts["hits"] / lookups if lookups else 0.0)
+            hits = sum(counts["hits"] for counts in self.stats.values())
+            lookups = hits + sum(counts["misses"] for counts in self.stats.values())
+            return {
+                "entries": self.entries,
+                "bytes": self.bytes,
+                "evictions": self.evictions,
+                "hits": hits,
+                "misses": lookups - hits,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "call_sites": sites
+            }
+
+    def close(self):
+        """Close the database"""
+        with self.lock:
+            self.conn.close()
+
+
+_shared_cache: Optional[PromptCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_prompt_cache(config: Optional[Dict[str, Any]] = None) -> PromptCache:
+    """
+    Get the process-wide prompt cache, creating it on first use
+
+    Args:
+        config: PromptCache configuration, used only when the cache is created
+
+    Returns:
+        The shared cache
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                _shared_cache = PromptCache(config)
+    return _shared_cache
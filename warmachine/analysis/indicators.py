@@ -0,0 +1,590 @@
+"""
+Incremental technical indicators
+
+Stateful versions of the indicators computed with pandas rolling/ewm windows in
+market_analyzer.calculate_technical_indicators and TradingHandler. Each indicator
+consumes one bar at a time and updates its running state in O(1) (CCI's mean
+absolute deviation is O(period)), reproducing the pandas kernels: compensated
+rolling sums, Welford rolling variance, monotonic-deque rolling extremes and
+adjust=False exponential weighting, so values agree with the pandas outputs to
+floating-point tolerance.
+
+IndicatorEngine keeps one set of indicators per (symbol, timeframe), seeds it from
+history once and afterwards only feeds bars it has not seen.
+"""
+
+import copy
+import math
+import threading
+from collections import deque
+from typing import Dict, Any, Callable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+NAN = float("nan")
+
+
+def _div(numerator: float, denominator: float) -> float:
+    """Divide with NumPy semantics (x/0 = +-inf, 0/0 = nan)"""
+    if denominator == 0:
+        if numerator == 0 or numerator != numerator:
+            return NAN
+        return math.copysign(math.inf, numerator) * math.copysign(1.0, denominator)
+    return numerator / denominator
+
+
+class RollingMean:
+    """Rolling mean over the last `window` values (pandas rolling().mean())"""
+
+    __slots__ = ("window", "min_periods", "values", "nobs", "sum", "compensation",
+                 "neg_ct", "same_count", "prev_value")
+
+    def __init__(self, window: int, min_periods: Optional[int] = None):
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self.values = deque()
+        self.nobs = 0
+        self.sum = 0.0
+        self.compensation = 0.0
+        self.neg_ct = 0
+        self.same_count = 0
+        self.prev_value = NAN
+
+    def update(self, value: float) -> float:
+        if len(self.values) == self.window:
+            old = self.values.popleft()
+            if old == old:
+                self.nobs -= 1
+                y = -old - self.compensation
+                t = self.sum + y
+                self.compensation = t - self.sum - y
+                self.sum = t
+                if math.copysign(1.0, old) < 0:
+                    self.neg_ct -= 1
+
+        self.values.append(value)
+        if value == value:
+            self.nobs += 1
+            y = value - self.compensation
+            t = self.sum + y
+            self.compensation = t - self.sum - y
+            self.sum = t
+            if math.copysign(1.0, value) < 0:
+                self.neg_ct += 1
+            self.same_count = self.same_count + 1 if value == self.prev_value else 1
+            self.prev_value = value
+
+        if self.nobs < self.min_periods or self.nobs == 0:
+            return NAN
+        if self.same_count >= self.nobs:
+            return self.prev_value
+        result = self.sum / self.nobs
+        if self.neg_ct == 0 and result < 0:
+            return 0.0
+        if self.neg_ct == self.nobs and result > 0:
+            return 0.0
+        return result
+
+
+class RollingStd:
+    """Rolling sample standard deviation (pandas rolling().std(), ddof=1)"""
+
+    __slots__ = ("window", "min_periods", "values", "nobs", "mean", "ssqdm", "compensation")
+
+    def __init__(self, window: int, min_periods: Optional[int] = None):
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self.values = deque()
+        self.nobs = 0
+        self.mean = 0.0
+        self.ssqdm = 0.0
+        self.compensation = 0.0
+
+    def update(self, value: float) -> float:
+        # Welford's update with Kahan-compensated mean
+        if len(self.values) == self.window:
+            old = self.values.popleft()
+            if old == old:
+                self.nobs -= 1
+                if self.nobs:
+                    prev_mean = self.mean - self.compensation
+                    y = old - self.compensation
+                    t = y - self.mean
+                    self.compensation = t + self.mean - y
+                    self.mean = self.mean - t / self.nobs
+                    self.ssqdm -= (old - prev_mean) * (old - self.mean)
+                else:
+                    self.mean = 0.0
+                    self.ssqdm = 0.0
+
+        self.values.append(value)
+        if value == value:
+            self.nobs += 1
+            prev_mean = self.mean - self.compensation
+            y = value - self.compensation
+            t = y - self.mean
+            self.compensation = t + self.mean - y
+            self.mean = self.mean + t / self.nobs
+            self.ssqdm += (value - prev_mean) * (value - self.mean)
+
+        if self.nobs < self.min_periods or self.nobs <= 1:
+            return NAN
+        variance = self.ssqdm / (self.nobs - 1)
+        return math.sqrt(variance) if variance > 0 else 0.0
+
+
+class RollingExtreme:
+    """Rolling max or min over the last `window` values (monotonic deque)"""
+
+    __slots__ = ("window", "min_periods", "is_max", "candidates", "valid", "count")
+
+    def __init__(self, window: int, is_max: bool = True, min_periods: Optional[int] = None):
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self.is_max = is_max
+        self.candidates = deque()  # (position, value), values monotonic
+        self.valid = deque()  # positions of non-NaN values in the window
+        self.count = 0
+
+    def update(self, value: float) -> float:
+        position = self.count
+        self.count += 1
+        expired = position - self.window
+
+        while self.candidates and self.candidates[0][0] <= expired:
+            self.candidates.popleft()
+        while self.valid and self.valid[0] <= expired:
+            self.valid.popleft()
+
+        if value == value:
+            self.valid.append(position)
+            if self.is_max:
+                while self.candidates and self.candidates[-1][1] <= value:
+                    self.candidates.pop()
+            else:
+                while self.candidates and self.candidates[-1][1] >= value:
+                    self.candidates.pop()
+            self.candidates.append((position, value))
+
+        if len(self.valid) < max(self.min_periods, 1):
+            return NAN
+        return self.candidates[0][1]
+
+
+class EWM:
+    """Exponentially weighted mean with adjust=False (pandas ewm().mean())"""
+
+    __slots__ = ("alpha", "weighted", "old_wt", "nobs")
+
+    def __init__(self, span: Optional[float] = None, alpha: Optional[float] = None):
+        if alpha is None:
+            alpha = 2.0 / (span + 1.0)
+        self.alpha = alpha
+        self.weighted = NAN
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    def update(self, value: float) -> float:
+        is_observation = value == value
+        self.nobs += is_observation
+        if self.weighted == self.weighted:
+            # NaN inputs still decay the old weight (ignore_na=False)
+            self.old_wt *= 1.0 - self.alpha
+            if is_observation:
+                if self.weighted != value:
+                    self.weighted = (self.old_wt * self.weighted + self.alpha * value) / (self.old_wt + self.alpha)
+                self.old_wt = 1.0
+        else:
+            self.weighted = value
+        return self.weighted if self.nobs > 0 else NAN
+
+
+class Indicator:
+    """Base class of the incremental indicators"""
+
+    def update(self, high: float, low: float, close: float, volume: float = 0.0) -> Any:
+        """
+        Add a bar
+
+        Args:
+            high: Bar high
+            low: Bar low
+            close: Bar close
+            volume: Bar volume
+
+        Returns:
+            Indicator value after the bar (a float, or a dict for multi-line indicators)
+        """
+        raise NotImplementedError
+
+
+class MovingAverage(Indicator):
+    """Simple moving average of the close"""
+
+    def __init__(self, window: int):
+        self.mean = RollingMean(window)
+
+    def update(self, high: float, low: float, close: float, volume: float = 0.0) -> float:
+        return self.mean.update(close)
+
+
+class ExponentialMovingAverage(Indicator):
+    """Exponential moving average of the close (adjust=False)"""
+
+    def __init__(self, span: int):
+        self.ewm = EWM(span=span)
+
+    def update(self, high: float, low: float, close: float, volume: float = 0.0) -> float:
+        return self.ewm.update(close)
+
+
+class MACD(Indicator):
+    """MACD line, signal line and histogram"""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = EWM(span=fast)
+        self.slow = EWM(span=slow)
+        self.signal = EWM(span=signal)
+
+    def update(self, high: float, low: float, close: float, volume: float = 0.0) -> Dict[str, float]:
+        fast = self.fast.update(close)
+        slow = self.slow.update(close)
+        macd = fast - slow
+        signal = self.signal.update(macd)
+        return {"fast": fast, "slow": slow, "macd": macd, "signal": signal, "hist": macd - signal}
+
+
+class RSI(Indicator):
+    """Relative strength index from simple rolling means of gains and losses"""
+
+    def __init__(self, period: int = 14):
+        self.gain = RollingMean(period)
+        self.loss = RollingMean(period)
+        self.prev_close = NAN
+
+    def update(self, high: float, low: float, close: float, volume: float = 0.0) -> float:
+        delta = close - self.prev_close
+        self.prev_close = close
+        gain = self.gain.update(delta if delta > 0 else 0.0)
+        loss = self.loss.update(-(delta if delta < 0 else 0.0))
+        rs = _div(gain, loss)
+        return 100 - _div(100, 1 + rs)
+
+
+class BollingerBands(Indicator):
+    """Bollinger bands around a simple moving average"""
+
+    def __init__(self, window: int = 20, num_std: float = 2.0):
+        self.mean = RollingMean(window)
+        self.std = RollingStd(window)
+        self.num_std = num_std
+
+    def update(self, high: float, low: float, close: float, volume: float = 0.0) -> Dict[str, float]:
+        middle = self.mean.update(close)
+        std = self.std.update(close)
+        return {"middle": middle, "std": std,
+                "upper": middle + self.num_std * std, "lower": middle - self.num_std * std}
+
+
+class Volatility(Indicator):
+    """Rolling standard deviation of the close as a percentage of its mean"""
+
+    def __init__(self, window: int = 20):
+        self.mean = RollingMean(window)
+        self.std = RollingStd(window)
+
+    def update(self, high: float, low: float, close: float, volume: float = 0.0) -> float:
+        mean = self.mean.update(close)
+        std = self.std.update(close)
+        return _div(std, mean) * 100
+
+
+class KDJ(Indicator):
+    """Stochastic K, D and J lines"""
+
+    def __init__(self, n: int = 9, m1: int = 3, m2: int = 3):
+        self.lowest = RollingExtreme(n, is_max=False, min_periods=1)
+        self.highest = RollingExtreme(n, is_max=True, min_periods=1)
+        self.k = EWM(alpha=1 / m1)
+        self.d = EWM(alpha=1 / m2)
+
+    def update(self, high: float, low: float, close: float, volume: float = 0.0) -> Dict[str, float]:
+        lowest = self.lowest.update(low)
+        highest = self.highest.update(high)
+        rsv = _div(close - lowest, highest - lowest) * 100
+        k = self.k.update(rsv)
+        d = self.d.update(k)
+        return {"k": k, "d": d, "j": 3 * k - 2 * d}
+
+
+class CCI(Indicator):
+    """Commodity channel index of the typical price"""
+
+    def __init__(self, period: int = 20):
+        self.period = period
+        self.mean = RollingMean(period)
+        self.window = np.full(period, np.nan)
+        self.count = 0
+
+    def update(self, high: float, low: float, close: float, volume: float = 0.0) -> float:
+        tp = (high + low + close) / 3
+        mean = self.mean.update(tp)
+        self.window[self.count % self.period] = tp
+        self.count += 1
+        if self.count < self.period or np.isnan(self.window).any():
+            return NAN
+        # Mean absolute deviation moves with the mean, so it is recomputed over the window
+        mean_deviation = float(np.abs(self.window - self.window.mean()).mean())
+        return _div(tp - mean, 0.015 * mean_deviation)
+
+
+class _TrueRange:
+    """True range and directional movement of consecutive bars"""
+
+    __slots__ = ("prev_high", "prev_low", "prev_close")
+
+    def __init__(self):
+        self.prev_high = NAN
+        self.prev_low = NAN
+        self.prev_close = NAN
+
+    def update(self, high: float, low: float, close: float) -> Tuple[float, float, float]:
+        tr = high - low
+        if self.prev_close == self.prev_close:
+            tr = max(tr, abs(high - self.prev_close), abs(low - self.prev_close))
+        up_move = high - self.prev_high
+        down_move = self.prev_low - low
+        plus_dm = up_move if up_move > down_move and up_move > 0 else 0.0
+        minus_dm = down_move if down_move > up_move and down_move > 0 else 0.0
+        self.prev_high, self.prev_low, self.prev_close = high, low, close
+        return tr, plus_dm, minus_dm
+
+
+class ATR(Indicator):
+    """Average true range (simple rolling mean of the true range)"""
+
+    def __init__(self, period: int = 14):
+        self.true_range = _TrueRange()
+        self.mean = RollingMean(period)
+
+    def update(self, high: float, low: float, close: float, volume: float = 0.0) -> float:
+        tr, _, _ = self.true_range.update(high, low, close)
+        return self.mean.update(tr)
+
+
+class DMI(Indicator):
+    """Directional movement index: +DI, -DI and ADX"""
+
+    def __init__(self, period: int = 14):
+        self.true_range = _TrueRange()
+        self.tr = RollingMean(period)
+        self.plus_dm = RollingMean(period)
+        self.minus_dm = RollingMean(period)
+        self.adx = RollingMean(period)
+
+    def update(self, high: float, low: float, close: float, volume: float = 0.0) -> Dict[str, float]:
+        tr, plus_dm, minus_dm = self.true_range.update(high, low, close)
+        tr = self.tr.update(tr)
+        plus_di = 100 * _div(self.plus_dm.update(plus_dm), tr)
+        minus_di = 100 * _div(self.minus_dm.update(minus_dm), tr)
+        dx = 100 * _div(abs(plus_di - minus_di), plus_di + minus_di)
+        return {"plus_di": plus_di, "minus_di": minus_di, "adx": self.adx.update(dx)}
+
+
+class Ichimoku(Indicator):
+    """Ichimoku cloud lines"""
+
+    def __init__(self, conversion: int = 9, base: int = 26, span_b: int = 52):
+        self.windows = [
+            (RollingExtreme(window, is_max=True), RollingExtreme(window, is_max=False))
+            for window in (conversion, base, span_b)
+        ]
+
+    def update(self, high: float, low: float, close: float, volume: float = 0.0) -> Dict[str, float]:
+        conversion, base, span_b = [(highest.update(high) + lowest.update(low)) / 2
+                                    for highest, lowest in self.windows]
+        return {
+            "conversion_line": conversion,
+            "base_line": base,
+            "leading_span_a": (conversion + base) / 2,
+            "leading_span_b": span_b,
+            # The lagging span plots this close 26 bars back; for the latest bar it is not known yet
+            "lagging_span": NAN
+        }
+
+
+class OBV(Indicator):
+    """On-balance volume"""
+
+    def __init__(self):
+        self.prev_close = NAN
+        self.total = 0.0
+
+    def update(self, high: float, low: float, close: float, volume: float = 0.0) -> float:
+        if self.prev_close == self.prev_close and close == close and close != self.prev_close:
+            self.total += volume if close > self.prev_close else -volume
+        self.prev_close = close
+        return self.total
+
+
+def bar_arrays(data: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Get high, low, close and volume arrays from an OHLCV DataFrame
+
+    Accepts capitalised (yfinance) and lowercase column names; missing high/low fall
+    back to the close and missing volume to zero.
+    """
+    def column(name: str) -> Optional[np.ndarray]:
+        for key in (name.capitalize(), name):
+            if key in data.columns:
+                return data[key].to_numpy(dtype=np.float64)
+        return None
+
+    close = column("close")
+    if close is None:
+        raise ValueError("DataFrame has no close column")
+    high = column("high")
+    low = column("low")
+    volume = column("volume")
+    return (high if high is not None else close, low if low is not None else close, close,
+            volume if volume is not None else np.zeros(len(close)))
+
+
+def run_indicator(indicator: Indicator, data: pd.DataFrame) -> Tuple[Any, Any]:
+    """
+    Feed a whole history through a fresh indicator
+
+    Returns:
+        Tuple of (value after the last bar, value after the bar before it)
+    """
+    current = previous = NAN
+    for bar in zip(*(values.tolist() for values in bar_arrays(data))):
+        previous = current
+        current = indicator.update(*bar)
+    return current, previous
+
+
+class IndicatorSet:
+    """A named group of indicators fed with the same bars"""
+
+    def __init__(self, indicators: Dict[str, Indicator], history: int = 2):
+        """
+        Args:
+            indicators: Indicator name -> indicator
+            history: Number of recent bars whose values are kept
+        """
+        self.indicators = indicators
+        self.history = deque(maxlen=max(history, 2))
+        self.last_timestamp = None
+        self.bars = 0
+
+    @property
+    def current(self) -> Dict[str, Any]:
+        """Values after the latest bar"""
+        return self.history[-1][2] if self.history else {}
+
+    @property
+    def previous(self) -> Dict[str, Any]:
+        """Values after the bar before the latest one"""
+        return self.history[-2][2] if len(self.history) > 1 else {}
+
+    def update(self, high: float, low: float, close: float, volume: float = 0.0,
+               timestamp: Any = None) -> Dict[str, Any]:
+        """Add a bar to every indicator and return their values"""
+        values = {name: indicator.update(high, low, close, volume)
+                  for name, indicator in self.indicators.items()}
+        self.history.append((timestamp, close, values))
+        self.last_timestamp = timestamp
+        self.bars += 1
+        return values
+
+    def seed(self, data: pd.DataFrame) -> "IndicatorSet":
+        """Feed every row of an OHLCV DataFrame, oldest first"""
+        for timestamp, bar in zip(data.index, zip(*(values.tolist() for values in bar_arrays(data)))):
+            self.update(*bar, timestamp=timestamp)
+        return self
+
+
+class IndicatorEngine:
+    """Incremental indicator state per (symbol, timeframe)"""
+
+    def __init__(self, factory: Callable[[], Dict[str, Indicator]], history: int = 2):
+        """
+        Initialize the engine
+
+        Args:
+            factory: Function creating a fresh name -> indicator mapping for a new series
+            history: Number of recent bars whose values are kept per series
+        """
+        self.factory = factory
+        self.history = history
+        self.states: Dict[Tuple[str, str], IndicatorSet] = {}
+        self.lock = threading.Lock()
+
+    def get_state(self, symbol: str, timeframe: str) -> IndicatorSet:
+        """Get the indicator state of a series, creating it if needed"""
+        key = (symbol, timeframe)
+        with self.lock:
+            state = self.states.get(key)
+            if state is None:
+                state = self.states[key] = IndicatorSet(self.factory(), self.history)
+            return state
+
+    def update(self, symbol: str, timeframe: str, high: float, low: float, close: float,
+               volume: float = 0.0, timestamp: Any = None) -> Dict[str, Any]:
+        """Add a completed bar to a series and return the new indicator values"""
+        return self.get_state(symbol, timeframe).update(high, low, close, volume, timestamp)
+
+    def sync(self, symbol: str, timeframe: str, data: pd.DataFrame,
+             last_bar_final: bool = False) -> IndicatorSet:
+        """
+        Bring a series up to date with a bar history
+
+        Only rows newer than the last bar already fed are processed. The state is
+        rebuilt from `data` when it does not connect to it (first call, a gap, or
+        older data). Unless `last_bar_final` is set, the last row is treated as a
+        bar still forming: it is applied to a copy of the state and not committed.
+
+        Args:
+            symbol: Symbol
+            timeframe: Time frame
+            data: OHLCV DataFrame indexed by bar timestamp, oldest first
+            last_bar_final: Whether the last row is a completed bar
+
+        Returns:
+            IndicatorSet whose current values include the last row of `data`
+        """
+        key = (symbol, timeframe)
+        committed = data if last_bar_final else data.iloc[:-1]
+
+        with self.lock:
+            state = self.states.get(key)
+            position = len(committed)
+            if state is not None and state.bars and len(committed):
+                # Continue after the last bar fed, if it is part of this history
+                position = committed.index.searchsorted(state.last_timestamp, side="right")
+                if position == 0 or committed.index[position - 1] != state.last_timestamp:
+                    state = None
+            if state is None:
+                state = self.states[key] = IndicatorSet(self.factory(), self.history)
+                position = 0
+
+            state.seed(committed.iloc[position:])
+
+            if last_bar_final or data.empty:
+                return state
+
+            # Evaluate the forming bar without committing it
+            provisional = copy.deepcopy(state)
+
+        high, low, close, volume = (float(values[-1]) for values in bar_arrays(data.iloc[-1:]))
+        provisional.update(high, low, close, volume, timestamp=data.index[-1])
+        return provisional
+
+    def reset(self, symbol: Optional[str] = None, timeframe: Optional[str] = None):
+        """Drop the state of matching series (all series when no filter is given)"""
+        with self.lock:
+            for key in list(self.states):
+                if (symbol is None or key[0] == symbol) and (timeframe is None or key[1] == timeframe):
+                    del self.states[key]
@@ -10,6 +10,13 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy import stats
+from scipy.signal import lfilter
+
+try:
+    from analysis.indicators import IndicatorEngine, MovingAverage, MACD, RSI, BollingerBands, Volatility
+except ImportError:
+    # Run as a script from the analysis directory
+    from indicators import IndicatorEngine, MovingAverage, MACD, RSI, BollingerBands, Volatility
 
 # Import custom modules
 try:
@@ -111,6 +118,80 @@ def calculate_technical_indicators(df):
     return df
 
 
+def _analyzer_indicators():
+    """Incremental counterparts of the calculate_technical_indicators columns"""
+    return {
+        'MA5': MovingAverage(5),
+        'MA20': MovingAverage(20),
+        'MA50': MovingAverage(50),
+        'MACD': MACD(12, 26, 9),
+        'RSI': RSI(14),
+        'BB': BollingerBands(20, 2),
+        'Volatility': Volatility(20)
+    }
+
+
+# Keeps enough rows for generate_signals (it needs 50)
+_indicator_engine = IndicatorEngine(_analyzer_indicators, history=50)
+
+
+def _indicator_columns(values):
+    """Map IndicatorSet values to the calculate_technical_indicators column names"""
+    macd = values['MACD']
+    bb = values['BB']
+    return {
+        'MA5': values['MA5'],
+        'MA20': values['MA20'],
+        'MA50': values['MA50'],
+        'EMA12': macd['fast'],
+        'EMA26': macd['slow'],
+        'MACD': macd['macd'],
+        'Signal': macd['signal'],
+        'MACD_Hist': macd['hist'],
+        'RSI': values['RSI'],
+        'BB_Middle': bb['middle'],
+        'BB_Std': bb['std'],
+        'BB_Upper': bb['upper'],
+        'BB_Lower': bb['lower'],
+        'Volatility': values['Volatility']
+    }
+
+
+def update_technical_indicators(df, symbol, timeframe='1d', last_bar_final=True, engine=None):
+    """Streaming counterpart of calculate_technical_indicators
+    
+    Indicator state is kept per (symbol, timeframe), so each call only processes the
+    bars of df that are newer than the previous call (O(1) per bar) instead of
+    recomputing the rolling windows over the whole history. The values match
+    calculate_technical_indicators over the history fed so far (the EMAs keep
+    their weight from bars before the start of df).
+    
+    Args:
+        df: Price history with a sorted, unique index, oldest first
+        symbol: Symbol the history belongs to
+        timeframe: Bar timeframe of the history
+        last_bar_final: Whether the last row is a completed bar (if not, it is
+            evaluated but not added to the state)
+        engine: IndicatorEngine to use (default: the module-level engine)
+    
+    Returns:
+        The last (up to 50) rows of calculate_technical_indicators(df)
+    """
+    engine = engine or _indicator_engine
+    state = engine.sync(symbol, timeframe, df, last_bar_final=last_bar_final)
+    if not state.history:
+        return df.iloc[:0].copy()
+    
+    rows = pd.DataFrame([_indicator_columns(values) for _, _, values in state.history],
+                        index=[timestamp for timestamp, _, _ in state.history])
+    rows = rows[rows.index.isin(df.index)]
+    result = df.loc[rows.index].copy()
+    for column in rows.columns:
+        result[column] = rows[column].to_numpy()
+    
+    return result.dropna()
+
+
 def generate_signals(df, symbol, threshold=0.75):
     """Generate trading signals based on technical analysis"""
     
@@ -213,6 +294,246 @@ def generate_signals(df, symbol, threshold=0.75):
     return signals
 
 
+def generate_signal_frame(df, threshold=0.75):
+    """Evaluate the generate_signals rules for every row at once
+    
+    Row j of the result holds what generate_signals would return for df.iloc[:j + 1]:
+    the same scores, computed with the same floating-point operations, as
+    vectorised boolean masks over the indicator columns.
+    
+    Returns:
+        DataFrame with buy_score, sell_score and action (1 = BUY, -1 = SELL, 0 = none)
+    """
+    close = df['Close'].to_numpy(dtype=float)
+    ma5 = df['MA5'].to_numpy(dtype=float)
+    ma20 = df['MA20'].to_numpy(dtype=float)
+    macd = df['MACD'].to_numpy(dtype=float)
+    macd_signal = df['Signal'].to_numpy(dtype=float)
+    rsi = df['RSI'].to_numpy(dtype=float)
+    bb_lower = df['BB_Lower'].to_numpy(dtype=float)
+    bb_upper = df['BB_Upper'].to_numpy(dtype=float)
+    n = len(close)
+    
+    def shifted(values, periods):
+        out = np.full(n, np.nan)
+        if n > periods:
+            out[periods:] = values[:-periods]
+        return out
+    
+    prev_ma5, prev_ma20 = shifted(ma5, 1), shifted(ma20, 1)
+    prev_macd, prev_signal = shifted(macd, 1), shifted(macd_signal, 1)
+    close_5 = shifted(close, 4)
+    
+    # 1. Moving Average Crossover
+    ma_buy = (prev_ma5 <= prev_ma20) & (ma5 > ma20)
+    ma_sell = ~ma_buy & (prev_ma5 >= prev_ma20) & (ma5 < ma20)
+    
+    # 2. MACD Crossover
+    macd_buy = (prev_macd <= prev_signal) & (macd > macd_signal)
+    macd_sell = ~macd_buy & (prev_macd >= prev_signal) & (macd < macd_signal)
+    
+    # 3. RSI Overbought/Oversold
+    rsi_buy = rsi < 30
+    rsi_sell = ~rsi_buy & (rsi > 70)
+    
+    # 4. Bollinger Band Breakout
+    bb_buy = close < bb_lower
+    bb_sell = ~bb_buy & (close > bb_upper)
+    
+    # 5. Price Trend
+    with np.errstate(divide='ignore', invalid='ignore'):
+        price_change = (close - close_5) / close_5
+    trend_buy = price_change > 0.02
+    trend_sell = ~trend_buy & (price_change < -0.02)
+    
+    # Accumulate in the same order as generate_signals so scores match exactly
+    buy_score = np.zeros(n)
+    sell_score = np.zeros(n)
+    factors = np.zeros(n)
+    for buy, sell, weight in (
+        (ma_buy, ma_sell, 1.0),
+        (macd_buy, macd_sell, 1.0),
+        (rsi_buy, rsi_sell, 1.0),
+        (bb_buy, bb_sell, 0.5),
+        (trend_buy, trend_sell, 0.5)
+    ):
+        buy_score += np.where(buy, weight, 0.0)
+        sell_score += np.where(sell, weight, 0.0)
+        factors += np.where(buy | sell, weight, 0.0)
+    
+    has_factors = factors > 0
+    buy_score = np.divide(buy_score, factors, out=buy_score, where=has_factors)
+    sell_score = np.divide(sell_score, factors, out=sell_score, where=has_factors)
+    
+    action = np.where(buy_score > threshold, 1, np.where(sell_score > threshold, -1, 0)).astype(np.int8)
+    
+    # generate_signals needs at least 50 rows of history
+    action[:49] = 0
+    
+    return pd.DataFrame({
+        'buy_score': buy_score,
+        'sell_score': sell_score,
+        'action': action
+    }, index=df.index)
+
+
+def _panel_ema(values, span):
+    """Column-wise ewm(span, adjust=False).mean() of a gap-free (time x symbol) array"""
+    alpha = 2.0 / (span + 1.0)
+    # With y[0] = x[0] the recursion y = (1 - alpha) * y + alpha * x is a first-order IIR filter
+    zi = (1 - alpha) * values[:1]
+    ema, _ = lfilter([alpha], [1.0, alpha - 1.0], values, axis=0, zi=zi)
+    return ema
+
+
+def scan_signals(values, symbols, fields, threshold=0.75, signals_only=True):
+    """Apply the generate_signals rules to every symbol of a panel at once
+    
+    The indicators generate_signals reads (MA5/MA20 and MACD/Signal on the last two
+    bars, RSI, Bollinger Bands and the 5-bar price change on the last bar) are
+    computed with array operations across all symbols, so scanning a universe
+    costs a few vector passes instead of one calculate_technical_indicators call
+    per symbol.
+    
+    Args:
+        values: (time x symbol x field) array, oldest bar first, e.g. from
+            MarketDataHub.panel_to_array
+        symbols: Symbol of each column
+        fields: Field name of each slice of the last axis (needs 'close' or 'Close')
+        threshold: Signal confidence threshold (0-1)
+        signals_only: Return only symbols with a BUY or SELL signal
+        
+    Returns:
+        DataFrame ranked by signal score with symbol, action, confidence, buy_score,
+        sell_score, price, RSI, BB_position, MA_crossover, MACD_crossover and
+        price_change. Symbols with fewer than 99 bars (generate_signals needs 50
+        rows after the 49 warm-up bars of MA50) are left out. Gaps inside a
+        symbol's history are forward-filled.
+    """
+    field_names = [str(f).lower() for f in fields]
+    close = np.asarray(values, dtype=float)[:, :, field_names.index('close')]
+    n = close.shape[0]
+    symbols = np.asarray(symbols, dtype=object)
+    
+    # Enough history, and a price on the latest bar
+    bars = np.sum(~np.isnan(close), axis=0)
+    valid = (bars >= 99) & ~np.isnan(close[-1]) if n else np.zeros(len(symbols), dtype=bool)
+    close = close[:, valid]
+    symbols = symbols[valid]
+    if not len(symbols):
+        return pd.DataFrame(columns=['symbol', 'action', 'confidence', 'buy_score', 'sell_score', 'price',
+                                     'RSI', 'BB_position', 'MA_crossover', 'MACD_crossover', 'price_change'])
+    
+    # Leading gaps take the first price (EMAs then start on the first real bar),
+    # later gaps the previous price
+    close = pd.DataFrame(close).ffill().bfill().to_numpy()
+    
+    def window_mean(window, offset=0):
+        end = n - offset
+        return close[end - window:end].mean(axis=0)
+    
+    ma5, prev_ma5 = window_mean(5), window_mean(5, 1)
+    ma20, prev_ma20 = window_mean(20), window_mean(20, 1)
+    
+    macd_line = _panel_ema(close, 12) - _panel_ema(close, 26)
+    macd_signal = _panel_ema(macd_line, 9)
+    macd, prev_macd = macd_line[-1], macd_line[-2]
+    sig, prev_sig = macd_signal[-1], macd_signal[-2]
+    
+    delta = np.diff(close[-15:], axis=0)
+    gain = np.where(delta > 0, delta, 0.0).mean(axis=0)
+    loss = -np.where(delta < 0, delta, 0.0).mean(axis=0)
+    
+    last20 = close[-20:]
+    bb_middle = last20.mean(axis=0)
+    bb_std = last20.std(axis=0, ddof=1)
+    bb_upper = bb_middle + 2 * bb_std
+    bb_lower = bb_middle - 2 * bb_std
+    
+    price = close[-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - (100 / (1 + gain / loss))
+        price_change = (price - close[-5]) / close[-5]
+        bb_position = (price - bb_lower) / (bb_upper - bb_lower)
+    
+    # Same rules, weights and accumulation order as generate_signals
+    ma_buy = (prev_ma5 <= prev_ma20) & (ma5 > ma20)
+    ma_sell = ~ma_buy & (prev_ma5 >= prev_ma20) & (ma5 < ma20)
+    macd_buy = (prev_macd <= prev_sig) & (macd > sig)
+    macd_sell = ~macd_buy & (prev_macd >= prev_sig) & (macd < sig)
+    rsi_buy = rsi < 30
+    rsi_sell = ~rsi_buy & (rsi > 70)
+    bb_buy = price < bb_lower
+    bb_sell = ~bb_buy & (price > bb_upper)
+    trend_buy = price_change > 0.02
+    trend_sell = ~trend_buy & (price_change < -0.02)
+    
+    buy_score = np.zeros(len(symbols))
+    sell_score = np.zeros(len(symbols))
+    factors = np.zeros(len(symbols))
+    for buy, sell, weight in (
+        (ma_buy, ma_sell, 1.0),
+        (macd_buy, macd_sell, 1.0),
+        (rsi_buy, rsi_sell, 1.0),
+        (bb_buy, bb_sell, 0.5),
+        (trend_buy, trend_sell, 0.5)
+    ):
+        buy_score += np.where(buy, weight, 0.0)
+        sell_score += np.where(sell, weight, 0.0)
+        factors += np.where(buy | sell, weight, 0.0)
+    
+    has_factors = factors > 0
+    buy_score = np.divide(buy_score, factors, out=buy_score, where=has_factors)
+    sell_score = np.divide(sell_score, factors, out=sell_score, where=has_factors)
+    
+    is_buy = buy_score > threshold
+    is_sell = ~is_buy & (sell_score > threshold)
+    score = np.where(is_buy, buy_score, np.where(is_sell, sell_score, np.maximum(buy_score, sell_score)))
+    
+    table = pd.DataFrame({
+        'symbol': symbols,
+        'action': np.where(is_buy, 'BUY', np.where(is_sell, 'SELL', '')),
+        'confidence': np.round(score * 100).astype(int),
+        'buy_score': buy_score,
+        'sell_score': sell_score,
+        'price': price,
+        'RSI': np.round(rsi, 2),
+        'BB_position': bb_position,
+        'MA_crossover': np.where(is_sell, ma_sell, ma_buy),
+        'MACD_crossover': np.where(is_sell, macd_sell, macd_buy),
+        'price_change': price_change
+    })
+    if signals_only:
+        table = table[is_buy | is_sell]
+    
+    # Rank: signals first, then by score, biggest movers first among ties
+    order = np.lexsort((-np.abs(table['price_change'].to_numpy()), -table['confidence'].to_numpy(),
+                        table['action'].to_numpy() == ''))
+    return table.iloc[order].reset_index(drop=True)
+
+
+def scan_universe(hub, symbols, timeframe='1d', lookback_days=365, threshold=0.75, signals_only=True):
+    """Fetch close prices for a universe through a MarketDataHub and scan them
+    
+    Args:
+        hub: MarketDataHub (bars already in its bar store are not downloaded again)
+        symbols: Symbols to scan
+        timeframe: Bar timeframe
+        lookback_days: Calendar days of history to load (needs 99+ bars per symbol)
+        threshold: Signal confidence threshold (0-1)
+        signals_only: Return only symbols with a BUY or SELL signal
+        
+    Returns:
+        Ranked signal table from scan_signals
+    """
+    start = datetime.now() - timedelta(days=lookback_days)
+    panel = hub.get_stock_data_bulk(symbols, timeframe, start=start, fields=['close'])
+    if panel.empty:
+        return scan_signals(np.empty((0, 0, 1)), [], ['close'], threshold, signals_only)
+    values, _, panel_symbols, fields = hub.panel_to_array(panel)
+    return scan_signals(values, panel_symbols, fields, threshold, signals_only)
+
+
 def generate_option_signals(symbol, threshold=0.75):
     """Generate option trading signals based on volatility and pricing"""
     
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+AI Event Pool persistence benchmark
+
+Adds N events to an AIEventPool backed by a temporary directory and reports
+add_event latency per block of events, followed by the time to replay the log.
+With the append-only event log the latency should stay flat as the pool grows.
+"""
+
+import os
+import sys
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import statistics
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.ai_event_pool import AIEventPool, AIEvent, EventCategory, EventPriority
+
+
+def make_event(i: int) -> AIEvent:
+    """Build a synthetic whale alert"""
+    return AIEvent(
+        event_id=f"bench_{i}",
+        timestamp=datetime.now().isoformat(),
+        category=EventCategory.WHALE_ALERT,
+        symbol=f"SYM{i % 200}",
+        title=f"Whale Alert: BUY SYM{i % 200} ${i * 1000:,.2f}",
+        content="Large order detected on the tape.",
+        priority=EventPriority(1 + i % 5),
+        source="benchmark",
+        metadata={"trade_side": "buy", "trade_value": i * 1000.0, "exchange": "bench"}
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark AIEventPool.add_event latency")
+    parser.add_argument("--events", type=int, default=100000, help="Number of events to add")
+    parser.add_argument("--block", type=int, default=10000, help="Events per reported block")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    storage_path = tempfile.mkdtemp(prefix="event_pool_bench_")
+
+    try:
+        pool = AIEventPool({"storage": {"event_pool_path": storage_path}})
+
+        print(f"{'events':>10} {'mean_us':>10} {'p50_us':>10} {'p99_us':>10}")
+        latencies = []
+        for i in range(args.events):
+            event = make_event(i)
+            start = time.perf_counter()
+            pool.add_event(event)
+            latencies.append((time.perf_counter() - start) * 1e6)
+
+            if (i + 1) % args.block == 0:
+                latencies.sort()
+                print(f"{i + 1:>10} {statistics.mean(latencies):>10.1f} "
+                      f"{latencies[len(latencies) // 2]:>10.1f} "
+                      f"{latencies[int(len(latencies) * 0.99)]:>10.1f}")
+                latencies = []
+
+        pool.store.close()
+
+        start = time.perf_counter()
+        replayed = AIEventPool({"storage": {"event_pool_path": storage_path}})
+        elapsed = time.perf_counter() - start
+        print(f"Replayed {len(replayed.events)} events in {elapsed:.2f}s")
+    finally:
+        shutil.rmtree(storage_path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+Backtest engine benchmark
+
+Runs the technical strategy over synthetic random-walk bars with the vectorized
+engine at several history lengths, and with the bar-by-bar loop engine where it
+finishes in reasonable time, checking that both produce identical results.
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+import contextlib
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trading.backtest_strategy import run_backtest, run_backtest_vectorized
+
+
+def make_bars(bars: int, seed: int = 7) -> pd.DataFrame:
+    """Build an OHLCV random walk with one bar per minute"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, bars)))
+    spread = np.abs(rng.normal(0, 0.001, bars)) * close
+    return pd.DataFrame({
+        "Open": np.roll(close, 1),
+        "High": close + spread,
+        "Low": close - spread,
+        "Close": close,
+        "Volume": rng.integers(100000, 1000000, bars).astype(float)
+    }, index=pd.date_range("2020-01-01", periods=bars, freq="min"))
+
+
+def timed(engine, data, threshold):
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = engine(data.copy(), threshold=threshold, commission=0.001)
+        return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vectorized vs loop backtest engines")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000],
+                        help="History lengths (bars) to test")
+    parser.add_argument("--loop-max", type=int, default=2000,
+                        help="Largest history also run through the loop engine")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Signal threshold")
+    args = parser.parse_args()
+
+    for bars in args.sizes:
+        data = make_bars(bars)
+        fast, fast_time = timed(run_backtest_vectorized, data, args.threshold)
+        line = (f"{bars:>9,} bars  vectorized {fast_time:8.3f}s "
+                f"({bars / fast_time:,.0f} bars/s, {len(fast['trades'])} trades)")
+
+        if bars <= args.loop_max:
+            slow, slow_time = timed(run_backtest, data, args.threshold)
+            pd.testing.assert_frame_equal(slow["results"], fast["results"], check_dtype=False)
+            assert slow["trades"] == fast["trades"], "trade lists differ"
+            line += f"  loop {slow_time:8.3f}s  speedup {slow_time / fast_time:,.0f}x  (identical)"
+
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
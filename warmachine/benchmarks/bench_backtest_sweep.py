@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+Parallel backtest sweep benchmark
+
+Builds synthetic daily bars for many symbols and runs a threshold/commission grid
+through run_sweep, reporting backtests per second and the serial baseline rate.
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+import contextlib
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trading.backtest_strategy import build_param_grid, run_backtest_vectorized, run_sweep
+
+
+def make_daily_bars(bars: int, seed: int) -> pd.DataFrame:
+    """Build an OHLCV random walk with one bar per day"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, bars)))
+    spread = np.abs(rng.normal(0, 0.01, bars)) * close
+    return pd.DataFrame({
+        "Open": np.roll(close, 1),
+        "High": close + spread,
+        "Low": close - spread,
+        "Close": close,
+        "Volume": rng.integers(100000, 1000000, bars).astype(float)
+    }, index=pd.date_range("2015-01-01", periods=bars, freq="D"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel backtest sweeps")
+    parser.add_argument("--symbols", type=int, default=500, help="Number of symbols")
+    parser.add_argument("--bars", type=int, default=2500, help="Bars per symbol")
+    parser.add_argument("--thresholds", type=int, default=10, help="Threshold values in the grid")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    args = parser.parse_args()
+
+    data = {f"SYM{i}": make_daily_bars(args.bars, i) for i in range(args.symbols)}
+    grid = build_param_grid(list(np.linspace(0.3, 0.75, args.thresholds)), [0.0, 0.001], [0.0])
+    jobs = args.symbols * len(grid)
+
+    # Serial baseline: one full vectorized backtest per job
+    sample = min(20, jobs)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for i in range(sample):
+            params = grid[i % len(grid)]
+            run_backtest_vectorized(data[f"SYM{i % args.symbols}"], **params)
+        serial_rate = sample / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    table = run_sweep(data, grid, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.symbols} symbols x {len(grid)} parameter sets x {args.bars} bars: "
+          f"{len(table)} backtests in {elapsed:.2f}s ({len(table) / elapsed:,.0f}/s, "
+          f"{args.workers or os.cpu_count()} workers)")
+    print(f"serial run_backtest_vectorized: {serial_rate:,.0f}/s "
+          f"(estimated {jobs / serial_rate:.1f}s for the same grid)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""
+Bar store benchmark
+
+Appends a year of synthetic 1-minute bars to a BarStore one day at a time, then
+times month, day and single-column range reads against the per-day JSON files the
+market data hub used to write.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.data.bar_store import BarStore
+
+
+def make_bars(days: int, seed: int = 7) -> pd.DataFrame:
+    """Build 24/7 1-minute OHLCV bars"""
+    rng = np.random.default_rng(seed)
+    n = days * 1440
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.0005, n)))
+    return pd.DataFrame({
+        "open": np.roll(close, 1),
+        "high": close * 1.0005,
+        "low": close * 0.9995,
+        "close": close,
+        "volume": rng.integers(1, 1000, n).astype(np.int64)
+    }, index=pd.date_range("2024-01-01", periods=n, freq="min", name="timestamp"))
+
+
+def best_of(func, repeat: int = 20) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark BarStore appends and range reads")
+    parser.add_argument("--days", type=int, default=365, help="Days of 1-minute bars")
+    args = parser.parse_args()
+
+    bars = make_bars(args.days)
+    root = tempfile.mkdtemp(prefix="bar_store_bench_")
+    try:
+        store = BarStore(os.path.join(root, "bars"))
+
+        start = time.perf_counter()
+        for _, day in bars.groupby(bars.index.normalize()):
+            store.append("crypto_bars", "BTCUSDT", "1m", day)
+        elapsed = time.perf_counter() - start
+        print(f"append: {len(bars):,} bars in {args.days} daily appends, {elapsed:.2f}s "
+              f"({elapsed / args.days * 1000:.2f} ms/append)")
+
+        # Round trip and overlapping (merge) append
+        stored = store.read("crypto_bars", "BTCUSDT", "1m")
+        pd.testing.assert_frame_equal(stored, bars, check_freq=False, check_index_type=False)
+        patch = bars.iloc[1000:1010] * 2
+        store.append("crypto_bars", "BTCUSDT", "1m", patch)
+        merged = store.read("crypto_bars", "BTCUSDT", "1m", start=bars.index[990], end=bars.index[1019])
+        assert (merged.iloc[10:20].to_numpy() == patch.to_numpy()).all()
+        assert len(merged) == 30
+        store.append("crypto_bars", "BTCUSDT", "1m", bars.iloc[1000:1010])
+
+        month_start, month_end = "2024-03-01", "2024-03-31 23:59"
+        month = store.read("crypto_bars", "BTCUSDT", "1m", start=month_start, end=month_end)
+        print(f"month read: {len(month):,} bars, zero-copy={isinstance(month['close'].values, np.memmap)}, "
+              f"{best_of(lambda: store.read('crypto_bars', 'BTCUSDT', '1m', start=month_start, end=month_end)) * 1000:.2f} ms")
+        print(f"month close only: "
+              f"{best_of(lambda: store.read('crypto_bars', 'BTCUSDT', '1m', start=month_start, end=month_end, columns=['close'])) * 1000:.2f} ms")
+        print(f"one day: "
+              f"{best_of(lambda: store.read('crypto_bars', 'BTCUSDT', '1m', start='2024-06-10', end='2024-06-10 23:59')) * 1000:.2f} ms")
+        print(f"last 500 bars: "
+              f"{best_of(lambda: store.read('crypto_bars', 'BTCUSDT', '1m', limit=500)) * 1000:.2f} ms")
+
+        # Previous format: pretty-printed JSON records, one file per save
+        json_path = os.path.join(root, "month.json")
+        start = time.perf_counter()
+        with open(json_path, "w") as f:
+            json.dump(json.loads(month.reset_index().to_json(orient="records")), f, indent=2)
+        write_time = time.perf_counter() - start
+
+        def load_json():
+            with open(json_path) as f:
+                df = pd.DataFrame(json.load(f))
+            return df.set_index("timestamp")
+
+        print(f"JSON month: write {write_time * 1000:.0f} ms, read {best_of(load_json, 3) * 1000:.0f} ms")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+"""
+Bulk history fetch benchmark
+
+Backfills 1-minute bars for a universe of symbols through MarketDataHub from a
+simulated Yahoo source with a fixed per-request latency and Yahoo's 7-day range
+limit for minute bars. Compares one request per symbol and chunk issued
+sequentially with get_stock_data_bulk (multi-symbol chunk requests, run
+concurrently), then repeats the bulk call with a slightly later end to show that
+bars already in the bar store are not downloaded again.
+"""
+
+import os
+import sys
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.data.market_data_hub import MarketDataHub, YahooFinanceConnector, TimeFrame
+
+
+class SimulatedYahoo(YahooFinanceConnector):
+    """Yahoo connector serving synthetic regular-session bars after a fixed delay"""
+
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+        self.requests = 0
+        self.bars_served = 0
+        self.lock = threading.Lock()
+
+    def get_stock_history(self, symbols, timeframe, start, end):
+        time.sleep(self.latency)
+        index = pd.date_range(start.ceil("min"), end, freq="min", inclusive="left", name="Datetime")
+        index = index[index.dayofweek < 5]
+        index = index[index.indexer_between_time("09:30", "15:59")]
+        result = {}
+        for symbol in symbols:
+            rng = np.random.default_rng(abs(hash(symbol)) % 2 ** 32)
+            close = 100 + rng.random(len(index))
+            result[symbol] = pd.DataFrame({"open": close, "high": close + 0.1, "low": close - 0.1,
+                                           "close": close, "volume": np.full(len(index), 100.0)}, index=index)
+        with self.lock:
+            self.requests += 1
+            self.bars_served += len(index) * len(symbols)
+        return result
+
+
+def sequential_backfill(source: SimulatedYahoo, symbols, start, end) -> int:
+    """One request per symbol and 7-day chunk, one after another"""
+    bars = 0
+    chunk = pd.Timedelta(days=source.BULK_CHUNK_DAYS[TimeFrame.MINUTE_1])
+    for symbol in symbols:
+        chunk_start = start
+        while chunk_start < end:
+            chunk_end = min(chunk_start + chunk, end)
+            bars += len(source.get_stock_history([symbol], TimeFrame.MINUTE_1, chunk_start, chunk_end)[symbol])
+            chunk_start = chunk_end
+    return bars
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk multi-symbol history fetches")
+    parser.add_argument("--symbols", type=int, default=200, help="Universe size")
+    parser.add_argument("--days", type=int, default=28, help="Days of 1-minute history")
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated request latency (s)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent bulk requests")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    symbols = [f"S{i:04d}" for i in range(args.symbols)]
+    end = pd.Timestamp("2024-03-29 16:00", tz="America/New_York")
+    start = end - pd.Timedelta(days=args.days)
+
+    root = tempfile.mkdtemp(prefix="bulk_fetch_bench_")
+    try:
+        source = SimulatedYahoo(args.latency)
+        begin = time.perf_counter()
+        bars = sequential_backfill(source, symbols, start, end)
+        sequential_time = time.perf_counter() - begin
+        print(f"{len(symbols)} symbols x {args.days} days of 1m bars, {args.latency * 1000:.0f} ms per request")
+        print(f"  per-symbol sequential   {sequential_time:6.2f}s  {source.requests:5d} requests  {bars:,} bars")
+
+        hub = MarketDataHub({"bar_store": {"path": os.path.join(root, "bars")},
+                             "bulk_concurrency": args.concurrency})
+        source = SimulatedYahoo(args.latency)
+        hub.data_sources = {"yahoo": source}
+
+        begin = time.perf_counter()
+        panel = hub.get_stock_data_bulk(symbols, TimeFrame.MINUTE_1, start, end)
+        bulk_time = time.perf_counter() - begin
+        print(f"  bulk, cold store        {bulk_time:6.2f}s  {source.requests:5d} requests  "
+              f"panel {panel.shape[0]:,} x {panel.shape[1]:,}")
+
+        requests = source.requests
+        begin = time.perf_counter()
+        panel = hub.get_stock_data_bulk(symbols, TimeFrame.MINUTE_1, start, end + pd.Timedelta(days=3))
+        warm_time = time.perf_counter() - begin
+        print(f"  bulk, +3 days (warm)    {warm_time:6.2f}s  {source.requests - requests:5d} requests  "
+              f"panel {panel.shape[0]:,} x {panel.shape[1]:,}")
+
+        values, index, panel_symbols, fields = hub.panel_to_array(panel)
+        assert values.shape == (len(index), len(symbols), len(fields))
+        assert not np.isnan(values).any()
+        print(f"  array {values.shape} ({' x '.join(['time', 'symbol', 'field'])}), "
+              f"{values.nbytes / 1024 ** 2:.0f} MB")
+        hub.close()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
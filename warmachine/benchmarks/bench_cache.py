@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""
+Shared cache benchmark
+
+Simulates a long-running collector writing per-symbol bar frames and quote dicts
+into the shared LRU/TTL cache, and reports get/set throughput, the byte and entry
+bounds being held, and the hit/eviction counters.
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.cache import LRUCache, estimate_size
+
+
+def make_frame(rows: int) -> pd.DataFrame:
+    close = np.random.default_rng(rows).random(rows) + 100
+    return pd.DataFrame({"open": close, "high": close, "low": close, "close": close,
+                         "volume": np.ones(rows)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the shared LRU/TTL cache")
+    parser.add_argument("--symbols", type=int, default=5000, help="Distinct symbols written")
+    parser.add_argument("--ops", type=int, default=200000, help="Mixed get/set operations")
+    parser.add_argument("--max-mb", type=float, default=64, help="Cache byte limit (MB)")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    cache = LRUCache(max_entries=100000, max_bytes=int(args.max_mb * 1024 * 1024), default_ttl=300)
+    bars = cache.namespace("bars", ttl=3600)
+    quotes = cache.namespace("quotes", ttl=5, stale_ttl=5)
+    frame = make_frame(2000)
+    print(f"bar frame: {estimate_size(frame) / 1024:.0f} KB, {args.symbols:,} symbols "
+          f"would need {estimate_size(frame) * args.symbols / 1024 ** 2:,.0f} MB unbounded")
+
+    # Skewed access: a few hot symbols, a long tail of cold ones
+    symbols = [f"SYM{i}" for i in range(args.symbols)]
+    weights = [1.0 / (i + 1) for i in range(args.symbols)]
+    keys = rng.choices(symbols, weights=weights, k=args.ops)
+
+    start = time.perf_counter()
+    for symbol in keys:
+        if bars.get(symbol) is None:
+            bars.set(symbol, frame)
+        quotes.set(symbol, {"bid": 1.0, "ask": 1.01, "ts": time.time()})
+    elapsed = time.perf_counter() - start
+    print(f"{args.ops:,} get+set rounds in {elapsed:.2f}s ({args.ops * 2 / elapsed:,.0f} ops/s)")
+
+    stats = cache.get_stats()
+    print(f"held: {stats['entries']:,} entries, {stats['bytes'] / 1024 ** 2:.1f} MB "
+          f"(limit {args.max_mb:.0f} MB), evictions {stats['evictions']:,}")
+    for name in ("bars", "quotes"):
+        ns = cache.get_stats(name)
+        print(f"  {name}: entries {ns['entries']:,}, hit rate {ns['hit_rate']:.1%}, evictions {ns['evictions']:,}")
+    assert stats["bytes"] <= cache.max_bytes
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+"""
+Async HTTP client benchmark
+
+Starts a local stub server that imitates the Polygon and Binance REST endpoints
+with a fixed per-request latency, then compares a new session per request (a
+fresh TCP connection every call, like the module-level requests.get calls) with
+the pooled shared client, sequentially and concurrently. It also checks retries
+against a flaky endpoint and the per-provider rate limit, and times the async
+Polygon option chain, which fetches its contract quotes concurrently.
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import logging
+import argparse
+import threading
+
+import aiohttp
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from connectors.http_client import AsyncHTTPClient
+from connectors.polygon_connector import PolygonConnector
+from connectors.binance_connector import BinanceConnector
+
+
+class StubServer:
+    """Polygon/Binance-like REST stub running on its own thread and loop"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.connections = set()
+        self.flaky_calls = {}
+        self.loop = asyncio.new_event_loop()
+        self.port = None
+        self.started = threading.Event()
+
+    async def _delay(self, request):
+        self.connections.add(id(request.transport))
+        await asyncio.sleep(self.latency)
+
+    async def last_trade(self, request):
+        await self._delay(request)
+        return web.json_response({"status": "OK", "results": {"p": 100.0 + random.random(), "s": 10}})
+
+    async def contracts(self, request):
+        await self._delay(request)
+        results = [
+            {"ticker": f"O:SPY{exp}{kind}{strike}", "expiration_date": f"2024-0{exp}-19",
+             "strike_price": float(strike), "contract_type": "call" if kind == "C" else "put"}
+            for exp in range(1, 4) for strike in range(80, 121, 2) for kind in ("C", "P")
+        ]
+        return web.json_response({"status": "OK", "results": results})
+
+    async def aggs(self, request):
+        await self._delay(request)
+        limit = int(request.query.get("limit", 100))
+        start = 1_700_000_000_000
+        results = [{"t": start - i * 60000, "o": 1.0, "h": 1.1, "l": 0.9, "c": 1.0, "v": 100, "vw": 1.0}
+                   for i in range(limit)]
+        return web.json_response({"status": "OK", "results": results})
+
+    async def depth(self, request):
+        await self._delay(request)
+        limit = int(request.query.get("limit", 100))
+        return web.json_response({
+            "lastUpdateId": 1,
+            "bids": [[f"{100 - i * 0.01:.2f}", "1.0"] for i in range(limit)],
+            "asks": [[f"{100 + i * 0.01:.2f}", "1.0"] for i in range(limit)]
+        })
+
+    async def flaky(self, request):
+        await self._delay(request)
+        key = request.query.get("id")
+        self.flaky_calls[key] = self.flaky_calls.get(key, 0) + 1
+        if self.flaky_calls[key] < 3:
+            return web.json_response({"error": "busy"}, status=503, headers={"Retry-After": "0"})
+        return web.json_response({"ok": True})
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        app = web.Application()
+        app.router.add_get("/v2/last/trade/{ticker}", self.last_trade)
+        app.router.add_get("/v2/last/nbbo/{ticker}", self.last_trade)
+        app.router.add_get("/v3/reference/options/contracts", self.contracts)
+        app.router.add_get("/v2/aggs/ticker/{ticker}/range/{multiplier}/{timespan}/{start}/{end}", self.aggs)
+        app.router.add_get("/api/v3/depth", self.depth)
+        app.router.add_get("/flaky", self.flaky)
+        runner = web.AppRunner(app, access_log=None)
+        self.loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        self.loop.run_until_complete(site.start())
+        self.port = site._server.sockets[0].getsockname()[1]
+        self.started.set()
+        self.loop.run_forever()
+
+    def start(self) -> str:
+        threading.Thread(target=self._run, daemon=True).start()
+        self.started.wait()
+        return f"http://127.0.0.1:{self.port}"
+
+
+async def run(args):
+    server = StubServer(args.latency)
+    base_url = server.start()
+    url = f"{base_url}/v2/last/trade/SPY"
+
+    # New connection per request
+    start = time.perf_counter()
+    for _ in range(args.requests):
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url) as response:
+                await response.json()
+    fresh_time = time.perf_counter() - start
+
+    client = AsyncHTTPClient({"max_connections_per_host": args.pool})
+    server.connections.clear()
+    start = time.perf_counter()
+    for _ in range(args.requests):
+        await client.get_json(url, provider="bench")
+    pooled_time = time.perf_counter() - start
+    pooled_connections = len(server.connections)
+
+    server.connections.clear()
+    start = time.perf_counter()
+    await asyncio.gather(*(client.get_json(url, provider="bench") for _ in range(args.requests)))
+    concurrent_time = time.perf_counter() - start
+
+    print(f"{args.requests} requests, {args.latency * 1000:.0f} ms server latency")
+    print(f"  new connection per request  {fresh_time:6.2f}s  {fresh_time / args.requests * 1000:6.1f} ms/req")
+    print(f"  pooled, sequential          {pooled_time:6.2f}s  {pooled_time / args.requests * 1000:6.1f} ms/req "
+          f"({pooled_connections} connection)")
+    print(f"  pooled, concurrent          {concurrent_time:6.2f}s  "
+          f"({len(server.connections)} connections, pool limit {args.pool})")
+
+    # Retries with jitter against an endpoint that fails the first two attempts of each request
+    retry_client = AsyncHTTPClient({"backoff_base": 0.01})
+    results = await asyncio.gather(*(retry_client.request("GET", f"{base_url}/flaky", "flaky", params={"id": i})
+                                     for i in range(20)))
+    metrics = retry_client.get_metrics("flaky")
+    assert all(r == {"ok": True} for r in results)
+    print(f"flaky endpoint: 20/20 succeeded after {metrics['retries']} retries, statuses {metrics['statuses']}")
+
+    # Per-provider token bucket
+    client.configure_provider("limited", rate=50, burst=5)
+    start = time.perf_counter()
+    await asyncio.gather(*(client.get_json(url, provider="limited") for _ in range(55)))
+    print(f"rate limit 50/s burst 5: 55 requests took {time.perf_counter() - start:.2f}s "
+          f"(expected >= {(55 - 5) / 50:.2f}s)")
+
+    # Connectors against the stub
+    polygon = PolygonConnector({"api_key": "stub", "base_url": base_url, "requests_per_second": 1000})
+    binance = BinanceConnector({"base_url": base_url, "enable_websocket": False})
+    bars = await polygon.get_bars_async("SPY", "1m", 500)
+    book = await binance.get_order_book_async("BTC-USDT", 100)
+    print(f"polygon get_bars_async: {len(bars)} bars; binance get_order_book_async: "
+          f"{len(book['bids'])}x{len(book['asks'])} levels")
+
+    start = time.perf_counter()
+    chain = await polygon.get_option_chain_async("SPY")
+    chain_time = time.perf_counter() - start
+    contracts = sum(1 for e in chain["expirations"] for o in e["options"] for side in ("call", "put") if o[side])
+    print(f"polygon get_option_chain_async: {contracts} contract quotes in {chain_time:.2f}s "
+          f"(sequential at this latency: >= {(contracts + 2) * args.latency:.2f}s)")
+    metrics = polygon.http.get_metrics("polygon")
+    print(f"polygon metrics: {metrics['requests']} requests, p50 {metrics['p50_ms']:.1f} ms, "
+          f"p95 {metrics['p95_ms']:.1f} ms, statuses {metrics['statuses']}")
+
+    await client.close()
+    await retry_client.close()
+    await polygon.http.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the shared async HTTP client against a local stub")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--latency", type=float, default=0.01, help="Stub server latency per request (s)")
+    parser.add_argument("--pool", type=int, default=20, help="Connections per host")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+"""
+Incremental indicator benchmark
+
+Streams synthetic bars one at a time and compares, per new bar, recomputing the
+indicators with pandas over the whole history (calculate_technical_indicators and
+the KDJ/CCI/DMI/Ichimoku calculations TradingHandler used, including CCI's
+rolling().apply) with updating the stateful indicators of analysis.indicators.
+Checks that both give the same values on every bar of the streamed window.
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analysis.market_analyzer import calculate_technical_indicators, _analyzer_indicators, _indicator_columns
+from analysis.indicators import IndicatorSet, KDJ, CCI, DMI, Ichimoku
+
+
+def make_bars(n: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        "Open": close,
+        "High": close * (1 + rng.random(n) * 0.01),
+        "Low": close * (1 - rng.random(n) * 0.01),
+        "Close": close,
+        "Volume": rng.integers(100, 10000, n).astype(float)
+    })
+
+
+def pandas_oscillators(data: pd.DataFrame) -> dict:
+    """The pandas KDJ, CCI, DMI and Ichimoku calculations, latest values"""
+    high, low, close = data["High"], data["Low"], data["Close"]
+    rsv = (close - low.rolling(9, min_periods=1).min()) / \
+        (high.rolling(9, min_periods=1).max() - low.rolling(9, min_periods=1).min()) * 100
+    k = rsv.ewm(alpha=1 / 3, adjust=False).mean()
+    d = k.ewm(alpha=1 / 3, adjust=False).mean()
+
+    tp = (high + low + close) / 3
+    cci = (tp - tp.rolling(20).mean()) / (0.015 * tp.rolling(20).apply(lambda x: np.abs(x - x.mean()).mean()))
+
+    tr = pd.concat([high - low, (high - close.shift(1)).abs(), (low - close.shift(1)).abs()], axis=1).max(axis=1)
+    up_move, down_move = high - high.shift(1), low.shift(1) - low
+    plus_dm = pd.Series(np.where((up_move > down_move) & (up_move > 0), up_move, 0), index=data.index)
+    minus_dm = pd.Series(np.where((down_move > up_move) & (down_move > 0), down_move, 0), index=data.index)
+    plus_di = 100 * plus_dm.rolling(14).mean() / tr.rolling(14).mean()
+    minus_di = 100 * minus_dm.rolling(14).mean() / tr.rolling(14).mean()
+    adx = (100 * (plus_di - minus_di).abs() / (plus_di + minus_di)).rolling(14).mean()
+
+    conversion = (high.rolling(9).max() + low.rolling(9).min()) / 2
+    base = (high.rolling(26).max() + low.rolling(26).min()) / 2
+    span_b = (high.rolling(52).max() + low.rolling(52).min()) / 2
+    return {
+        "k": k.iloc[-1], "d": d.iloc[-1], "cci": cci.iloc[-1], "plus_di": plus_di.iloc[-1],
+        "adx": adx.iloc[-1], "span_a": ((conversion + base) / 2).iloc[-1], "span_b": span_b.iloc[-1]
+    }
+
+
+def incremental_oscillators(values: dict) -> dict:
+    return {
+        "k": values["KDJ"]["k"], "d": values["KDJ"]["d"], "cci": values["CCI"],
+        "plus_di": values["DMI"]["plus_di"], "adx": values["DMI"]["adx"],
+        "span_a": values["Ichimoku"]["leading_span_a"], "span_b": values["Ichimoku"]["leading_span_b"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incremental indicators against pandas recomputation")
+    parser.add_argument("--history", type=int, default=2000, help="Bars of history before streaming")
+    parser.add_argument("--bars", type=int, default=200, help="Bars streamed")
+    args = parser.parse_args()
+
+    bars = make_bars(args.history + args.bars)
+    columns = ["MA5", "MA20", "MA50", "EMA12", "EMA26", "MACD", "Signal", "MACD_Hist", "RSI",
+               "BB_Middle", "BB_Std", "BB_Upper", "BB_Lower", "Volatility"]
+
+    # Pandas: recompute everything over the full history on each new bar
+    start = time.perf_counter()
+    pandas_rows, pandas_osc = [], []
+    for end in range(args.history + 1, args.history + args.bars + 1):
+        history = bars.iloc[:end]
+        pandas_rows.append(calculate_technical_indicators(history)[columns].iloc[-1].to_numpy())
+        pandas_osc.append(pandas_oscillators(history))
+    pandas_time = time.perf_counter() - start
+
+    # Incremental: seed once from the history, then one update per bar
+    indicators = _analyzer_indicators()
+    indicators.update({"KDJ": KDJ(), "CCI": CCI(), "DMI": DMI(), "Ichimoku": Ichimoku()})
+    start = time.perf_counter()
+    state = IndicatorSet(indicators).seed(bars.iloc[:args.history])
+    seed_time = time.perf_counter() - start
+
+    stream = bars.iloc[args.history:]
+    stream_bars = list(zip(stream["High"].tolist(), stream["Low"].tolist(), stream["Close"].tolist(),
+                           stream["Volume"].tolist()))
+    incremental_rows, incremental_osc = [], []
+    start = time.perf_counter()
+    for bar in stream_bars:
+        values = state.update(*bar)
+        incremental_rows.append(values)
+    update_time = time.perf_counter() - start
+    for values in incremental_rows:
+        incremental_osc.append(incremental_oscillators(values))
+    incremental_rows = [[_indicator_columns(values)[c] for c in columns] for values in incremental_rows]
+
+    assert np.allclose(np.array(pandas_rows, dtype=float), np.array(incremental_rows, dtype=float),
+                       rtol=1e-9, atol=1e-9, equal_nan=True)
+    assert np.allclose(pd.DataFrame(pandas_osc).to_numpy(float), pd.DataFrame(incremental_osc).to_numpy(float),
+                       rtol=1e-9, atol=1e-9, equal_nan=True)
+
+    print(f"{args.bars} bars streamed after {args.history:,} bars of history, "
+          f"{len(columns)} analyzer columns + KDJ/CCI/DMI/Ichimoku (values match)")
+    print(f"  pandas recompute per bar   {pandas_time / args.bars * 1000:9.2f} ms/bar")
+    print(f"  incremental update         {update_time / args.bars * 1000:9.3f} ms/bar  "
+          f"({pandas_time / update_time:,.0f}x faster)")
+    print(f"  one-off seed from history  {seed_time * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
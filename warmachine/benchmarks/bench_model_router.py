@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+"""
+AI model router benchmark
+
+Serves fake OpenAI-compatible chat completion endpoints from a local aiohttp
+server: a primary model with a long latency tail and occasional 503s, and a
+faster fallback. Several callers (reporter, self-improvement, Telegram queries)
+send overlapping prompts through AIModelRouter, first one request at a time with
+fallback only after a failure (the previous router), then concurrently with
+per-model concurrency limits, hedging and coalescing of identical prompts.
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import logging
+import argparse
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_engine.ai_model_router import AIModelRouter
+
+
+class FakeLLMServer:
+    """Chat completion endpoints with configurable latency and failures per model"""
+
+    def __init__(self, slow_share: float, slow_latency: float, error_share: float, seed: int = 3):
+        self.slow_share = slow_share
+        self.slow_latency = slow_latency
+        self.error_share = error_share
+        self.rng = random.Random(seed)
+        self.requests = {"primary": 0, "fallback": 0}
+        self.runner = None
+        self.port = None
+
+    async def handle(self, request: web.Request) -> web.Response:
+        model = request.match_info["model"]
+        body = await request.json()
+        self.requests[model] += 1
+        if model == "primary":
+            roll = self.rng.random()
+            if roll < self.error_share:
+                await asyncio.sleep(0.05)
+                return web.Response(status=503, text="overloaded")
+            latency = self.slow_latency if roll < self.error_share + self.slow_share else 0.2
+        else:
+            latency = 0.35
+        await asyncio.sleep(latency * self.rng.uniform(0.8, 1.2))
+        answer = f"{model} answer to: {body['messages'][-1]['content'][:40]}"
+        return web.json_response({"choices": [{"message": {"role": "assistant", "content": answer}}]})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/{model}/chat/completions", self.handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+def make_workload(callers: int, prompts_per_caller: int, shared: float, seed: int = 9) -> list:
+    """Per caller prompt lists; a share of prompts is common to all callers"""
+    rng = random.Random(seed)
+    common = [f"Summarise today's market for symbol {i}" for i in range(prompts_per_caller)]
+    return [
+        [common[i] if rng.random() < shared else f"Caller {c} question {i}" for i in range(prompts_per_caller)]
+        for c in range(callers)
+    ]
+
+
+def make_router(port: int, **ai_config) -> AIModelRouter:
+    config = {"ai": dict({
+        "provider": "deepseek",
+        "fallback_provider": "openai",
+        "base_url": f"http://127.0.0.1:{port}/primary",
+        "openai_base_url": f"http://127.0.0.1:{port}/fallback",
+        "request_timeout": 30.0,
+        "prompt_cache": {"enabled": False}
+    }, **ai_config)}
+    return AIModelRouter(config)
+
+
+def summarise(label: str, latencies: list, elapsed: float, server: FakeLLMServer, errors: int):
+    latencies = sorted(latencies)
+    p50 = latencies[len(latencies) // 2]
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"  {label:<34} {elapsed:6.2f}s  p50 {p50:5.2f}s  p95 {p95:5.2f}s  max {latencies[-1]:5.2f}s  "
+          f"server requests {server.requests['primary']:3d} primary / {server.requests['fallback']:3d} fallback"
+          f"{f'  {errors} errors' if errors else ''}")
+
+
+async def run_sequential(router: AIModelRouter, workload: list):
+    """Callers share the router one request at a time"""
+    latencies, errors = [], 0
+    for i in range(max(len(prompts) for prompts in workload)):
+        for prompts in workload:
+            start = time.perf_counter()
+            response = await router.ask_async(prompts[i])
+            latencies.append(time.perf_counter() - start)
+            errors += response.startswith("Error:")
+    return latencies, errors
+
+
+async def run_concurrent(router: AIModelRouter, workload: list):
+    """Every caller sends its prompts concurrently"""
+    async def timed(prompt):
+        start = time.perf_counter()
+        response = await router.ask_async(prompt)
+        return time.perf_counter() - start, response.startswith("Error:")
+
+    results = await asyncio.gather(*(timed(prompt) for prompts in workload for prompt in prompts))
+    return [latency for latency, _ in results], sum(error for _, error in results)
+
+
+async def bench(args):
+    workload = make_workload(args.callers, args.prompts, args.shared)
+    total = sum(len(prompts) for prompts in workload)
+    print(f"{args.callers} callers x {args.prompts} prompts ({args.shared:.0%} shared), primary: 0.2s, "
+          f"{args.slow:.0%} at {args.slow_latency:.0f}s, {args.errors:.0%} HTTP 503; fallback: 0.35s")
+
+    for label, runner, ai_config in (
+        ("one at a time, fallback on failure", run_sequential,
+         {"max_concurrency": 1, "hedge_delay": None, "coalesce": False}),
+        ("concurrent, hedged, coalesced", run_concurrent,
+         {"max_concurrency": args.concurrency, "hedge_delay": args.hedge_delay, "coalesce": True})
+    ):
+        server = FakeLLMServer(args.slow, args.slow_latency, args.errors)
+        await server.start()
+        try:
+            router = make_router(server.port, **ai_config)
+            start = time.perf_counter()
+            latencies, errors = await runner(router, workload)
+            summarise(label, latencies, time.perf_counter() - start, server, errors)
+        finally:
+            await server.stop()
+
+    metrics = router.get_metrics()
+    print(f"  {metrics['requests']} requests, {metrics['coalesced']} coalesced")
+    for name in ("deepseek", "openai"):
+        stats = metrics["models"][name]
+        histogram = {bucket: count for bucket, count in stats["latency_histogram"].items() if count}
+        print(f"  {name:<9} requests {stats['requests']:3d}  wins {stats['wins']:3d}  hedges {stats['hedges']:3d}  "
+              f"cancelled {stats['cancelled']:3d}  errors {stats['error_types']}  latency {histogram}")
+    assert len(latencies) == total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark AIModelRouter against a local fake LLM server")
+    parser.add_argument("--callers", type=int, default=3, help="Concurrent callers sharing the router")
+    parser.add_argument("--prompts", type=int, default=20, help="Prompts per caller")
+    parser.add_argument("--shared", type=float, default=0.3, help="Share of prompts common to all callers")
+    parser.add_argument("--slow", type=float, default=0.15, help="Share of slow primary responses")
+    parser.add_argument("--slow-latency", type=float, default=5.0, help="Slow primary response time (s)")
+    parser.add_argument("--errors", type=float, default=0.05, help="Share of primary HTTP 503 responses")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent requests per model")
+    parser.add_argument("--hedge-delay", type=float, default=1.0, help="Seconds before hedging with the fallback")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Local order book replay benchmark
+
+Builds a synthetic depth snapshot and a stream of sequenced depth diffs, replays
+them through LocalOrderBook and reports diff events and level updates per second,
+plus the cost of top-N and cumulative-depth queries.
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from connectors.order_book import LocalOrderBook
+
+
+def make_snapshot(levels: int, mid: float, tick: float, update_id: int):
+    """Build a snapshot with `levels` price levels per side"""
+    return {
+        "lastUpdateId": update_id,
+        "bids": [[f"{mid - (i + 1) * tick:.2f}", f"{random.uniform(0.1, 5):.4f}"] for i in range(levels)],
+        "asks": [[f"{mid + (i + 1) * tick:.2f}", f"{random.uniform(0.1, 5):.4f}"] for i in range(levels)],
+    }
+
+
+def make_diffs(count: int, levels_per_side: int, mid: float, tick: float, first_id: int, spread_levels: int):
+    """Build sequenced depthUpdate events; ~20% of level updates delete the level"""
+    diffs = []
+    update_id = first_id
+    for _ in range(count):
+        def side(sign):
+            return [
+                [f"{mid + sign * random.randint(1, spread_levels) * tick:.2f}",
+                 "0" if random.random() < 0.2 else f"{random.uniform(0.1, 5):.4f}"]
+                for _ in range(levels_per_side)
+            ]
+        diffs.append({
+            "e": "depthUpdate", "E": update_id, "s": "BTCUSDT",
+            "U": update_id, "u": update_id + 1,
+            "b": side(-1), "a": side(1)
+        })
+        update_id += 2
+    return diffs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LocalOrderBook diff replay")
+    parser.add_argument("--events", type=int, default=200000, help="Number of diff events")
+    parser.add_argument("--levels", type=int, default=5000, help="Snapshot levels per side")
+    parser.add_argument("--updates", type=int, default=5, help="Level updates per side per event")
+    args = parser.parse_args()
+
+    random.seed(42)
+    mid, tick = 30000.0, 0.01
+    snapshot = make_snapshot(args.levels, mid, tick, update_id=1000)
+    diffs = make_diffs(args.events, args.updates, mid, tick, first_id=1001, spread_levels=args.levels)
+
+    book = LocalOrderBook("BTCUSDT")
+    start = time.perf_counter()
+    book.apply_snapshot(snapshot)
+    snapshot_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for diff in diffs:
+        book.apply_diff(diff)
+    elapsed = time.perf_counter() - start
+    level_updates = args.events * args.updates * 2
+
+    queries = 10000
+    start = time.perf_counter()
+    for _ in range(queries):
+        book.top(20)
+        book.cumulative_depth(pct=0.0001)
+    query_time = (time.perf_counter() - start) / queries
+
+    print(f"snapshot ({2 * args.levels} levels): {snapshot_time * 1000:.1f} ms")
+    print(f"diff events: {args.events / elapsed:,.0f}/s, level updates: {level_updates / elapsed:,.0f}/s")
+    print(f"book size: {len(book.bids)} bids / {len(book.asks)} asks, synced={book.synced}")
+    print(f"top(20) + cumulative_depth(0.01%): {query_time * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+"""
+Polygon WebSocket replay benchmark
+
+Replays recorded Polygon stock frames (one JSON array per line, as received from
+the socket) through PolygonConnector's decoding and dispatch path and through
+the previous per-message handler: json.loads, ISO timestamp strings and
+f"{data_type}:{symbol}" callback lookups. Without --frames a synthetic market-open
+stream of trades, quotes and minute aggregates is generated.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from connectors import polygon_connector
+from connectors.polygon_connector import PolygonConnector
+
+LEGACY_EVENT_TYPES = {"T": "trades", "Q": "quotes", "AM": "bars", "XT": "trades", "XQ": "quotes", "XA": "bars"}
+
+
+def legacy_handle(callbacks: dict, data, is_crypto: bool = False):
+    """The handler PolygonConnector used before the dispatch table"""
+    if isinstance(data, dict) and 'status' in data:
+        return
+    if not isinstance(data, list):
+        return
+    for msg in data:
+        if 'ev' not in msg or 'sym' not in msg:
+            continue
+        symbol = msg['sym']
+        if is_crypto and not symbol.startswith("X:"):
+            symbol = f"X:{symbol}"
+        data_type = LEGACY_EVENT_TYPES.get(msg['ev'])
+        if not data_type:
+            continue
+        timestamp = datetime.fromtimestamp(msg.get('t', 0) / 1000.0).isoformat() if 't' in msg else datetime.now().isoformat()
+        if data_type == "trades":
+            formatted = {"symbol": symbol, "timestamp": timestamp, "price": msg.get('p', 0), "size": msg.get('s', 0),
+                         "exchange": msg.get('x', ''), "trade_id": msg.get('i', '')}
+        elif data_type == "quotes":
+            formatted = {"symbol": symbol, "timestamp": timestamp, "bid_price": msg.get('bp', 0),
+                         "bid_size": msg.get('bs', 0), "ask_price": msg.get('ap', 0),
+                         "ask_size": msg.get('as', 0), "exchange": msg.get('x', '')}
+        else:
+            formatted = {"symbol": symbol, "timestamp": timestamp, "open": msg.get('o', 0), "high": msg.get('h', 0),
+                         "low": msg.get('l', 0), "close": msg.get('c', 0), "volume": msg.get('v', 0),
+                         "vwap": msg.get('vw', 0)}
+        callback_key = f"{data_type}:{symbol}"
+        if callback_key in callbacks:
+            for callback in callbacks[callback_key]:
+                callback(formatted)
+
+
+def make_frames(count: int, events_per_frame: int, symbols: list, seed: int = 7) -> list:
+    """Synthetic stock stream: 60% quotes, 38% trades, 2% minute aggregates"""
+    rng = random.Random(seed)
+    t = 1_700_000_000_000
+    frames = []
+    for _ in range(count):
+        events = []
+        for _ in range(events_per_frame):
+            t += 1
+            sym = rng.choice(symbols)
+            price = round(100 + rng.random() * 50, 2)
+            r = rng.random()
+            if r < 0.6:
+                events.append({"ev": "Q", "sym": sym, "bx": 4, "bp": price, "bs": 2, "ax": 7,
+                               "ap": round(price + 0.01, 2), "as": 3, "c": 0, "t": t, "q": t, "z": 3})
+            elif r < 0.98:
+                events.append({"ev": "T", "sym": sym, "x": 4, "i": str(t), "z": 3, "p": price,
+                               "s": rng.randint(1, 500), "c": [12], "t": t, "q": t})
+            else:
+                events.append({"ev": "AM", "sym": sym, "v": 1000, "av": 50000, "op": price, "vw": price,
+                               "o": price, "c": price, "h": price, "l": price, "a": price, "z": 10,
+                               "s": t - 60000, "e": t})
+        frames.append(json.dumps(events, separators=(",", ":")))
+    return frames
+
+
+def replay(handle, frames: list, loads) -> float:
+    start = time.perf_counter()
+    for frame in frames:
+        handle(loads(frame))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay Polygon WebSocket frames through the decoder")
+    parser.add_argument("--frames", help="File with one recorded frame per line")
+    parser.add_argument("--count", type=int, default=5000, help="Synthetic frames to generate")
+    parser.add_argument("--events", type=int, default=50, help="Events per synthetic frame")
+    parser.add_argument("--symbols", type=int, default=3000, help="Symbols in the synthetic stream")
+    parser.add_argument("--subscribed", type=int, default=500, help="Symbols with callbacks")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    symbols = [f"S{i:04d}" for i in range(args.symbols)]
+    if args.frames:
+        with open(args.frames) as f:
+            frames = [line for line in f if line.strip()]
+        symbols = sorted({m.get("sym") for frame in frames for m in json.loads(frame) if m.get("sym")})
+    else:
+        frames = make_frames(args.count, args.events, symbols)
+    events = sum(frame.count('"ev"') for frame in frames)
+
+    subscribed = symbols[:args.subscribed]
+    delivered = {"new": 0, "legacy": 0}
+
+    def on_new(data):
+        delivered["new"] += 1
+
+    def on_legacy(data):
+        delivered["legacy"] += 1
+
+    connector = PolygonConnector({"api_key": "bench"})
+    connector.enable_websocket = True
+    legacy_callbacks = {}
+    for symbol in subscribed:
+        for data_type, legacy_type in (("stock_trades", "trades"), ("stock_quotes", "quotes"), ("stock_bars", "bars")):
+            connector.subscribe(symbol, data_type, on_new)
+            legacy_callbacks[f"{legacy_type}:{symbol}"] = [on_legacy]
+
+    legacy_time = replay(lambda data: legacy_handle(legacy_callbacks, data), frames, json.loads)
+    new_json_time = replay(connector._handle_websocket_message, frames, json.loads)
+    delivered["new"] = 0
+    new_time = replay(connector._handle_websocket_message, frames, polygon_connector._loads)
+    assert delivered["new"] == delivered["legacy"], delivered
+
+    backend = polygon_connector._loads.__module__ or "json"
+    print(f"{len(frames):,} frames, {events:,} events, {len(subscribed):,}/{len(symbols):,} symbols subscribed, "
+          f"{delivered['new']:,} callbacks")
+    for name, elapsed in (("legacy handler (json)", legacy_time),
+                          ("dispatch table (json)", new_json_time),
+                          (f"dispatch table ({backend})", new_time)):
+        print(f"  {name:<26} {elapsed:6.2f}s  {events / elapsed / 1e6:5.2f} M events/s  "
+              f"{elapsed / len(frames) * 1e6:7.1f} us/frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+"""
+AI prompt cache benchmark
+
+Callers ask the router about market snapshots that are rebuilt every round from
+slowly drifting prices and indicators, against the fake LLM server of
+bench_model_router. Compares no cache, a cache keyed on the exact prompt text
+and the default cache that quantises numbers in prompts, then reopens the cache
+file to show that entries survive a restart.
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import logging
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_engine.prompt_cache import normalize_prompt
+from benchmarks.bench_model_router import FakeLLMServer, make_router
+
+
+def make_snapshots(symbols: int, rounds: int, drift: float, seed: int = 4) -> list:
+    """Per round, one analysis prompt per symbol built from drifting market data"""
+    rng = random.Random(seed)
+    state = [[rng.uniform(20, 500), rng.uniform(30, 70), rng.uniform(1e6, 5e7)] for _ in range(symbols)]
+    snapshots = []
+    for _ in range(rounds):
+        prompts = []
+        for i, (price, rsi, volume) in enumerate(state):
+            prompts.append(
+                f"Analyse S{i:03d} on 2024-05-17: price ${price:.2f}, RSI(14) {rsi:.1f}, "
+                f"MA20 ${price * 0.98:.2f}, volume {volume:.0f}. Should we buy, hold or sell?"
+            )
+            state[i] = [price * (1 + rng.gauss(0, drift)), rsi + rng.gauss(0, drift * 100),
+                        volume * (1 + rng.gauss(0, drift * 5))]
+        snapshots.append(prompts)
+    return snapshots
+
+
+async def run(router, snapshots: list) -> list:
+    """Each round's prompts are sent concurrently; rounds follow each other"""
+    latencies = []
+
+    async def timed(prompt):
+        start = time.perf_counter()
+        response = await router.ask_async(prompt, call_site="analysis")
+        latencies.append(time.perf_counter() - start)
+        assert not response.startswith("Error:"), response
+
+    for prompts in snapshots:
+        await asyncio.gather(*(timed(prompt) for prompt in prompts))
+    return sorted(latencies)
+
+
+async def bench(args, directory: str):
+    snapshots = make_snapshots(args.symbols, args.rounds, args.drift)
+    total = args.symbols * args.rounds
+    print(f"{args.symbols} symbols x {args.rounds} rounds, prices drifting {args.drift:.2%} per round")
+    print(f"  e.g. {snapshots[0][0]}")
+    print(f"    -> {normalize_prompt(snapshots[0][0])}")
+
+    path = os.path.join(directory, "prompt_cache.sqlite")
+    for label, cache_config in (
+        ("no cache", {"enabled": False}),
+        ("exact prompt cache", {"path": os.path.join(directory, "exact.sqlite"), "digits": None}),
+        ("quantised prompt cache", {"path": path}),
+        ("quantised, after restart", {"path": path})
+    ):
+        server = FakeLLMServer(0.0, 0.0, 0.0)
+        await server.start()
+        try:
+            router = make_router(server.port, max_concurrency=args.concurrency, hedge_delay=None,
+                                 prompt_cache=dict(cache_config, ttl=args.ttl))
+            start = time.perf_counter()
+            latencies = await run(router, snapshots)
+            elapsed = time.perf_counter() - start
+        finally:
+            await server.stop()
+
+        stats = router.get_metrics()["prompt_cache"]
+        hit_rate = f"hit rate {stats['hit_rate']:6.1%}" if stats else " " * 15
+        print(f"  {label:<26} {elapsed:6.2f}s  p50 {latencies[len(latencies) // 2] * 1000:7.1f} ms  "
+              f"{hit_rate}  model requests {server.requests['primary']:4d} / {total}")
+        if router.prompt_cache is not None:
+            router.prompt_cache.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the persistent AI prompt cache")
+    parser.add_argument("--symbols", type=int, default=40, help="Symbols analysed per round")
+    parser.add_argument("--rounds", type=int, default=10, help="Snapshot rounds")
+    parser.add_argument("--drift", type=float, default=0.0005, help="Relative price change per round")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent requests per model")
+    parser.add_argument("--ttl", type=float, default=600, help="Cache TTL in seconds")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(bench(args, directory))
+
+
+if __name__ == "__main__":
+    main()
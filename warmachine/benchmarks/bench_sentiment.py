@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+"""
+Sentiment adapter benchmark
+
+Scores a burst of news items with a simulated transformer model that has a
+fixed cost per forward pass plus a cost per text and releases the GIL while it
+runs, like torch inference. Compares the previous path (process_news inline, one
+model call per item, event loop blocked throughout) with process_news_async,
+which micro-batches the burst on a pool, and reports the longest event loop
+stall of each. Also compares keyword extraction with the per-keyword ``in`` scan
+against the compiled KeywordMatcher and checks both find the same keywords.
+"""
+
+import os
+import sys
+import time
+import random
+import string
+import asyncio
+import logging
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.analysis.sentiment_adapter import SentimentAdapter, KeywordMatcher
+
+WORDS = ("stock market rally earnings guidance inflation rate cut federal reserve bank tech "
+         "semiconductor oil energy demand supply chain growth recession bond yield dollar").split()
+
+
+class SimulatedModel:
+    """Sentiment pipeline stand-in: overhead per call plus a cost per text"""
+
+    def __init__(self, call_cost: float, text_cost: float):
+        self.call_cost = call_cost
+        self.text_cost = text_cost
+        self.calls = 0
+
+    def __call__(self, texts, batch_size=1, truncation=False):
+        texts = [texts] if isinstance(texts, str) else texts
+        self.calls += 1
+        time.sleep(self.call_cost + self.text_cost * len(texts))
+        return [{"label": "POSITIVE" if len(text) % 2 else "NEGATIVE", "score": 0.5 + len(text) % 50 / 100}
+                for text in texts]
+
+
+def load_simulated_model(model: str, device: int) -> SimulatedModel:
+    call_cost, text_cost = (float(value) for value in model.split(":"))
+    return SimulatedModel(call_cost, text_cost)
+
+
+class SimulatedSentimentAdapter(SentimentAdapter):
+    analyzer_loader = staticmethod(load_simulated_model)
+
+
+def make_news(n_items: int, duplicates: float, rng) -> list:
+    """News items; a share repeats earlier headlines (syndicated copies)"""
+    news = []
+    for i in range(n_items):
+        if news and rng.random() < duplicates:
+            news.append(dict(rng.choice(news)))
+        else:
+            news.append({
+                "title": " ".join(rng.choice(WORDS) for _ in range(8)),
+                "content": " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 200))),
+                "source": "wire"
+            })
+    return news
+
+
+async def max_stall(work) -> tuple:
+    """Run work while a heartbeat measures the longest event loop stall"""
+    stall = 0.0
+    running = True
+
+    async def heartbeat():
+        nonlocal stall
+        last = time.perf_counter()
+        while running:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            stall = max(stall, now - last - 0.001)
+            last = now
+
+    beat = asyncio.ensure_future(heartbeat())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    result = await work()
+    elapsed = time.perf_counter() - start
+    running = False
+    await beat
+    return result, elapsed, stall
+
+
+async def bench_burst(args, news: list):
+    model = f"{args.call_cost / 1000}:{args.text_cost / 1000}"
+
+    inline = SimulatedSentimentAdapter({"sentiment_model": model, "cache_size": 0})
+
+    async def run_inline():
+        return [inline.process_news(item) for item in news]
+
+    expected, inline_time, inline_stall = await max_stall(run_inline)
+
+    batched = SimulatedSentimentAdapter({
+        "sentiment_model": model,
+        "batch_window_ms": args.window,
+        "max_batch_size": args.batch_size,
+        "workers": args.workers
+    })
+
+    async def run_batched():
+        return await asyncio.gather(*(batched.process_news_async(item) for item in news))
+
+    results, batched_time, batched_stall = await max_stall(run_batched)
+    assert [r["sentiment_scores"] for r in results] == [r["sentiment_scores"] for r in expected]
+    stats = batched.get_stats()
+
+    print(f"burst of {len(news)} news items, model {args.call_cost:.0f} ms per call + "
+          f"{args.text_cost:.1f} ms per text (same scores on both paths)")
+    print(f"  inline process_news          {inline_time * 1000:8.1f} ms  "
+          f"{inline.sentiment_analyzer.calls:4d} model calls  longest loop stall {inline_stall * 1000:7.1f} ms")
+    print(f"  micro-batched, {args.workers} worker(s)     {batched_time * 1000:8.1f} ms  "
+          f"{batched.sentiment_analyzer.calls:4d} model calls  longest loop stall {batched_stall * 1000:7.1f} ms  "
+          f"({inline_time / batched_time:.1f}x)")
+    print(f"  mean batch {stats['mean_batch_size']:.1f} texts, {stats['joined']} duplicate texts joined a "
+          f"pending score")
+    inline.close()
+    batched.close()
+
+
+def bench_keywords(args, rng):
+    """Keyword lists (company names, tickers, topics) and texts mentioning a few of them"""
+    def word(low, high):
+        return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(low, high)))
+
+    filler = [word(2, 9) for _ in range(2000)]
+    names = [word(4, 10) for _ in range(args.keywords * 2)]
+    keywords = [name.title() for name in rng.sample(names, args.keywords)]
+    texts = [
+        " ".join(rng.choice(names) if rng.random() < 0.05 else rng.choice(filler) for _ in range(150))
+        for _ in range(args.items)
+    ]
+
+    start = time.perf_counter()
+    expected = [{k for k in keywords if k.lower() in text} for text in texts]
+    scan_time = time.perf_counter() - start
+
+    matcher = KeywordMatcher(keywords)
+    start = time.perf_counter()
+    found = [set(matcher.find(text)) for text in texts]
+    matcher_time = time.perf_counter() - start
+    assert found == expected
+
+    print(f"keyword extraction, {len(keywords)} keywords over {len(texts)} texts (same keywords found)")
+    print(f"  per-keyword in scan          {scan_time / len(texts) * 1e6:8.1f} us/text")
+    print(f"  KeywordMatcher               {matcher_time / len(texts) * 1e6:8.1f} us/text  "
+          f"({scan_time / matcher_time:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark micro-batched sentiment scoring")
+    parser.add_argument("--items", type=int, default=500, help="News items in the burst")
+    parser.add_argument("--duplicates", type=float, default=0.1, help="Share of repeated news items")
+    parser.add_argument("--call-cost", type=float, default=20.0, help="Model cost per forward pass (ms)")
+    parser.add_argument("--text-cost", type=float, default=1.0, help="Model cost per text (ms)")
+    parser.add_argument("--window", type=float, default=5.0, help="Batch collection window (ms)")
+    parser.add_argument("--batch-size", type=int, default=32, help="Maximum texts per batch")
+    parser.add_argument("--workers", type=int, default=2, help="Scoring pool workers")
+    parser.add_argument("--keywords", type=int, default=500, help="Keywords per category")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    rng = random.Random(8)
+    news = make_news(args.items, args.duplicates, rng)
+    asyncio.run(bench_burst(args, news))
+    bench_keywords(args, rng)
+
+
+if __name__ == "__main__":
+    main()
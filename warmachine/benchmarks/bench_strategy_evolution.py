@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+"""
+Strategy evolution benchmark
+
+Runs the genetic strategy search over a year of synthetic minute bars with a
+breakout entry signal. First checks on a slice that the vectorised population
+evaluation gives the same fitness as StrategyEvaluator.evaluate_strategy (the
+row-by-row iloc simulation) and extrapolates the old per-individual cost to the
+full run, then times whole generations (evaluate, select, breed) in-process and
+on a process pool with the bars in shared memory. Finally runs the same search
+with the fitness cache and staged screening, reports the share of simulated
+individual-bars they save per generation, and repeats that run with the same
+seed as a restart that reopens the cache file.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.strategy.strategy_evolution import StrategyEvolution, StrategyEvaluator, population_genes, market_arrays
+
+GENES = {
+    "spread_ratio": (0.001, 0.01),
+    "gamma_threshold": (0.1, 0.9),
+    "iv_skew_sensitivity": (0.1, 2.0),
+    "theta_decay_rate": (0.01, 0.1),
+    "hedge_frequency": (1, 60),
+    "max_position_size": (0.05, 0.5),
+    "stop_loss_threshold": (0.002, 0.02),
+    "take_profit_threshold": (0.004, 0.04),
+    "volatility_lookback": (20, 60),
+    "correlation_threshold": (0.1, 0.9)
+}
+
+
+class BreakoutEvaluator(StrategyEvaluator):
+    """Enters in the direction of the precomputed breakout signal column"""
+
+    def _generate_signal(self, dna, market_data: pd.Series) -> int:
+        return int(market_data["signal"])
+
+    def _generate_signals(self, genes, data) -> np.ndarray:
+        return data["signal"].astype(np.int8)
+
+
+def make_config(population: int, workers: int, cache_path: str = None) -> dict:
+    """Without cache_path the fitness cache and staged screening are off"""
+    return {"strategy_evolution": {
+        "genes": {name: {"min": low, "max": high, "mutation_rate": 0.2, "mutation_strength": 0.2}
+                  for name, (low, high) in GENES.items()},
+        "evolution": {"population_size": population, "survival_rate": 0.1, "crossover_rate": 0.7},
+        "evaluation": {
+            "metric_weights": {"sharpe_ratio": 0.4, "sortino_ratio": 0.0, "max_drawdown": -0.2,
+                               "win_rate": 0.2, "profit_factor": 0.2},
+            "workers": workers,
+            "fitness_cache": {"enabled": cache_path is not None, "path": cache_path},
+            "staging": {"enabled": cache_path is not None}
+        }
+    }}
+
+
+def make_bars(n_bars: int, seed: int = 21) -> pd.DataFrame:
+    """Minute closes, rolling annualised volatility (%) and a 30-bar breakout signal"""
+    rng = np.random.default_rng(seed)
+    vol_regime = np.repeat(rng.uniform(0.0003, 0.0012, n_bars // 390 + 1), 390)[:n_bars]
+    price = 100 * np.exp(np.cumsum(rng.normal(0, vol_regime)))
+    returns = pd.Series(np.log(price)).diff()
+    volatility = (returns.rolling(60, min_periods=2).std() * np.sqrt(252 * 390) * 100).bfill().fillna(0)
+    momentum = pd.Series(price).pct_change(30).fillna(0)
+    signal = np.where(momentum > 0.006, 1, np.where(momentum < -0.006, -1, 0))
+    index = pd.date_range("2024-01-02 09:30", periods=n_bars, freq="min")
+    return pd.DataFrame({"price": price, "volatility": volatility.to_numpy(), "signal": signal}, index=index)
+
+
+def make_evolution(config_path: str) -> StrategyEvolution:
+    evolution = StrategyEvolution(config_path)
+    evolution.evaluator = BreakoutEvaluator(evolution.config)
+    return evolution
+
+
+def check_parity(config_path: str, bars: pd.DataFrame, individuals: int, n_bars: int) -> float:
+    """Compare fitness of both paths on a slice; returns seconds per individual-bar of the old path"""
+    evolution = make_evolution(config_path)
+    evolution.config["strategy_evolution"]["evolution"]["population_size"] = individuals
+    evolution.initialize_population()
+    window = bars.iloc[:n_bars]
+
+    async def old_path():
+        return [await evolution.evaluator.evaluate_strategy(dna, window) for dna in evolution.population]
+
+    start = time.perf_counter()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected = np.array(asyncio.run(old_path()))
+    old_time = time.perf_counter() - start
+
+    fitness = evolution.evaluator.evaluate_population(population_genes(evolution.population), market_arrays(window))
+    assert np.allclose(fitness, expected, rtol=1e-12, atol=0, equal_nan=True), (fitness, expected)
+    evolution.close()
+    return old_time / (individuals * n_bars)
+
+
+def run_generations(config_path: str, bars: pd.DataFrame, generations: int, workers: int) -> tuple:
+    """Returns (seconds, evaluation seconds, evolution); runs are seeded, so repeated runs are identical"""
+    random.seed(7)
+    np.random.seed(7)
+    evolution = make_evolution(config_path)
+    evolution.workers = workers
+
+    async def run():
+        for _ in range(generations):
+            await evolution.evolve(bars)
+
+    start = time.perf_counter()
+    try:
+        asyncio.run(run())
+    finally:
+        evolution.close()
+    elapsed = time.perf_counter() - start
+    evaluation = sum(record["evaluation_time"] for record in evolution.history)
+    return elapsed, evaluation, evolution
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vectorised, parallel strategy evolution")
+    parser.add_argument("--population", type=int, default=1000, help="Individuals per generation")
+    parser.add_argument("--bars", type=int, default=252 * 390, help="Minute bars (default: one year)")
+    parser.add_argument("--generations", type=int, default=5, help="Generations to time")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Process pool size")
+    parser.add_argument("--parity-individuals", type=int, default=10, help="Individuals in the parity check")
+    parser.add_argument("--parity-bars", type=int, default=5000, help="Bars in the parity check")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    bars = make_bars(args.bars)
+    with tempfile.TemporaryDirectory() as directory:
+        config_path = os.path.join(directory, "strategy_evolution_config.json")
+        with open(config_path, "w") as f:
+            json.dump(make_config(args.population, args.workers), f)
+
+        per_bar = check_parity(config_path, bars, args.parity_individuals, args.parity_bars)
+        old_generation = per_bar * args.population * args.bars
+        print(f"{args.population:,} individuals x {args.bars:,} minute bars, "
+              f"{int((bars['signal'] != 0).sum()):,} signal bars")
+        print(f"  row-by-row evaluate_strategy  {per_bar * 1e6:6.1f} us per individual-bar "
+              f"(same fitness on {args.parity_individuals} x {args.parity_bars:,} bars), "
+              f"~{old_generation / 3600:.1f} h per generation")
+
+        for workers in sorted({1, args.workers}):
+            elapsed, evaluation, evolution = run_generations(config_path, bars, args.generations, workers)
+            print(f"  vectorised, {workers} process(es)       {args.generations / elapsed:6.2f} generations/s  "
+                  f"(evaluation {evaluation / args.generations:5.2f} s/generation, "
+                  f"~{old_generation / (evaluation / args.generations):,.0f}x), best fitness {evolution.best_fitness:.3f}")
+        baseline = evaluation
+
+        cache_path = os.path.join(directory, "fitness_cache.sqlite")
+        cached_config_path = os.path.join(directory, "strategy_evolution_cached_config.json")
+        with open(cached_config_path, "w") as f:
+            json.dump(make_config(args.population, args.workers, cache_path), f)
+        elapsed, evaluation, evolution = run_generations(cached_config_path, bars, args.generations, args.workers)
+        print(f"  + fitness cache, staged screening {args.generations / elapsed:6.2f} generations/s  "
+              f"(evaluation {evaluation / args.generations:5.2f} s/generation, {baseline / evaluation:.1f}x), "
+              f"best fitness {evolution.best_fitness:.3f}")
+        for record in evolution.history:
+            stats = record["evaluation"]
+            print(f"    generation {record['generation']}: {stats['invalid']:4d} invalid  "
+                  f"{stats['cache_hits']:4d} cached  {stats['duplicates']:4d} duplicates  "
+                  f"{stats['screened']:4d} screened  {stats['pruned']:4d} pruned  {stats['full']:4d} full  "
+                  f"-> {stats['compute_saved']:6.1%} of individual-bars saved")
+
+        # A restarted run of the same search finds its fitness values in the cache file
+        elapsed, restart_evaluation, restarted = run_generations(cached_config_path, bars, args.generations, args.workers)
+        saved = np.mean([record["evaluation"]["compute_saved"] for record in restarted.history])
+        print(f"  same search after a restart       {args.generations / elapsed:6.2f} generations/s  "
+              f"(evaluation {restart_evaluation / args.generations:5.2f} s/generation), "
+              f"{saved:.1%} of individual-bars saved, best fitness {restarted.best_fitness:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""
+Tick model benchmark
+
+Normalizes synthetic Binance trade messages in chunks, the way a feed handler
+receives them, into (a) per-message dataclasses carrying raw_data like the old
+models, (b) slotted Trade objects without raw_data and (c) columnar TradeBatch
+arrays, and reports throughput and the memory retained for the normalized ticks.
+"""
+
+import gc
+import os
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+from dataclasses import fields, make_dataclass
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.data_models import Trade, TradeBatch, DataNormalizer, DataSource, MarketType
+
+# The pre-slots model: same fields, instance __dict__
+LegacyTrade = make_dataclass("LegacyTrade", [(f.name, f.type, f) for f in fields(Trade)])
+
+
+def make_messages(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    symbols = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT"]
+    base = 1_700_000_000_000
+    return [
+        {"e": "trade", "E": base + i, "s": rng.choice(symbols), "t": seed * count + i,
+         "p": f"{30000 + rng.random() * 100:.2f}", "q": f"{rng.random():.5f}",
+         "T": base + i, "m": rng.random() < 0.5, "M": True}
+        for i in range(count)
+    ]
+
+
+def legacy_normalize(messages: list) -> list:
+    return [
+        LegacyTrade(
+            symbol=m.get("s", ""), market_type=MarketType.CRYPTO, source=DataSource.BINANCE,
+            timestamp=datetime.fromtimestamp(m.get("T", 0) / 1000), price=float(m.get("p", 0)),
+            quantity=float(m.get("q", 0)), side="sell" if m.get("m") else "buy",
+            trade_id=m.get("t"), raw_data=m
+        )
+        for m in messages
+    ]
+
+
+def slotted_normalize(messages: list) -> list:
+    return [
+        Trade(
+            symbol=m.get("s", ""), market_type=MarketType.CRYPTO, source=DataSource.BINANCE,
+            timestamp=datetime.fromtimestamp(m.get("T", 0) / 1000), price=float(m.get("p", 0)),
+            quantity=float(m.get("q", 0)), side="sell" if m.get("m") else "buy",
+            trade_id=m.get("t")
+        )
+        for m in messages
+    ]
+
+
+def batch_normalize(messages: list) -> TradeBatch:
+    return DataNormalizer.normalize_trades(messages, DataSource.BINANCE)
+
+
+def run(normalize, chunks: list, measure_memory: bool):
+    """Normalize every chunk and keep the results; returns (seconds, retained bytes)"""
+    gc.collect()
+    if measure_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    results = [normalize(chunk) for chunk in chunks]
+    elapsed = time.perf_counter() - start
+    retained = 0
+    if measure_memory:
+        retained = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+    del results
+    return elapsed, retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tick model memory and normalization throughput")
+    parser.add_argument("--ticks", type=int, default=1_000_000, help="Number of trade messages")
+    parser.add_argument("--chunk", type=int, default=1000, help="Messages per feed batch")
+    args = parser.parse_args()
+
+    chunks = [make_messages(args.chunk, seed) for seed in range(args.ticks // args.chunk)]
+    ticks = len(chunks) * args.chunk
+
+    # Message dicts are only retained by the raw_data variant, so count them against it
+    tracemalloc.start()
+    sample = make_messages(args.chunk, -1)
+    message_bytes = tracemalloc.get_traced_memory()[0] / args.chunk
+    tracemalloc.stop()
+    del sample
+
+    batch = batch_normalize(chunks[0])
+    reference = slotted_normalize(chunks[0])
+    assert [(t.symbol, t.price, t.quantity, t.side, t.trade_id) for t in batch.to_trades()] == \
+        [(t.symbol, t.price, t.quantity, t.side, t.trade_id) for t in reference]
+
+    print(f"{ticks:,} ticks in batches of {args.chunk:,}")
+    for name, normalize, extra in (
+        ("dataclass + raw_data", legacy_normalize, message_bytes),
+        ("slotted Trade", slotted_normalize, 0),
+        ("TradeBatch", batch_normalize, 0),
+    ):
+        elapsed, _ = run(normalize, chunks, False)
+        _, retained = run(normalize, chunks, True)
+        per_tick = retained / ticks + extra
+        print(f"  {name:<22} {ticks / elapsed / 1e6:6.2f} M ticks/s  "
+              f"{per_tick:6.0f} B/tick  {per_tick * ticks / 1024 ** 2:8,.0f} MB retained")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,9 @@ import pandas as pd
 import numpy as np
 import requests
 
+from core.cache import get_shared_cache
+from connectors.http_client import get_http_client, HTTPError
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -34,7 +37,7 @@ class AlphaVantageConnector:
         """
         self.config = config
         self.api_key = config.get("api_key", "")
-        self.base_url = "https://www.alphavantage.co/query"
+        self.base_url = config.get("base_url", "https://www.alphavantage.co/query")
         
         # Validate API key
         if not self.api_key:
@@ -42,15 +45,26 @@ class AlphaVantageConnector:
             raise ValueError("Alpha Vantage API key is required")
         
         # Cache to avoid redundant API calls
-        self.market_data_cache = {}
         self.cache_duration = config.get("cache_duration", 300)  # seconds
-        self.cache_lock = threading.RLock()
+        self.market_data_cache = get_shared_cache().namespace("alpha_vantage", ttl=self.cache_duration)
         
         # Rate limiting (Alpha Vantage has a limit of 5 calls per minute for free tier)
         self.calls_per_minute = config.get("calls_per_minute", 5)
         self.api_call_times = []
         self.api_call_lock = threading.RLock()
         
+        # Keep-alive session for the blocking calls; async calls share the pooled
+        # client, whose token bucket enforces the same per-minute budget
+        self.session = requests.Session()
+        self.http = get_http_client()
+        self.http.configure_provider(
+            "alpha_vantage",
+            rate=self.calls_per_minute / 60.0,
+            burst=self.calls_per_minute,
+            max_retries=config.get("max_retries"),
+            timeout=config.get("timeout")
+        )
+        
         logger.info("Alpha Vantage connector initialized")
     
     def _make_api_request(self, params: Dict[str, Any]) -> Dict[str, Any]:
@@ -90,21 +104,10 @@ class AlphaVantageConnector:
         params["apikey"] = self.api_key
         
         try:
-            response = requests.get(self.base_url, params=params)
+            response = self.session.get(self.base_url, params=params)
             
             if response.status_code == 200:
-                data = response.json()
-                
-                # Check for API error messages
-                if "Error Message" in data:
-                    logger.error(f"Alpha Vantage API error: {data['Error Message']}")
-                    return {}
-                
-                # Check for usage limit messages
-                if "Note" in data and "API call frequency" in data["Note"]:
-                    logger.warning(f"Alpha Vantage API limit warning: {data['Note']}")
-                
-                return data
+                return self._check_api_response(response.json())
             else:
                 logger.error(f"Alpha Vantage API error: {response.status_code} - {response.text}")
                 return {}
@@ -113,6 +116,41 @@ class AlphaVantageConnector:
             logger.error(f"Error making API request: {str(e)}")
             return {}
     
+    async def _make_api_request_async(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Make a rate-limited API request through the shared async HTTP client
+        
+        Args:
+            params: Query parameters
+            
+        Returns:
+            Response data
+        """
+        params = dict(params, apikey=self.api_key)
+        
+        try:
+            data = await self.http.get_json(self.base_url, provider="alpha_vantage", params=params)
+            return self._check_api_response(data)
+        except HTTPError as e:
+            logger.error(f"Alpha Vantage API error: {e.status} - {e.message}")
+            return {}
+        except Exception as e:
+            logger.error(f"Error making API request: {str(e)}")
+            return {}
+    
+    def _check_api_response(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Log API error and usage-limit messages embedded in a 200 response"""
+        # Check for API error messages
+        if "Error Message" in data:
+            logger.error(f"Alpha Vantage API error: {data['Error Message']}")
+            return {}
+        
+        # Check for usage limit messages
+        if "Note" in data and "API call frequency" in data["Note"]:
+            logger.warning(f"Alpha Vantage API limit warning: {data['Note']}")
+        
+        return data
+    
     def _get_from_cache(self, cache_key: str) -> Optional[Dict[str, Any]]:
         """
         Get data from cache if available and not expired
@@ -123,17 +161,7 @@ class AlphaVantageConnector:
         Returns:
             Cached data or None
         """
-        with self.cache_lock:
-            if cache_key in self.market_data_cache:
-                cached_data = self.market_data_cache[cache_key]
-                cache_time = cached_data.get("cache_time", 0)
-                current_time = time.time()
-                
-                # Check if cache is still valid
-                if current_time - cache_time < self.cache_duration:
-                    return cached_data.get("data")
-        
-        return None
+        return self.market_data_cache.get(cache_key)
     
     def _store_in_cache(self, cache_key: str, data: Dict[str, Any]):
         """
@@ -143,11 +171,7 @@ class AlphaVantageConnector:
             cache_key: Cache key
             data: Data to store
         """
-        with self.cache_lock:
-            self.market_data_cache[cache_key] = {
-                "data": data,
-                "cache_time": time.time()
-            }
+        self.market_data_cache.set(cache_key, data)
     
     def get_stock_data(self, symbol: str, function: str = "TIME_SERIES_DAILY", 
                      outputsize: str = "compact") -> Dict[str, Any]:
@@ -391,6 +415,26 @@ class AlphaVantageConnector:
         Returns:
             DataFrame with price data
         """
+        data = self._make_api_request(self._bars_params(symbol, timeframe))
+        return self._parse_bars(data, symbol, limit)
+    
+    async def get_bars_async(self, symbol: str, timeframe: str, limit: int = 100) -> pd.DataFrame:
+        """
+        Get price bars as DataFrame without blocking the event loop
+        
+        Args:
+            symbol: Stock symbol
+            timeframe: Time frame (1m, 5m, 15m, 30m, 1h, 1d, 1w, 1M)
+            limit: Maximum number of bars to return
+            
+        Returns:
+            DataFrame with price data
+        """
+        data = await self._make_api_request_async(self._bars_params(symbol, timeframe))
+        return self._parse_bars(data, symbol, limit)
+    
+    def _bars_params(self, symbol: str, timeframe: str) -> Dict[str, Any]:
+        """Build time series request parameters for a timeframe"""
         # Map timeframe to Alpha Vantage function and interval
         function = "TIME_SERIES_DAILY"
         interval = None
@@ -419,8 +463,10 @@ class AlphaVantageConnector:
         if interval:
             params["interval"] = interval
         
-        # Make API request
-        data = self._make_api_request(params)
+        return params
+    
+    def _parse_bars(self, data: Dict[str, Any], symbol: str, limit: int) -> pd.DataFrame:
+        """Convert a time series response to a bar DataFrame"""
         if not data:
             return pd.DataFrame()
         
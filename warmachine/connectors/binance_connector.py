@@ -19,6 +19,8 @@ import hashlib
 import requests
 from urllib.parse import urlencode
 
+from connectors.http_client import get_http_client, HTTPError
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -55,11 +57,24 @@ class BinanceConnector:
         self.subscriptions = {}
         self.callbacks = {}
         
+        # Allow pointing the REST API at another host (e.g. a local stub server)
+        self.base_url = config.get("base_url", self.base_url)
+        
         # Cache to avoid redundant API calls
         self.market_data_cache = {}
         self.websocket_lock = threading.RLock()
         self.stream_id = 1
         
+        # Keep-alive session for the blocking REST calls, shared async client for the async ones
+        self.session = requests.Session()
+        self.http = get_http_client()
+        self.http.configure_provider(
+            "binance",
+            rate=config.get("requests_per_second", 20),  # 1200 request weight per minute
+            max_retries=config.get("max_retries"),
+            timeout=config.get("timeout")
+        )
+        
         # Start WebSocket thread if enabled
         self.running = True
         self.enable_websocket = config.get("enable_websocket", True)
@@ -110,18 +125,15 @@ class BinanceConnector:
             params = {}
         
         if signed:
-            # Add timestamp for signed endpoints
-            params['timestamp'] = int(time.time() * 1000)
-            query_string = urlencode(params)
-            params['signature'] = self._generate_signature(query_string)
+            self._sign_params(params)
         
         try:
             if method == "GET":
-                response = requests.get(url, headers=headers, params=params)
+                response = self.session.get(url, headers=headers, params=params)
             elif method == "POST":
-                response = requests.post(url, headers=headers, params=params)
+                response = self.session.post(url, headers=headers, params=params)
             elif method == "DELETE":
-                response = requests.delete(url, headers=headers, params=params)
+                response = self.session.delete(url, headers=headers, params=params)
             else:
                 logger.error(f"Unsupported HTTP method: {method}")
                 return {}
@@ -136,6 +148,58 @@ class BinanceConnector:
             logger.error(f"Error making REST request: {str(e)}")
             return {}
     
+    async def _make_rest_request_async(self, endpoint: str, method: str = "GET",
+                                       params: Dict[str, Any] = None, signed: bool = False) -> Any:
+        """
+        Make a REST API request to Binance through the shared async HTTP client
+        
+        Args:
+            endpoint: API endpoint path
+            method: HTTP method (GET, POST, DELETE)
+            params: Query parameters
+            signed: Whether the request requires signing
+            
+        Returns:
+            Response data
+        """
+        url = f"{self.base_url}{endpoint}"
+        headers = {
+            "X-MBX-APIKEY": self.api_key
+        }
+        
+        if params is None:
+            params = {}
+        
+        # Signed requests get a fresh timestamp and signature on every attempt
+        prepare_params = None
+        if signed:
+            def prepare_params():
+                attempt_params = dict(params)
+                self._sign_params(attempt_params)
+                return attempt_params
+        
+        # A repeated order POST could place the order twice unless Binance can
+        # reject the duplicate by its client order id
+        max_retries = None
+        if method == "POST" and "newClientOrderId" not in params:
+            max_retries = 0
+        
+        try:
+            return await self.http.request(method, url, provider="binance", params=params, headers=headers,
+                                           max_retries=max_retries, prepare_params=prepare_params)
+        except HTTPError as e:
+            logger.error(f"Binance API error: {e.status} - {e.message}")
+            return {}
+        except Exception as e:
+            logger.error(f"Error making REST request: {str(e)}")
+            return {}
+    
+    def _sign_params(self, params: Dict[str, Any]):
+        """Add the timestamp and signature required by signed endpoints"""
+        params['timestamp'] = int(time.time() * 1000)
+        query_string = urlencode(params)
+        params['signature'] = self._generate_signature(query_string)
+    
     def _websocket_thread(self):
         """Background thread that manages WebSocket connections"""
         import websocket
@@ -537,18 +601,38 @@ class BinanceConnector:
         Returns:
             Order book data
         """
+        result = self._make_rest_request("/api/v3/depth", params=self._order_book_params(symbol, limit))
+        return self._format_order_book(symbol, result)
+    
+    async def get_order_book_async(self, symbol: str, limit: int = 100) -> Dict[str, Any]:
+        """
+        Get order book (market depth) without blocking the event loop
+        
+        Args:
+            symbol: Trading symbol
+            limit: Depth of the order book (max 5000)
+            
+        Returns:
+            Order book data
+        """
+        result = await self._make_rest_request_async("/api/v3/depth", params=self._order_book_params(symbol, limit))
+        return self._format_order_book(symbol, result)
+    
+    def _order_book_params(self, symbol: str, limit: int) -> Dict[str, Any]:
+        """Build depth request parameters"""
         # Binance limits: 5, 10, 20, 50, 100, 500, 1000, 5000
         valid_limits = [5, 10, 20, 50, 100, 500, 1000, 5000]
         
         # Find closest valid limit
         actual_limit = min(valid_limits, key=lambda x: abs(x - limit))
         
-        symbol_formatted = self._format_symbol_for_api(symbol)
-        result = self._make_rest_request("/api/v3/depth", params={
-            "symbol": symbol_formatted,
+        return {
+            "symbol": self._format_symbol_for_api(symbol),
             "limit": actual_limit
-        })
-        
+        }
+    
+    def _format_order_book(self, symbol: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Format a depth response"""
         if not result or "bids" not in result or "asks" not in result:
             logger.warning(f"Failed to get order book for {symbol}")
             return {"bids": [], "asks": []}
@@ -583,9 +667,34 @@ class BinanceConnector:
         Returns:
             List of kline data
         """
-        symbol_formatted = self._format_symbol_for_api(symbol)
+        params = self._klines_params(symbol, interval, limit, start_time, end_time)
+        result = self._make_rest_request("/api/v3/klines", params=params)
+        return self._format_klines(symbol, result)
+    
+    async def get_klines_async(self, symbol: str, interval: str, limit: int = 500,
+                               start_time: Optional[int] = None, end_time: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get klines/candlestick data without blocking the event loop
+        
+        Args:
+            symbol: Trading symbol
+            interval: Time interval (1m, 3m, 5m, 15m, 30m, 1h, 2h, 4h, 6h, 8h, 12h, 1d, 3d, 1w, 1M)
+            limit: Number of candles to return (max 1000)
+            start_time: Start time in milliseconds
+            end_time: End time in milliseconds
+            
+        Returns:
+            List of kline data
+        """
+        params = self._klines_params(symbol, interval, limit, start_time, end_time)
+        result = await self._make_rest_request_async("/api/v3/klines", params=params)
+        return self._format_klines(symbol, result)
+    
+    def _klines_params(self, symbol: str, interval: str, limit: int,
+                       start_time: Optional[int], end_time: Optional[int]) -> Dict[str, Any]:
+        """Build klines request parameters"""
         params = {
-            "symbol": symbol_formatted,
+            "symbol": self._format_symbol_for_api(symbol),
             "interval": interval,
             "limit": min(limit, 1000)
         }
@@ -596,8 +705,10 @@ class BinanceConnector:
         if end_time:
             params["endTime"] = end_time
         
-        result = self._make_rest_request("/api/v3/klines", params=params)
-        
+        return params
+    
+    def _format_klines(self, symbol: str, result: Any) -> List[Dict[str, Any]]:
+        """Format a klines response"""
         if not isinstance(result, list):
             logger.warning(f"Failed to get klines for {symbol}")
             return []
@@ -633,8 +744,24 @@ class BinanceConnector:
         Returns:
             DataFrame with price data
         """
-        klines = self.get_klines(symbol, timeframe, limit)
+        return self._klines_to_frame(symbol, self.get_klines(symbol, timeframe, limit))
+    
+    async def get_bars_async(self, symbol: str, timeframe: str, limit: int = 100) -> pd.DataFrame:
+        """
+        Get historical price bars as a DataFrame without blocking the event loop
         
+        Args:
+            symbol: Trading symbol
+            timeframe: Bar duration (1m, 3m, 5m, 15m, 30m, 1h, 2h, 4h, 6h, 8h, 12h, 1d, 3d, 1w, 1M)
+            limit: Maximum number of bars to return
+            
+        Returns:
+            DataFrame with price data
+        """
+        return self._klines_to_frame(symbol, await self.get_klines_async(symbol, timeframe, limit))
+    
+    def _klines_to_frame(self, symbol: str, klines: List[Dict[str, Any]]) -> pd.DataFrame:
+        """Convert formatted klines to a bar DataFrame"""
         if not klines:
             logger.warning(f"No kline data for {symbol}")
             return pd.DataFrame()
@@ -14,13 +14,17 @@ import json
 import logging
 import asyncio
 import websockets
+import aiohttp
 import time
-from typing import Dict, List, Any, Optional, Set, Callable
+import numpy as np
+from typing import Dict, List, Any, Optional, Set, Callable, Tuple
 from datetime import datetime
 import hmac
 import hashlib
 import urllib.parse
 
+from connectors.order_book import LocalOrderBook
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -29,7 +33,11 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class RealTimeBuffer:
-    """Fast, thread-safe buffer for real-time market data"""
+    """Fast ring buffer for real-time market data
+    
+    Intended for a single producer on the event loop. Pushes and reads never await,
+    so they cannot interleave and no lock is needed.
+    """
     
     def __init__(self, size: int = 100000):
         """Initialize buffer with given size"""
@@ -38,46 +46,202 @@ class RealTimeBuffer:
         self.head = 0
         self.tail = 0
         self.count = 0
-        self.lock = asyncio.Lock()
     
     async def push(self, item: Any):
         """Add item to buffer"""
-        async with self.lock:
-            self.buffer[self.head] = item
-            self.head = (self.head + 1) % self.size
-            
-            if self.count < self.size:
-                self.count += 1
-            else:
-                self.tail = (self.tail + 1) % self.size
+        self.buffer[self.head] = item
+        self.head = (self.head + 1) % self.size
+        
+        if self.count < self.size:
+            self.count += 1
+        else:
+            self.tail = (self.tail + 1) % self.size
     
     async def get_latest(self, n: int = 1) -> List[Any]:
         """Get the latest n items from buffer"""
-        async with self.lock:
-            if self.count == 0:
-                return []
-            
-            items = []
-            n = min(n, self.count)
-            
-            for i in range(n):
-                idx = (self.head - i - 1) % self.size
-                items.append(self.buffer[idx])
-            
-            return items
+        if self.count == 0:
+            return []
+        
+        items = []
+        n = min(n, self.count)
+        
+        for i in range(n):
+            idx = (self.head - i - 1) % self.size
+            items.append(self.buffer[idx])
+        
+        return items
     
     async def get_all(self) -> List[Any]:
         """Get all items in buffer"""
-        async with self.lock:
-            if self.count == 0:
-                return []
-            
-            items = []
-            for i in range(self.count):
-                idx = (self.tail + i) % self.size
-                items.append(self.buffer[idx])
-            
-            return items
+        if self.count == 0:
+            return []
+        
+        items = []
+        for i in range(self.count):
+            idx = (self.tail + i) % self.size
+            items.append(self.buffer[idx])
+        
+        return items
+
+class ColumnarRingBuffer:
+    """Fixed-size ring of typed NumPy columns for a single producer
+    
+    Every row is written twice, at ``i`` and ``i + size``, so the latest ``n`` rows
+    always form one contiguous slice and readers get zero-copy views. Views alias
+    the ring: copy them if they must outlive further pushes.
+    """
+    
+    def __init__(self, columns: Dict[str, Any], size: int = 100000):
+        """
+        Initialize buffer
+        
+        Args:
+            columns: Column name -> NumPy dtype, in push order
+            size: Number of rows retained
+        """
+        self.size = size
+        self.names = list(columns)
+        self.columns = {name: np.zeros(2 * size, dtype=dtype) for name, dtype in columns.items()}
+        self._arrays = [self.columns[name] for name in self.names]
+        self.total = 0  # rows ever pushed
+    
+    def __len__(self) -> int:
+        return min(self.total, self.size)
+    
+    def push(self, *values):
+        """Append a row; values follow the column order"""
+        i = self.total % self.size
+        j = i + self.size
+        for array, value in zip(self._arrays, values):
+            array[i] = value
+            array[j] = value
+        self.total += 1
+    
+    def update_last(self, *values):
+        """Overwrite the most recent row in place"""
+        if self.total == 0:
+            self.push(*values)
+            return
+        i = (self.total - 1) % self.size
+        j = i + self.size
+        for array, value in zip(self._arrays, values):
+            array[i] = value
+            array[j] = value
+    
+    def last(self, column: str) -> Any:
+        """Get the newest value of a column (None if empty)"""
+        if self.total == 0:
+            return None
+        return self.columns[column][(self.total - 1) % self.size]
+    
+    def _bounds(self, n: Optional[int]) -> Tuple[int, int]:
+        """Get [start, end) of the latest n rows in the mirrored arrays"""
+        count = len(self)
+        n = count if n is None else max(0, min(n, count))
+        end = (self.total - 1) % self.size + 1 + self.size if self.total else self.size
+        return end - n, end
+    
+    def latest(self, n: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Get the latest n rows (all rows if None), oldest first
+        
+        Returns:
+            Column name -> read-only view
+        """
+        start, end = self._bounds(n)
+        views = {}
+        for name, array in self.columns.items():
+            view = array[start:end]
+            view.flags.writeable = False
+            views[name] = view
+        return views
+    
+    def since(self, value: Any, column: str = "timestamp") -> Dict[str, np.ndarray]:
+        """
+        Get rows whose (ascending) ``column`` is >= value, oldest first
+        
+        Returns:
+            Column name -> read-only view
+        """
+        start, end = self._bounds(None)
+        offset = int(np.searchsorted(self.columns[column][start:end], value, side="left"))
+        return self.latest(end - start - offset)
+
+TRADE_COLUMNS = {
+    "timestamp": np.int64,   # trade time, epoch ms
+    "price": np.float64,
+    "quantity": np.float64,
+    "side": np.int8,         # aggressor: +1 buy, -1 sell
+    "trade_id": np.int64
+}
+
+KLINE_COLUMNS = {
+    "open_time": np.int64,
+    "close_time": np.int64,
+    "open": np.float64,
+    "high": np.float64,
+    "low": np.float64,
+    "close": np.float64,
+    "volume": np.float64,
+    "is_closed": np.bool_
+}
+
+class TradeBuffer(ColumnarRingBuffer):
+    """Columnar trade tape for one symbol with vectorised flow metrics"""
+    
+    def __init__(self, size: int = 100000):
+        super().__init__(TRADE_COLUMNS, size)
+    
+    def window(self, window_ms: Optional[int] = None, n: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Select trades by time window (relative to the newest trade) or by count
+        
+        Args:
+            window_ms: Look-back in milliseconds
+            n: Number of latest trades (used when window_ms is None)
+        """
+        if window_ms is not None and self.total:
+            return self.since(self.last("timestamp") - window_ms)
+        return self.latest(n)
+    
+    def vwap(self, window_ms: Optional[int] = None, n: Optional[int] = None) -> float:
+        """Volume-weighted average price over the window"""
+        trades = self.window(window_ms, n)
+        volume = trades["quantity"].sum()
+        if volume <= 0:
+            return 0.0
+        return float(np.dot(trades["price"], trades["quantity"]) / volume)
+    
+    def volume(self, window_ms: Optional[int] = None, n: Optional[int] = None) -> float:
+        """Traded quantity over the window"""
+        return float(self.window(window_ms, n)["quantity"].sum())
+    
+    def order_flow(self, window_ms: Optional[int] = None, n: Optional[int] = None) -> Dict[str, float]:
+        """
+        Aggressor-side order flow over the window
+        
+        Returns:
+            Dictionary with buy/sell volume and notional, imbalance (-1..1), VWAP and count
+        """
+        trades = self.window(window_ms, n)
+        qty = trades["quantity"]
+        notional = trades["price"] * qty
+        buys = trades["side"] > 0
+        
+        buy_volume = float(qty[buys].sum())
+        sell_volume = float(qty.sum()) - buy_volume
+        total_volume = buy_volume + sell_volume
+        total_notional = float(notional.sum())
+        
+        return {
+            "trade_count": int(len(qty)),
+            "buy_volume": buy_volume,
+            "sell_volume": sell_volume,
+            "buy_notional": float(notional[buys].sum()),
+            "sell_notional": total_notional - float(notional[buys].sum()),
+            "imbalance": (buy_volume - sell_volume) / total_volume if total_volume > 0 else 0.0,
+            "vwap": total_notional / total_volume if total_volume > 0 else 0.0
+        }
 
 class BinanceWebSocketClient:
     """Binance WebSocket client for real-time market data"""
@@ -100,9 +264,21 @@ class BinanceWebSocketClient:
         self.api_secret = api_secret
         self.reconnect_interval = reconnect_interval
         
-        # Data buffers for different data types
-        self.trade_buffer = RealTimeBuffer(buffer_size)
-        self.kline_buffer = RealTimeBuffer(buffer_size)
+        # Columnar per-symbol buffers for trades and klines
+        self.buffer_size = buffer_size
+        self.trade_buffers: Dict[str, TradeBuffer] = {}
+        self.kline_buffers: Dict[str, ColumnarRingBuffer] = {}
+        
+        # Local L2 order books maintained from depth diffs
+        self.order_books: Dict[str, LocalOrderBook] = {}
+        self.snapshot_tasks: Dict[str, asyncio.Task] = {}
+        self.snapshot_limit = 1000
+        # Unsynced snapshot retries back off exponentially: /api/v3/depth is weight-heavy
+        self.snapshot_retries: Dict[str, int] = {}
+        self.snapshot_backoff = 1.0
+        self.snapshot_max_backoff = 60.0
+        
+        # Raw message buffers for other data types
         self.depth_buffer = RealTimeBuffer(buffer_size)
         self.ticker_buffer = RealTimeBuffer(buffer_size)
         
@@ -140,10 +316,10 @@ class BinanceWebSocketClient:
         
         Args:
             symbols: List of trading symbols
-            channels: List of channels to subscribe to (default: trade, kline, depth, ticker)
+            channels: List of channels to subscribe to (default: trade, kline, depth diffs, ticker)
         """
         if not channels:
-            channels = ["trade", "kline_1m", "depth20", "ticker"]
+            channels = ["trade", "kline_1m", "depth@100ms", "ticker"]
         
         try:
             # Convert symbols to lowercase (Binance format)
@@ -237,17 +413,20 @@ class BinanceWebSocketClient:
                 
                 if event_type == "trade":
                     # Trade event
-                    await self.trade_buffer.push(message)
+                    self._store_trade(message)
                     await self._call_callbacks("trade", message)
                     
                 elif event_type == "kline":
                     # Kline/candlestick event
-                    await self.kline_buffer.push(message)
+                    self._store_kline(message)
                     await self._call_callbacks("kline", message)
                     
                 elif event_type == "depthUpdate":
-                    # Order book update
+                    # Order book diff: apply to the local book
                     await self.depth_buffer.push(message)
+                    book = self.get_local_order_book(message["s"])
+                    if not book.apply_diff(message):
+                        self._request_snapshot(book)
                     await self._call_callbacks("depth", message)
                     
                 elif event_type == "24hrTicker":
@@ -258,6 +437,112 @@ class BinanceWebSocketClient:
         except Exception as e:
             logger.error(f"Error processing message: {str(e)}")
     
+    def get_trade_buffer(self, symbol: str) -> TradeBuffer:
+        """
+        Get (creating if needed) the columnar trade buffer for a symbol
+        
+        Args:
+            symbol: Trading symbol (case-insensitive)
+        """
+        symbol = symbol.upper()
+        buffer = self.trade_buffers.get(symbol)
+        if buffer is None:
+            buffer = self.trade_buffers[symbol] = TradeBuffer(self.buffer_size)
+        return buffer
+    
+    def get_kline_buffer(self, symbol: str) -> ColumnarRingBuffer:
+        """
+        Get (creating if needed) the columnar kline buffer for a symbol
+        
+        Args:
+            symbol: Trading symbol (case-insensitive)
+        """
+        symbol = symbol.upper()
+        buffer = self.kline_buffers.get(symbol)
+        if buffer is None:
+            buffer = self.kline_buffers[symbol] = ColumnarRingBuffer(KLINE_COLUMNS, self.buffer_size)
+        return buffer
+    
+    def get_local_order_book(self, symbol: str) -> LocalOrderBook:
+        """
+        Get (creating if needed) the local order book for a symbol
+        
+        Args:
+            symbol: Trading symbol (case-insensitive)
+        """
+        symbol = symbol.upper()
+        book = self.order_books.get(symbol)
+        if book is None:
+            book = self.order_books[symbol] = LocalOrderBook(symbol)
+        return book
+    
+    def _request_snapshot(self, book: LocalOrderBook):
+        """Start fetching a depth snapshot for a book unless one is in flight"""
+        task = self.snapshot_tasks.get(book.symbol)
+        if task is not None and not task.done():
+            return
+        self.snapshot_tasks[book.symbol] = asyncio.create_task(self._load_snapshot(book))
+    
+    async def _load_snapshot(self, book: LocalOrderBook):
+        """Fetch a REST depth snapshot and rebuild the local book from it"""
+        url = f"{self.BASE_API_URL}/api/v3/depth"
+        params = {"symbol": book.symbol, "limit": self.snapshot_limit}
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                    response.raise_for_status()
+                    snapshot = await response.json()
+            
+            book.apply_snapshot(snapshot)
+        except Exception as e:
+            logger.error(f"Error loading {book.symbol} depth snapshot: {str(e)}")
+        
+        if book.synced:
+            self.snapshot_retries.pop(book.symbol, None)
+            logger.info(f"Synced {book.symbol} order book at update {book.last_update_id}")
+            return
+        
+        # A failed request or a gap in the buffered diffs needs another snapshot
+        retries = self.snapshot_retries.get(book.symbol, 0) + 1
+        self.snapshot_retries[book.symbol] = retries
+        delay = min(self.snapshot_max_backoff, self.snapshot_backoff * 2 ** min(retries - 1, 16))
+        logger.warning(f"{book.symbol} order book not synced, retrying snapshot in {delay:.0f}s")
+        await asyncio.sleep(delay)
+        
+        if not book.synced and self.running:
+            self.snapshot_tasks.pop(book.symbol, None)
+            self._request_snapshot(book)
+    
+    def _store_trade(self, message: Dict[str, Any]):
+        """Append a trade message to its symbol's columnar buffer"""
+        self.get_trade_buffer(message["s"]).push(
+            message.get("T", 0),
+            float(message["p"]),
+            float(message["q"]),
+            # "m" means the buyer was the maker, i.e. the seller was the aggressor
+            -1 if message.get("m", False) else 1,
+            message.get("t", 0)
+        )
+    
+    def _store_kline(self, message: Dict[str, Any]):
+        """Append a kline message, updating the row in place while the bar is open"""
+        k = message.get("k", {})
+        buffer = self.get_kline_buffer(message["s"])
+        row = (
+            k.get("t", 0),
+            k.get("T", 0),
+            float(k.get("o", 0)),
+            float(k.get("h", 0)),
+            float(k.get("l", 0)),
+            float(k.get("c", 0)),
+            float(k.get("v", 0)),
+            k.get("x", False)
+        )
+        if buffer.total and buffer.last("open_time") == row[0]:
+            buffer.update_last(*row)
+        else:
+            buffer.push(*row)
+    
     async def _call_callbacks(self, event_type: str, data: Dict[str, Any]):
         """
         Call registered callbacks for event type
@@ -292,15 +577,49 @@ class BinanceWebSocketClient:
             limit: Maximum number of trades to return
             
         Returns:
-            List of trade events
+            List of trade events (Binance field names, numeric values), newest first
         """
-        trades = await self.trade_buffer.get_latest(limit)
-        
         if symbol:
-            symbol = symbol.lower()
-            return [t for t in trades if t.get("s", "").lower() == symbol]
+            buffers = {symbol.upper(): self.trade_buffers.get(symbol.upper())}
+        else:
+            buffers = self.trade_buffers
+        
+        trades = []
+        for sym, buffer in buffers.items():
+            if buffer is None:
+                continue
+            cols = buffer.latest(limit)
+            for ts, price, qty, side, trade_id in zip(
+                cols["timestamp"].tolist(), cols["price"].tolist(), cols["quantity"].tolist(),
+                cols["side"].tolist(), cols["trade_id"].tolist()
+            ):
+                trades.append({
+                    "e": "trade", "s": sym, "T": ts, "t": trade_id,
+                    "p": price, "q": qty, "m": side < 0
+                })
+        
+        trades.sort(key=lambda t: t["T"], reverse=True)
+        return trades[:limit]
+    
+    def get_trade_columns(self, symbol: str, limit: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Get the latest trades for a symbol as zero-copy column views, oldest first
         
-        return trades
+        Args:
+            symbol: Trading symbol
+            limit: Maximum number of trades (None = all buffered)
+        """
+        return self.get_trade_buffer(symbol).latest(limit)
+    
+    def get_order_flow(self, symbol: str, window_ms: int = 60000) -> Dict[str, float]:
+        """
+        Get vectorised order-flow metrics for a symbol
+        
+        Args:
+            symbol: Trading symbol
+            window_ms: Look-back window in milliseconds, relative to the newest trade
+        """
+        return self.get_trade_buffer(symbol).order_flow(window_ms=window_ms)
     
     async def get_klines(self, symbol: str = None, limit: int = 100) -> List[Dict[str, Any]]:
         """
@@ -311,15 +630,26 @@ class BinanceWebSocketClient:
             limit: Maximum number of klines to return
             
         Returns:
-            List of kline events
+            List of klines, newest first
         """
-        klines = await self.kline_buffer.get_latest(limit)
-        
         if symbol:
-            symbol = symbol.lower()
-            return [k for k in klines if k.get("s", "").lower() == symbol]
-        
-        return klines
+            buffers = {symbol.upper(): self.kline_buffers.get(symbol.upper())}
+        else:
+            buffers = self.kline_buffers
+        
+        klines = []
+        for sym, buffer in buffers.items():
+            if buffer is None:
+                continue
+            cols = buffer.latest(limit)
+            names = buffer.names
+            for row in zip(*(cols[name].tolist() for name in names)):
+                kline = dict(zip(names, row))
+                kline["symbol"] = sym
+                klines.append(kline)
+        
+        klines.sort(key=lambda k: k["open_time"], reverse=True)
+        return klines[:limit]
     
     async def get_order_book(self, symbol: str) -> Dict[str, Any]:
         """
@@ -331,6 +661,10 @@ class BinanceWebSocketClient:
         Returns:
             Latest order book state
         """
+        book = self.order_books.get(symbol.upper())
+        if book is not None and book.synced:
+            return book.to_dict()
+        
         symbol = symbol.lower()
         book_updates = await self.depth_buffer.get_latest(100)
         filtered = [b for b in book_updates if b.get("s", "").lower() == symbol]
@@ -362,6 +696,8 @@ class EnhancedDataFeed:
         self.config = config
         self.symbols = config.get("symbols", ["BTC-USDT", "ETH-USDT", "SPY", "QQQ", "NVDA"])
         self.buffer = RealTimeBuffer(config.get("buffer_size", 100000))
+        # Keep the exchange message on standardized records (off by default to save memory)
+        self.keep_raw_data = config.get("keep_raw_data", False)
         
         # Exchange clients
         self.binance_client = None
@@ -395,7 +731,7 @@ class EnhancedDataFeed:
                 # Connect to Binance WebSocket
                 await self.binance_client.connect(
                     symbols=binance_symbols,
-                    channels=["trade", "kline_1m", "depth20", "ticker"]
+                    channels=["trade", "kline_1m", "depth@100ms", "ticker"]
                 )
                 
                 # Register callbacks
@@ -419,9 +755,10 @@ class EnhancedDataFeed:
             "price": float(trade_data.get("p", 0)),
             "quantity": float(trade_data.get("q", 0)),
             "side": "BUY" if trade_data.get("m", False) else "SELL",
-            "trade_id": str(trade_data.get("t", "")),
-            "raw_data": trade_data
+            "trade_id": str(trade_data.get("t", ""))
         }
+        if self.keep_raw_data:
+            standardized["raw_data"] = trade_data
         
         # Push to buffer
         await self.buffer.push(standardized)
@@ -442,21 +779,22 @@ class EnhancedDataFeed:
                 base = symbol[:-4]
                 symbol = f"{base}-USDT"
         
-        bids = depth_data.get("b", [])
-        asks = depth_data.get("a", [])
+        # Forward the maintained book rather than the raw diff
+        book = self.binance_client.order_books.get(depth_data.get("s", "").upper())
+        if book is None or not book.synced:
+            return
+        
+        top = book.top(self.config.get("orderbook_depth", 20))
         
         standardized = {
             "timestamp": depth_data.get("E", int(time.time() * 1000)),
             "exchange": "BINANCE",
             "symbol": symbol,
-            "bids": [[float(price), float(qty)] for price, qty in bids],
-            "asks": [[float(price), float(qty)] for price, qty in asks],
-            "raw_data": depth_data
+            "bids": top["bids"],
+            "asks": top["asks"],
+            "last_update_id": book.last_update_id
         }
         
-        # Push to specific order book buffer
-        # (implement separate buffer for order books if needed)
-        
         # Call handlers
         for handler in self.handlers:
             try:
@@ -487,9 +825,10 @@ class EnhancedDataFeed:
             "low": float(k.get("l", 0)),
             "close": float(k.get("c", 0)),
             "volume": float(k.get("v", 0)),
-            "is_closed": k.get("x", False),
-            "raw_data": kline_data
+            "is_closed": k.get("x", False)
         }
+        if self.keep_raw_data:
+            standardized["raw_data"] = kline_data
         
         # Push to buffer
         await self.buffer.push(standardized)
@@ -0,0 +1,363 @@
+"""
+Shared async HTTP client
+
+One aiohttp session per event loop with keep-alive connection pools per host,
+per-provider token-bucket rate limits, retries with exponential backoff and full
+jitter, and per-provider request timing metrics. Used by the async REST methods
+of the market data connectors.
+"""
+
+import json
+import time
+import random
+import asyncio
+import logging
+import threading
+import weakref
+from collections import deque
+from typing import Callable, Dict, Any, Optional
+
+import aiohttp
+
+# Use orjson for response bodies when installed
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class HTTPError(Exception):
+    """Non-retryable HTTP status, or a request that failed after all retries"""
+
+    def __init__(self, status: int, message: str, url: str):
+        super().__init__(f"HTTP {status} for {url}: {message}")
+        self.status = status
+        self.message = message
+        self.url = url
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter
+
+    Callers reserve a token and then sleep until it becomes available, so the
+    bucket can be shared by coroutines on different event loops and threads.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size (defaults to one second of tokens)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take tokens and return how long to wait before using them"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= tokens
+            return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """Wait for tokens; returns the time spent waiting"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class ProviderMetrics:
+    """Request counters and latency samples for one provider"""
+
+    def __init__(self, samples: int = 1000):
+        self.requests = 0
+        self.failures = 0
+        self.retries = 0
+        self.throttled = 0.0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.statuses: Dict[int, int] = {}
+        self.latencies = deque(maxlen=samples)
+
+    def record(self, elapsed: float, status: Optional[int]):
+        self.requests += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        self.latencies.append(elapsed)
+        if status is not None:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "retries": self.retries,
+            "throttled_seconds": self.throttled,
+            "avg_ms": self.total_time / self.requests * 1000 if self.requests else 0.0,
+            "p50_ms": percentile(0.50) * 1000,
+            "p95_ms": percentile(0.95) * 1000,
+            "p99_ms": percentile(0.99) * 1000,
+            "max_ms": self.max_time * 1000,
+            "statuses": dict(self.statuses)
+        }
+
+
+class AsyncHTTPClient:
+    """Pooled async HTTP client shared by the REST connectors"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the client
+
+        Args:
+            config: Dictionary with optional max_connections, max_connections_per_host,
+                keepalive_timeout, timeout, max_retries, backoff_base, backoff_max
+                and a "providers" mapping passed to configure_provider
+        """
+        config = config or {}
+        self.max_connections = config.get("max_connections", 100)
+        self.max_connections_per_host = config.get("max_connections_per_host", 20)
+        self.keepalive_timeout = config.get("keepalive_timeout", 30)
+        self.timeout = config.get("timeout", 10.0)
+        self.max_retries = config.get("max_retries", 3)
+        self.backoff_base = config.get("backoff_base", 0.25)
+        self.backoff_max = config.get("backoff_max", 8.0)
+
+        # aiohttp sessions are bound to the loop that created them
+        self.sessions = weakref.WeakKeyDictionary()
+        self.providers: Dict[str, Dict[str, Any]] = {}
+        self.metrics: Dict[str, ProviderMetrics] = {}
+        self.lock = threading.RLock()
+
+        for name, provider_config in config.get("providers", {}).items():
+            self.configure_provider(name, **provider_config)
+
+    def configure_provider(self, name: str, rate: Optional[float] = None, burst: Optional[float] = None,
+                           max_retries: Optional[int] = None, timeout: Optional[float] = None):
+        """
+        Set the rate limit and retry policy for a provider
+
+        Args:
+            name: Provider name used in request()
+            rate: Requests per second (None = unlimited)
+            burst: Bucket capacity (defaults to one second of requests)
+            max_retries: Retries after the first attempt (None = client default)
+            timeout: Total request timeout in seconds (None = client default)
+        """
+        with self.lock:
+            self.providers[name] = {
+                "bucket": TokenBucket(rate, burst) if rate else None,
+                "max_retries": self.max_retries if max_retries is None else max_retries,
+                "timeout": self.timeout if timeout is None else timeout
+            }
+            self.metrics.setdefault(name, ProviderMetrics())
+
+    def _get_provider(self, name: str) -> Dict[str, Any]:
+        provider = self.providers.get(name)
+        if provider is None:
+            self.configure_provider(name)
+            provider = self.providers[name]
+        return provider
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get the pooled session for the running event loop"""
+        loop = asyncio.get_running_loop()
+        session = self.sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300
+            )
+            session = aiohttp.ClientSession(connector=connector)
+            self.sessions[loop] = session
+        return session
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Exponential backoff with full jitter, never shorter than Retry-After"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass
+        return delay
+
+    async def request(self, method: str, url: str, provider: str = "default",
+                      params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None,
+                      json_body: Any = None, data: Any = None, timeout: Optional[float] = None,
+                      response_type: str = "json", max_retries: Optional[int] = None,
+                      prepare_params: Optional[Callable[[], Dict[str, Any]]] = None) -> Any:
+        """
+        Make an HTTP request
+
+        Args:
+            method: HTTP method
+            url: Full URL
+            provider: Provider name for rate limiting, retry policy and metrics
+            params: Query parameters
+            headers: Request headers
+            json_body: JSON request body
+            data: Raw request body
+            timeout: Total timeout in seconds (None = provider default)
+            response_type: "json", "text" or "bytes"
+            max_retries: Retries after the first attempt (None = provider policy);
+                pass 0 for requests that are not safe to repeat
+            prepare_params: Called before every attempt to build the query parameters
+                instead of `params`, e.g. to sign with a fresh timestamp
+
+        Returns:
+            Parsed response body
+
+        Raises:
+            HTTPError: On a non-retryable status or when retries are exhausted
+            aiohttp.ClientError / asyncio.TimeoutError: When retries are exhausted
+        """
+        policy = self._get_provider(provider)
+        metrics = self.metrics[provider]
+        client_timeout = aiohttp.ClientTimeout(total=timeout or policy["timeout"])
+        if max_retries is None:
+            max_retries = policy["max_retries"]
+        session = self._get_session()
+
+        attempt = 0
+        while True:
+            if policy["bucket"] is not None:
+                metrics.throttled += await policy["bucket"].acquire()
+
+            if prepare_params is not None:
+                params = prepare_params()
+
+            start = time.perf_counter()
+            status = None
+            try:
+                async with session.request(method, url, params=params, headers=headers, json=json_body,
+                                           data=data, timeout=client_timeout) as response:
+                    status = response.status
+                    if status < 400:
+                        if response_type == "json":
+                            body = _loads(await response.read())
+                        elif response_type == "text":
+                            body = await response.text()
+                        else:
+                            body = await response.read()
+                        metrics.record(time.perf_counter() - start, status)
+                        return body
+
+                    message = (await response.text())[:200]
+                    retry_after = response.headers.get("Retry-After")
+                metrics.record(time.perf_counter() - start, status)
+
+                if status not in RETRY_STATUSES or attempt >= max_retries:
+                    metrics.failures += 1
+                    raise HTTPError(status, message, url)
+                delay = self._backoff(attempt, retry_after)
+                logger.warning(f"{provider} HTTP {status} for {url}, retrying in {delay:.2f}s")
+
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                metrics.record(time.perf_counter() - start, None)
+                if attempt >= max_retries:
+                    metrics.failures += 1
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"{provider} request to {url} failed ({type(e).__name__}), retrying in {delay:.2f}s")
+
+            attempt += 1
+            metrics.retries += 1
+            await asyncio.sleep(delay)
+
+    async def get_json(self, url: str, provider: str = "default", params: Optional[Dict[str, Any]] = None,
+                       headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None) -> Any:
+        """GET a JSON resource"""
+        return await self.request("GET", url, provider, params=params, headers=headers, timeout=timeout)
+
+    async def post_json(self, url: str, body: Any = None, provider: str = "default",
+                        params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None,
+                        timeout: Optional[float] = None) -> Any:
+        """POST a JSON body and parse the JSON response"""
+        return await self.request("POST", url, provider, params=params, headers=headers,
+                                  json_body=body, timeout=timeout)
+
+    def get_metrics(self, provider: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get request metrics
+
+        Args:
+            provider: Provider to report (None = all providers)
+
+        Returns:
+            Metrics dictionary, keyed by provider when provider is None
+        """
+        with self.lock:
+            if provider is not None:
+                metrics = self.metrics.get(provider)
+                return metrics.to_dict() if metrics else {}
+            return {name: metrics.to_dict() for name, metrics in self.metrics.items()}
+
+    async def close(self):
+        """Close the session of the running event loop"""
+        session = self.sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None and not session.closed:
+            await session.close()
+
+
+_shared_client: Optional[AsyncHTTPClient] = None
+_shared_client_lock = threading.Lock()
+
+
+def get_http_client() -> AsyncHTTPClient:
+    """Get the process-wide HTTP client, creating it with default settings on first use"""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = AsyncHTTPClient()
+    return _shared_client
+
+
+def configure_http_client(config: Dict[str, Any]) -> AsyncHTTPClient:
+    """
+    Update the settings of the process-wide HTTP client
+
+    Pool sizes apply to sessions created afterwards; provider policies apply
+    immediately.
+
+    Args:
+        config: AsyncHTTPClient configuration
+
+    Returns:
+        The shared client
+    """
+    client = get_http_client()
+    with client.lock:
+        client.max_connections = config.get("max_connections", client.max_connections)
+        client.max_connections_per_host = config.get("max_connections_per_host", client.max_connections_per_host)
+        client.keepalive_timeout = config.get("keepalive_timeout", client.keepalive_timeout)
+        client.timeout = config.get("timeout", client.timeout)
+        client.max_retries = config.get("max_retries", client.max_retries)
+        client.backoff_base = config.get("backoff_base", client.backoff_base)
+        client.backoff_max = config.get("backoff_max", client.backoff_max)
+        for name, provider_config in config.get("providers", {}).items():
+            client.configure_provider(name, **provider_config)
+    return client
@@ -343,6 +343,7 @@ class AlphaVantageConnector:
     def __init__(self, api_key: str):
         self.api_key = api_key
         self.base_url = "https://www.alphavantage.co/query"
+        self.session = requests.Session()  # 复用连接(keep-alive)
     
     def get_price(self, symbol: str) -> Dict[str, Any]:
         """获取实时价格"""
@@ -352,7 +353,7 @@ class AlphaVantageConnector:
             "apikey": self.api_key
         }
         
-        response = requests.get(self.base_url, params=params)
+        response = self.session.get(self.base_url, params=params)
         data = response.json()
         
         if "Global Quote" in data:
@@ -382,7 +383,7 @@ class AlphaVantageConnector:
             "outputsize": "compact"
         }
         
-        response = requests.get(self.base_url, params=params)
+        response = self.session.get(self.base_url, params=params)
         data = response.json()
         
         key = f"Time Series ({interval})"
@@ -410,6 +411,7 @@ class BinanceConnector:
         self.api_key = api_key
         self.api_secret = api_secret
         self.base_url = "https://api.binance.com/api/v3"
+        self.session = requests.Session()  # 复用连接(keep-alive)
     
     def get_orderbook(self, symbol: str, depth: int = 10) -> Dict[str, Any]:
         """获取订单簿"""
@@ -419,7 +421,7 @@ class BinanceConnector:
             "limit": depth
         }
         
-        response = requests.get(url, params=params)
+        response = self.session.get(url, params=params)
         data = response.json()
         
         return {
@@ -437,7 +439,7 @@ class BinanceConnector:
             "limit": limit
         }
         
-        response = requests.get(url, params=params)
+        response = self.session.get(url, params=params)
         data = response.json()
         
         return [
@@ -467,13 +469,14 @@ class PolygonConnector:
     def __init__(self, api_key: str):
         self.api_key = api_key
         self.base_url = "https://api.polygon.io"
+        self.session = requests.Session()  # 复用连接(keep-alive)
     
     def get_last_quote(self, symbol: str) -> Dict[str, Any]:
         """获取最新报价"""
         url = f"{self.base_url}/v2/last/nbbo/{symbol}"
         headers = {"Authorization": f"Bearer {self.api_key}"}
         
-        response = requests.get(url, headers=headers)
+        response = self.session.get(url, headers=headers)
         data = response.json()
         
         if data.get("status") == "success":
@@ -501,7 +504,7 @@ class PolygonConnector:
         url = f"{self.base_url}/v2/ticks/stocks/trades/{symbol}/{date}"
         headers = {"Authorization": f"Bearer {self.api_key}"}
         
-        response = requests.get(url, headers=headers)
+        response = self.session.get(url, headers=headers)
         data = response.json()
         
         if data.get("status") == "success":
@@ -0,0 +1,272 @@
+"""
+Local Order Book
+
+Maintains a full L2 order book per symbol from an exchange snapshot plus a stream of
+depth diffs, following Binance's sequencing rules:
+
+1. Buffer diff events until a REST snapshot (``lastUpdateId``) is available
+2. Drop buffered events with ``u`` <= ``lastUpdateId``
+3. The first applied event must satisfy ``U`` <= ``lastUpdateId`` + 1 <= ``u``
+4. Every later event must have ``U`` == previous ``u`` + 1, otherwise the book
+   is out of sync and must be rebuilt from a fresh snapshot
+
+Price keys are kept in a sorted container with quantities in a dict, so top-of-book
+and cumulative-depth queries only touch the levels they need. With sortedcontainers
+installed, adding or removing a level costs O(log n); without it the keys fall back
+to a plain list kept sorted by bisection, where each new or removed level is O(n).
+"""
+
+import bisect
+import logging
+from typing import Dict, List, Any, Optional, Tuple
+
+try:
+    from sortedcontainers import SortedList
+except ImportError:
+    SortedList = None
+
+logger = logging.getLogger(__name__)
+
+
+class _BisectKeys(list):
+    """Sorted list of keys with the parts of the SortedList API used by BookSide"""
+
+    def add(self, key: float):
+        bisect.insort(self, key)
+
+    def remove(self, key: float):
+        del self[bisect.bisect_left(self, key)]
+
+    def bisect_right(self, key: float) -> int:
+        return bisect.bisect_right(self, key)
+
+
+def _sorted_keys():
+    return SortedList() if SortedList is not None else _BisectKeys()
+
+
+class BookSide:
+    """One side of an order book: sorted price levels and their quantities"""
+
+    def __init__(self, descending: bool):
+        """
+        Initialize book side
+
+        Args:
+            descending: True for bids (best price is highest)
+        """
+        self.descending = descending
+        # Sort keys ascending in "best first" order: bids store negated prices
+        self.keys = _sorted_keys()
+        self.levels: Dict[float, float] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def clear(self):
+        self.keys = _sorted_keys()
+        self.levels = {}
+
+    def set(self, price: float, quantity: float):
+        """Set a level's quantity; zero removes the level"""
+        key = -price if self.descending else price
+        if quantity <= 0:
+            if price in self.levels:
+                del self.levels[price]
+                self.keys.remove(key)
+            return
+
+        if price not in self.levels:
+            self.keys.add(key)
+        self.levels[price] = quantity
+
+    def best(self) -> Optional[Tuple[float, float]]:
+        """Get the best (price, quantity), or None if empty"""
+        if not self.keys:
+            return None
+        price = -self.keys[0] if self.descending else self.keys[0]
+        return price, self.levels[price]
+
+    def top(self, n: int) -> List[List[float]]:
+        """Get the best n levels as [price, quantity] pairs"""
+        sign = -1 if self.descending else 1
+        return [[sign * key, self.levels[sign * key]] for key in self.keys[:n]]
+
+    def depth(self, n: Optional[int] = None, price_limit: Optional[float] = None) -> float:
+        """
+        Cumulative quantity over the best levels
+
+        Args:
+            n: Number of levels to include
+            price_limit: Include only levels at or better than this price
+        """
+        end = len(self.keys) if n is None else min(n, len(self.keys))
+        if price_limit is not None:
+            key = -price_limit if self.descending else price_limit
+            end = min(end, self.keys.bisect_right(key))
+        sign = -1 if self.descending else 1
+        return sum(self.levels[sign * key] for key in self.keys[:end])
+
+
+class LocalOrderBook:
+    """L2 order book rebuilt from a snapshot and kept current with depth diffs"""
+
+    def __init__(self, symbol: str, max_buffered: int = 10000):
+        """
+        Initialize order book
+
+        Args:
+            symbol: Trading symbol
+            max_buffered: Diff events kept while waiting for a snapshot
+        """
+        self.symbol = symbol
+        self.bids = BookSide(descending=True)
+        self.asks = BookSide(descending=False)
+        self.last_update_id = 0
+        self.last_event_time = 0
+        self.synced = False
+        self.max_buffered = max_buffered
+        self.buffered: List[Dict[str, Any]] = []
+
+        # Statistics
+        self.events_applied = 0
+        self.levels_updated = 0
+        self.resyncs = 0
+
+    def _apply_levels(self, side: BookSide, levels: List[List[Any]]):
+        for price, quantity in levels:
+            side.set(float(price), float(quantity))
+        self.levels_updated += len(levels)
+
+    def apply_snapshot(self, snapshot: Dict[str, Any]):
+        """
+        Rebuild the book from a REST depth snapshot and replay buffered diffs
+
+        Args:
+            snapshot: Snapshot with "lastUpdateId", "bids" and "asks"
+        """
+        self.bids.clear()
+        self.asks.clear()
+        self._apply_levels(self.bids, snapshot.get("bids", []))
+        self._apply_levels(self.asks, snapshot.get("asks", []))
+        self.last_update_id = int(snapshot["lastUpdateId"])
+        self.synced = True
+
+        buffered, self.buffered = self.buffered, []
+        for i, event in enumerate(buffered):
+            if not self.apply_diff(event):
+                # The failing event is buffered again; keep the rest for the next snapshot
+                for later in buffered[i + 1:]:
+                    self._buffer(later)
+                break
+
+    def apply_diff(self, event: Dict[str, Any]) -> bool:
+        """
+        Apply a depth diff event
+
+        Args:
+            event: Binance depthUpdate event with "U", "u", "b" and "a"
+
+        Returns:
+            False if the book is waiting for (or now needs) a snapshot
+        """
+        if not self.synced:
+            self._buffer(event)
+            return False
+
+        first_id = int(event["U"])
+        final_id = int(event["u"])
+
+        # Already contained in the snapshot or a previous event
+        if final_id <= self.last_update_id:
+            return True
+
+        if first_id > self.last_update_id + 1:
+            logger.warning(
+                f"{self.symbol} order book gap: expected update {self.last_update_id + 1}, "
+                f"got {first_id}; resyncing"
+            )
+            self.invalidate()
+            self._buffer(event)
+            return False
+
+        self._apply_levels(self.bids, event.get("b", []))
+        self._apply_levels(self.asks, event.get("a", []))
+        self.last_update_id = final_id
+        self.last_event_time = event.get("E", self.last_event_time)
+        self.events_applied += 1
+        return True
+
+    def _buffer(self, event: Dict[str, Any]):
+        self.buffered.append(event)
+        if len(self.buffered) > self.max_buffered:
+            del self.buffered[:len(self.buffered) - self.max_buffered]
+
+    def invalidate(self):
+        """Mark the book out of sync; diffs are buffered until the next snapshot"""
+        if self.synced:
+            self.resyncs += 1
+        self.synced = False
+        self.bids.clear()
+        self.asks.clear()
+
+    def best_bid(self) -> Optional[Tuple[float, float]]:
+        return self.bids.best()
+
+    def best_ask(self) -> Optional[Tuple[float, float]]:
+        return self.asks.best()
+
+    def mid_price(self) -> Optional[float]:
+        bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return (bid[0] + ask[0]) / 2
+
+    def spread(self) -> Optional[float]:
+        bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return ask[0] - bid[0]
+
+    def top(self, n: int = 20) -> Dict[str, List[List[float]]]:
+        """Get the best n levels per side"""
+        return {"bids": self.bids.top(n), "asks": self.asks.top(n)}
+
+    def cumulative_depth(self, pct: Optional[float] = None, levels: Optional[int] = None) -> Dict[str, float]:
+        """
+        Cumulative bid/ask quantity near the top of the book
+
+        Args:
+            pct: Include levels within this fraction of the mid price (e.g. 0.01 = 1%)
+            levels: Include at most this many levels per side
+
+        Returns:
+            Dictionary with bid_depth, ask_depth and imbalance (-1..1)
+        """
+        bid_limit = ask_limit = None
+        if pct is not None:
+            mid = self.mid_price()
+            if mid is not None:
+                bid_limit = mid * (1 - pct)
+                ask_limit = mid * (1 + pct)
+
+        bid_depth = self.bids.depth(levels, bid_limit)
+        ask_depth = self.asks.depth(levels, ask_limit)
+        total = bid_depth + ask_depth
+
+        return {
+            "bid_depth": bid_depth,
+            "ask_depth": ask_depth,
+            "imbalance": (bid_depth - ask_depth) / total if total > 0 else 0.0
+        }
+
+    def to_dict(self, depth: int = 20) -> Dict[str, Any]:
+        """Get the top of the book in the standard order book dictionary format"""
+        book = self.top(depth)
+        book.update({
+            "symbol": self.symbol,
+            "timestamp": self.last_event_time,
+            "last_update_id": self.last_update_id,
+            "synced": self.synced
+        })
+        return book
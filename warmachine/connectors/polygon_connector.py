@@ -8,15 +8,18 @@ Can be used as a complement to or fallback for IBKR data.
 import os
 import logging
 import time
+import asyncio
 import threading
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Union, Callable
+from typing import Dict, List, Any, Optional, Union, Callable, Tuple
 import json
 import websocket
 import requests
 import pandas as pd
 import numpy as np
 
+from connectors.http_client import get_http_client, HTTPError
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -24,6 +27,59 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Use orjson for WebSocket frames when installed (several times faster than json)
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+def _format_trade(symbol: str, msg: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "symbol": symbol,
+        "timestamp": msg["t"] * 1_000_000 if "t" in msg else time.time_ns(),
+        "price": msg.get('p', 0),
+        "size": msg.get('s', 0),
+        "exchange": msg.get('x', ''),
+        "trade_id": msg.get('i', '')
+    }
+
+def _format_quote(symbol: str, msg: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "symbol": symbol,
+        "timestamp": msg["t"] * 1_000_000 if "t" in msg else time.time_ns(),
+        "bid_price": msg.get('bp', 0),
+        "bid_size": msg.get('bs', 0),
+        "ask_price": msg.get('ap', 0),
+        "ask_size": msg.get('as', 0),
+        "exchange": msg.get('x', '')
+    }
+
+def _format_bar(symbol: str, msg: Dict[str, Any]) -> Dict[str, Any]:
+    # Aggregates carry the window start in 's' and end in 'e'; trades/quotes use 't'
+    start = msg.get('t', msg.get('s'))
+    return {
+        "symbol": symbol,
+        "timestamp": start * 1_000_000 if start is not None else time.time_ns(),
+        "open": msg.get('o', 0),
+        "high": msg.get('h', 0),
+        "low": msg.get('l', 0),
+        "close": msg.get('c', 0),
+        "volume": msg.get('v', 0),
+        "vwap": msg.get('vw', 0)
+    }
+
+# Subscription data type -> (stock event, crypto event, formatter)
+DATA_TYPE_EVENTS = {
+    "stock_trades": ("T", None, _format_trade),
+    "stock_quotes": ("Q", None, _format_quote),
+    "stock_bars": ("AM", None, _format_bar),
+    "order_book": ("Q", "XQ", _format_quote),
+    "crypto_trades": (None, "XT", _format_trade),
+    "crypto_quotes": (None, "XQ", _format_quote),
+    "crypto_bars": (None, "XA", _format_bar)
+}
+
 class PolygonConnector:
     """Connector for Polygon.io market data"""
     
@@ -36,7 +92,7 @@ class PolygonConnector:
         """
         self.config = config
         self.api_key = config.get("api_key", "")
-        self.base_url = "https://api.polygon.io"
+        self.base_url = config.get("base_url", "https://api.polygon.io")
         self.ws_url = "wss://socket.polygon.io/stocks"
         self.ws_crypto_url = "wss://socket.polygon.io/crypto"
         
@@ -53,12 +109,25 @@ class PolygonConnector:
         self.reconnect_interval = config.get("reconnect_interval", 30)
         self.subscriptions = {}
         self.callbacks = {}
+        # (event, wire symbol) -> (symbol, formatter, callbacks); replaced, never mutated,
+        # so the WebSocket threads can read it without taking the lock
+        self.dispatch_table: Dict[Tuple[str, str], Tuple[str, Callable, Tuple[Callable, ...]]] = {}
         
         # Cache to avoid redundant API calls
         self.market_data_cache = {}
         self.option_chains_cache = {}
         self.websocket_lock = threading.RLock()
         
+        # Keep-alive session for the blocking REST calls, shared async client for the async ones
+        self.session = requests.Session()
+        self.http = get_http_client()
+        self.http.configure_provider(
+            "polygon",
+            rate=config.get("requests_per_second", 100),
+            max_retries=config.get("max_retries"),
+            timeout=config.get("timeout")
+        )
+        
         # Start WebSocket thread if enabled
         self.running = True
         self.enable_websocket = config.get("enable_websocket", False)
@@ -97,8 +166,7 @@ class PolygonConnector:
             # Define callbacks
             def on_message(ws, message):
                 try:
-                    data = json.loads(message)
-                    self._handle_websocket_message(data)
+                    self._handle_websocket_message(_loads(message))
                 except Exception as e:
                     logger.error(f"Error handling WebSocket message: {str(e)}")
             
@@ -152,8 +220,7 @@ class PolygonConnector:
             # Define callbacks
             def on_message(ws, message):
                 try:
-                    data = json.loads(message)
-                    self._handle_websocket_message(data, is_crypto=True)
+                    self._handle_websocket_message(_loads(message), is_crypto=True)
                 except Exception as e:
                     logger.error(f"Error handling Crypto WebSocket message: {str(e)}")
             
@@ -282,95 +349,59 @@ class PolygonConnector:
                 logger.error(f"Error sending crypto subscription: {str(e)}")
     
     def _handle_websocket_message(self, data, is_crypto=False):
-        """Process incoming WebSocket messages"""
-        # Check if it's a status message
-        if isinstance(data, dict) and 'status' in data:
-            if data['status'] == 'connected':
-                logger.info(f"WebSocket {'crypto ' if is_crypto else ''}connected")
-            elif data['status'] == 'auth_success':
-                logger.info(f"WebSocket {'crypto ' if is_crypto else ''}authenticated")
-            return
+        """
+        Process a decoded WebSocket frame
+        
+        Each event is routed through the (event, symbol) dispatch table, so events
+        nobody subscribed to are dropped before any formatting work is done.
+        Timestamps are passed on as epoch nanoseconds.
         
-        # Handle data messages
-        if not isinstance(data, list):
+        Args:
+            data: Decoded frame (list of events, or a single status dict)
+            is_crypto: Whether the frame came from the crypto socket
+        """
+        if isinstance(data, dict):
+            data = [data]
+        elif not isinstance(data, list):
             return
         
+        dispatch_table = self.dispatch_table
         for msg in data:
             try:
-                # Extract message type and symbol
-                if 'ev' not in msg or 'sym' not in msg:
-                    continue
-                
-                event_type = msg['ev']
-                symbol = msg['sym']
-                
-                # Add X: prefix for crypto symbols
-                if is_crypto and not symbol.startswith("X:"):
-                    symbol = f"X:{symbol}"
-                
-                # Map event type to our data types
-                data_type = None
-                if event_type == 'T':  # Trade
-                    data_type = "trades"
-                elif event_type == 'Q':  # Quote
-                    data_type = "quotes"
-                elif event_type == 'AM':  # Aggregate/Bar
-                    data_type = "bars"
-                elif event_type == 'XT':  # Crypto Trade
-                    data_type = "trades"
-                elif event_type == 'XQ':  # Crypto Quote
-                    data_type = "quotes"
-                elif event_type == 'XA':  # Crypto Aggregate/Bar
-                    data_type = "bars"
-                
-                if not data_type:
+                route = dispatch_table.get((msg.get('ev'), msg.get('sym') or msg.get('pair')))
+                if route is None:
+                    if msg.get('ev') == 'status' or 'status' in msg:
+                        logger.info(f"WebSocket {'crypto ' if is_crypto else ''}status: "
+                                    f"{msg.get('status')} {msg.get('message', '')}")
                     continue
                 
-                # Format the data based on type
-                formatted_data = None
-                timestamp = datetime.fromtimestamp(msg.get('t', 0) / 1000.0).isoformat() if 't' in msg else datetime.now().isoformat()
-                
-                if data_type == "trades":
-                    formatted_data = {
-                        "symbol": symbol,
-                        "timestamp": timestamp,
-                        "price": msg.get('p', 0),
-                        "size": msg.get('s', 0),
-                        "exchange": msg.get('x', ''),
-                        "trade_id": msg.get('i', '')
-                    }
-                elif data_type == "quotes":
-                    formatted_data = {
-                        "symbol": symbol,
-                        "timestamp": timestamp,
-                        "bid_price": msg.get('bp', 0),
-                        "bid_size": msg.get('bs', 0),
-                        "ask_price": msg.get('ap', 0),
-                        "ask_size": msg.get('as', 0),
-                        "exchange": msg.get('x', '')
-                    }
-                elif data_type == "bars":
-                    formatted_data = {
-                        "symbol": symbol,
-                        "timestamp": timestamp,
-                        "open": msg.get('o', 0),
-                        "high": msg.get('h', 0),
-                        "low": msg.get('l', 0),
-                        "close": msg.get('c', 0),
-                        "volume": msg.get('v', 0),
-                        "vwap": msg.get('vw', 0)
-                    }
-                
-                # Notify callbacks
-                if formatted_data:
-                    callback_key = f"{data_type}:{symbol}"
-                    if callback_key in self.callbacks:
-                        for callback in self.callbacks[callback_key]:
-                            callback(formatted_data)
+                symbol, formatter, callbacks = route
+                formatted_data = formatter(symbol, msg)
+                for callback in callbacks:
+                    callback(formatted_data)
             
             except Exception as e:
                 logger.error(f"Error processing WebSocket message: {str(e)}")
     
+    def _add_route(self, symbol: str, data_type: str, callback: Callable):
+        """Add a callback to the dispatch table (caller holds websocket_lock)"""
+        stock_event, crypto_event, formatter = DATA_TYPE_EVENTS[data_type]
+        if symbol.startswith("X:"):
+            event, wire_symbol = crypto_event, symbol[2:]
+        else:
+            event, wire_symbol = stock_event, symbol
+        if event is None:
+            return
+        
+        key = (event, wire_symbol)
+        table = dict(self.dispatch_table)
+        if key in table:
+            _, formatter, callbacks = table[key]
+            table[key] = (symbol, formatter, callbacks + (callback,))
+        else:
+            table[key] = (symbol, formatter, (callback,))
+        self.dispatch_table = table
+    
     def _make_rest_request(self, endpoint: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Make a REST API request to Polygon
@@ -388,7 +419,7 @@ class PolygonConnector:
         }
         
         try:
-            response = requests.get(url, headers=headers, params=params)
+            response = self.session.get(url, headers=headers, params=params)
             
             if response.status_code == 200:
                 return response.json()
@@ -400,6 +431,31 @@ class PolygonConnector:
             logger.error(f"Error making REST request: {str(e)}")
             return {}
     
+    async def _make_rest_request_async(self, endpoint: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Make a REST API request to Polygon through the shared async HTTP client
+        
+        Args:
+            endpoint: API endpoint path
+            params: Query parameters
+            
+        Returns:
+            Response data dictionary
+        """
+        url = f"{self.base_url}{endpoint}"
+        headers = {
+            "Authorization": f"Bearer {self.api_key}"
+        }
+        
+        try:
+            return await self.http.get_json(url, provider="polygon", params=params, headers=headers)
+        except HTTPError as e:
+            logger.error(f"Polygon API error: {e.status} - {e.message}")
+            return {}
+        except Exception as e:
+            logger.error(f"Error making REST request: {str(e)}")
+            return {}
+    
     def get_bars(self, symbol: str, timeframe: str, limit: int = 100) -> pd.DataFrame:
         """
         Get historical price bars
@@ -412,6 +468,40 @@ class PolygonConnector:
         Returns:
             DataFrame with price data
         """
+        request = self._bars_request(symbol, timeframe, limit)
+        if request is None:
+            return pd.DataFrame()
+        
+        # Make API request
+        response = self._make_rest_request(*request)
+        return self._parse_bars(response, symbol, timeframe, limit)
+    
+    async def get_bars_async(self, symbol: str, timeframe: str, limit: int = 100) -> pd.DataFrame:
+        """
+        Get historical price bars without blocking the event loop
+        
+        Args:
+            symbol: Instrument symbol
+            timeframe: Bar duration (1m, 5m, 15m, 1h, 1d)
+            limit: Maximum number of bars to return
+            
+        Returns:
+            DataFrame with price data
+        """
+        request = self._bars_request(symbol, timeframe, limit)
+        if request is None:
+            return pd.DataFrame()
+        
+        response = await self._make_rest_request_async(*request)
+        return self._parse_bars(response, symbol, timeframe, limit)
+    
+    def _bars_request(self, symbol: str, timeframe: str, limit: int) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Build the aggregates endpoint and parameters for a bars request
+        
+        Returns:
+            (endpoint, params), or None for an unsupported timeframe
+        """
         # Map timeframe to Polygon timespan
         tf_map = {
             "1m": "minute",
@@ -438,7 +528,7 @@ class PolygonConnector:
         
         if timeframe not in tf_map:
             logger.error(f"Unsupported timeframe: {timeframe}")
-            return pd.DataFrame()
+            return None
         
         # Determine if we're dealing with a crypto symbol
         is_crypto = symbol.startswith("X:") or "-USD" in symbol or "-USDT" in symbol
@@ -467,10 +557,10 @@ class PolygonConnector:
             "limit": adjusted_limit,
             "sort": "desc"
         }
-        
-        # Make API request
-        response = self._make_rest_request(endpoint, params)
-        
+        return endpoint, params
+    
+    def _parse_bars(self, response: Dict[str, Any], symbol: str, timeframe: str, limit: int) -> pd.DataFrame:
+        """Convert an aggregates response to a bar DataFrame"""
         if not response or "results" not in response or not response["results"]:
             logger.warning(f"No bar data returned for {symbol}")
             return pd.DataFrame()
@@ -582,87 +672,92 @@ class PolygonConnector:
             underlying_price = latest_quote["results"]["p"]
             
             # Get option expiry dates
-            contract_path = f"/v3/reference/options/contracts"
-            params = {
+            contracts_response = self._make_rest_request("/v3/reference/options/contracts", {
                 "underlying_ticker": symbol,
                 "limit": 1000
+            })
+            
+            if not contracts_response or "results" not in contracts_response or not contracts_response["results"]:
+                logger.warning(f"No option contracts found for {symbol}")
+                return {}
+            
+            expirations = self._select_option_strikes(contracts_response["results"], underlying_price)
+            result = self._assemble_option_chain(symbol, underlying_price, expirations,
+                                                 self._get_option_data_from_contract)
+            
+            # Update cache
+            self.option_chains_cache[cache_key] = {
+                "timestamp": datetime.now(),
+                "data": result
             }
             
-            contracts_response = self._make_rest_request(contract_path, params)
+            return result
+            
+        except Exception as e:
+            logger.error(f"Error getting option chain for {symbol}: {str(e)}")
+            return {}
+    
+    async def get_option_chain_async(self, symbol: str) -> Dict[str, Any]:
+        """
+        Get full option chain for a symbol without blocking the event loop
+        
+        The underlying price and contract list are requested together, then the
+        last trade of every selected contract is fetched concurrently instead of
+        one request at a time.
+        
+        Args:
+            symbol: Underlying symbol
+            
+        Returns:
+            Dictionary with option chain data
+        """
+        cache_key = f"option_chain_{symbol}"
+        
+        # Check cache first (valid for 5 minutes)
+        if cache_key in self.option_chains_cache:
+            cache_entry = self.option_chains_cache[cache_key]
+            age = datetime.now() - cache_entry["timestamp"]
+            if age.total_seconds() < 300:  # 5 minutes
+                return cache_entry["data"]
+        
+        try:
+            latest_quote, contracts_response = await asyncio.gather(
+                self._make_rest_request_async(f"/v2/last/trade/{symbol}"),
+                self._make_rest_request_async("/v3/reference/options/contracts", {
+                    "underlying_ticker": symbol,
+                    "limit": 1000
+                })
+            )
+            
+            if not latest_quote or "results" not in latest_quote:
+                logger.warning(f"Could not get latest price for {symbol}")
+                return {}
+            
+            underlying_price = latest_quote["results"]["p"]
             
             if not contracts_response or "results" not in contracts_response or not contracts_response["results"]:
                 logger.warning(f"No option contracts found for {symbol}")
                 return {}
             
-            # Get unique expiry dates
-            contracts = contracts_response["results"]
-            expirations = sorted(list(set(contract["expiration_date"] for contract in contracts)))
-            
-            # Limit to first 10 expirations
-            expirations = expirations[:10]
+            expirations = self._select_option_strikes(contracts_response["results"], underlying_price)
             
-            # Build result structure
-            result = {
-                "symbol": symbol,
-                "underlying_price": underlying_price,
-                "timestamp": datetime.now().isoformat(),
-                "expirations": []
+            # Quote every selected contract concurrently
+            contracts = {
+                contract.get("ticker", ""): contract
+                for _, strike_list in expirations
+                for _, pair in strike_list
+                for contract in pair.values() if contract
+            }
+            quotes = await asyncio.gather(*(
+                self._make_rest_request_async(f"/v2/last/trade/{ticker}") for ticker in contracts
+            ))
+            option_data = {
+                ticker: self._format_option_data(contract, quote)
+                for (ticker, contract), quote in zip(contracts.items(), quotes)
             }
             
-            # Process options for each expiration
-            for exp_date in expirations:
-                exp_contracts = [c for c in contracts if c["expiration_date"] == exp_date]
-                
-                # Group by strike price
-                strikes = {}
-                for contract in exp_contracts:
-                    strike = contract["strike_price"]
-                    if strike not in strikes:
-                        strikes[strike] = {"call": None, "put": None}
-                    
-                    contract_type = contract["contract_type"].lower()
-                    if contract_type == "call":
-                        strikes[strike]["call"] = contract
-                    elif contract_type == "put":
-                        strikes[strike]["put"] = contract
-                
-                # Filter to reasonable strike range (70% to 130% of current price)
-                filtered_strikes = {}
-                for strike, data in strikes.items():
-                    if 0.7 * underlying_price <= strike <= 1.3 * underlying_price:
-                        filtered_strikes[strike] = data
-                
-                # Convert to sorted list
-                strike_list = sorted(filtered_strikes.items(), key=lambda x: x[0])
-                
-                # Limit to 30 strikes around ATM
-                if len(strike_list) > 30:
-                    atm_idx = min(range(len(strike_list)), key=lambda i: abs(strike_list[i][0] - underlying_price))
-                    start_idx = max(0, atm_idx - 15)
-                    end_idx = min(len(strike_list), start_idx + 30)
-                    strike_list = strike_list[start_idx:end_idx]
-                
-                # Format expiration entry
-                exp_entry = {
-                    "date": exp_date,
-                    "options": []
-                }
-                
-                # Process each strike
-                for strike, contracts in strike_list:
-                    # Get option details
-                    call_contract = contracts["call"]
-                    put_contract = contracts["put"]
-                    
-                    option_data = {
-                        "strike": strike,
-                        "call": self._get_option_data_from_contract(call_contract) if call_contract else {},
-                        "put": self._get_option_data_from_contract(put_contract) if put_contract else {}
-                    }
-                    
-                    exp_entry["options"].append(option_data)
-                
-                result["expirations"].append(exp_entry)
+            result = self._assemble_option_chain(symbol, underlying_price, expirations,
+                                                 lambda contract: option_data.get(contract.get("ticker", ""), {}))
             
             # Update cache
             self.option_chains_cache[cache_key] = {
@@ -676,6 +771,97 @@ class PolygonConnector:
             logger.error(f"Error getting option chain for {symbol}: {str(e)}")
             return {}
     
+    def _select_option_strikes(self, contracts: List[Dict[str, Any]],
+                               underlying_price: float) -> List[Tuple[str, List[Tuple[float, Dict[str, Any]]]]]:
+        """
+        Pick the expirations and strikes to include in a chain
+        
+        Args:
+            contracts: Contract reference records
+            underlying_price: Current underlying price
+            
+        Returns:
+            [(expiration, [(strike, {"call": contract, "put": contract}), ...]), ...]
+        """
+        # Get unique expiry dates, limited to the first 10
+        expirations = sorted(list(set(contract["expiration_date"] for contract in contracts)))[:10]
+        
+        selected = []
+        for exp_date in expirations:
+            exp_contracts = [c for c in contracts if c["expiration_date"] == exp_date]
+            
+            # Group by strike price
+            strikes = {}
+            for contract in exp_contracts:
+                strike = contract["strike_price"]
+                if strike not in strikes:
+                    strikes[strike] = {"call": None, "put": None}
+                
+                contract_type = contract["contract_type"].lower()
+                if contract_type == "call":
+                    strikes[strike]["call"] = contract
+                elif contract_type == "put":
+                    strikes[strike]["put"] = contract
+            
+            # Filter to reasonable strike range (70% to 130% of current price)
+            filtered_strikes = {}
+            for strike, data in strikes.items():
+                if 0.7 * underlying_price <= strike <= 1.3 * underlying_price:
+                    filtered_strikes[strike] = data
+            
+            # Convert to sorted list
+            strike_list = sorted(filtered_strikes.items(), key=lambda x: x[0])
+            
+            # Limit to 30 strikes around ATM
+            if len(strike_list) > 30:
+                atm_idx = min(range(len(strike_list)), key=lambda i: abs(strike_list[i][0] - underlying_price))
+                start_idx = max(0, atm_idx - 15)
+                end_idx = min(len(strike_list), start_idx + 30)
+                strike_list = strike_list[start_idx:end_idx]
+            
+            selected.append((exp_date, strike_list))
+        
+        return selected
+    
+    def _assemble_option_chain(self, symbol: str, underlying_price: float,
+                               expirations: List[Tuple[str, List[Tuple[float, Dict[str, Any]]]]],
+                               option_data: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Build the option chain result structure
+        
+        Args:
+            symbol: Underlying symbol
+            underlying_price: Current underlying price
+            expirations: Output of _select_option_strikes
+            option_data: Returns the formatted option data for a contract
+            
+        Returns:
+            Dictionary with option chain data
+        """
+        result = {
+            "symbol": symbol,
+            "underlying_price": underlying_price,
+            "timestamp": datetime.now().isoformat(),
+            "expirations": []
+        }
+        
+        for exp_date, strike_list in expirations:
+            exp_entry = {
+                "date": exp_date,
+                "options": []
+            }
+            
+            for strike, pair in strike_list:
+                exp_entry["options"].append({
+                    "strike": strike,
+                    "call": option_data(pair["call"]) if pair["call"] else {},
+                    "put": option_data(pair["put"]) if pair["put"] else {}
+                })
+            
+            result["expirations"].append(exp_entry)
+        
+        return result
+    
     def _get_option_data_from_contract(self, contract: Dict[str, Any]) -> Dict[str, Any]:
         """
         Extract option data from a contract record
@@ -689,13 +875,22 @@ class PolygonConnector:
         if not contract:
             return {}
         
-        try:
-            # Get ticker symbol
-            ticker = contract.get("ticker", "")
-            
-            # Try to get latest quote
-            quote = self._make_rest_request(f"/v2/last/trade/{ticker}")
+        # Try to get latest quote
+        quote = self._make_rest_request(f"/v2/last/trade/{contract.get('ticker', '')}")
+        return self._format_option_data(contract, quote)
+    
+    def _format_option_data(self, contract: Dict[str, Any], quote: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Format option data from a contract record and its last trade
+        
+        Args:
+            contract: Contract data dictionary
+            quote: Last trade response for the contract
             
+        Returns:
+            Formatted option data
+        """
+        try:
             if quote and "results" in quote:
                 price = quote["results"].get("p", 0)
                 size = quote["results"].get("s", 0)
@@ -745,75 +940,114 @@ class PolygonConnector:
             Dictionary with order book data
         """
         try:
-            # For crypto symbols, format properly
-            is_crypto = symbol.startswith("X:") or "-USD" in symbol or "-USDT" in symbol
-            api_symbol = symbol
-            
-            if is_crypto:
-                if "-USD" in symbol:
-                    clean_symbol = symbol.replace("-USD", "")
-                    api_symbol = f"X:{clean_symbol}USD"
-                elif "-USDT" in symbol:
-                    clean_symbol = symbol.replace("-USDT", "")
-                    api_symbol = f"X:{clean_symbol}USDT"
-            
-            # Get latest quote
-            quote_path = f"/v2/last/nbbo/{api_symbol}"
-            quote = self._make_rest_request(quote_path)
-            
-            if not quote or "results" not in quote or not quote["results"]:
-                logger.warning(f"No quote data for {symbol}")
-                return {"bids": [], "asks": []}
-            
-            # Simulate order book from NBBO
-            # This is a limitation - Polygon doesn't provide full book depth via REST
-            results = quote["results"]
-            bid_price = results.get("p", 0)
-            bid_size = results.get("s", 0)
-            
-            # Get ask from a separate quote
-            ask_quote_path = f"/v2/last/trade/{api_symbol}"
-            ask_quote = self._make_rest_request(ask_quote_path)
-            
-            if ask_quote and "results" in ask_quote and ask_quote["results"]:
-                ask_results = ask_quote["results"]
-                ask_price = ask_results.get("p", 0) * 1.001  # Slightly higher than last trade
-                ask_size = ask_results.get("s", 0)
-            else:
-                ask_price = bid_price * 1.001  # Default fallback
-                ask_size = bid_size
-            
-            # Create simulated order book with price variation
-            bids = []
-            asks = []
-            
-            # Generate bids (descending prices)
-            for i in range(depth):
-                price_factor = 1 - (i * 0.001)
-                size_factor = 1 - (i * 0.1)
-                price = bid_price * price_factor
-                size = max(1, bid_size * size_factor)
-                bids.append((price, size))
-            
-            # Generate asks (ascending prices)
-            for i in range(depth):
-                price_factor = 1 + (i * 0.001)
-                size_factor = 1 - (i * 0.1)
-                price = ask_price * price_factor
-                size = max(1, ask_size * size_factor)
-                asks.append((price, size))
+            api_symbol = self._order_book_symbol(symbol)
+            quote = self._make_rest_request(f"/v2/last/nbbo/{api_symbol}")
+            ask_quote = self._make_rest_request(f"/v2/last/trade/{api_symbol}")
+            return self._build_order_book(symbol, quote, ask_quote, depth)
             
-            return {
-                "symbol": symbol,
-                "timestamp": datetime.now().isoformat(),
-                "bids": bids,
-                "asks": asks
-            }
+        except Exception as e:
+            logger.error(f"Error getting order book for {symbol}: {str(e)}")
+            return {"bids": [], "asks": []}
+    
+    async def get_order_book_async(self, symbol: str, depth: int = 10) -> Dict[str, Any]:
+        """
+        Get market order book without blocking the event loop
+        
+        Args:
+            symbol: Instrument symbol
+            depth: Book depth
+            
+        Returns:
+            Dictionary with order book data
+        """
+        try:
+            api_symbol = self._order_book_symbol(symbol)
+            quote, ask_quote = await asyncio.gather(
+                self._make_rest_request_async(f"/v2/last/nbbo/{api_symbol}"),
+                self._make_rest_request_async(f"/v2/last/trade/{api_symbol}")
+            )
+            return self._build_order_book(symbol, quote, ask_quote, depth)
             
         except Exception as e:
             logger.error(f"Error getting order book for {symbol}: {str(e)}")
             return {"bids": [], "asks": []}
     
+    def _order_book_symbol(self, symbol: str) -> str:
+        """Format a symbol for the quote endpoints"""
+        # For crypto symbols, format properly
+        is_crypto = symbol.startswith("X:") or "-USD" in symbol or "-USDT" in symbol
+        api_symbol = symbol
+        
+        if is_crypto:
+            if "-USD" in symbol:
+                clean_symbol = symbol.replace("-USD", "")
+                api_symbol = f"X:{clean_symbol}USD"
+            elif "-USDT" in symbol:
+                clean_symbol = symbol.replace("-USDT", "")
+                api_symbol = f"X:{clean_symbol}USDT"
+        
+        return api_symbol
+    
+    def _build_order_book(self, symbol: str, quote: Dict[str, Any], ask_quote: Dict[str, Any],
+                          depth: int) -> Dict[str, Any]:
+        """
+        Simulate an order book from the NBBO and last trade
+        
+        Args:
+            symbol: Instrument symbol
+            quote: NBBO response
+            ask_quote: Last trade response
+            depth: Book depth
+            
+        Returns:
+            Dictionary with order book data
+        """
+        if not quote or "results" not in quote or not quote["results"]:
+            logger.warning(f"No quote data for {symbol}")
+            return {"bids": [], "asks": []}
+        
+        # Simulate order book from NBBO
+        # This is a limitation - Polygon doesn't provide full book depth via REST
+        results = quote["results"]
+        bid_price = results.get("p", 0)
+        bid_size = results.get("s", 0)
+        
+        # Get ask from a separate quote
+        if ask_quote and "results" in ask_quote and ask_quote["results"]:
+            ask_results = ask_quote["results"]
+            ask_price = ask_results.get("p", 0) * 1.001  # Slightly higher than last trade
+            ask_size = ask_results.get("s", 0)
+        else:
+            ask_price = bid_price * 1.001  # Default fallback
+            ask_size = bid_size
+        
+        # Create simulated order book with price variation
+        bids = []
+        asks = []
+        
+        # Generate bids (descending prices)
+        for i in range(depth):
+            price_factor = 1 - (i * 0.001)
+            size_factor = 1 - (i * 0.1)
+            price = bid_price * price_factor
+            size = max(1, bid_size * size_factor)
+            bids.append((price, size))
+        
+        # Generate asks (ascending prices)
+        for i in range(depth):
+            price_factor = 1 + (i * 0.001)
+            size_factor = 1 - (i * 0.1)
+            price = ask_price * price_factor
+            size = max(1, ask_size * size_factor)
+            asks.append((price, size))
+        
+        return {
+            "symbol": symbol,
+            "timestamp": datetime.now().isoformat(),
+            "bids": bids,
+            "asks": asks
+        }
+    
     def subscribe(self, symbol: str, data_type: str, callback: Callable) -> bool:
         """
         Subscribe to real-time market data
@@ -859,6 +1093,7 @@ class PolygonConnector:
             if callback_key not in self.callbacks:
                 self.callbacks[callback_key] = []
             self.callbacks[callback_key].append(callback)
+            self._add_route(symbol, data_type, callback)
             
             # Update websocket subscriptions if connected
             if self.ws_connected and not symbol.startswith("X:"):
@@ -13,7 +13,8 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Union
 import aiohttp
 import asyncio
-from diskcache import Cache
+
+from core.cache import get_shared_cache
 
 # 配置日志
 logger = logging.getLogger(__name__)
@@ -27,15 +28,13 @@ class TradierOptionsAdapter:
         
         Args:
             api_key: Tradier API密钥
-            cache_dir: 缓存目录路径
+            cache_dir: 缓存目录路径（期权链改用共享内存缓存，保留此参数以兼容旧调用）
         """
         self.api_key = api_key
         self.base_url = "https://sandbox.tradier.com/v1"
         self.session = None
-        self.cache = Cache(cache_dir)
-        
-        # 确保缓存目录存在
-        os.makedirs(cache_dir, exist_ok=True)
+        # 期权链缓存1分钟，过期后1分钟内先返回旧数据并在后台刷新
+        self.cache = get_shared_cache().namespace("tradier_chains", ttl=60, stale_ttl=60)
         
         logger.info("Tradier期权数据适配器初始化完成")
     
@@ -114,31 +113,22 @@ class TradierOptionsAdapter:
         
         cache_key = self._get_cache_key(symbol, expiration, **filters)
         
-        # 检查缓存
-        if cached_data := self.cache.get(cache_key):
-            if time.time() - cached_data['timestamp'] < 60:  # 1分钟内的缓存有效
-                return cached_data['data']
-        
-        # 获取原始数据
-        raw_data = await self._request(
-            "markets/options/chains",
-            params={
-                "symbol": symbol,
-                "expiration": expiration,
-                "greeks": "true"
-            }
-        )
-        
-        # 处理数据
-        processed_data = self._process_chain_data(raw_data, filters)
-        
-        # 更新缓存
-        self.cache.set(cache_key, {
-            'timestamp': time.time(),
-            'data': processed_data
-        })
+        async def load_chain():
+            # 获取原始数据
+            raw_data = await self._request(
+                "markets/options/chains",
+                params={
+                    "symbol": symbol,
+                    "expiration": expiration,
+                    "greeks": "true"
+                }
+            )
+            
+            # 处理数据
+            return self._process_chain_data(raw_data, filters)
         
-        return processed_data
+        # 优先使用缓存
+        return await self.cache.get_or_load_async(cache_key, load_chain)
     
     def _process_chain_data(self, raw_data: Dict[str, Any], filters: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -225,5 +215,4 @@ class TradierOptionsAdapter:
     async def close(self):
         """关闭连接"""
         if self.session and not self.session.closed:
-            await self.session.close()
-        self.cache.close() 
\ No newline at end of file
+            await self.session.close() 
\ No newline at end of file
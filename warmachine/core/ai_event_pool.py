@@ -8,12 +8,16 @@ These events can be subscribed to by various components of the system or by user
 import os
 import json
 import time
+import heapq
+import bisect
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Union, Tuple, Callable
 from enum import Enum
 import threading
 
+from .event_log import SegmentedEventLog
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -87,6 +91,7 @@ class AIEvent:
         self.metadata = metadata or {}
         self.actions = actions or []
         self.delivered_to = set()  # Track which subscribers have received this
+        self.sequence = 0  # Insertion order, assigned by the pool
     
     def is_expired(self) -> bool:
         """Check if the event has expired"""
@@ -138,6 +143,47 @@ class AIEvent:
         
         return event
 
+class TimeIndex:
+    """Event IDs kept sorted by (timestamp, sequence) for range and "latest N" queries"""
+    
+    def __init__(self):
+        self.keys: List[Tuple[str, int]] = []
+        self.event_ids: List[str] = []
+    
+    def __len__(self) -> int:
+        return len(self.event_ids)
+    
+    def add(self, event: AIEvent):
+        """Insert an event; O(1) when events arrive in time order"""
+        key = (event.timestamp, event.sequence)
+        if not self.keys or key >= self.keys[-1]:
+            self.keys.append(key)
+            self.event_ids.append(event.event_id)
+        else:
+            i = bisect.bisect_right(self.keys, key)
+            self.keys.insert(i, key)
+            self.event_ids.insert(i, event.event_id)
+    
+    def remove(self, event: AIEvent):
+        """Remove an event located by bisection"""
+        key = (event.timestamp, event.sequence)
+        i = bisect.bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            del self.keys[i]
+            del self.event_ids[i]
+    
+    def latest(self, limit: int) -> List[str]:
+        """Get up to ``limit`` event IDs, newest first"""
+        if limit <= 0:
+            return []
+        return self.event_ids[:-limit - 1:-1]
+    
+    def between(self, start: Optional[str] = None, end: Optional[str] = None) -> List[str]:
+        """Get event IDs with start <= timestamp <= end (ISO strings), oldest first"""
+        lo = bisect.bisect_left(self.keys, (start, -1)) if start else 0
+        hi = bisect.bisect_right(self.keys, (end, float('inf'))) if end else len(self.keys)
+        return self.event_ids[lo:hi]
+
 class AIEventPool:
     """Central repository for AI-generated events"""
     
@@ -150,18 +196,43 @@ class AIEventPool:
         """
         self.config = config
         self.events: Dict[str, AIEvent] = {}  # event_id -> event
-        self.category_indexes: Dict[EventCategory, List[str]] = {
-            category: [] for category in EventCategory
+        self.category_indexes: Dict[EventCategory, TimeIndex] = {
+            category: TimeIndex() for category in EventCategory
         }
-        self.symbol_indexes: Dict[str, List[str]] = {}  # symbol -> [event_ids]
-        self.priority_indexes: Dict[EventPriority, List[str]] = {
-            priority: [] for priority in EventPriority
+        self.symbol_indexes: Dict[str, TimeIndex] = {}  # symbol -> time-ordered event_ids
+        self.priority_indexes: Dict[EventPriority, TimeIndex] = {
+            priority: TimeIndex() for priority in EventPriority
         }
         
+        # Insertion order: parallel lists of sequence numbers and event IDs.
+        # Deleted events are skipped lazily and compacted out periodically.
+        self.next_sequence = 1
+        self.sequence_numbers: List[int] = []
+        self.sequence_event_ids: List[str] = []
+        
+        # Min-heap of (expiry, sequence, event_id) so cleanup only touches expired events
+        self.expiry_heap: List[Tuple[datetime, int, str]] = []
+        
+        # Per-subscriber low-water mark: every event with a sequence number at or
+        # below the cursor is delivered, filtered out, expired or deleted
+        self.delivery_cursors: Dict[str, int] = {}
+        
         # Storage paths
-        self.storage_path = "data/ai/events"
+        storage_config = config.get("storage", {})
+        self.storage_path = storage_config.get("event_pool_path", "data/ai/events")
         os.makedirs(self.storage_path, exist_ok=True)
         
+        # Append-only event log (replaces rewriting events.json on every change)
+        store_config = config.get("event_store", {})
+        self.store = SegmentedEventLog(
+            self.storage_path,
+            prefix="events",
+            segment_max_bytes=store_config.get("segment_max_bytes", 16 * 1024 * 1024),
+            max_segments=store_config.get("max_segments", 8),
+            fsync=store_config.get("fsync", False)
+        )
+        self.compaction_thread = None
+        
         # Lock for thread safety
         self.lock = threading.RLock()
         
@@ -175,38 +246,150 @@ class AIEventPool:
         logger.info("AI Event Intelligence Pool initialized")
     
     def _load_events(self):
-        """Load events from storage"""
+        """Load events from storage by replaying the event log"""
         try:
-            events_file = os.path.join(self.storage_path, "events.json")
-            if os.path.exists(events_file):
-                with open(events_file, 'r') as f:
-                    events_data = json.load(f)
-                
-                for event_data in events_data:
+            with self.lock:
+                for record in self.store.replay():
                     try:
-                        event = AIEvent.from_dict(event_data)
-                        if not event.is_expired():
-                            self.add_event(event)
+                        self._apply_record(record)
                     except Exception as e:
                         logger.error(f"Failed to load event: {str(e)}")
                 
-                logger.info(f"Loaded {len(self.events)} events from storage")
+                # Drop events that expired while we were offline
+                self._remove_expired_events()
+                
+                migrated = self._migrate_legacy_events()
+            
+            if migrated or self.store.needs_compaction():
+                self._save_events()
+            
+            logger.info(f"Loaded {len(self.events)} events from storage")
         except Exception as e:
             logger.error(f"Error loading events: {str(e)}")
     
+    def _migrate_legacy_events(self) -> bool:
+        """Import events from the old single-file events.json format, if present"""
+        events_file = os.path.join(self.storage_path, "events.json")
+        if not os.path.exists(events_file):
+            return False
+        
+        with open(events_file, 'r') as f:
+            events_data = json.load(f)
+        
+        for event_data in events_data:
+            try:
+                event = AIEvent.from_dict(event_data)
+                if not event.is_expired() and event.event_id not in self.events:
+                    self._index_event(event)
+            except Exception as e:
+                logger.error(f"Failed to load event: {str(e)}")
+        
+        os.replace(events_file, events_file + ".migrated")
+        logger.info(f"Migrated {len(events_data)} events from {events_file}")
+        return True
+    
+    def _apply_record(self, record: Dict[str, Any]):
+        """Apply a single event log record to the in-memory pool"""
+        op = record.get("op")
+        if op == "add":
+            event = AIEvent.from_dict(record["event"])
+            # Upsert: a snapshot may repeat events from segments it replaced
+            if event.event_id in self.events:
+                self._unindex_event(event.event_id)
+            self._index_event(event)
+        elif op == "deliver":
+            event = self.events.get(record["event_id"])
+            if event:
+                event.delivered_to.add(record["subscriber_id"])
+        elif op == "delete":
+            if record["event_id"] in self.events:
+                self._unindex_event(record["event_id"])
+        else:
+            logger.warning(f"Unknown event log record: {op}")
+    
     def _save_events(self):
-        """Save events to storage"""
+        """Compact the event log into a snapshot of the current pool"""
         try:
-            events_data = [event.to_dict() for event in self.events.values()]
+            with self.lock:
+                cut_seq = self.store.begin_compaction()
+                if cut_seq is None:
+                    return
+                # Serialise under the lock: delivered_to and the event fields are
+                # mutated by other threads; only the file write happens outside it
+                records = [{"op": "add", "event": event.to_dict()} for event in self.events.values()]
             
-            events_file = os.path.join(self.storage_path, "events.json")
-            with open(events_file, 'w') as f:
-                json.dump(events_data, f, indent=2)
+            self.store.finish_compaction(cut_seq, records)
             
-            logger.debug(f"Saved {len(events_data)} events to storage")
+            logger.debug(f"Saved {len(records)} events to storage")
         except Exception as e:
             logger.error(f"Error saving events: {str(e)}")
     
+    def _maybe_compact(self):
+        """Start a background compaction when enough segments have accumulated"""
+        if self.compaction_thread is not None and self.compaction_thread.is_alive():
+            return
+        if not self.store.needs_compaction():
+            return
+        self.compaction_thread = threading.Thread(target=self._save_events, daemon=True)
+        self.compaction_thread.start()
+    
+    def _index_event(self, event: AIEvent):
+        """Add an event to main storage and the lookup indexes"""
+        event.sequence = self.next_sequence
+        self.next_sequence += 1
+        self.events[event.event_id] = event
+        
+        self.sequence_numbers.append(event.sequence)
+        self.sequence_event_ids.append(event.event_id)
+        
+        # Add to category, symbol and priority indexes
+        self.category_indexes[event.category].add(event)
+        if event.symbol not in self.symbol_indexes:
+            self.symbol_indexes[event.symbol] = TimeIndex()
+        self.symbol_indexes[event.symbol].add(event)
+        self.priority_indexes[event.priority].add(event)
+        
+        # Schedule expiry
+        if event.expiry:
+            try:
+                expiry = datetime.fromisoformat(event.expiry)
+                if expiry.tzinfo is not None:
+                    expiry = expiry.astimezone().replace(tzinfo=None)
+                heapq.heappush(self.expiry_heap, (expiry, event.sequence, event.event_id))
+            except (TypeError, ValueError):
+                logger.warning(f"Invalid expiry for event {event.event_id}: {event.expiry}")
+    
+    def _unindex_event(self, event_id: str) -> AIEvent:
+        """Remove an event from main storage and the lookup indexes"""
+        event = self.events.pop(event_id)
+        
+        self.category_indexes[event.category].remove(event)
+        symbol_index = self.symbol_indexes.get(event.symbol)
+        if symbol_index is not None:
+            symbol_index.remove(event)
+            if not symbol_index:
+                del self.symbol_indexes[event.symbol]
+        self.priority_indexes[event.priority].remove(event)
+        
+        # The sequence list and expiry heap drop stale entries lazily
+        if len(self.sequence_event_ids) > 2 * len(self.events) + 1024:
+            self._compact_sequence()
+        
+        return event
+    
+    def _compact_sequence(self):
+        """Drop deleted events from the insertion-order lists"""
+        live = [
+            (seq, event_id) for seq, event_id in zip(self.sequence_numbers, self.sequence_event_ids)
+            if event_id in self.events and self.events[event_id].sequence == seq
+        ]
+        self.sequence_numbers = [seq for seq, _ in live]
+        self.sequence_event_ids = [event_id for _, event_id in live]
+    
+    def _lookup(self, event_ids: List[str]) -> List[AIEvent]:
+        """Resolve event IDs to events"""
+        return [self.events[event_id] for event_id in event_ids if event_id in self.events]
+    
     def add_event(self, event: AIEvent) -> bool:
         """
         Add a new event to the pool
@@ -223,25 +406,15 @@ class AIEventPool:
                 logger.warning(f"Event {event.event_id} already exists, skipping")
                 return False
             
-            # Add to main storage
-            self.events[event.event_id] = event
-            
-            # Add to category index
-            self.category_indexes[event.category].append(event.event_id)
+            self._index_event(event)
             
-            # Add to symbol index
-            if event.symbol not in self.symbol_indexes:
-                self.symbol_indexes[event.symbol] = []
-            self.symbol_indexes[event.symbol].append(event.event_id)
-            
-            # Add to priority index
-            self.priority_indexes[event.priority].append(event.event_id)
-            
-            # Save to storage
-            self._save_events()
-            
-            logger.info(f"Added new event: {event.event_id} - {event.title}")
-            return True
+            # Persist as a single appended record
+            self.store.append({"op": "add", "event": event.to_dict()})
+        
+        self._maybe_compact()
+        
+        logger.info(f"Added new event: {event.event_id} - {event.title}")
+        return True
     
     def get_event(self, event_id: str) -> Optional[AIEvent]:
         """
@@ -272,7 +445,13 @@ class AIEventPool:
             if not event:
                 return False
             
-            event.delivered_to.add(subscriber_id)
+            if subscriber_id not in event.delivered_to:
+                event.delivered_to.add(subscriber_id)
+                self.store.append({
+                    "op": "deliver",
+                    "event_id": event_id,
+                    "subscriber_id": subscriber_id
+                })
             return True
     
     def get_events_by_category(self, category: EventCategory, limit: int = 100) -> List[AIEvent]:
@@ -284,14 +463,11 @@ class AIEventPool:
             limit: Maximum number of events to return
             
         Returns:
-            List of matching events
+            List of matching events, newest first
         """
         with self.lock:
-            event_ids = self.category_indexes.get(category, [])
-            # Get the events and sort by timestamp (newest first)
-            events = [self.events[event_id] for event_id in event_ids if event_id in self.events]
-            events.sort(key=lambda e: e.timestamp, reverse=True)
-            return events[:limit]
+            index = self.category_indexes.get(category)
+            return self._lookup(index.latest(limit)) if index else []
     
     def get_events_by_symbol(self, symbol: str, limit: int = 100) -> List[AIEvent]:
         """
@@ -302,14 +478,11 @@ class AIEventPool:
             limit: Maximum number of events to return
             
         Returns:
-            List of matching events
+            List of matching events, newest first
         """
         with self.lock:
-            event_ids = self.symbol_indexes.get(symbol, [])
-            # Get the events and sort by timestamp (newest first)
-            events = [self.events[event_id] for event_id in event_ids if event_id in self.events]
-            events.sort(key=lambda e: e.timestamp, reverse=True)
-            return events[:limit]
+            index = self.symbol_indexes.get(symbol)
+            return self._lookup(index.latest(limit)) if index else []
     
     def get_events_by_priority(self, priority: EventPriority, limit: int = 100) -> List[AIEvent]:
         """
@@ -320,32 +493,100 @@ class AIEventPool:
             limit: Maximum number of events to return
             
         Returns:
-            List of matching events
+            List of matching events, newest first
         """
         with self.lock:
-            event_ids = self.priority_indexes.get(priority, [])
-            # Get the events and sort by timestamp (newest first)
-            events = [self.events[event_id] for event_id in event_ids if event_id in self.events]
-            events.sort(key=lambda e: e.timestamp, reverse=True)
-            return events[:limit]
+            index = self.priority_indexes.get(priority)
+            return self._lookup(index.latest(limit)) if index else []
     
-    def get_undelivered_events(self, subscriber_id: str, limit: int = 100) -> List[AIEvent]:
+    def get_events_between(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        symbol: Optional[str] = None,
+        category: Optional[EventCategory] = None
+    ) -> List[AIEvent]:
+        """
+        Get events in a time window using the time-ordered indexes
+        
+        Args:
+            start: Earliest ISO timestamp (inclusive, None = unbounded)
+            end: Latest ISO timestamp (inclusive, None = unbounded)
+            symbol: Restrict to a symbol (takes precedence over category)
+            category: Restrict to a category
+            
+        Returns:
+            List of matching events, oldest first
+        """
+        with self.lock:
+            if symbol is not None:
+                index = self.symbol_indexes.get(symbol)
+                if index is None:
+                    return []
+                events = self._lookup(index.between(start, end))
+                if category is not None:
+                    events = [e for e in events if e.category == category]
+                return events
+            
+            if category is not None:
+                return self._lookup(self.category_indexes[category].between(start, end))
+            
+            event_ids = []
+            for index in self.category_indexes.values():
+                event_ids.extend(index.between(start, end))
+            events = self._lookup(event_ids)
+            events.sort(key=lambda e: (e.timestamp, e.sequence))
+            return events
+    
+    def get_undelivered_events(
+        self,
+        subscriber_id: str,
+        limit: int = 100,
+        predicate: Optional[Callable[[AIEvent], bool]] = None
+    ) -> List[AIEvent]:
         """
         Get events not yet delivered to a subscriber
         
+        Only events after the subscriber's delivery cursor are scanned. The cursor
+        advances over the leading run of events that are delivered, expired or
+        deleted, so repeated calls do not rescan the pool. Events the predicate
+        rejects are skipped but not passed by the cursor, so a later call with a
+        wider predicate still finds them.
+        
         Args:
             subscriber_id: Subscriber identifier
             limit: Maximum number of events to return
+            predicate: Optional filter applied to this call only
             
         Returns:
             List of undelivered events
         """
         with self.lock:
-            # Find events that haven't been delivered to this subscriber
-            undelivered = [
-                event for event in self.events.values()
-                if subscriber_id not in event.delivered_to and not event.is_expired()
-            ]
+            cursor = self.delivery_cursors.get(subscriber_id, 0)
+            start = bisect.bisect_right(self.sequence_numbers, cursor)
+            
+            undelivered = []
+            advancing = True
+            for i in range(start, len(self.sequence_numbers)):
+                sequence = self.sequence_numbers[i]
+                event = self.events.get(self.sequence_event_ids[i])
+                
+                settled = (
+                    event is None
+                    or event.sequence != sequence
+                    or subscriber_id in event.delivered_to
+                    or event.is_expired()
+                )
+                if settled:
+                    if advancing:
+                        cursor = sequence
+                    continue
+                
+                advancing = False
+                if predicate is None or predicate(event):
+                    undelivered.append(event)
+            
+            self.delivery_cursors[subscriber_id] = cursor
             
             # Sort by priority (highest first) and then by timestamp (newest first)
             undelivered.sort(key=lambda e: (e.priority.value, e.timestamp), reverse=True)
@@ -366,53 +607,34 @@ class AIEventPool:
             if event_id not in self.events:
                 return False
             
-            event = self.events[event_id]
-            
-            # Remove from main storage
-            del self.events[event_id]
-            
-            # Remove from category index
-            if event.category in self.category_indexes:
-                self.category_indexes[event.category] = [
-                    eid for eid in self.category_indexes[event.category] if eid != event_id
-                ]
-            
-            # Remove from symbol index
-            if event.symbol in self.symbol_indexes:
-                self.symbol_indexes[event.symbol] = [
-                    eid for eid in self.symbol_indexes[event.symbol] if eid != event_id
-                ]
-            
-            # Remove from priority index
-            if event.priority in self.priority_indexes:
-                self.priority_indexes[event.priority] = [
-                    eid for eid in self.priority_indexes[event.priority] if eid != event_id
-                ]
-            
-            # Save changes
-            self._save_events()
+            self._unindex_event(event_id)
+            self.store.append({"op": "delete", "event_id": event_id})
             
             logger.debug(f"Deleted event: {event_id}")
             return True
     
+    def _remove_expired_events(self) -> int:
+        """Delete expired events by popping the expiry heap; returns the number removed"""
+        now = datetime.now()
+        removed = 0
+        with self.lock:
+            while self.expiry_heap and self.expiry_heap[0][0] < now:
+                _, sequence, event_id = heapq.heappop(self.expiry_heap)
+                event = self.events.get(event_id)
+                # Skip heap entries for events that were already deleted or replaced
+                if event is None or event.sequence != sequence:
+                    continue
+                self.delete_event(event_id)
+                removed += 1
+        return removed
+    
     def _cleanup_expired_events(self):
         """Periodically clean up expired events"""
         while True:
             try:
-                now = datetime.now()
-                with self.lock:
-                    # Find expired events
-                    expired_ids = [
-                        event_id for event_id, event in self.events.items()
-                        if event.is_expired()
-                    ]
-                    
-                    # Delete expired events
-                    for event_id in expired_ids:
-                        self.delete_event(event_id)
-                    
-                    if expired_ids:
-                        logger.info(f"Cleaned up {len(expired_ids)} expired events")
+                removed = self._remove_expired_events()
+                if removed:
+                    logger.info(f"Cleaned up {removed} expired events")
             except Exception as e:
                 logger.error(f"Error during event cleanup: {str(e)}")
             
@@ -14,6 +14,8 @@ import logging
 import time
 import asyncio
 import json
+from array import array
+from collections import deque
 from typing import Dict, List, Any, Optional, Set, Callable
 from datetime import datetime
 import numpy as np
@@ -26,6 +28,146 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+SIDE_CODES = {"BUY": 1, "SELL": -1}
+SIDE_NAMES = {1: "BUY", -1: "SELL", 0: ""}
+
+class TradeFlowState:
+    """Rolling trade accumulators for one symbol; every update is O(1)
+    
+    Recent trades live in fixed-size typed arrays used as a ring. Running sums cover
+    the last ``trade_window`` trades (for VWAP and average size) and a time window
+    of ``volume_window_ms`` (for traded volume); a monotonic deque tracks the largest
+    of the last ``aggressive_window`` trades.
+    """
+    
+    def __init__(
+        self,
+        history_size: int = 1000,
+        trade_window: int = 100,
+        volume_window_ms: int = 60000,
+        aggressive_window: int = 10,
+        spike_lookback: int = 5
+    ):
+        self.history_size = max(history_size, trade_window, aggressive_window)
+        self.trade_window = trade_window
+        self.volume_window_ms = volume_window_ms
+        self.aggressive_window = aggressive_window
+        
+        # Ring of recent trades
+        self.timestamps = array('q', [0]) * self.history_size
+        self.prices = array('d', [0.0]) * self.history_size
+        self.quantities = array('d', [0.0]) * self.history_size
+        self.sides = array('b', [0]) * self.history_size
+        self.count = 0
+        
+        # Last `trade_window` trades
+        self.window_quantity = 0.0
+        self.window_notional = 0.0
+        
+        # Time-windowed volume: (timestamp, quantity) pairs inside the window
+        self.window_trades = deque()
+        self.window_volume = 0.0
+        
+        # Previous windowed volumes for spike detection
+        self.volume_lookback = deque(maxlen=spike_lookback)
+        self.volume_lookback_sum = 0.0
+        
+        # Previous VWAP for deviation checks
+        self.vwap = 0.0
+        self.prev_vwap = None
+        
+        # Monotonic deque of (sequence, quantity) for the largest recent trade
+        self.max_quantity = deque()
+    
+    def update(self, timestamp: int, price: float, quantity: float, side: int):
+        """Add a trade and roll every window forward"""
+        n = self.count
+        slot = n % self.history_size
+        
+        # Leave the count window
+        if n >= self.trade_window:
+            old = (n - self.trade_window) % self.history_size
+            old_quantity = self.quantities[old]
+            self.window_quantity -= old_quantity
+            self.window_notional -= self.prices[old] * old_quantity
+        
+        self.timestamps[slot] = timestamp
+        self.prices[slot] = price
+        self.quantities[slot] = quantity
+        self.sides[slot] = side
+        self.count = n + 1
+        
+        self.window_quantity += quantity
+        self.window_notional += price * quantity
+        
+        # Bound floating-point drift of the running sums
+        if self.count % self.history_size == 0:
+            self._resync_window()
+        
+        # Time window, relative to the newest trade
+        window_trades = self.window_trades
+        window_trades.append((timestamp, quantity))
+        self.window_volume += quantity
+        cutoff = timestamp - self.volume_window_ms
+        while window_trades[0][0] < cutoff:
+            self.window_volume -= window_trades.popleft()[1]
+        if len(window_trades) == 1:
+            # Only the new trade is left; reset the sum exactly
+            self.window_volume = quantity
+        
+        # Largest of the last `aggressive_window` trades
+        max_quantity = self.max_quantity
+        while max_quantity and max_quantity[-1][1] <= quantity:
+            max_quantity.pop()
+        max_quantity.append((n, quantity))
+        if max_quantity[0][0] <= n - self.aggressive_window:
+            max_quantity.popleft()
+        
+        self.prev_vwap = self.vwap if n else None
+        self.vwap = self.window_notional / self.window_quantity if self.window_quantity > 0 else 0.0
+    
+    def _resync_window(self):
+        """Recompute the count-window sums exactly"""
+        quantity = notional = 0.0
+        for i in range(max(0, self.count - self.trade_window), self.count):
+            slot = i % self.history_size
+            quantity += self.quantities[slot]
+            notional += self.prices[slot] * self.quantities[slot]
+        self.window_quantity = quantity
+        self.window_notional = notional
+    
+    def push_volume(self, volume: float):
+        """Record a windowed volume observation for spike detection"""
+        if len(self.volume_lookback) == self.volume_lookback.maxlen:
+            self.volume_lookback_sum -= self.volume_lookback[0]
+        self.volume_lookback.append(volume)
+        self.volume_lookback_sum += volume
+    
+    @property
+    def window_count(self) -> int:
+        return min(self.count, self.trade_window)
+    
+    def largest_recent(self) -> Dict[str, Any]:
+        """Get the largest of the last `aggressive_window` trades"""
+        sequence, _ = self.max_quantity[0]
+        return self.trade_at(sequence)
+    
+    def trade_at(self, sequence: int) -> Dict[str, Any]:
+        """Get a buffered trade by sequence number as a dictionary"""
+        slot = sequence % self.history_size
+        return {
+            "timestamp": self.timestamps[slot],
+            "price": self.prices[slot],
+            "quantity": self.quantities[slot],
+            "side": SIDE_NAMES.get(self.sides[slot], "")
+        }
+    
+    def recent_trades(self, n: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get up to n buffered trades, oldest first"""
+        available = min(self.count, self.history_size)
+        n = available if n is None else min(n, available)
+        return [self.trade_at(i) for i in range(self.count - n, self.count)]
+
 class OrderFlowMonitor:
     """Monitors order flow for anomalies and liquidity patterns"""
     
@@ -49,11 +191,14 @@ class OrderFlowMonitor:
         # Alert handlers
         self.alert_handlers = []
         
+        # Rolling window sizes
+        self.trade_history_size = config.get("trade_history_size", 1000)
+        self.trade_window = config.get("trade_window", 100)
+        self.volume_window_ms = config.get("volume_window_ms", 60000)
+        
         # State data
         self.orderbooks = {}  # Latest orderbooks by symbol
-        self.trade_history = {}  # Recent trades by symbol
-        self.volume_history = {}  # Volume history by symbol
-        self.vwap_history = {}  # VWAP history by symbol
+        self.trade_flow: Dict[str, TradeFlowState] = {}  # Rolling trade state by symbol
         self.last_alert_time = {}  # Last alert time by symbol/alert type
         
         # Throttling
@@ -89,27 +234,58 @@ class OrderFlowMonitor:
             symbol: Trading symbol
             trade: Trade data dictionary
         """
-        # Initialize trade history for symbol if needed
-        if symbol not in self.trade_history:
-            self.trade_history[symbol] = []
-        
-        # Add trade to history
-        self.trade_history[symbol].append({
-            "timestamp": trade.get("timestamp", int(time.time() * 1000)),
-            "price": trade.get("price", 0),
-            "quantity": trade.get("quantity", 0),
-            "side": trade.get("side", ""),
-            "exchange": trade.get("exchange", ""),
-            "trade_id": trade.get("trade_id", ""),
-        })
-        
-        # Keep only recent trades (last 1000)
-        if len(self.trade_history[symbol]) > 1000:
-            self.trade_history[symbol] = self.trade_history[symbol][-1000:]
+        state = self.trade_flow.get(symbol)
+        if state is None:
+            state = self.trade_flow[symbol] = TradeFlowState(
+                history_size=self.trade_history_size,
+                trade_window=self.trade_window,
+                volume_window_ms=self.volume_window_ms
+            )
+        
+        # Add trade to the rolling state
+        state.update(
+            trade.get("timestamp", int(time.time() * 1000)),
+            trade.get("price", 0),
+            trade.get("quantity", 0),
+            SIDE_CODES.get(trade.get("side", ""), 0)
+        )
         
         # Calculate trade metrics
         self._calculate_trade_metrics(symbol)
     
+    def get_recent_trades(self, symbol: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get buffered trades for a symbol, oldest first
+        
+        Args:
+            symbol: Trading symbol
+            limit: Maximum number of trades
+        """
+        state = self.trade_flow.get(symbol)
+        return state.recent_trades(limit) if state else []
+    
+    def get_trade_metrics(self, symbol: str) -> Dict[str, Any]:
+        """
+        Get the current rolling trade metrics for a symbol
+        
+        Args:
+            symbol: Trading symbol
+        """
+        state = self.trade_flow.get(symbol)
+        if state is None:
+            return {}
+        return {
+            "trade_count": state.count,
+            "window_volume": state.window_volume,
+            "vwap": state.vwap,
+            "avg_trade_size": state.window_quantity / state.window_count if state.window_count else 0.0
+        }
+    
+    def _alert_due(self, symbol: str, alert_type: str) -> bool:
+        """Cheap throttle pre-check so hot paths skip building throttled alerts"""
+        last = self.last_alert_time.get(f"{symbol}:{alert_type}")
+        return last is None or time.time() - last >= self.min_alert_interval
+    
     def _calculate_orderbook_metrics(self, symbol: str):
         """
         Calculate orderbook metrics and detect anomalies
@@ -174,43 +350,26 @@ class OrderFlowMonitor:
         """
         Calculate trade metrics and detect anomalies
         
+        All inputs come from the symbol's rolling accumulators, so this is O(1)
+        per trade regardless of window sizes.
+        
         Args:
             symbol: Trading symbol
         """
-        if symbol not in self.trade_history or len(self.trade_history[symbol]) < 10:
+        state = self.trade_flow.get(symbol)
+        if state is None or state.count < 10:
             return
         
         try:
-            # Get recent trades
-            recent_trades = self.trade_history[symbol][-100:]
-            
-            # Initialize volume history if needed
-            if symbol not in self.volume_history:
-                self.volume_history[symbol] = []
-            
-            # Calculate volume in last minute
-            current_time = int(time.time() * 1000)
-            one_minute_ago = current_time - 60000
-            
-            minute_volume = sum(
-                trade["quantity"] for trade in recent_trades 
-                if trade["timestamp"] >= one_minute_ago
-            )
-            
-            # Add to volume history
-            self.volume_history[symbol].append({
-                "timestamp": current_time,
-                "volume": minute_volume
-            })
-            
-            # Keep only recent history (last 60 minutes)
-            if len(self.volume_history[symbol]) > 60:
-                self.volume_history[symbol] = self.volume_history[symbol][-60:]
+            current_time = state.timestamps[(state.count - 1) % state.history_size]
             
-            # Check for volume spike
-            if len(self.volume_history[symbol]) > 5:
-                avg_volume = sum(v["volume"] for v in self.volume_history[symbol][-6:-1]) / 5
-                if avg_volume > 0 and minute_volume > avg_volume * self.volume_spike_threshold:
+            # Check for volume spike against the previous windowed volumes
+            minute_volume = state.window_volume
+            lookback = state.volume_lookback
+            if len(lookback) == lookback.maxlen:
+                avg_volume = state.volume_lookback_sum / len(lookback)
+                if (avg_volume > 0 and minute_volume > avg_volume * self.volume_spike_threshold
+                        and self._alert_due(symbol, "volume_spike")):
                     self._create_alert(
                         symbol=symbol,
                         alert_type="volume_spike",
@@ -224,53 +383,33 @@ class OrderFlowMonitor:
                             "timestamp": current_time
                         }
                     )
+            state.push_volume(minute_volume)
             
-            # Calculate VWAP
-            vwap = self._calculate_vwap(recent_trades)
-            
-            # Initialize VWAP history if needed
-            if symbol not in self.vwap_history:
-                self.vwap_history[symbol] = []
-            
-            # Add to VWAP history
-            self.vwap_history[symbol].append({
-                "timestamp": current_time,
-                "vwap": vwap
-            })
-            
-            # Keep only recent history
-            if len(self.vwap_history[symbol]) > 100:
-                self.vwap_history[symbol] = self.vwap_history[symbol][-100:]
-            
-            # Check for price deviation from VWAP
-            if len(recent_trades) > 0 and len(self.vwap_history[symbol]) > 1:
-                latest_price = recent_trades[-1]["price"]
-                
-                # Get recent VWAP
-                recent_vwap = self.vwap_history[symbol][-2]["vwap"]
+            # Check for price deviation from the previous VWAP
+            recent_vwap = state.prev_vwap
+            if recent_vwap:
+                latest_price = state.prices[(state.count - 1) % state.history_size]
+                deviation = abs(latest_price - recent_vwap) / recent_vwap
                 
-                if recent_vwap > 0:
-                    deviation = abs(latest_price - recent_vwap) / recent_vwap
-                    
-                    if deviation > self.vwap_deviation_threshold:
-                        direction = "above" if latest_price > recent_vwap else "below"
-                        self._create_alert(
-                            symbol=symbol,
-                            alert_type="vwap_deviation",
-                            title=f"Price-VWAP Deviation for {symbol}",
-                            content=f"Price significantly {direction} VWAP. Deviation: {deviation:.2%}",
-                            level="medium",
-                            data={
-                                "price": latest_price,
-                                "vwap": recent_vwap,
-                                "deviation": deviation,
-                                "direction": direction,
-                                "timestamp": current_time
-                            }
-                        )
+                if deviation > self.vwap_deviation_threshold and self._alert_due(symbol, "vwap_deviation"):
+                    direction = "above" if latest_price > recent_vwap else "below"
+                    self._create_alert(
+                        symbol=symbol,
+                        alert_type="vwap_deviation",
+                        title=f"Price-VWAP Deviation for {symbol}",
+                        content=f"Price significantly {direction} VWAP. Deviation: {deviation:.2%}",
+                        level="medium",
+                        data={
+                            "price": latest_price,
+                            "vwap": recent_vwap,
+                            "deviation": deviation,
+                            "direction": direction,
+                            "timestamp": current_time
+                        }
+                    )
             
             # Check for aggressive orders (large market orders)
-            self._detect_aggressive_orders(symbol, recent_trades)
+            self._detect_aggressive_orders(symbol, state)
             
         except Exception as e:
             logger.error(f"Error calculating trade metrics for {symbol}: {str(e)}")
@@ -402,32 +541,26 @@ class OrderFlowMonitor:
                 }
             )
     
-    def _detect_aggressive_orders(self, symbol: str, trades: List[Dict[str, Any]]):
+    def _detect_aggressive_orders(self, symbol: str, state: TradeFlowState):
         """
         Detect aggressive market orders
         
         Args:
             symbol: Trading symbol
-            trades: List of recent trades
+            state: Rolling trade state for the symbol
         """
-        if not trades or len(trades) < 10:
+        if state.window_count < 10:
             return
         
-        # Calculate average trade size
-        avg_trade_size = sum(trade["quantity"] for trade in trades) / len(trades)
+        # Average trade size over the trade window
+        avg_trade_size = state.window_quantity / state.window_count
         
         # Threshold for aggressive order
         aggressive_threshold = avg_trade_size * 3
         
-        # Find aggressive trades
-        aggressive_trades = [
-            trade for trade in trades[-10:] 
-            if trade["quantity"] > aggressive_threshold
-        ]
-        
-        if aggressive_trades:
-            # Get largest aggressive trade
-            largest_trade = max(aggressive_trades, key=lambda x: x["quantity"])
+        # Largest of the most recent trades
+        if state.max_quantity[0][1] > aggressive_threshold and self._alert_due(symbol, "aggressive_order"):
+            largest_trade = state.largest_recent()
             
             self._create_alert(
                 symbol=symbol,
@@ -3,10 +3,21 @@ Sentiment Adapter for WarMachine Trading System
 
 This module implements sentiment analysis and news processing capabilities,
 converting raw text data into structured sentiment signals.
+
+Texts submitted from async code are collected for a few milliseconds and scored
+as one batch in a thread or process pool; results come back through futures and
+are cached by text hash. Keywords are found with one precompiled regex trie.
 """
 
+import re
+import sys
+import asyncio
+import hashlib
 import logging
-from typing import Dict, Any, List, Optional
+import functools
+from typing import Dict, Any, List, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import numpy as np
 from datetime import datetime
 import json
@@ -18,27 +29,185 @@ from core.tg_bot.super_commander import SuperCommander
 
 logger = logging.getLogger(__name__)
 
+def load_sentiment_pipeline(model: str, device: int):
+    """Load the transformers sentiment pipeline
+
+    Args:
+        model: Model name
+        device: Device index (-1 = CPU)
+
+    Returns:
+        Sentiment analysis pipeline
+    """
+    return pipeline("sentiment-analysis", model=model, device=device)
+
+def score_texts(analyzer, texts: List[str], batch_size: int) -> List[Dict[str, float]]:
+    """Score a batch of texts with the transformer model and TextBlob
+
+    Args:
+        analyzer: Sentiment analysis pipeline
+        texts: Texts to score
+        batch_size: Texts per model forward pass
+
+    Returns:
+        Sentiment scores per text, in input order
+    """
+    transformer_results = analyzer(texts, batch_size=batch_size, truncation=True)
+    scores = []
+    for text, transformer_result in zip(texts, transformer_results):
+        textblob_sentiment = TextBlob(text).sentiment
+        scores.append({
+            "transformer_score": transformer_result["score"],
+            "transformer_label": transformer_result["label"],
+            "textblob_polarity": textblob_sentiment.polarity,
+            "textblob_subjectivity": textblob_sentiment.subjectivity
+        })
+    return scores
+
+# Analyzer of a process pool worker, loaded once by the pool initializer
+_worker_analyzer = None
+
+def _init_worker(loader, model: str, device: int):
+    global _worker_analyzer
+    _worker_analyzer = loader(model, device)
+
+def _score_in_worker(texts: List[str], batch_size: int) -> List[Dict[str, float]]:
+    return score_texts(_worker_analyzer, texts, batch_size)
+
+class KeywordMatcher:
+    """Case-insensitive substring search for many keywords in one regex pass
+    
+    The keywords are compiled into a trie-shaped regex inside a lookahead, so
+    each position of the text yields the longest keyword starting there.
+    Keywords contained in a matched one are added from a per-match cache, which
+    gives the same result as testing every keyword with ``in``. Short lists are
+    faster as plain ``in`` tests over the lowercased terms.
+    """
+    
+    # Below this many distinct terms the per-term scan beats the regex
+    REGEX_MIN_TERMS = 128
+    
+    def __init__(self, keywords):
+        """Initialize keyword matcher
+        
+        Args:
+            keywords: Keywords to search for
+        """
+        self.keywords = list(dict.fromkeys(keywords))
+        self.order = {keyword: i for i, keyword in enumerate(self.keywords)}
+        
+        # Lowercased term -> keywords spelling it
+        self.variants: Dict[str, List[str]] = {}
+        for keyword in self.keywords:
+            self.variants.setdefault(keyword.lower(), []).append(keyword)
+        self.always = self.variants.pop("", [])
+        
+        self.terms = sorted(self.variants)
+        self.pattern = None
+        if len(self.terms) >= self.REGEX_MIN_TERMS:
+            self.pattern = re.compile("(?=(" + self._build(self._trie(self.terms)) + "))")
+        self.contained: Dict[str, List[str]] = {}
+        
+    @staticmethod
+    def _trie(terms: List[str]) -> Dict[str, Any]:
+        trie: Dict[str, Any] = {}
+        for term in terms:
+            node = trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[""] = {}
+        return trie
+        
+    def _build(self, node: Dict[str, Any]) -> str:
+        """Regex for a trie node; optional tails are greedy, so the longest term wins"""
+        branches = [re.escape(char) + self._build(child) for char, child in node.items() if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+        
+    def find(self, text_lower: str) -> List[str]:
+        """Find keywords in text
+        
+        Args:
+            text_lower: Lowercased text
+            
+        Returns:
+            Keywords occurring in the text, in configuration order
+        """
+        found = set(self.always)
+        if self.pattern is None:
+            for term in self.terms:
+                if term in text_lower:
+                    found.update(self.variants[term])
+            return sorted(found, key=self.order.__getitem__)
+            
+        for term in set(self.pattern.findall(text_lower)):
+            contained = self.contained.get(term)
+            if contained is None:
+                contained = [
+                    keyword for other in self.terms if other in term for keyword in self.variants[other]
+                ]
+                self.contained[term] = contained
+            found.update(contained)
+        return sorted(found, key=self.order.__getitem__)
+
 class SentimentAdapter:
     """Adapter for sentiment analysis and news processing"""
     
+    # Loads the model from (name, device); must be picklable for a process pool
+    analyzer_loader = staticmethod(load_sentiment_pipeline)
+    
     def __init__(self, config: Dict[str, Any]):
         """Initialize sentiment adapter
         
         Args:
-            config: Configuration dictionary
+            config: Configuration dictionary. Optional batching settings:
+                batch_window_ms (how long texts are collected, default 5),
+                max_batch_size (default 32), executor ("thread" or "process"),
+                workers (pool size, default 1) and cache_size (texts whose
+                scores are kept, default 10000)
         """
         self.config = config
+        self.model_name = config.get("sentiment_model", "distilbert-base-uncased-finetuned-sst-2-english")
+        self.device = config.get("device", -1)
         
-        # Initialize sentiment analyzer
-        self.sentiment_analyzer = pipeline(
-            "sentiment-analysis",
-            model=config.get("sentiment_model", "distilbert-base-uncased-finetuned-sst-2-english"),
-            device=config.get("device", -1)
-        )
+        # Micro-batching settings
+        self.batch_window = config.get("batch_window_ms", 5) / 1000
+        self.max_batch_size = max(1, config.get("max_batch_size", 32))
+        self.executor_type = config.get("executor", "thread")
+        self.workers = max(1, config.get("workers", 1))
+        self.cache_size = config.get("cache_size", 10000)
+        
+        # Initialize sentiment analyzer; a process pool loads it in every worker
+        if self.executor_type == "process":
+            self.sentiment_analyzer = None
+            self.executor = ProcessPoolExecutor(
+                self.workers,
+                initializer=_init_worker,
+                initargs=(type(self).analyzer_loader, self.model_name, self.device)
+            )
+            self._score_batch = functools.partial(_score_in_worker, batch_size=self.max_batch_size)
+        else:
+            self.sentiment_analyzer = self.analyzer_loader(self.model_name, self.device)
+            self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix="sentiment")
+            self._score_batch = functools.partial(
+                score_texts, self.sentiment_analyzer, batch_size=self.max_batch_size
+            )
+            
+        # Text hash -> scores (LRU) and batching state, used from one event loop
+        self.cache: "OrderedDict[bytes, Dict[str, float]]" = OrderedDict()
+        self.inflight: Dict[bytes, asyncio.Future] = {}
+        self.pending: List[Tuple[bytes, str]] = []
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+        self.batch_tasks = set()
+        self.stats = {"requests": 0, "cache_hits": 0, "joined": 0, "batches": 0, "texts_scored": 0}
         
         # Initialize keyword lists
         self.market_keywords = set(config.get("market_keywords", []))
         self.sector_keywords = set(config.get("sector_keywords", []))
+        self.market_matcher = KeywordMatcher(config.get("market_keywords", []))
+        self.sector_matcher = KeywordMatcher(config.get("sector_keywords", []))
         
         # Initialize sentiment thresholds
         self.sentiment_thresholds = config.get("sentiment_thresholds", {
@@ -59,37 +228,50 @@ class SentimentAdapter:
             Processed sentiment data
         """
         try:
-            # Extract text
-            title = news_data.get("title", "")
-            content = news_data.get("content", "")
-            source = news_data.get("source", "")
-            timestamp = news_data.get("timestamp", datetime.now().isoformat())
-            
-            # Combine title and content
-            text = f"{title} {content}"
+            text = self._news_text(news_data)
+            return self._build_news_result(news_data, text, self._analyze_sentiment(text))
             
-            # Get sentiment scores
-            sentiment_scores = self._analyze_sentiment(text)
-            
-            # Extract keywords
-            keywords = self._extract_keywords(text)
+        except Exception as e:
+            logger.error(f"Error processing news: {str(e)}")
+            raise
             
-            # Get market impact
-            market_impact = self._calculate_market_impact(sentiment_scores, keywords)
+    async def process_news_async(self, news_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Process news article, scoring it in the next sentiment batch
+        
+        Args:
+            news_data: News article data
             
-            return {
-                "timestamp": timestamp,
-                "source": source,
-                "sentiment_scores": sentiment_scores,
-                "keywords": keywords,
-                "market_impact": market_impact,
-                "raw_text": text
-            }
+        Returns:
+            Processed sentiment data
+        """
+        try:
+            text = self._news_text(news_data)
+            return self._build_news_result(news_data, text, await self.analyze_sentiment_async(text))
             
         except Exception as e:
             logger.error(f"Error processing news: {str(e)}")
             raise
             
+    def _news_text(self, news_data: Dict[str, Any]) -> str:
+        # Combine title and content
+        return f"{news_data.get('title', '')} {news_data.get('content', '')}"
+        
+    def _build_news_result(
+        self,
+        news_data: Dict[str, Any],
+        text: str,
+        sentiment_scores: Dict[str, float]
+    ) -> Dict[str, Any]:
+        keywords = self._extract_keywords(text)
+        return {
+            "timestamp": news_data.get("timestamp", datetime.now().isoformat()),
+            "source": news_data.get("source", ""),
+            "sentiment_scores": sentiment_scores,
+            "keywords": keywords,
+            "market_impact": self._calculate_market_impact(sentiment_scores, keywords),
+            "raw_text": text
+        }
+        
     def process_social_media(self, post_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process social media post
         
@@ -100,33 +282,62 @@ class SentimentAdapter:
             Processed sentiment data
         """
         try:
-            # Extract text
             text = post_data.get("text", "")
-            platform = post_data.get("platform", "")
-            timestamp = post_data.get("timestamp", datetime.now().isoformat())
-            
-            # Get sentiment scores
-            sentiment_scores = self._analyze_sentiment(text)
+            return self._build_social_media_result(post_data, text, self._analyze_sentiment(text))
             
-            # Extract keywords
-            keywords = self._extract_keywords(text)
+        except Exception as e:
+            logger.error(f"Error processing social media: {str(e)}")
+            raise
             
-            # Get market impact
-            market_impact = self._calculate_market_impact(sentiment_scores, keywords)
+    async def process_social_media_async(self, post_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Process social media post, scoring it in the next sentiment batch
+        
+        Args:
+            post_data: Social media post data
             
-            return {
-                "timestamp": timestamp,
-                "platform": platform,
-                "sentiment_scores": sentiment_scores,
-                "keywords": keywords,
-                "market_impact": market_impact,
-                "raw_text": text
-            }
+        Returns:
+            Processed sentiment data
+        """
+        try:
+            text = post_data.get("text", "")
+            return self._build_social_media_result(post_data, text, await self.analyze_sentiment_async(text))
             
         except Exception as e:
             logger.error(f"Error processing social media: {str(e)}")
             raise
             
+    def _build_social_media_result(
+        self,
+        post_data: Dict[str, Any],
+        text: str,
+        sentiment_scores: Dict[str, float]
+    ) -> Dict[str, Any]:
+        keywords = self._extract_keywords(text)
+        return {
+            "timestamp": post_data.get("timestamp", datetime.now().isoformat()),
+            "platform": post_data.get("platform", ""),
+            "sentiment_scores": sentiment_scores,
+            "keywords": keywords,
+            "market_impact": self._calculate_market_impact(sentiment_scores, keywords),
+            "raw_text": text
+        }
+        
+    @staticmethod
+    def _text_key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        
+    def _cache_get(self, key: bytes) -> Optional[Dict[str, float]]:
+        scores = self.cache.get(key)
+        if scores is not None:
+            self.cache.move_to_end(key)
+        return scores
+        
+    def _cache_put(self, key: bytes, scores: Dict[str, float]):
+        self.cache[key] = scores
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+            
     def _analyze_sentiment(self, text: str) -> Dict[str, float]:
         """Analyze sentiment of text
         
@@ -137,24 +348,146 @@ class SentimentAdapter:
             Dictionary of sentiment scores
         """
         try:
-            # Get transformer sentiment
-            transformer_result = self.sentiment_analyzer(text)[0]
-            
-            # Get TextBlob sentiment
-            blob = TextBlob(text)
-            textblob_sentiment = blob.sentiment
-            
-            return {
-                "transformer_score": transformer_result["score"],
-                "transformer_label": transformer_result["label"],
-                "textblob_polarity": textblob_sentiment.polarity,
-                "textblob_subjectivity": textblob_sentiment.subjectivity
-            }
+            return self.analyze_batch([text])[0]
             
         except Exception as e:
             logger.error(f"Error analyzing sentiment: {str(e)}")
             raise
             
+    def analyze_batch(self, texts: List[str]) -> List[Dict[str, float]]:
+        """Analyze sentiment of several texts, blocking until they are scored
+        
+        Texts are deduplicated and looked up in the cache; the rest are scored
+        on the pool in batches of max_batch_size.
+        
+        Args:
+            texts: Texts to analyze
+            
+        Returns:
+            Dictionary of sentiment scores per text, in input order
+        """
+        keys = [self._text_key(text) for text in texts]
+        self.stats["requests"] += len(texts)
+        
+        scored: Dict[bytes, Dict[str, float]] = {}
+        missing: Dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            if key in scored or key in missing:
+                continue
+            scores = self._cache_get(key)
+            if scores is None:
+                missing[key] = text
+            else:
+                scored[key] = scores
+        self.stats["cache_hits"] += len(texts) - len(missing)
+        
+        items = list(missing.items())
+        batches = [items[i:i + self.max_batch_size] for i in range(0, len(items), self.max_batch_size)]
+        results = [self.executor.submit(self._score_batch, [text for _, text in batch]) for batch in batches]
+        for batch, result in zip(batches, results):
+            self.stats["batches"] += 1
+            self.stats["texts_scored"] += len(batch)
+            for (key, _), scores in zip(batch, result.result()):
+                self._cache_put(key, scores)
+                scored[key] = scores
+                
+        return [dict(scored[key]) for key in keys]
+        
+    async def analyze_sentiment_async(self, text: str) -> Dict[str, float]:
+        """Analyze sentiment of text in the next micro-batch
+        
+        The text waits up to batch_window_ms for others to join its batch (or
+        until max_batch_size texts are pending); the batch is then scored on the
+        pool without blocking the event loop. Identical texts share one score.
+        
+        Args:
+            text: Text to analyze
+            
+        Returns:
+            Dictionary of sentiment scores
+        """
+        key = self._text_key(text)
+        self.stats["requests"] += 1
+        
+        scores = self._cache_get(key)
+        if scores is not None:
+            self.stats["cache_hits"] += 1
+            return dict(scores)
+            
+        future = self.inflight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self.inflight[key] = future
+            self.pending.append((key, text))
+            if len(self.pending) >= self.max_batch_size:
+                self._flush()
+            elif self.flush_handle is None:
+                self.flush_handle = loop.call_later(self.batch_window, self._flush)
+        else:
+            self.stats["joined"] += 1
+            
+        # A cancelled caller must not cancel the score other callers wait for
+        return dict(await asyncio.shield(future))
+        
+    def _flush(self):
+        """Send the pending texts to the pool as one batch"""
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        batch, self.pending = self.pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self.batch_tasks.add(task)
+            task.add_done_callback(self.batch_tasks.discard)
+            
+    async def _run_batch(self, batch: List[Tuple[bytes, str]]):
+        """Score a batch on the pool and resolve its futures
+        
+        Args:
+            batch: (text hash, text) pairs
+        """
+        self.stats["batches"] += 1
+        self.stats["texts_scored"] += len(batch)
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self._score_batch, [text for _, text in batch]
+            )
+        except Exception as e:
+            logger.error(f"Error analyzing sentiment batch of {len(batch)} texts: {str(e)}")
+            for key, _ in batch:
+                future = self.inflight.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+            
+        for (key, _), scores in zip(batch, results):
+            self._cache_put(key, scores)
+            future = self.inflight.pop(key, None)
+            if future is not None and not future.done():
+                future.set_result(scores)
+                
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batching and cache statistics
+        
+        Returns:
+            Request, cache hit and batch counters with the mean batch size
+        """
+        batches = self.stats["batches"]
+        return dict(
+            self.stats,
+            mean_batch_size=self.stats["texts_scored"] / batches if batches else 0.0,
+            cache_entries=len(self.cache),
+            pending=len(self.pending)
+        )
+        
+    def close(self):
+        """Shut down the scoring pool, dropping batches that have not started"""
+        if sys.version_info >= (3, 9):
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        else:
+            self.executor.shutdown(wait=False)
+        
     def _extract_keywords(self, text: str) -> Dict[str, List[str]]:
         """Extract keywords from text
         
@@ -168,15 +501,9 @@ class SentimentAdapter:
             # Convert text to lowercase
             text_lower = text.lower()
             
-            # Find market keywords
-            market_matches = [k for k in self.market_keywords if k.lower() in text_lower]
-            
-            # Find sector keywords
-            sector_matches = [k for k in self.sector_keywords if k.lower() in text_lower]
-            
             return {
-                "market_keywords": market_matches,
-                "sector_keywords": sector_matches
+                "market_keywords": self.market_matcher.find(text_lower),
+                "sector_keywords": self.sector_matcher.find(text_lower)
             }
             
         except Exception as e:
@@ -0,0 +1,498 @@
+"""
+Shared LRU/TTL Cache
+
+In-memory cache shared by the data connectors and processors. Entries live in
+namespaces that carry their own TTL and stale-while-revalidate window; the cache
+as a whole is bounded by entry count and by approximate size in bytes, evicting the
+least recently used entries first. Hits, misses, stale hits, expirations and
+evictions are counted per namespace.
+"""
+
+import sys
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Callable, Hashable, Awaitable
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Items sampled when estimating the size of large containers
+SIZE_SAMPLE = 8
+
+
+def estimate_size(value: Any, depth: int = 3) -> int:
+    """
+    Approximate the memory footprint of a value in bytes
+
+    Arrays and DataFrames report their buffers; containers are estimated from a
+    sample of their items, so the cost does not grow with the container size.
+
+    Args:
+        value: Value to measure
+        depth: How many container levels to descend into
+
+    Returns:
+        Estimated size in bytes
+    """
+    if isinstance(value, pd.DataFrame):
+        # Row count times dtype widths; DataFrame.memory_usage builds a Series per call
+        # and is ~10x slower, which shows up when caching frames on every bar
+        row_bytes = sum(getattr(dtype, "itemsize", 8) for dtype in value.dtypes.tolist())
+        return int(value.index.nbytes + len(value) * row_bytes)
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=False))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes) + 112
+    if isinstance(value, (str, bytes, bytearray, int, float, bool)) or value is None:
+        return sys.getsizeof(value)
+
+    size = sys.getsizeof(value)
+    if depth <= 0:
+        return size
+
+    if isinstance(value, dict):
+        items = list(value.items())
+        sample = items[:SIZE_SAMPLE]
+        if sample:
+            per_item = sum(estimate_size(k, depth - 1) + estimate_size(v, depth - 1) for k, v in sample) / len(sample)
+            size += int(per_item * len(items))
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        items = value if isinstance(value, (list, tuple)) else list(value)
+        sample = items[:SIZE_SAMPLE]
+        if sample:
+            per_item = sum(estimate_size(v, depth - 1) for v in sample) / len(sample)
+            size += int(per_item * len(items))
+    elif hasattr(value, "__dict__"):
+        size += estimate_size(vars(value), depth - 1)
+    elif hasattr(value, "__slots__"):
+        size += sum(estimate_size(getattr(value, slot, None), depth - 1) for slot in value.__slots__)
+
+    return size
+
+
+class CacheEntry:
+    """A cached value with its freshness deadlines"""
+
+    __slots__ = ("value", "expires_at", "stale_until", "size")
+
+    def __init__(self, value: Any, expires_at: float, stale_until: float, size: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+        self.size = size
+
+
+class LRUCache:
+    """Bounded LRU cache with per-namespace TTLs and stale-while-revalidate"""
+
+    COUNTERS = ("hits", "stale_hits", "misses", "sets", "expirations", "evictions")
+
+    def __init__(
+        self,
+        max_entries: int = 100000,
+        max_bytes: int = 512 * 1024 * 1024,
+        default_ttl: Optional[float] = 300.0,
+        default_stale_ttl: float = 0.0,
+        sizeof: Callable[[Any], int] = estimate_size
+    ):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum number of entries across all namespaces
+            max_bytes: Maximum approximate total size of cached values
+            default_ttl: Seconds an entry stays fresh (None = no expiry)
+            default_stale_ttl: Seconds after expiry an entry may still be served
+                by get_or_load while it is refreshed
+            sizeof: Function estimating the size of a value in bytes
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.default_stale_ttl = default_stale_ttl
+        self.sizeof = sizeof
+
+        self.entries: "OrderedDict[tuple, CacheEntry]" = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.RLock()
+
+        self.namespace_config: Dict[str, Dict[str, Any]] = {}
+        self.stats_by_namespace: Dict[str, Dict[str, int]] = {}
+        self.refreshing = set()
+
+    def configure_namespace(self, namespace: str, ttl: Optional[float] = None,
+                            stale_ttl: Optional[float] = None):
+        """
+        Set the TTL and stale window used for a namespace's entries
+
+        Args:
+            namespace: Namespace name
+            ttl: Seconds entries stay fresh (None = cache default)
+            stale_ttl: Seconds after expiry entries may be served stale (None = cache default)
+        """
+        with self.lock:
+            config = self.namespace_config.setdefault(namespace, {})
+            if ttl is not None:
+                config["ttl"] = ttl
+            if stale_ttl is not None:
+                config["stale_ttl"] = stale_ttl
+
+    def namespace(self, name: str, ttl: Optional[float] = None,
+                  stale_ttl: Optional[float] = None) -> "CacheNamespace":
+        """
+        Get a view of the cache bound to one namespace
+
+        Args:
+            name: Namespace name
+            ttl: TTL for the namespace (None = keep current setting)
+            stale_ttl: Stale window for the namespace (None = keep current setting)
+        """
+        self.configure_namespace(name, ttl, stale_ttl)
+        return CacheNamespace(self, name)
+
+    def _count(self, namespace: str, counter: str, amount: int = 1):
+        stats = self.stats_by_namespace.get(namespace)
+        if stats is None:
+            stats = self.stats_by_namespace[namespace] = dict.fromkeys(self.COUNTERS, 0)
+        stats[counter] += amount
+
+    def _remove(self, full_key: tuple, counter: Optional[str] = None):
+        entry = self.entries.pop(full_key, None)
+        if entry is not None:
+            self.total_bytes -= entry.size
+            if counter:
+                self._count(full_key[0], counter)
+
+    def _lookup(self, namespace: str, key: Hashable, allow_stale: bool):
+        """
+        Find an entry, dropping it if past its stale window
+
+        Returns:
+            Tuple of (entry or None, is_stale)
+        """
+        full_key = (namespace, key)
+        entry = self.entries.get(full_key)
+        if entry is None:
+            return None, False
+
+        now = time.monotonic()
+        if now < entry.expires_at:
+            self.entries.move_to_end(full_key)
+            return entry, False
+
+        if allow_stale and now < entry.stale_until:
+            self.entries.move_to_end(full_key)
+            return entry, True
+
+        if now >= entry.stale_until:
+            self._remove(full_key, "expirations")
+        return None, False
+
+    def get(self, key: Hashable, namespace: str = "default", default: Any = None,
+            allow_stale: bool = False) -> Any:
+        """
+        Get a cached value
+
+        Args:
+            key: Cache key
+            namespace: Namespace
+            default: Value returned on a miss
+            allow_stale: Also return entries that expired but are within their stale window
+
+        Returns:
+            The cached value, or default
+        """
+        with self.lock:
+            entry, stale = self._lookup(namespace, key, allow_stale)
+            if entry is None:
+                self._count(namespace, "misses")
+                return default
+            self._count(namespace, "stale_hits" if stale else "hits")
+            return entry.value
+
+    def contains(self, key: Hashable, namespace: str = "default") -> bool:
+        """Check whether a fresh entry exists (does not count as a hit or miss)"""
+        with self.lock:
+            entry = self.entries.get((namespace, key))
+            return entry is not None and time.monotonic() < entry.expires_at
+
+    def set(self, key: Hashable, value: Any, namespace: str = "default",
+            ttl: Optional[float] = None, stale_ttl: Optional[float] = None,
+            size: Optional[int] = None):
+        """
+        Store a value
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            namespace: Namespace
+            ttl: Seconds the entry stays fresh (None = namespace/cache default)
+            stale_ttl: Stale window in seconds (None = namespace/cache default)
+            size: Size in bytes if known (None = estimate)
+        """
+        if size is None:
+            size = self.sizeof(value)
+
+        with self.lock:
+            config = self.namespace_config.get(namespace, {})
+            if ttl is None:
+                ttl = config.get("ttl", self.default_ttl)
+            if stale_ttl is None:
+                stale_ttl = config.get("stale_ttl", self.default_stale_ttl)
+
+            full_key = (namespace, key)
+            self._remove(full_key)
+
+            if size > self.max_bytes:
+                logger.debug(f"Not caching {namespace}:{key}: {size} bytes exceeds cache size")
+                return
+
+            now = time.monotonic()
+            expires_at = now + ttl if ttl is not None else float("inf")
+            self.entries[full_key] = CacheEntry(value, expires_at, expires_at + stale_ttl, size)
+            self.total_bytes += size
+            self._count(namespace, "sets")
+
+            self._evict()
+
+    def _evict(self):
+        """Evict least recently used entries until the cache is within its bounds"""
+        while self.entries and (len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes):
+            oldest = next(iter(self.entries))
+            self._remove(oldest, "evictions")
+
+    def delete(self, key: Hashable, namespace: str = "default") -> bool:
+        """Delete an entry. Returns True if it existed."""
+        with self.lock:
+            existed = (namespace, key) in self.entries
+            self._remove((namespace, key))
+            return existed
+
+    def clear(self, namespace: Optional[str] = None):
+        """Remove all entries, or all entries of one namespace"""
+        with self.lock:
+            if namespace is None:
+                self.entries.clear()
+                self.total_bytes = 0
+                return
+            for full_key in [k for k in self.entries if k[0] == namespace]:
+                self._remove(full_key)
+
+    def keys(self, namespace: str = "default") -> List[Hashable]:
+        """List keys in a namespace, least recently used first"""
+        with self.lock:
+            return [key for ns, key in self.entries if ns == namespace]
+
+    def purge_expired(self) -> int:
+        """Remove entries past their stale window. Returns the number removed."""
+        with self.lock:
+            now = time.monotonic()
+            expired = [k for k, entry in self.entries.items() if now >= entry.stale_until]
+            for full_key in expired:
+                self._remove(full_key, "expirations")
+            return len(expired)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], namespace: str = "default",
+                    ttl: Optional[float] = None) -> Any:
+        """
+        Get a value, loading it on a miss
+
+        A stale entry is returned immediately while a background thread reloads it.
+
+        Args:
+            key: Cache key
+            loader: Function returning the fresh value
+            namespace: Namespace
+            ttl: TTL for the loaded value (None = namespace/cache default)
+        """
+        with self.lock:
+            entry, stale = self._lookup(namespace, key, allow_stale=True)
+            if entry is not None:
+                self._count(namespace, "stale_hits" if stale else "hits")
+                if stale and self._begin_refresh(namespace, key):
+                    threading.Thread(
+                        target=self._refresh, args=(key, loader, namespace, ttl), daemon=True
+                    ).start()
+                return entry.value
+            self._count(namespace, "misses")
+
+        value = loader()
+        self.set(key, value, namespace, ttl)
+        return value
+
+    async def get_or_load_async(self, key: Hashable, loader: Callable[[], Awaitable[Any]],
+                                namespace: str = "default", ttl: Optional[float] = None) -> Any:
+        """
+        Async version of get_or_load; stale entries are refreshed in a background task
+
+        Args:
+            key: Cache key
+            loader: Coroutine function returning the fresh value
+            namespace: Namespace
+            ttl: TTL for the loaded value (None = namespace/cache default)
+        """
+        with self.lock:
+            entry, stale = self._lookup(namespace, key, allow_stale=True)
+            if entry is not None:
+                self._count(namespace, "stale_hits" if stale else "hits")
+                if stale and self._begin_refresh(namespace, key):
+                    asyncio.ensure_future(self._refresh_async(key, loader, namespace, ttl))
+                return entry.value
+            self._count(namespace, "misses")
+
+        value = await loader()
+        self.set(key, value, namespace, ttl)
+        return value
+
+    def _begin_refresh(self, namespace: str, key: Hashable) -> bool:
+        """Claim the refresh of a stale entry; False if one is already running"""
+        if (namespace, key) in self.refreshing:
+            return False
+        self.refreshing.add((namespace, key))
+        return True
+
+    def _refresh(self, key: Hashable, loader: Callable[[], Any], namespace: str, ttl: Optional[float]):
+        try:
+            self.set(key, loader(), namespace, ttl)
+        except Exception as e:
+            logger.warning(f"Error refreshing cache entry {namespace}:{key}: {str(e)}")
+        finally:
+            with self.lock:
+                self.refreshing.discard((namespace, key))
+
+    async def _refresh_async(self, key: Hashable, loader: Callable[[], Awaitable[Any]],
+                             namespace: str, ttl: Optional[float]):
+        try:
+            self.set(key, await loader(), namespace, ttl)
+        except Exception as e:
+            logger.warning(f"Error refreshing cache entry {namespace}:{key}: {str(e)}")
+        finally:
+            with self.lock:
+                self.refreshing.discard((namespace, key))
+
+    def get_stats(self, namespace: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get cache counters
+
+        Args:
+            namespace: Namespace to report (None = totals over all namespaces)
+
+        Returns:
+            Dictionary with counters, entry count, size and hit rate
+        """
+        with self.lock:
+            if namespace is None:
+                stats = dict.fromkeys(self.COUNTERS, 0)
+                for ns_stats in self.stats_by_namespace.values():
+                    for counter, value in ns_stats.items():
+                        stats[counter] += value
+                stats["entries"] = len(self.entries)
+                stats["bytes"] = self.total_bytes
+                stats["max_entries"] = self.max_entries
+                stats["max_bytes"] = self.max_bytes
+            else:
+                stats = dict(self.stats_by_namespace.get(namespace, dict.fromkeys(self.COUNTERS, 0)))
+                sizes = [entry.size for (ns, _), entry in self.entries.items() if ns == namespace]
+                stats["entries"] = len(sizes)
+                stats["bytes"] = sum(sizes)
+                stats.update(self.namespace_config.get(namespace, {}))
+
+            lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+            stats["hit_rate"] = (stats["hits"] + stats["stale_hits"]) / lookups if lookups else 0.0
+            return stats
+
+
+class CacheNamespace:
+    """View of an LRUCache bound to one namespace, usable like a dict"""
+
+    def __init__(self, cache: LRUCache, name: str):
+        self.cache = cache
+        self.name = name
+
+    def get(self, key: Hashable, default: Any = None, allow_stale: bool = False) -> Any:
+        return self.cache.get(key, self.name, default, allow_stale)
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None,
+            stale_ttl: Optional[float] = None, size: Optional[int] = None):
+        self.cache.set(key, value, self.name, ttl, stale_ttl, size)
+
+    def delete(self, key: Hashable) -> bool:
+        return self.cache.delete(key, self.name)
+
+    def clear(self):
+        self.cache.clear(self.name)
+
+    def keys(self) -> List[Hashable]:
+        return self.cache.keys(self.name)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        return self.cache.get_or_load(key, loader, self.name, ttl)
+
+    async def get_or_load_async(self, key: Hashable, loader: Callable[[], Awaitable[Any]],
+                                ttl: Optional[float] = None) -> Any:
+        return await self.cache.get_or_load_async(key, loader, self.name, ttl)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self.cache.get_stats(self.name)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.cache.contains(key, self.name)
+
+    def __getitem__(self, key: Hashable) -> Any:
+        missing = object()
+        value = self.cache.get(key, self.name, missing)
+        if value is missing:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any):
+        self.cache.set(key, value, self.name)
+
+    def __delitem__(self, key: Hashable):
+        if not self.cache.delete(key, self.name):
+            raise KeyError(key)
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+
+_shared_cache: Optional[LRUCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_cache() -> LRUCache:
+    """Get the process-wide cache, creating it with default limits on first use"""
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                _shared_cache = LRUCache()
+    return _shared_cache
+
+
+def configure_shared_cache(config: Dict[str, Any]) -> LRUCache:
+    """
+    Set the limits of the process-wide cache
+
+    Args:
+        config: Dictionary with optional max_entries, max_bytes, default_ttl,
+            default_stale_ttl and a "namespaces" mapping of name -> {ttl, stale_ttl}
+
+    Returns:
+        The shared cache
+    """
+    cache = get_shared_cache()
+    with cache.lock:
+        cache.max_entries = config.get("max_entries", cache.max_entries)
+        cache.max_bytes = config.get("max_bytes", cache.max_bytes)
+        cache.default_ttl = config.get("default_ttl", cache.default_ttl)
+        cache.default_stale_ttl = config.get("default_stale_ttl", cache.default_stale_ttl)
+        for name, ns_config in config.get("namespaces", {}).items():
+            cache.configure_namespace(name, ns_config.get("ttl"), ns_config.get("stale_ttl"))
+        cache._evict()
+    return cache
@@ -5,5 +5,6 @@ This package contains the data components for the WarMachine trading platform.
 """
 
 from .market_data_hub import MarketDataHub
+from .bar_store import BarStore
 
-__all__ = ['MarketDataHub'] 
\ No newline at end of file
+__all__ = ['MarketDataHub', 'BarStore'] 
\ No newline at end of file
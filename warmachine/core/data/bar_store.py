@@ -0,0 +1,406 @@
+"""
+Columnar Bar Store
+
+On-disk store for OHLCV-style bar data, partitioned by data type, symbol, timeframe
+and date:
+
+    <root>/<data_type>/<symbol>/<timeframe>/<partition>/<column>.bin
+
+Each column of a partition is a raw little-endian NumPy array; timestamps are int64
+nanoseconds since the epoch (UTC) and are kept sorted. Reads memory-map only the
+requested columns and slice them by timestamp with a binary search, so a range query
+that falls inside one partition returns a DataFrame backed directly by the mapped
+files, without parsing or copying. Appends of newer bars write only the new rows.
+
+Intraday timeframes are partitioned by month, daily and weekly bars by year.
+"""
+
+import os
+import json
+import shutil
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+TIMESTAMP_COLUMN = "timestamp"
+META_FILE = "_meta.json"
+
+# Column names looked for when a DataFrame has no DatetimeIndex
+TIMESTAMP_FIELDS = ["timestamp", "time", "datetime", "date", "Date", "Datetime"]
+
+
+def _safe_name(name: str) -> str:
+    """Make a symbol or timeframe usable as a directory name"""
+    return str(name).replace("/", "_").replace("\\", "_").replace(":", "_")
+
+
+class BarStore:
+    """Partitioned, memory-mapped columnar store for time-indexed bars"""
+
+    def __init__(self, root: str, partition: Optional[str] = None):
+        """
+        Initialize the bar store
+
+        Args:
+            root: Root directory of the store
+            partition: Partition size ("D", "M" or "Y"); None = by timeframe
+        """
+        self.root = root
+        self.partition = partition
+        self.lock = threading.RLock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _series_dir(self, data_type: str, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.root, _safe_name(data_type), _safe_name(symbol), _safe_name(timeframe or "default"))
+
+    def _partition_unit(self, timeframe: str) -> str:
+        """Get the NumPy datetime unit used to partition a timeframe"""
+        if self.partition:
+            return self.partition
+        if timeframe and timeframe[-1:] in ("d", "w", "M"):
+            return "Y"
+        return "M"
+
+    @staticmethod
+    def _read_json(path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _write_json(path: str, data: Dict[str, Any]):
+        """Write a JSON file atomically"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _column_path(partition_dir: str, column: str) -> str:
+        return os.path.join(partition_dir, f"{column}.bin")
+
+    def list_partitions(self, data_type: str, symbol: str, timeframe: str) -> List[str]:
+        """
+        List partitions of a series, oldest first
+
+        Returns:
+            Partition names (e.g. "2024-01" for monthly partitions)
+        """
+        series_dir = self._series_dir(data_type, symbol, timeframe)
+        if not os.path.isdir(series_dir):
+            return []
+        return sorted(
+            name for name in os.listdir(series_dir)
+            if not name.startswith((".", "_")) and not name.endswith((".tmp", ".old"))
+            and os.path.isdir(os.path.join(series_dir, name))
+        )
+
+    def get_schema(self, data_type: str, symbol: str, timeframe: str) -> Optional[Dict[str, Any]]:
+        """Get the stored column schema of a series, or None if it does not exist"""
+        return self._read_json(os.path.join(self._series_dir(data_type, symbol, timeframe), META_FILE))
+
+    def _partition_rows(self, partition_dir: str) -> int:
+        meta = self._read_json(os.path.join(partition_dir, META_FILE))
+        return meta["rows"] if meta else 0
+
+    @staticmethod
+    def _extract_timestamps(df: pd.DataFrame):
+        """
+        Get UTC nanosecond timestamps for a DataFrame's rows
+
+        Returns:
+            Tuple of (int64 timestamps, timezone name or None, index name, timestamp column or None)
+        """
+        column = None
+        if isinstance(df.index, pd.DatetimeIndex):
+            index = df.index
+            name = df.index.name or TIMESTAMP_COLUMN
+        else:
+            column = next((c for c in TIMESTAMP_FIELDS if c in df.columns), None)
+            if column is None:
+                raise ValueError("DataFrame has no DatetimeIndex or timestamp column")
+            values = df[column]
+            if pd.api.types.is_numeric_dtype(values):
+                index = pd.DatetimeIndex(pd.to_datetime(values, unit="ms"))
+            else:
+                index = pd.DatetimeIndex(pd.to_datetime(values))
+            name = column
+
+        tz = None
+        if index.tz is not None:
+            tz = str(index.tz)
+            index = index.tz_convert(None)
+
+        timestamps = np.asarray(index, dtype="datetime64[ns]").view(np.int64)
+        return timestamps, tz, name, column
+
+    def append(self, data_type: str, symbol: str, timeframe: str, df: pd.DataFrame) -> int:
+        """
+        Append bars to a series
+
+        Rows newer than everything stored are appended in place; rows overlapping
+        stored data are merged into their partition, replacing stored rows with the
+        same timestamp. The numeric columns of the first write fix the series schema;
+        later writes must have the same columns.
+
+        Args:
+            data_type: Type of data (e.g. DataType.STOCK_BARS)
+            symbol: Symbol
+            timeframe: Time frame
+            df: Bars with a DatetimeIndex or a timestamp column
+
+        Returns:
+            Number of rows written
+
+        Raises:
+            ValueError: If the columns do not match the stored schema
+        """
+        if df is None or df.empty:
+            return 0
+
+        timestamps, tz, index_name, timestamp_column = self._extract_timestamps(df)
+
+        with self.lock:
+            series_dir = self._series_dir(data_type, symbol, timeframe)
+            os.makedirs(series_dir, exist_ok=True)
+
+            columns = {
+                str(c): df[c].dtype.str for c in df.columns
+                if c != timestamp_column and isinstance(df[c].dtype, np.dtype) and df[c].dtype.kind in "biuf"
+            }
+            skipped = [str(c) for c in df.columns if c != timestamp_column and str(c) not in columns]
+            if skipped:
+                logger.debug(f"Not storing non-numeric columns {skipped} for {symbol}")
+
+            schema = self.get_schema(data_type, symbol, timeframe)
+            if schema is None:
+                schema = {"columns": columns, "tz": tz, "index_name": index_name,
+                          "partition": self._partition_unit(timeframe)}
+                self._write_json(os.path.join(series_dir, META_FILE), schema)
+            else:
+                # Columns are fixed by the first write; filling or dropping them here
+                # would store made-up values that later reads cannot tell apart
+                missing = [c for c in schema["columns"] if c not in columns]
+                unknown = [c for c in columns if c not in schema["columns"]]
+                if missing or unknown:
+                    raise ValueError(
+                        f"Columns of {symbol} {timeframe} bars do not match the stored schema "
+                        f"(missing: {missing}, not in schema: {unknown})"
+                    )
+
+            arrays = {}
+            for column, dtype in schema["columns"].items():
+                values = df[column].to_numpy()
+                dtype = np.dtype(dtype)
+                if dtype.kind in "biu" and values.dtype.kind == "f" and np.isnan(values).any():
+                    raise ValueError(f"Column {column} of {symbol} {timeframe} bars has missing values "
+                                     f"but is stored as {dtype}")
+                arrays[column] = values.astype(dtype, copy=False)
+
+            # Sort and de-duplicate incoming rows, keeping the last value per timestamp
+            order = np.argsort(timestamps, kind="stable")
+            timestamps = timestamps[order]
+            keep = np.ones(len(timestamps), dtype=bool)
+            keep[:-1] = timestamps[1:] != timestamps[:-1]
+            timestamps = timestamps[keep]
+            arrays = {column: values[order][keep] for column, values in arrays.items()}
+
+            # Split by partition
+            unit = schema.get("partition", "M")
+            keys = timestamps.view("datetime64[ns]").astype(f"datetime64[{unit}]")
+            bounds = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+            starts = np.concatenate([[0], bounds])
+            ends = np.concatenate([bounds, [len(timestamps)]])
+
+            for start, end in zip(starts, ends):
+                partition = str(keys[start])
+                self._write_partition(
+                    os.path.join(series_dir, partition),
+                    timestamps[start:end],
+                    {column: values[start:end] for column, values in arrays.items()},
+                    schema
+                )
+
+            return len(timestamps)
+
+    def _write_partition(self, partition_dir: str, timestamps: np.ndarray,
+                         arrays: Dict[str, np.ndarray], schema: Dict[str, Any]):
+        """Append sorted rows to one partition, merging if they overlap stored rows"""
+        rows = self._partition_rows(partition_dir)
+
+        if rows > 0:
+            stored = np.memmap(self._column_path(partition_dir, TIMESTAMP_COLUMN), dtype=np.int64, mode='r', shape=(rows,))
+            last_stored = int(stored[-1])
+            del stored
+
+            if timestamps[0] <= last_stored:
+                self._merge_partition(partition_dir, rows, timestamps, arrays, schema)
+                return
+        else:
+            os.makedirs(partition_dir, exist_ok=True)
+
+        # Fast path: write only the new rows. Files are truncated to the committed row
+        # count first, discarding any bytes from an append that died before its meta update.
+        for column, values in [(TIMESTAMP_COLUMN, timestamps)] + list(arrays.items()):
+            path = self._column_path(partition_dir, column)
+            with open(path, 'ab') as f:
+                f.truncate(rows * values.dtype.itemsize)
+                f.write(np.ascontiguousarray(values).tobytes())
+
+        self._write_json(os.path.join(partition_dir, META_FILE), {"rows": rows + len(timestamps)})
+
+    def _merge_partition(self, partition_dir: str, rows: int, timestamps: np.ndarray,
+                         arrays: Dict[str, np.ndarray], schema: Dict[str, Any]):
+        """Rewrite a partition with new rows merged in (new values win on equal timestamps)"""
+        stored_ts = np.fromfile(self._column_path(partition_dir, TIMESTAMP_COLUMN), dtype=np.int64, count=rows)
+        merged_ts = np.concatenate([stored_ts, timestamps])
+
+        order = np.argsort(merged_ts, kind="stable")
+        merged_ts = merged_ts[order]
+        # Within equal timestamps the stable sort keeps stored rows before new ones
+        keep = np.ones(len(merged_ts), dtype=bool)
+        keep[:-1] = merged_ts[1:] != merged_ts[:-1]
+
+        tmp_dir = partition_dir + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        merged_ts[keep].tofile(self._column_path(tmp_dir, TIMESTAMP_COLUMN))
+        for column, dtype in schema["columns"].items():
+            stored = np.fromfile(self._column_path(partition_dir, column), dtype=np.dtype(dtype), count=rows)
+            merged = np.concatenate([stored, arrays[column]])[order][keep]
+            merged.tofile(self._column_path(tmp_dir, column))
+        self._write_json(os.path.join(tmp_dir, META_FILE), {"rows": int(keep.sum())})
+
+        # Readers holding maps of the old files keep seeing the old data
+        old_dir = partition_dir + ".old"
+        shutil.rmtree(old_dir, ignore_errors=True)
+        os.rename(partition_dir, old_dir)
+        os.rename(tmp_dir, partition_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+    @staticmethod
+    def _to_ns(value: Union[str, datetime, pd.Timestamp, int, None], tz: Optional[str] = None) -> Optional[int]:
+        """Convert a timestamp argument to UTC epoch nanoseconds (naive values are in `tz`)"""
+        if value is None:
+            return None
+        ts = pd.Timestamp(value)
+        if ts.tzinfo is None and tz:
+            ts = ts.tz_localize(tz)
+        if ts.tzinfo is not None:
+            ts = ts.tz_convert(None)
+        return int(np.datetime64(ts.to_datetime64(), "ns").view(np.int64))
+
+    def read(self, data_type: str, symbol: str, timeframe: str,
+             start: Any = None, end: Any = None, columns: Optional[List[str]] = None,
+             limit: Optional[int] = None) -> pd.DataFrame:
+        """
+        Read bars from a series
+
+        Args:
+            data_type: Type of data
+            symbol: Symbol
+            timeframe: Time frame
+            start: Earliest timestamp to include (None = from the beginning); naive
+                timestamps are taken in the series' timezone
+            end: Latest timestamp to include (None = to the end)
+            columns: Columns to load (None = all)
+            limit: Return only the last `limit` rows of the range
+
+        Returns:
+            DataFrame indexed by timestamp; read-only and zero-copy when the range
+            falls in a single partition. Empty if nothing is stored.
+        """
+        schema = self.get_schema(data_type, symbol, timeframe)
+        if schema is None:
+            return pd.DataFrame()
+
+        if columns is None:
+            selected = list(schema["columns"].items())
+        else:
+            selected = [(c, schema["columns"][c]) for c in columns if c in schema["columns"]]
+            missing = [c for c in columns if c not in schema["columns"]]
+            if missing:
+                logger.warning(f"Columns {missing} not stored for {symbol} {timeframe}")
+
+        start_ns = self._to_ns(start, schema.get("tz"))
+        end_ns = self._to_ns(end, schema.get("tz"))
+        series_dir = self._series_dir(data_type, symbol, timeframe)
+        unit = schema.get("partition", "M")
+
+        # Choose partitions by name before touching any files
+        partitions = []
+        for name in self.list_partitions(data_type, symbol, timeframe):
+            first = np.datetime64(name, unit)
+            first_ns = int(first.astype("datetime64[ns]").view(np.int64))
+            next_ns = int((first + 1).astype("datetime64[ns]").view(np.int64))
+            if end_ns is not None and first_ns > end_ns:
+                continue
+            if start_ns is not None and next_ns <= start_ns:
+                continue
+            partitions.append(name)
+
+        if limit is not None:
+            partitions.reverse()
+
+        pieces = []
+        total = 0
+        for name in partitions:
+            partition_dir = os.path.join(series_dir, name)
+            rows = self._partition_rows(partition_dir)
+            if rows == 0:
+                continue
+
+            ts = np.memmap(self._column_path(partition_dir, TIMESTAMP_COLUMN), dtype=np.int64, mode='r', shape=(rows,))
+            lo = 0 if start_ns is None else int(np.searchsorted(ts, start_ns, side="left"))
+            hi = rows if end_ns is None else int(np.searchsorted(ts, end_ns, side="right"))
+            if limit is not None:
+                lo = max(lo, hi - (limit - total))
+            if hi <= lo:
+                continue
+
+            piece = {TIMESTAMP_COLUMN: ts[lo:hi]}
+            for column, dtype in selected:
+                values = np.memmap(self._column_path(partition_dir, column), dtype=np.dtype(dtype), mode='r', shape=(rows,))
+                piece[column] = values[lo:hi]
+            pieces.append(piece)
+
+            total += hi - lo
+            if limit is not None and total >= limit:
+                break
+
+        if not pieces:
+            return pd.DataFrame()
+
+        if limit is not None:
+            pieces.reverse()
+
+        if len(pieces) == 1:
+            data = pieces[0]
+        else:
+            data = {key: np.concatenate([piece[key] for piece in pieces]) for key in pieces[0]}
+
+        index = pd.DatetimeIndex(np.asarray(data.pop(TIMESTAMP_COLUMN)).view("datetime64[ns]"),
+                                 name=schema.get("index_name") or TIMESTAMP_COLUMN, copy=False)
+        if schema.get("tz"):
+            index = index.tz_localize("UTC").tz_convert(schema["tz"])
+
+        return pd.DataFrame(data, index=index, copy=False)
+
+    def last_timestamp(self, data_type: str, symbol: str, timeframe: str) -> Optional[pd.Timestamp]:
+        """Get the timestamp of the newest stored bar, or None if the series is empty"""
+        df = self.read(data_type, symbol, timeframe, columns=[], limit=1)
+        return df.index[-1] if len(df.index) else None
+
+    def delete(self, data_type: str, symbol: str, timeframe: str):
+        """Delete a series"""
+        with self.lock:
+            shutil.rmtree(self._series_dir(data_type, symbol, timeframe), ignore_errors=True)
@@ -10,9 +10,11 @@ import os
 import logging
 import json
 import time
+import asyncio
 import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Union, Callable
+from typing import Dict, List, Any, Optional, Union, Callable, Tuple
 import pandas as pd
 import numpy as np
 import yfinance as yf
@@ -20,6 +22,9 @@ from connectors.ibkr_connector import IBKRConnector
 from connectors.polygon_connector import PolygonConnector
 from connectors.alphavantage_connector import AlphaVantageConnector
 from connectors.binance_connector import BinanceConnector
+from connectors.http_client import TokenBucket
+from core.data.bar_store import BarStore, TIMESTAMP_FIELDS
+from core.cache import get_shared_cache, configure_shared_cache
 
 # Configure logging
 logging.basicConfig(
@@ -28,6 +33,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def normalize_bar_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Rename bar columns to lowercase snake_case ("Adj Close" -> "adj_close")"""
+    return df.rename(columns=lambda col: str(col).strip().lower().replace(" ", "_"))
+
 class DataType:
     """Enumeration of data types"""
     STOCK_BARS = "stock_bars"
@@ -62,38 +71,112 @@ class TimeFrame:
 class YahooFinanceConnector:
     """Yahoo Finance data connector"""
     
+    # yfinance interval names
+    INTERVALS = {
+        TimeFrame.MINUTE_1: "1m",
+        TimeFrame.MINUTE_5: "5m",
+        TimeFrame.MINUTE_15: "15m",
+        TimeFrame.MINUTE_30: "30m",
+        TimeFrame.HOUR_1: "1h",
+        TimeFrame.DAY_1: "1d",
+        TimeFrame.WEEK_1: "1wk"
+    }
+    
+    # Regular-session bars per trading day, used to size period requests
+    BARS_PER_DAY = {
+        TimeFrame.MINUTE_1: 390,
+        TimeFrame.MINUTE_5: 78,
+        TimeFrame.MINUTE_15: 26,
+        TimeFrame.MINUTE_30: 13,
+        TimeFrame.HOUR_1: 7,
+        TimeFrame.DAY_1: 1,
+        TimeFrame.WEEK_1: 0.2
+    }
+    
+    # Longest date range Yahoo serves per request (1m bars: 7 days, other intraday: 60 days)
+    BULK_CHUNK_DAYS = {
+        TimeFrame.MINUTE_1: 7,
+        TimeFrame.MINUTE_5: 59,
+        TimeFrame.MINUTE_15: 59,
+        TimeFrame.MINUTE_30: 59,
+        TimeFrame.HOUR_1: 729,
+        TimeFrame.DAY_1: 3650,
+        TimeFrame.WEEK_1: 3650
+    }
+    
+    # Symbols per yf.download call
+    BULK_MAX_SYMBOLS = 50
+    
     def __init__(self, config: Dict[str, Any] = None):
         """Initialize Yahoo Finance connector"""
         self.config = config or {}
+        self.tickers = {}
         logger.info("Yahoo Finance connector initialized")
     
+    def _ticker(self, symbol: str) -> "yf.Ticker":
+        """Reuse Ticker objects (and their HTTP session) across calls"""
+        ticker = self.tickers.get(symbol)
+        if ticker is None:
+            ticker = self.tickers[symbol] = yf.Ticker(symbol)
+        return ticker
+    
     def get_stock_data(self, symbol: str, timeframe: str = TimeFrame.MINUTE_1, limit: int = 100) -> pd.DataFrame:
         """Get stock data from Yahoo Finance"""
         try:
-            # Convert timeframe to yfinance interval
-            interval_map = {
-                TimeFrame.MINUTE_1: "1m",
-                TimeFrame.MINUTE_5: "5m",
-                TimeFrame.MINUTE_15: "15m",
-                TimeFrame.MINUTE_30: "30m",
-                TimeFrame.HOUR_1: "1h",
-                TimeFrame.DAY_1: "1d",
-                TimeFrame.WEEK_1: "1w"
-            }
-            interval = interval_map.get(timeframe, "1m")
+            interval = self.INTERVALS.get(timeframe, "1m")
+            
+            # Request enough calendar days for `limit` bars (weekends and holidays
+            # included), within the range Yahoo serves for the interval
+            bars_per_day = self.BARS_PER_DAY.get(timeframe, 1)
+            days = int(np.ceil(limit / bars_per_day * 7 / 5)) + 3
+            days = min(days, self.BULK_CHUNK_DAYS.get(timeframe, days))
             
             # Get data
-            stock = yf.Ticker(symbol)
-            data = stock.history(period=f"{limit}d", interval=interval)
-            return data
+            data = self._ticker(symbol).history(period=f"{days}d", interval=interval)
+            return data.tail(limit)
         except Exception as e:
             logger.error(f"Error getting Yahoo Finance data for {symbol}: {str(e)}")
             return pd.DataFrame()
     
+    def get_stock_history(self, symbols: List[str], timeframe: str, start: datetime,
+                          end: datetime) -> Dict[str, pd.DataFrame]:
+        """
+        Download bars for several symbols over a date range in one request
+        
+        Args:
+            symbols: Stock symbols (at most BULK_MAX_SYMBOLS)
+            timeframe: Time frame (from TimeFrame class)
+            start: Range start (inclusive)
+            end: Range end (exclusive)
+            
+        Returns:
+            Dictionary of symbol -> DataFrame with lowercase OHLCV columns
+        """
+        data = yf.download(
+            list(symbols), start=start, end=end, interval=self.INTERVALS.get(timeframe, "1d"),
+            group_by="ticker", auto_adjust=False, progress=False, threads=False
+        )
+        if data is None or data.empty:
+            return {}
+        
+        result = {}
+        for symbol in symbols:
+            if isinstance(data.columns, pd.MultiIndex):
+                if symbol not in data.columns.get_level_values(0):
+                    continue
+                frame = data[symbol]
+            else:
+                frame = data
+            frame = frame.dropna(how="all")
+            if frame.empty:
+                continue
+            result[symbol] = normalize_bar_columns(frame)
+        return result
+    
     def get_option_chain(self, symbol: str) -> Dict[str, Any]:
         """Get option chain from Yahoo Finance"""
         try:
-            stock = yf.Ticker(symbol)
+            stock = self._ticker(symbol)
             options = stock.options
             if not options:
                 return {}
@@ -119,8 +202,7 @@ class YahooFinanceConnector:
                 symbol = f"{symbol}-USD"
             
             # Get data
-            crypto = yf.Ticker(symbol)
-            data = crypto.history(period=f"{limit}d", interval=timeframe)
+            data = self._ticker(symbol).history(period=f"{limit}d", interval=timeframe)
             return data
         except Exception as e:
             logger.error(f"Error getting Yahoo Finance crypto data for {symbol}: {str(e)}")
@@ -129,6 +211,26 @@ class YahooFinanceConnector:
 class MarketDataHub:
     """Central hub for all market data"""
     
+    # Data types persisted in the columnar bar store
+    BAR_DATA_TYPES = (DataType.STOCK_BARS, DataType.CRYPTO_BARS)
+    
+    # Bar length per timeframe, used to find gaps in stored history
+    BAR_DURATIONS = {
+        TimeFrame.MINUTE_1: pd.Timedelta(minutes=1),
+        TimeFrame.MINUTE_5: pd.Timedelta(minutes=5),
+        TimeFrame.MINUTE_15: pd.Timedelta(minutes=15),
+        TimeFrame.MINUTE_30: pd.Timedelta(minutes=30),
+        TimeFrame.HOUR_1: pd.Timedelta(hours=1),
+        TimeFrame.DAY_1: pd.Timedelta(days=1),
+        TimeFrame.WEEK_1: pd.Timedelta(weeks=1)
+    }
+    
+    # Columns of bars in the bar store, whichever source or path wrote them
+    BAR_COLUMNS = ["open", "high", "low", "close", "volume"]
+    
+    # Default fields of bulk history panels
+    BULK_FIELDS = BAR_COLUMNS
+    
     def __init__(self, config: Dict[str, Any]):
         """
         Initialize the market data hub
@@ -138,7 +240,12 @@ class MarketDataHub:
         """
         self.config = config
         self.data_sources = {}
-        self.data_cache = {}
+        if "memory_cache" in config:
+            configure_shared_cache(config["memory_cache"])
+        # Bounded in-memory cache; entries carry their own fetch timestamp for the
+        # per-type freshness checks, the namespace TTL only limits how long they are kept
+        self.data_cache = get_shared_cache().namespace("market_data_hub", ttl=config.get("memory_cache_ttl", 3600))
+        self.max_cached_bars = config.get("max_cached_bars", 5000)
         self.last_update = {}
         self.callbacks = {}
         
@@ -146,9 +253,37 @@ class MarketDataHub:
         self.data_dir = "data/market"
         os.makedirs(self.data_dir, exist_ok=True)
         
+        # Columnar store for bar data
+        bar_store_config = self.config.get("bar_store", {})
+        self.bar_store = BarStore(
+            bar_store_config.get("path", os.path.join(self.data_dir, "bars")),
+            partition=bar_store_config.get("partition")
+        )
+        
         # Lock for thread safety
         self.lock = threading.RLock()
         
+        # Fetch path: remote calls run on worker threads, orchestrated on an
+        # event loop owned by the hub, with duplicate in-flight requests coalesced
+        self.cache_ttl = config.get("cache_ttl", 60)
+        self.hedge_delay = config.get("hedge_delay", 1.0)
+        self.source_timeout = config.get("source_timeout", 10.0)
+        self.source_timeouts = config.get("source_timeouts", {})
+        self.fetch_executor = ThreadPoolExecutor(
+            max_workers=config.get("fetch_workers", 8),
+            thread_name_prefix="market-data-fetch"
+        )
+        self.inflight: Dict[Tuple, Tuple[int, Future]] = {}
+        self.inflight_lock = threading.Lock()
+        self.loop = None
+        self.loop_thread = None
+        
+        # Bulk history downloads
+        self.bulk_concurrency = config.get("bulk_concurrency", 4)
+        self.market_timezone = config.get("market_timezone", "America/New_York")
+        bulk_rate = config.get("bulk_requests_per_second")
+        self.bulk_rate_limiter = TokenBucket(bulk_rate) if bulk_rate else None
+        
         # Initialize data sources based on config
         self._init_data_sources()
         
@@ -230,11 +365,193 @@ class MarketDataHub:
                     except Exception as e:
                         logger.error(f"Error in callback for {key}: {str(e)}")
     
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Get the hub's event loop, starting its thread on first use"""
+        with self.inflight_lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                self.loop_thread = threading.Thread(
+                    target=self.loop.run_forever, name="market-data-loop", daemon=True
+                )
+                self.loop_thread.start()
+            return self.loop
+    
+    def _get_cached_bars(self, cache_key: str, limit: int) -> Optional[pd.DataFrame]:
+        """Get bars from the in-memory cache if they are fresh and long enough"""
+        with self.lock:
+            cache_entry = self.data_cache.get(cache_key)
+            if cache_entry is None:
+                return None
+            age = datetime.now() - cache_entry["timestamp"]
+            if age.total_seconds() < self.cache_ttl and len(cache_entry["data"]) >= limit:
+                return cache_entry["data"].tail(limit)
+            return None
+    
+    def _get_stock_sources(self, source: str = None) -> Optional[List[Tuple[str, Any]]]:
+        """Get (name, connector) pairs to query for stock data, in priority order"""
+        if source:
+            if source not in self.data_sources:
+                return None
+            return [(source, self.data_sources[source])]
+        
+        # Priority order: IBKR -> Polygon -> Alpha Vantage -> Yahoo Finance
+        names = ["ibkr", "polygon", "alpha_vantage", "yahoo"]
+        return [(name, self.data_sources[name]) for name in names if name in self.data_sources]
+    
+    async def _hedged_fetch(self, sources: List[Tuple[str, Any]],
+                            call: Callable[[Any], pd.DataFrame]) -> Tuple[Optional[str], pd.DataFrame]:
+        """
+        Query sources in priority order, hedging slow ones
+        
+        The first source starts immediately. The next one starts as soon as a running
+        source fails, times out or returns nothing, or when none has answered within
+        hedge_delay seconds. The first non-empty result wins.
+        
+        Args:
+            sources: (name, connector) pairs in priority order
+            call: Blocking function fetching data from a connector (runs on a worker thread)
+            
+        Returns:
+            Tuple of (winning source name, data); (None, empty DataFrame) if all fail
+        """
+        loop = asyncio.get_running_loop()
+        remaining = list(sources)
+        pending = {}
+        
+        def launch():
+            name, connector = remaining.pop(0)
+            timeout = self.source_timeouts.get(name, self.source_timeout)
+            task = asyncio.ensure_future(
+                asyncio.wait_for(loop.run_in_executor(self.fetch_executor, call, connector), timeout)
+            )
+            pending[task] = name
+        
+        try:
+            if remaining:
+                launch()
+            
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending, timeout=self.hedge_delay if remaining else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                
+                if not done:
+                    # Hedge: the running sources are slow, start the next one too
+                    launch()
+                    continue
+                
+                for task in done:
+                    name = pending.pop(task)
+                    try:
+                        data = task.result()
+                    except asyncio.TimeoutError:
+                        logger.warning(f"Timed out getting data from {name}")
+                    except Exception as e:
+                        logger.warning(f"Error getting data from {name}: {str(e)}")
+                    else:
+                        if data is not None and not data.empty:
+                            return name, data
+                    
+                    if remaining:
+                        launch()
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        return None, pd.DataFrame()
+    
+    async def _fetch_stock_data(self, symbol: str, timeframe: str, limit: int,
+                                source: str = None) -> pd.DataFrame:
+        """Fetch stock bars from the sources and fill the caches"""
+        data_type = DataType.STOCK_BARS
+        sources = self._get_stock_sources(source)
+        if sources is None:
+            logger.error(f"Data source {source} not available")
+            return pd.DataFrame()
+        
+        name, data = await self._hedged_fetch(
+            sources, lambda connector: connector.get_stock_data(symbol, timeframe, limit)
+        )
+        if data.empty:
+            return data
+        
+        cache_key = f"{data_type}:{symbol}:{timeframe}"
+        with self.lock:
+            self.data_cache[cache_key] = {
+                "timestamp": datetime.now(),
+                "data": data
+            }
+            self.last_update[cache_key] = datetime.now()
+        
+        # Persist without holding up the callers
+        self.fetch_executor.submit(self.save_to_cache, data_type, symbol, timeframe, data)
+        logger.debug(f"Fetched {len(data)} {symbol} {timeframe} bars from {name}")
+        return data
+    
+    def _submit_stock_fetch(self, symbol: str, timeframe: str, limit: int, source: str = None) -> Future:
+        """
+        Start fetching stock bars, or join an identical request already in flight
+        
+        A request joins an in-flight one for the same symbol, timeframe and source
+        if that one asks for at least as many bars.
+        
+        Returns:
+            concurrent.futures.Future resolving to the DataFrame
+        """
+        key = (DataType.STOCK_BARS, symbol, timeframe, source)
+        loop = self._get_loop()
+        
+        with self.inflight_lock:
+            entry = self.inflight.get(key)
+            if entry is not None and entry[0] >= limit and not entry[1].done():
+                return entry[1]
+            
+            future = asyncio.run_coroutine_threadsafe(
+                self._fetch_stock_data(symbol, timeframe, limit, source), loop
+            )
+            self.inflight[key] = (limit, future)
+        
+        def _done(finished: Future):
+            with self.inflight_lock:
+                if self.inflight.get(key, (None, None))[1] is finished:
+                    del self.inflight[key]
+        
+        future.add_done_callback(_done)
+        return future
+    
+    async def get_stock_data_async(self, symbol: str, timeframe: str = TimeFrame.MINUTE_1,
+                                   limit: int = 100, source: str = None) -> pd.DataFrame:
+        """
+        Get stock price data without blocking the event loop
+        
+        Args:
+            symbol: Stock symbol
+            timeframe: Time frame (from TimeFrame class)
+            limit: Maximum number of bars to return
+            source: Specific data source to use (None = auto-select)
+            
+        Returns:
+            DataFrame with price data
+        """
+        cached = self._get_cached_bars(f"{DataType.STOCK_BARS}:{symbol}:{timeframe}", limit)
+        if cached is not None:
+            return cached
+        
+        try:
+            data = await asyncio.wrap_future(self._submit_stock_fetch(symbol, timeframe, limit, source))
+        except Exception as e:
+            logger.error(f"Error getting stock data for {symbol}: {str(e)}")
+            return pd.DataFrame()
+        return data.tail(limit) if len(data) > limit else data
+    
     def get_stock_data(self, symbol: str, timeframe: str = TimeFrame.MINUTE_1, 
                       limit: int = 100, source: str = None) -> pd.DataFrame:
         """
         Get stock price data
         
+        Blocking wrapper around the async fetch path for thread-based callers.
+        
         Args:
             symbol: Stock symbol
             timeframe: Time frame (from TimeFrame class)
@@ -244,48 +561,250 @@ class MarketDataHub:
         Returns:
             DataFrame with price data
         """
-        data_type = DataType.STOCK_BARS
-        cache_key = f"{data_type}:{symbol}:{timeframe}"
+        cached = self._get_cached_bars(f"{DataType.STOCK_BARS}:{symbol}:{timeframe}", limit)
+        if cached is not None:
+            return cached
         
-        with self.lock:
-            # Check cache first
-            if cache_key in self.data_cache:
-                cache_entry = self.data_cache[cache_key]
-                age = datetime.now() - cache_entry["timestamp"]
-                # If cache is fresh and has enough data, return it
-                if age.total_seconds() < 60 and len(cache_entry["data"]) >= limit:
-                    return cache_entry["data"].tail(limit)
-            
-            # Select data source
-            if source:
-                if source not in self.data_sources:
-                    logger.error(f"Data source {source} not available")
-                    return pd.DataFrame()
-                sources = [self.data_sources[source]]
-            else:
-                # Priority order: IBKR -> Polygon -> Alpha Vantage -> Yahoo Finance
-                sources = [
-                    self.data_sources.get("ibkr"),
-                    self.data_sources.get("polygon"),
-                    self.data_sources.get("alpha_vantage"),
-                    self.data_sources.get("yahoo")  # Always available as fallback
-                ]
-                sources = [s for s in sources if s is not None]
+        try:
+            data = self._submit_stock_fetch(symbol, timeframe, limit, source).result()
+        except Exception as e:
+            logger.error(f"Error getting stock data for {symbol}: {str(e)}")
+            return pd.DataFrame()
+        return data.tail(limit) if len(data) > limit else data
+    
+    def _stored_range(self, symbol: str, timeframe: str, start: pd.Timestamp,
+                      end: pd.Timestamp) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]:
+        """Get the first and last stored bar of a symbol within [start, end]"""
+        try:
+            index = self.bar_store.read(DataType.STOCK_BARS, symbol, timeframe, start=start, end=end,
+                                        columns=[]).index
+        except Exception as e:
+            logger.warning(f"Error reading stored {symbol} {timeframe} bars: {str(e)}")
+            return None, None
+        if len(index) == 0:
+            return None, None
+        return index[0], index[-1]
+    
+    @staticmethod
+    def _align_timestamp(ts: pd.Timestamp, like: pd.Timestamp) -> pd.Timestamp:
+        """Give `ts` the timezone of `like` (naive values are taken to be in that zone)"""
+        if like.tzinfo is None:
+            return ts.tz_convert(None) if ts.tzinfo is not None else ts
+        return ts.tz_localize(like.tzinfo) if ts.tzinfo is None else ts.tz_convert(like.tzinfo)
+    
+    def _missing_segments(self, symbol: str, timeframe: str, start: pd.Timestamp,
+                          end: pd.Timestamp) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """
+        Get the parts of [start, end] not covered by the bar store
+        
+        Only the head and tail of the range are checked; gaps between stored bars
+        (weekends, holidays, halts) are not refetched.
+        """
+        first, last = self._stored_range(symbol, timeframe, start, end)
+        if first is None:
+            return [(start, end)]
+        
+        bar = self.BAR_DURATIONS.get(timeframe, pd.Timedelta(days=1))
+        first = self._align_timestamp(first, start)
+        last = self._align_timestamp(last, start)
+        segments = []
+        if first - start >= bar:
+            segments.append((start, first - bar))
+        if end - last >= bar:
+            segments.append((last + bar, end))
+        return segments
+    
+    def _plan_bulk_fetch(self, segments: Dict[str, List[Tuple[pd.Timestamp, pd.Timestamp]]],
+                         start: pd.Timestamp, end: pd.Timestamp, chunk: pd.Timedelta,
+                         max_symbols: int) -> List[Tuple[List[str], pd.Timestamp, pd.Timestamp]]:
+        """
+        Split missing segments into provider-sized requests
+        
+        The range is cut into windows of `chunk` starting at `start`, so symbols
+        missing the same window share a request.
+        
+        Returns:
+            List of (symbols, window start, window end) requests
+        """
+        windows: Dict[int, Dict[str, Any]] = {}
+        for symbol, symbol_segments in segments.items():
+            for seg_start, seg_end in symbol_segments:
+                first = int((seg_start - start) // chunk)
+                last = int((seg_end - start) // chunk)
+                for k in range(first, last + 1):
+                    window = windows.setdefault(k, {"symbols": [], "start": seg_start, "end": seg_end})
+                    if symbol not in window["symbols"]:
+                        window["symbols"].append(symbol)
+                    window["start"] = min(window["start"], seg_start)
+                    window["end"] = max(window["end"], seg_end)
+        
+        requests = []
+        for k in sorted(windows):
+            window = windows[k]
+            window_start = max(start + k * chunk, window["start"])
+            window_end = min(start + (k + 1) * chunk, window["end"])
+            symbols = window["symbols"]
+            for i in range(0, len(symbols), max_symbols):
+                requests.append((symbols[i:i + max_symbols], window_start, window_end))
+        return requests
+    
+    async def get_stock_data_bulk_async(self, symbols: List[str], timeframe: str = TimeFrame.DAY_1,
+                                        start: Any = None, end: Any = None, source: str = None,
+                                        fields: List[str] = None) -> pd.DataFrame:
+        """
+        Get aligned price history for many symbols
+        
+        Bars already in the bar store are not downloaded again. The missing parts of
+        the range are split into chunks the provider serves in one request, with many
+        symbols per request, and the chunks are downloaded concurrently within
+        bulk_concurrency and bulk_requests_per_second.
+        
+        Args:
+            symbols: Stock symbols
+            timeframe: Time frame (from TimeFrame class)
+            start: Range start; naive values are in market_timezone (default: 365 days before end)
+            end: Range end (default: now)
+            source: Specific data source to use (None = auto-select)
+            fields: Bar fields to return (default: open, high, low, close, volume)
             
-            # Try each source in order
-            for source in sources:
+        Returns:
+            DataFrame indexed by timestamp with (field, symbol) MultiIndex columns;
+            bars missing for a symbol are NaN
+        """
+        fields = fields or self.BULK_FIELDS
+        symbols = list(dict.fromkeys(symbols))
+        # Naive bounds are exchange-local times
+        now = pd.Timestamp.now(tz=self.market_timezone)
+        end = self._align_timestamp(pd.Timestamp(end), now) if end is not None else now
+        start = self._align_timestamp(pd.Timestamp(start), now) if start is not None else end - pd.Timedelta(days=365)
+        
+        sources = self._get_stock_sources(source)
+        sources = [(name, c) for name, c in sources or [] if hasattr(c, "get_stock_history")]
+        if not sources:
+            logger.error(f"No data source with bulk history available (requested: {source})")
+            return pd.DataFrame()
+        name, connector = sources[0]
+        
+        loop = asyncio.get_running_loop()
+        
+        def find_missing() -> Dict[str, List[Tuple[pd.Timestamp, pd.Timestamp]]]:
+            # Reads the bar store, so it runs off the event loop
+            found = {}
+            for symbol in symbols:
+                missing = self._missing_segments(symbol, timeframe, start, end)
+                if missing:
+                    found[symbol] = missing
+            return found
+        
+        segments = await loop.run_in_executor(self.fetch_executor, find_missing)
+        
+        chunk = pd.Timedelta(days=connector.BULK_CHUNK_DAYS.get(timeframe, 365))
+        bar = self.BAR_DURATIONS.get(timeframe, pd.Timedelta(days=1))
+        requests = self._plan_bulk_fetch(segments, start, end, chunk,
+                                         getattr(connector, "BULK_MAX_SYMBOLS", 1))
+        
+        semaphore = asyncio.Semaphore(self.bulk_concurrency)
+        fetched: Dict[str, List[pd.DataFrame]] = {}
+        
+        def download(batch: List[str], batch_start: pd.Timestamp, batch_end: pd.Timestamp):
+            # End is exclusive for the providers
+            result = connector.get_stock_history(batch, timeframe, batch_start, batch_end + bar)
+            for symbol, df in result.items():
+                self.save_to_cache(DataType.STOCK_BARS, symbol, timeframe, df)
+            return result
+        
+        async def run(batch: List[str], batch_start: pd.Timestamp, batch_end: pd.Timestamp):
+            async with semaphore:
+                if self.bulk_rate_limiter is not None:
+                    await self.bulk_rate_limiter.acquire()
                 try:
-                    data = source.get_stock_data(symbol, timeframe, limit)
-                    if not data.empty:
-                        # Cache the result
-                        self.save_to_cache(data_type, symbol, timeframe, data)
-                        return data
+                    result = await loop.run_in_executor(self.fetch_executor, download, batch,
+                                                        batch_start, batch_end)
                 except Exception as e:
-                    logger.warning(f"Error getting data from {source.__class__.__name__}: {str(e)}")
-                    continue
+                    logger.error(f"Error downloading {len(batch)} symbols {batch_start} - {batch_end} "
+                                 f"from {name}: {str(e)}")
+                    return
+                for symbol, df in result.items():
+                    fetched.setdefault(symbol, []).append(df)
+        
+        await asyncio.gather(*(run(*request) for request in requests))
+        logger.debug(f"Bulk fetch of {len(symbols)} {timeframe} series: {len(requests)} requests to {name}, "
+                     f"{len(symbols) - len(segments)} served from the bar store")
+        
+        def assemble() -> pd.DataFrame:
+            frames = {}
+            for symbol in symbols:
+                try:
+                    df = self.bar_store.read(DataType.STOCK_BARS, symbol, timeframe, start=start, end=end,
+                                             columns=fields)
+                except Exception as e:
+                    logger.warning(f"Error reading stored {symbol} bars, using downloaded data: {str(e)}")
+                    parts = fetched.get(symbol, [])
+                    df = pd.concat(parts).sort_index() if parts else pd.DataFrame()
+                    df = df[~df.index.duplicated(keep="last")]
+                    df = df[[c for c in fields if c in df.columns]]
+                if not df.empty:
+                    frames[symbol] = df
+            return self._build_panel(frames, symbols, fields)
+        
+        return await loop.run_in_executor(self.fetch_executor, assemble)
+    
+    def get_stock_data_bulk(self, symbols: List[str], timeframe: str = TimeFrame.DAY_1,
+                            start: Any = None, end: Any = None, source: str = None,
+                            fields: List[str] = None) -> pd.DataFrame:
+        """
+        Get aligned price history for many symbols
+        
+        Blocking wrapper around get_stock_data_bulk_async for thread-based callers.
+        
+        Args:
+            symbols: Stock symbols
+            timeframe: Time frame (from TimeFrame class)
+            start: Range start; naive values are in market_timezone (default: 365 days before end)
+            end: Range end (default: now)
+            source: Specific data source to use (None = auto-select)
+            fields: Bar fields to return (default: open, high, low, close, volume)
             
-            # If all sources fail, return empty DataFrame
+        Returns:
+            DataFrame indexed by timestamp with (field, symbol) MultiIndex columns
+        """
+        try:
+            future = asyncio.run_coroutine_threadsafe(
+                self.get_stock_data_bulk_async(symbols, timeframe, start, end, source, fields),
+                self._get_loop()
+            )
+            return future.result()
+        except Exception as e:
+            logger.error(f"Error getting bulk stock data: {str(e)}")
+            return pd.DataFrame()
+    
+    @staticmethod
+    def _build_panel(frames: Dict[str, pd.DataFrame], symbols: List[str], fields: List[str]) -> pd.DataFrame:
+        """Align per-symbol bar frames into one (field, symbol) column panel"""
+        if not frames:
             return pd.DataFrame()
+        panel = pd.concat(frames, axis=1, sort=True)
+        panel = panel.swaplevel(0, 1, axis=1)
+        columns = pd.MultiIndex.from_product([fields, symbols], names=["field", "symbol"])
+        return panel.reindex(columns=columns)
+    
+    @staticmethod
+    def panel_to_array(panel: pd.DataFrame) -> Tuple[np.ndarray, pd.DatetimeIndex, List[str], List[str]]:
+        """
+        Convert a bulk history panel to a 3-D array
+        
+        Args:
+            panel: Result of get_stock_data_bulk
+            
+        Returns:
+            Tuple of (time x symbol x field array, timestamps, symbols, fields)
+        """
+        fields = list(panel.columns.get_level_values(0).unique())
+        symbols = list(panel.columns.get_level_values(1).unique())
+        columns = pd.MultiIndex.from_product([fields, symbols])
+        values = panel.reindex(columns=columns).to_numpy(dtype=np.float64)
+        values = values.reshape(len(panel), len(fields), len(symbols)).transpose(0, 2, 1)
+        return values, panel.index, symbols, fields
     
     def get_option_chain(self, symbol: str, source: str = None) -> Dict[str, Any]:
         """
@@ -303,8 +822,8 @@ class MarketDataHub:
         
         with self.lock:
             # Check cache first
-            if cache_key in self.data_cache:
-                cache_entry = self.data_cache[cache_key]
+            cache_entry = self.data_cache.get(cache_key)
+            if cache_entry is not None:
                 age = datetime.now() - cache_entry["timestamp"]
                 # For option chains, refresh every minute
                 if age.total_seconds() < 60:
@@ -363,8 +882,8 @@ class MarketDataHub:
         
         with self.lock:
             # Check cache first
-            if cache_key in self.data_cache:
-                cache_entry = self.data_cache[cache_key]
+            cache_entry = self.data_cache.get(cache_key)
+            if cache_entry is not None:
                 age = datetime.now() - cache_entry["timestamp"]
                 # If cache is fresh and has enough data, return it
                 if age.total_seconds() < 60 and len(cache_entry["data"]) >= limit:
@@ -422,8 +941,8 @@ class MarketDataHub:
         
         with self.lock:
             # Check cache first - order books need very fresh data
-            if cache_key in self.data_cache:
-                cache_entry = self.data_cache[cache_key]
+            cache_entry = self.data_cache.get(cache_key)
+            if cache_entry is not None:
                 age = datetime.now() - cache_entry["timestamp"]
                 # For order books, refresh every 5 seconds
                 if age.total_seconds() < 5:
@@ -519,19 +1038,25 @@ class MarketDataHub:
             # Update cache entry
             if data_type in [DataType.STOCK_BARS, DataType.CRYPTO_BARS]:
                 # For bars, append to existing dataframe
-                if cache_key in self.data_cache:
-                    existing_data = self.data_cache[cache_key]["data"]
+                # Streaming sources send epoch-ns integers (or ISO strings)
+                bar_time = pd.Timestamp(data["timestamp"])
+                cache_entry = self.data_cache.get(cache_key)
+                if cache_entry is not None:
+                    existing_data = cache_entry["data"]
                     # Append new bar if it's a new timestamp
-                    if data["timestamp"] not in existing_data.index:
-                        self.data_cache[cache_key]["data"] = pd.concat([
-                            existing_data,
-                            pd.DataFrame([data], index=[data["timestamp"]])
-                        ])
+                    if bar_time not in existing_data.index:
+                        self.data_cache[cache_key] = {
+                            "timestamp": cache_entry["timestamp"],
+                            "data": pd.concat([
+                                existing_data,
+                                pd.DataFrame([data], index=[bar_time])
+                            ]).tail(self.max_cached_bars)
+                        }
                 else:
                     # Create new cache entry
                     self.data_cache[cache_key] = {
                         "timestamp": datetime.now(),
-                        "data": pd.DataFrame([data], index=[data["timestamp"]])
+                        "data": pd.DataFrame([data], index=[bar_time])
                     }
             else:
                 # For other data types, just replace
@@ -545,6 +1070,15 @@ class MarketDataHub:
         # Notify callbacks
         self._notify_callbacks(data_type, symbol, data)
     
+    def close(self):
+        """Stop the fetch event loop and worker threads"""
+        with self.inflight_lock:
+            loop, self.loop = self.loop, None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            self.loop_thread.join(timeout=1.0)
+        self.fetch_executor.shutdown(wait=False)
+    
     def get_liquidity_imbalance(self, symbol: str) -> float:
         """
         Calculate liquidity imbalance for a symbol
@@ -632,9 +1166,71 @@ class MarketDataHub:
         
         return result
     
+    @classmethod
+    def _canonical_bars(cls, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Map bars from any source to the bar store columns
+        
+        Columns are renamed to lowercase, extra columns (dividends, splits, adjusted
+        close) are dropped and prices and volume are stored as float64.
+        
+        Raises:
+            ValueError: If an OHLCV column is missing
+        """
+        data = normalize_bar_columns(data)
+        missing = [column for column in cls.BAR_COLUMNS if column not in data.columns]
+        if missing:
+            raise ValueError(f"Bars have no {missing} columns: {list(data.columns)}")
+        
+        columns = list(cls.BAR_COLUMNS)
+        timestamp = next((c for c in TIMESTAMP_FIELDS if c in data.columns), None)
+        if not isinstance(data.index, pd.DatetimeIndex) and timestamp is not None:
+            columns.append(timestamp)
+        return data[columns].astype({column: np.float64 for column in cls.BAR_COLUMNS})
+    
+    def _merge_stored_bars(self, data_type: str, symbol: str, timeframe: str,
+                           data: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """
+        Merge a stored series with another column schema into new canonical bars
+        
+        Returns:
+            All stored bars mapped to BAR_COLUMNS with `data` on top (new rows win on
+            equal timestamps), or None if the stored bars cannot be mapped
+        """
+        cache_key = f"{data_type}:{symbol}:{timeframe}"
+        try:
+            stored = self._canonical_bars(self.bar_store.read(data_type, symbol, timeframe)).copy()
+        except Exception as e:
+            logger.error(f"Not saving {cache_key} bars: stored bars have columns that cannot be "
+                         f"mapped to {self.BAR_COLUMNS} ({str(e)})")
+            return None
+        
+        if not isinstance(data.index, pd.DatetimeIndex):
+            column = next((c for c in TIMESTAMP_FIELDS if c in data.columns), None)
+            if column is None:
+                logger.error(f"Not saving {cache_key} bars: no timestamps")
+                return None
+            values = data[column]
+            unit = "ms" if pd.api.types.is_numeric_dtype(values) else None
+            data = data.drop(columns=[column]).set_index(pd.DatetimeIndex(pd.to_datetime(values, unit=unit), name=column))
+        stored.index = self._align_index(stored.index, data.index).rename(data.index.name)
+        merged = pd.concat([stored, data])
+        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+        return merged
+    
+    @staticmethod
+    def _align_index(index: pd.DatetimeIndex, like: pd.DatetimeIndex) -> pd.DatetimeIndex:
+        """Give `index` the timezone of `like` (naive values are taken to be UTC)"""
+        if like.tz is None:
+            return index.tz_convert("UTC").tz_localize(None) if index.tz is not None else index
+        return index.tz_localize("UTC").tz_convert(like.tz) if index.tz is None else index.tz_convert(like.tz)
+    
     def save_to_cache(self, data_type: str, symbol: str, timeframe: str = None, data: Any = None):
         """
-        Save data to local cache file
+        Save data to local cache
+        
+        Bar DataFrames are appended to the columnar bar store; other data is written
+        to a per-day JSON file.
         
         Args:
             data_type: Type of data
@@ -649,10 +1245,27 @@ class MarketDataHub:
             
             with self.lock:
                 if data is None:
-                    if cache_key not in self.data_cache:
+                    cache_entry = self.data_cache.get(cache_key)
+                    if cache_entry is None:
                         logger.warning(f"No cache data for {cache_key}")
                         return
-                    data = self.data_cache[cache_key]["data"]
+                    data = cache_entry["data"]
+                
+                if data_type in self.BAR_DATA_TYPES and isinstance(data, pd.DataFrame):
+                    data = self._canonical_bars(data)
+                    schema = self.bar_store.get_schema(data_type, symbol, timeframe)
+                    expected = {column: data[column].dtype.str for column in self.BAR_COLUMNS}
+                    if schema is not None and schema["columns"] != expected:
+                        # Series written before the columns were normalized
+                        data = self._merge_stored_bars(data_type, symbol, timeframe, data)
+                        if data is None:
+                            return
+                        logger.warning(f"Rewriting stored {cache_key} bars with columns "
+                                       f"{list(schema['columns'])} as {self.BAR_COLUMNS}")
+                        self.bar_store.delete(data_type, symbol, timeframe)
+                    rows = self.bar_store.append(data_type, symbol, timeframe, data)
+                    logger.debug(f"Saved {rows} rows of {cache_key} to bar store")
+                    return
                 
                 # Create directory for symbol
                 symbol_dir = os.path.join(self.data_dir, symbol)
@@ -669,79 +1282,99 @@ class MarketDataHub:
                 
                 # Convert data to JSON-serializable format
                 if isinstance(data, pd.DataFrame):
-                    json_data = data.reset_index().to_json(orient="records")
-                    data_to_save = json.loads(json_data)
+                    data_to_save = json.loads(data.reset_index().to_json(orient="records"))
                 else:
                     data_to_save = data
                 
                 # Save to file
                 with open(filepath, 'w') as f:
-                    json.dump(data_to_save, f, indent=2)
+                    json.dump(data_to_save, f, separators=(',', ':'), default=str)
                 
                 logger.debug(f"Saved {cache_key} to {filepath}")
         
         except Exception as e:
             logger.error(f"Error saving data to cache: {str(e)}")
     
-    def load_from_cache(self, data_type: str, symbol: str, timeframe: str = None, date: str = None) -> Any:
+    def load_from_cache(self, data_type: str, symbol: str, timeframe: str = None, date: str = None,
+                        start: Any = None, end: Any = None, columns: List[str] = None,
+                        limit: int = None) -> Any:
         """
-        Load data from local cache file
+        Load data from local cache
         
         Args:
             data_type: Type of data
             symbol: Symbol
             timeframe: Time frame (optional)
             date: Date string in YYYYMMDD format (None = latest)
+            start: Earliest bar timestamp to load (bar data only)
+            end: Latest bar timestamp to load (bar data only)
+            columns: Bar columns to load (None = all)
+            limit: Load only the last `limit` bars of the range
             
         Returns:
-            Loaded data
+            Loaded data (a DataFrame for bar data)
         """
         try:
-            # Create directory path
-            symbol_dir = os.path.join(self.data_dir, symbol)
-            if not os.path.exists(symbol_dir):
-                logger.warning(f"No cache directory for {symbol}")
-                return None
-            
-            # Create filename pattern
-            filename_pattern = f"{data_type}"
-            if timeframe:
-                filename_pattern += f"_{timeframe}"
-            
-            if date:
-                filename_pattern += f"_{date}.json"
-            else:
-                filename_pattern += "_*.json"
-            
-            # Find matching files
-            import glob
-            matching_files = glob.glob(os.path.join(symbol_dir, filename_pattern))
-            
-            if not matching_files:
-                logger.warning(f"No cache files matching {filename_pattern}")
-                return None
-            
-            # Get the latest file
-            latest_file = max(matching_files, key=os.path.getmtime)
-            
-            # Load data
-            with open(latest_file, 'r') as f:
-                data = json.load(f)
-            
-            # Convert to appropriate format
-            if data_type in [DataType.STOCK_BARS, DataType.CRYPTO_BARS]:
-                df = pd.DataFrame(data)
-                if "timestamp" in df.columns:
-                    df.set_index("timestamp", inplace=True)
-                return df
-            else:
-                return data
+            if data_type in self.BAR_DATA_TYPES:
+                if date:
+                    day = datetime.strptime(date, "%Y%m%d")
+                    start = start or day
+                    end = end or (day + timedelta(days=1) - timedelta(microseconds=1))
+                
+                df = self.bar_store.read(data_type, symbol, timeframe, start=start, end=end,
+                                         columns=columns, limit=limit)
+                if not df.empty:
+                    return df
             
-            logger.debug(f"Loaded {data_type} for {symbol} from {latest_file}")
+            return self._load_json_cache(data_type, symbol, timeframe, date)
             
         except Exception as e:
             logger.error(f"Error loading data from cache: {str(e)}")
             return None
+    
+    def _load_json_cache(self, data_type: str, symbol: str, timeframe: str = None, date: str = None) -> Any:
+        """Load data from a per-day JSON cache file (also bars cached before the bar store)"""
+        # Create directory path
+        symbol_dir = os.path.join(self.data_dir, symbol)
+        if not os.path.exists(symbol_dir):
+            logger.warning(f"No cache directory for {symbol}")
+            return None
+        
+        # Create filename pattern
+        filename_pattern = f"{data_type}"
+        if timeframe:
+            filename_pattern += f"_{timeframe}"
+        
+        if date:
+            filename_pattern += f"_{date}.json"
+        else:
+            filename_pattern += "_*.json"
+        
+        # Find matching files
+        import glob
+        matching_files = glob.glob(os.path.join(symbol_dir, filename_pattern))
+        
+        if not matching_files:
+            logger.warning(f"No cache files matching {filename_pattern}")
+            return None
+        
+        # Get the latest file
+        latest_file = max(matching_files, key=os.path.getmtime)
+        
+        # Load data
+        with open(latest_file, 'r') as f:
+            data = json.load(f)
+        
+        logger.debug(f"Loaded {data_type} for {symbol} from {latest_file}")
+        
+        # Convert to appropriate format
+        if data_type in self.BAR_DATA_TYPES:
+            df = pd.DataFrame(data)
+            if "timestamp" in df.columns:
+                df.set_index("timestamp", inplace=True)
+            return df
+        else:
+            return data
 
 # For testing
 if __name__ == "__main__":
@@ -1,9 +1,10 @@
-from dataclasses import dataclass
+from dataclasses import MISSING, dataclass, field, fields, make_dataclass
 from datetime import datetime
-from typing import Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Sequence, Union
 from enum import Enum
 
-from core.tg_bot.super_commander import SuperCommander
+import numpy as np
+import pandas as pd
 
 class MarketType(Enum):
     STOCK = "stock"
@@ -19,6 +20,33 @@ class DataSource(Enum):
     IBKR = "ibkr"
     DATABENTO = "databento"
 
+def _slotted(cls):
+    """
+    以__slots__重建数据类，等同于Python 3.10+的dataclass(slots=True)
+
+    在类体中直接声明__slots__会与字段默认值冲突，因此在@dataclass之后重建类。
+    """
+    names = tuple(f.name for f in fields(cls))
+    namespace = dict(cls.__dict__)
+    namespace["__slots__"] = names
+    for name in names + ("__dict__", "__weakref__"):
+        namespace.pop(name, None)
+    if cls.__dataclass_params__.frozen:
+        # 默认的slots反序列化通过setattr赋值，不可变实例需要绕过__setattr__
+        def __getstate__(self):
+            return [getattr(self, name) for name in names]
+
+        def __setstate__(self, state):
+            for name, value in zip(names, state):
+                object.__setattr__(self, name, value)
+
+        namespace["__getstate__"] = __getstate__
+        namespace["__setstate__"] = __setstate__
+    slotted = type(cls)(cls.__name__, cls.__bases__, namespace)
+    slotted.__qualname__ = cls.__qualname__
+    return slotted
+
+@_slotted
 @dataclass
 class MarketData:
     """统一的市场数据模型"""
@@ -38,6 +66,7 @@ class MarketData:
     vwap: Optional[float] = None
     raw_data: Optional[Dict] = None
 
+@_slotted
 @dataclass
 class OrderBook:
     """统一的订单簿数据模型"""
@@ -49,6 +78,7 @@ class OrderBook:
     asks: List[List[float]]  # [[price, quantity], ...]
     raw_data: Optional[Dict] = None
 
+@_slotted
 @dataclass
 class Trade:
     """统一的交易数据模型"""
@@ -87,23 +117,208 @@ class MarketSnapshot:
     option_chain: Optional[OptionChain] = None
     raw_data: Optional[Dict] = None
 
+def _frozen_variant(cls, name: str):
+    """生成与cls字段相同的不可变(frozen+slots)数据类"""
+    spec = []
+    for f in fields(cls):
+        if f.default is MISSING:
+            spec.append((f.name, f.type))
+        else:
+            spec.append((f.name, f.type, field(default=f.default)))
+    variant = _slotted(make_dataclass(name, spec, frozen=True))
+    variant.__module__ = __name__
+    variant.__doc__ = f"{cls.__doc__}（不可变，可哈希）"
+    return variant
+
+# 不可变版本，适合作为字典键或在线程间共享
+FrozenMarketData = _frozen_variant(MarketData, "FrozenMarketData")
+FrozenOrderBook = _frozen_variant(OrderBook, "FrozenOrderBook")
+FrozenTrade = _frozen_variant(Trade, "FrozenTrade")
+
+# TradeBatch.sides 的编码
+SIDE_BUY = 1
+SIDE_SELL = -1
+SIDE_UNKNOWN = 0
+_SIDE_NAMES = {SIDE_BUY: "buy", SIDE_SELL: "sell", SIDE_UNKNOWN: ""}
+
+def _ns_to_datetime(ns: int) -> datetime:
+    """纳秒时间戳转本地时间（与单条标准化保持一致）"""
+    return datetime.fromtimestamp(ns / 1e9)
+
+@_slotted
+@dataclass
+class TradeBatch:
+    """列式(struct-of-arrays)成交批次，每列一个NumPy数组"""
+    source: DataSource
+    market_type: MarketType
+    symbols: np.ndarray  # object
+    timestamps: np.ndarray  # int64，纳秒时间戳
+    prices: np.ndarray  # float64
+    quantities: np.ndarray  # float64
+    sides: np.ndarray  # int8，SIDE_BUY / SIDE_SELL / SIDE_UNKNOWN
+    trade_ids: Optional[np.ndarray] = None  # object
+    raw_data: Optional[List[Dict]] = None
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def __getitem__(self, i: int) -> Trade:
+        """按需物化单笔成交"""
+        return Trade(
+            symbol=self.symbols[i],
+            market_type=self.market_type,
+            source=self.source,
+            timestamp=_ns_to_datetime(int(self.timestamps[i])),
+            price=float(self.prices[i]),
+            quantity=float(self.quantities[i]),
+            side=_SIDE_NAMES[int(self.sides[i])],
+            trade_id=None if self.trade_ids is None else self.trade_ids[i],
+            raw_data=None if self.raw_data is None else self.raw_data[i]
+        )
+
+    def to_trades(self) -> List[Trade]:
+        """转换为Trade对象列表"""
+        return [self[i] for i in range(len(self))]
+
+    def select(self, mask: np.ndarray) -> "TradeBatch":
+        """按布尔掩码或索引数组筛选"""
+        raw_data = None
+        if self.raw_data is not None:
+            raw_data = [self.raw_data[i] for i in np.arange(len(self))[mask]]
+        return TradeBatch(
+            source=self.source,
+            market_type=self.market_type,
+            symbols=self.symbols[mask],
+            timestamps=self.timestamps[mask],
+            prices=self.prices[mask],
+            quantities=self.quantities[mask],
+            sides=self.sides[mask],
+            trade_ids=None if self.trade_ids is None else self.trade_ids[mask],
+            raw_data=raw_data
+        )
+
+    def for_symbol(self, symbol: str) -> "TradeBatch":
+        """筛选单个品种"""
+        return self.select(self.symbols == symbol)
+
+    def notional(self) -> np.ndarray:
+        """每笔成交金额"""
+        return self.prices * self.quantities
+
+    def to_frame(self) -> pd.DataFrame:
+        """转换为以时间为索引的DataFrame"""
+        frame = pd.DataFrame({
+            "symbol": self.symbols,
+            "price": self.prices,
+            "quantity": self.quantities,
+            "side": self.sides
+        }, index=pd.DatetimeIndex(self.timestamps.astype("datetime64[ns]"), name="timestamp"))
+        if self.trade_ids is not None:
+            frame["trade_id"] = self.trade_ids
+        return frame
+
+    @classmethod
+    def concat(cls, batches: Sequence["TradeBatch"]) -> "TradeBatch":
+        """合并同一数据源的多个批次"""
+        if not batches:
+            raise ValueError("No batches to concatenate")
+        first = batches[0]
+        with_ids = all(b.trade_ids is not None for b in batches)
+        with_raw = all(b.raw_data is not None for b in batches)
+        return cls(
+            source=first.source,
+            market_type=first.market_type,
+            symbols=np.concatenate([b.symbols for b in batches]),
+            timestamps=np.concatenate([b.timestamps for b in batches]),
+            prices=np.concatenate([b.prices for b in batches]),
+            quantities=np.concatenate([b.quantities for b in batches]),
+            sides=np.concatenate([b.sides for b in batches]),
+            trade_ids=np.concatenate([b.trade_ids for b in batches]) if with_ids else None,
+            raw_data=[m for b in batches for m in b.raw_data] if with_raw else None
+        )
+
+@_slotted
+@dataclass
+class BookSnapshot:
+    """NumPy订单簿快照，bids/asks为(n, 2)的[价格, 数量]数组"""
+    symbol: str
+    market_type: MarketType
+    source: DataSource
+    timestamp: int  # 纳秒时间戳
+    bids: np.ndarray  # float64 (n, 2)，价格从高到低
+    asks: np.ndarray  # float64 (n, 2)，价格从低到高
+    raw_data: Optional[Dict] = None
+
+    @property
+    def best_bid(self) -> Optional[float]:
+        return float(self.bids[0, 0]) if len(self.bids) else None
+
+    @property
+    def best_ask(self) -> Optional[float]:
+        return float(self.asks[0, 0]) if len(self.asks) else None
+
+    @property
+    def mid(self) -> Optional[float]:
+        if not len(self.bids) or not len(self.asks):
+            return None
+        return float(self.bids[0, 0] + self.asks[0, 0]) / 2
+
+    @property
+    def spread(self) -> Optional[float]:
+        if not len(self.bids) or not len(self.asks):
+            return None
+        return float(self.asks[0, 0] - self.bids[0, 0])
+
+    def depth(self, levels: int = 10) -> Dict[str, float]:
+        """前N档买卖总量"""
+        return {
+            "bid": float(self.bids[:levels, 1].sum()),
+            "ask": float(self.asks[:levels, 1].sum())
+        }
+
+    def imbalance(self, levels: int = 10) -> float:
+        """前N档买卖量不平衡度，范围[-1, 1]"""
+        depth = self.depth(levels)
+        total = depth["bid"] + depth["ask"]
+        return (depth["bid"] - depth["ask"]) / total if total else 0.0
+
+    def to_order_book(self) -> OrderBook:
+        """转换为OrderBook对象"""
+        return OrderBook(
+            symbol=self.symbol,
+            market_type=self.market_type,
+            source=self.source,
+            timestamp=_ns_to_datetime(self.timestamp),
+            bids=self.bids.tolist(),
+            asks=self.asks.tolist(),
+            raw_data=self.raw_data
+        )
+
+# 各数据源成交消息字段:
+# (品种, 价格, 数量, 时间戳, 时间戳单位换算为纳秒的倍数, 成交ID, 方向字段, 市场类型)
+_TRADE_FIELDS = {
+    DataSource.POLYGON: ("sym", "p", "s", "t", 1_000_000, "i", None, MarketType.STOCK),
+    DataSource.TRADIER: ("symbol", "price", "size", "date", 1_000_000, None, None, MarketType.STOCK),
+    DataSource.BINANCE: ("s", "p", "q", "T", 1_000_000, "t", "m", MarketType.CRYPTO)
+}
+
 class DataNormalizer:
     """数据标准化处理器"""
     
     @staticmethod
-    def normalize_market_data(data: Dict, source: DataSource) -> MarketData:
+    def normalize_market_data(data: Dict, source: DataSource, keep_raw: bool = False) -> MarketData:
         """标准化市场数据"""
         if source == DataSource.POLYGON:
-            return DataNormalizer._normalize_polygon_data(data)
+            return DataNormalizer._normalize_polygon_data(data, keep_raw)
         elif source == DataSource.TRADIER:
-            return DataNormalizer._normalize_tradier_data(data)
+            return DataNormalizer._normalize_tradier_data(data, keep_raw)
         elif source == DataSource.BINANCE:
-            return DataNormalizer._normalize_binance_data(data)
+            return DataNormalizer._normalize_binance_data(data, keep_raw)
         else:
             raise ValueError(f"Unsupported data source: {source}")
 
     @staticmethod
-    def _normalize_polygon_data(data: Dict) -> MarketData:
+    def _normalize_polygon_data(data: Dict, keep_raw: bool = False) -> MarketData:
         """标准化Polygon数据"""
         return MarketData(
             symbol=data.get("sym", ""),
@@ -114,11 +329,11 @@ class DataNormalizer:
             volume=float(data.get("s", 0)),
             bid=float(data.get("bp", 0)),
             ask=float(data.get("ap", 0)),
-            raw_data=data
+            raw_data=data if keep_raw else None
         )
 
     @staticmethod
-    def _normalize_tradier_data(data: Dict) -> MarketData:
+    def _normalize_tradier_data(data: Dict, keep_raw: bool = False) -> MarketData:
         """标准化Tradier数据"""
         return MarketData(
             symbol=data.get("symbol", ""),
@@ -129,11 +344,11 @@ class DataNormalizer:
             volume=float(data.get("volume", 0)),
             bid=float(data.get("bid", 0)),
             ask=float(data.get("ask", 0)),
-            raw_data=data
+            raw_data=data if keep_raw else None
         )
 
     @staticmethod
-    def _normalize_binance_data(data: Dict) -> MarketData:
+    def _normalize_binance_data(data: Dict, keep_raw: bool = False) -> MarketData:
         """标准化Binance数据"""
         return MarketData(
             symbol=data.get("s", ""),
@@ -142,21 +357,21 @@ class DataNormalizer:
             timestamp=datetime.fromtimestamp(data.get("T", 0) / 1000),
             price=float(data.get("p", 0)),
             volume=float(data.get("q", 0)),
-            raw_data=data
+            raw_data=data if keep_raw else None
         )
 
     @staticmethod
-    def normalize_orderbook(data: Dict, source: DataSource) -> OrderBook:
+    def normalize_orderbook(data: Dict, source: DataSource, keep_raw: bool = False) -> OrderBook:
         """标准化订单簿数据"""
         if source == DataSource.POLYGON:
-            return DataNormalizer._normalize_polygon_orderbook(data)
+            return DataNormalizer._normalize_polygon_orderbook(data, keep_raw)
         elif source == DataSource.BINANCE:
-            return DataNormalizer._normalize_binance_orderbook(data)
+            return DataNormalizer._normalize_binance_orderbook(data, keep_raw)
         else:
             raise ValueError(f"Unsupported data source for orderbook: {source}")
 
     @staticmethod
-    def _normalize_polygon_orderbook(data: Dict) -> OrderBook:
+    def _normalize_polygon_orderbook(data: Dict, keep_raw: bool = False) -> OrderBook:
         """标准化Polygon订单簿数据"""
         return OrderBook(
             symbol=data.get("sym", ""),
@@ -165,11 +380,11 @@ class DataNormalizer:
             timestamp=datetime.fromtimestamp(data.get("t", 0) / 1000),
             bids=[[float(price), float(qty)] for price, qty in data.get("bids", [])],
             asks=[[float(price), float(qty)] for price, qty in data.get("asks", [])],
-            raw_data=data
+            raw_data=data if keep_raw else None
         )
 
     @staticmethod
-    def _normalize_binance_orderbook(data: Dict) -> OrderBook:
+    def _normalize_binance_orderbook(data: Dict, keep_raw: bool = False) -> OrderBook:
         """标准化Binance订单簿数据"""
         return OrderBook(
             symbol=data.get("s", ""),
@@ -178,5 +393,79 @@ class DataNormalizer:
             timestamp=datetime.fromtimestamp(data.get("T", 0) / 1000),
             bids=[[float(price), float(qty)] for price, qty in data.get("bids", [])],
             asks=[[float(price), float(qty)] for price, qty in data.get("asks", [])],
-            raw_data=data
-        ) 
\ No newline at end of file
+            raw_data=data if keep_raw else None
+        )
+
+    @staticmethod
+    def normalize_market_data_batch(messages: Sequence[Dict], source: DataSource,
+                                    keep_raw: bool = False) -> List[MarketData]:
+        """批量标准化市场数据"""
+        normalize = {
+            DataSource.POLYGON: DataNormalizer._normalize_polygon_data,
+            DataSource.TRADIER: DataNormalizer._normalize_tradier_data,
+            DataSource.BINANCE: DataNormalizer._normalize_binance_data
+        }.get(source)
+        if normalize is None:
+            raise ValueError(f"Unsupported data source: {source}")
+        return [normalize(data, keep_raw) for data in messages]
+
+    @staticmethod
+    def normalize_trades(messages: Sequence[Dict], source: DataSource,
+                         keep_raw: bool = False) -> TradeBatch:
+        """将一批成交消息标准化为列式TradeBatch，每列只做一次类型转换"""
+        spec = _TRADE_FIELDS.get(source)
+        if spec is None:
+            raise ValueError(f"Unsupported data source for trades: {source}")
+        symbol_key, price_key, quantity_key, time_key, time_scale, id_key, side_key, market_type = spec
+
+        timestamps = np.array([m.get(time_key, 0) for m in messages], dtype=np.int64)
+        timestamps *= time_scale
+        if side_key is None:
+            sides = np.zeros(len(messages), dtype=np.int8)
+        else:
+            # Binance的m=True表示买方是挂单方，即主动卖出
+            maker = np.array([m.get(side_key, False) for m in messages], dtype=bool)
+            sides = np.where(maker, SIDE_SELL, SIDE_BUY).astype(np.int8)
+
+        return TradeBatch(
+            source=source,
+            market_type=market_type,
+            symbols=np.array([m.get(symbol_key, "") for m in messages], dtype=object),
+            timestamps=timestamps,
+            prices=np.array([m.get(price_key, 0) for m in messages], dtype=np.float64),
+            quantities=np.array([m.get(quantity_key, 0) for m in messages], dtype=np.float64),
+            sides=sides,
+            trade_ids=np.array([m.get(id_key) for m in messages], dtype=object) if id_key else None,
+            raw_data=list(messages) if keep_raw else None
+        )
+
+    @staticmethod
+    def _book_levels(levels: Any) -> np.ndarray:
+        """[[price, qty], ...]（数字或字符串）转为(n, 2)浮点数组"""
+        return np.array(levels, dtype=np.float64).reshape(-1, 2)
+
+    @staticmethod
+    def normalize_book_snapshot(data: Dict, source: DataSource, keep_raw: bool = False) -> BookSnapshot:
+        """标准化订单簿为NumPy快照"""
+        if source == DataSource.POLYGON:
+            symbol, timestamp, market_type = data.get("sym", ""), data.get("t", 0), MarketType.STOCK
+        elif source == DataSource.BINANCE:
+            symbol, timestamp, market_type = data.get("s", ""), data.get("T", data.get("E", 0)), MarketType.CRYPTO
+        else:
+            raise ValueError(f"Unsupported data source for orderbook: {source}")
+
+        return BookSnapshot(
+            symbol=symbol,
+            market_type=market_type,
+            source=source,
+            timestamp=int(timestamp) * 1_000_000,
+            bids=DataNormalizer._book_levels(data.get("bids", data.get("b", []))),
+            asks=DataNormalizer._book_levels(data.get("asks", data.get("a", []))),
+            raw_data=data if keep_raw else None
+        )
+
+    @staticmethod
+    def normalize_book_snapshots(messages: Sequence[Dict], source: DataSource,
+                                 keep_raw: bool = False) -> List[BookSnapshot]:
+        """批量标准化订单簿快照"""
+        return [DataNormalizer.normalize_book_snapshot(data, source, keep_raw) for data in messages]
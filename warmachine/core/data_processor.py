@@ -2,8 +2,9 @@ import asyncio
 import logging
 from typing import Dict, List, Optional, Callable, Any
 from datetime import datetime
+from .cache import get_shared_cache
 from .data_models import (
-    MarketData, OrderBook, Trade, OptionChain, MarketSnapshot,
+    MarketData, OrderBook, Trade, OptionChain, MarketSnapshot, TradeBatch,
     DataSource, MarketType, DataNormalizer
 )
 
@@ -19,11 +20,13 @@ class DataProcessor:
             "market_data": [],
             "orderbook": [],
             "trade": [],
+            "trade_batch": [],
             "option_chain": [],
             "snapshot": []
         }
-        self.cache: Dict[str, Any] = {}
         self.cache_ttl = config.get("cache_ttl", 300)  # 默认5分钟缓存
+        self.keep_raw_data = config.get("keep_raw_data", False)  # 是否保留原始消息
+        self.cache = get_shared_cache().namespace(config.get("cache_namespace", "data_processor"), ttl=self.cache_ttl)
         
     def register_callback(self, data_type: str, callback: Callable) -> None:
         """注册数据回调函数"""
@@ -35,7 +38,7 @@ class DataProcessor:
     async def process_market_data(self, data: Dict, source: DataSource) -> None:
         """处理市场数据"""
         try:
-            normalized_data = self.normalizer.normalize_market_data(data, source)
+            normalized_data = self.normalizer.normalize_market_data(data, source, self.keep_raw_data)
             self._update_cache(f"market_data:{normalized_data.symbol}", normalized_data)
             
             # 触发回调
@@ -48,7 +51,7 @@ class DataProcessor:
     async def process_orderbook(self, data: Dict, source: DataSource) -> None:
         """处理订单簿数据"""
         try:
-            normalized_data = self.normalizer.normalize_orderbook(data, source)
+            normalized_data = self.normalizer.normalize_orderbook(data, source, self.keep_raw_data)
             self._update_cache(f"orderbook:{normalized_data.symbol}", normalized_data)
             
             # 触发回调
@@ -71,18 +74,18 @@ class DataProcessor:
                 quantity=float(data.get("quantity", 0)),
                 side=data.get("side", ""),
                 trade_id=data.get("trade_id"),
-                raw_data=data
+                raw_data=data if self.keep_raw_data else None
             )
             
             # 更新缓存
             cache_key = f"trades:{trade.symbol}"
-            if cache_key not in self.cache:
-                self.cache[cache_key] = []
-            self.cache[cache_key].append(trade)
+            trades = self.cache.get(cache_key) or []
+            trades.append(trade)
             
             # 保持最近1000笔交易
-            if len(self.cache[cache_key]) > 1000:
-                self.cache[cache_key] = self.cache[cache_key][-1000:]
+            if len(trades) > 1000:
+                trades = trades[-1000:]
+            self._update_cache(cache_key, trades)
                 
             # 触发回调
             for callback in self.callbacks["trade"]:
@@ -91,6 +94,20 @@ class DataProcessor:
         except Exception as e:
             logger.error(f"Error processing trade: {str(e)}")
             
+    async def process_trade_batch(self, messages: List[Dict], source: DataSource) -> Optional[TradeBatch]:
+        """批量处理数据源原始成交消息，回调收到列式TradeBatch"""
+        try:
+            batch = self.normalizer.normalize_trades(messages, source, self.keep_raw_data)
+            
+            # 触发回调
+            for callback in self.callbacks["trade_batch"]:
+                await callback(batch)
+            return batch
+                
+        except Exception as e:
+            logger.error(f"Error processing trade batch: {str(e)}")
+            return None
+            
     async def process_option_chain(self, data: Dict, source: DataSource) -> None:
         """处理期权链数据"""
         try:
@@ -103,7 +120,7 @@ class DataProcessor:
                 calls=data.get("calls", []),
                 puts=data.get("puts", []),
                 underlying_price=float(data.get("underlying_price", 0)),
-                raw_data=data
+                raw_data=data if self.keep_raw_data else None
             )
             
             # 更新缓存
@@ -152,16 +169,11 @@ class DataProcessor:
             
     def _update_cache(self, key: str, data: Any) -> None:
         """更新缓存"""
-        self.cache[key] = (datetime.now(), data)
+        self.cache.set(key, data)
         
     def _get_cached_data(self, key: str) -> Optional[Any]:
         """获取缓存数据"""
-        if key in self.cache:
-            timestamp, data = self.cache[key]
-            if (datetime.now() - timestamp).total_seconds() < self.cache_ttl:
-                return data
-            del self.cache[key]
-        return None
+        return self.cache.get(key)
         
     def clear_cache(self) -> None:
         """清除所有缓存"""
@@ -169,8 +181,14 @@ class DataProcessor:
         
     def get_cache_stats(self) -> Dict:
         """获取缓存统计信息"""
+        stats = self.cache.get_stats()
         return {
-            "total_items": len(self.cache),
+            "total_items": stats["entries"],
             "cache_ttl": self.cache_ttl,
-            "keys": list(self.cache.keys())
+            "keys": self.cache.keys(),
+            "bytes": stats["bytes"],
+            "hits": stats["hits"],
+            "misses": stats["misses"],
+            "evictions": stats["evictions"],
+            "hit_rate": stats["hit_rate"]
         } 
\ No newline at end of file
@@ -5,12 +5,15 @@ This module implements the event bus system for handling various types of events
 including market data, news, and sentiment analysis.
 """
 
+import time
+import gzip
 import logging
-from typing import Dict, Any, List, Callable, Optional
+import itertools
+from typing import Dict, Any, List, Callable, Optional, Iterable, Iterator
 from datetime import datetime
 import json
 import asyncio
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 
 from .analysis.sentiment_adapter import SentimentAdapter
 
@@ -25,6 +28,326 @@ class EventType:
     TRADE = "trade"
     SYSTEM = "system"
 
+class DispatchMode:
+    """Event dispatch modes"""
+    INLINE = "inline"    # publish awaits every handler in turn
+    FANOUT = "fanout"    # each handler has its own queue and worker task
+
+class BackpressurePolicy:
+    """What a full subscriber queue does with a new event"""
+    DROP_OLDEST = "drop_oldest"  # discard the oldest pending event
+    BLOCK = "block"              # make the publisher wait for space
+    COALESCE = "coalesce"        # replace a pending event with the same key, else drop oldest
+
+def default_coalesce_key(event: Dict[str, Any]) -> Any:
+    """Coalesce events of the same type for the same symbol"""
+    data = event.get("data") or {}
+    return (event.get("type"), data.get("symbol"))
+
+class SubscriberWorker:
+    """Bounded queue and worker task delivering events to a single handler"""
+    
+    def __init__(
+        self,
+        event_type: str,
+        handler: Callable,
+        max_queue_size: int = 1000,
+        policy: str = BackpressurePolicy.DROP_OLDEST,
+        key_func: Optional[Callable[[Dict[str, Any]], Any]] = None
+    ):
+        """Initialize subscriber worker
+        
+        Args:
+            event_type: Event type the handler is subscribed to
+            handler: Async handler function
+            max_queue_size: Maximum number of pending events
+            policy: Backpressure policy applied when the queue is full
+            key_func: Coalescing key for the COALESCE policy
+        """
+        self.event_type = event_type
+        self.handler = handler
+        self.max_queue_size = max(1, max_queue_size)
+        self.policy = policy
+        self.key_func = key_func or default_coalesce_key
+        
+        # Pending events in arrival order: key -> (event, enqueue time)
+        self.pending: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._counter = itertools.count()
+        # Events queued or being handled; idle is set when it drops to zero
+        self.unfinished = 0
+        # Created in start(): before Python 3.10 an Event binds to the loop current
+        # at construction, which need not be the loop that runs the worker
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.not_empty: Optional[asyncio.Event] = None
+        self.not_full: Optional[asyncio.Event] = None
+        self.idle: Optional[asyncio.Event] = None
+        self.task: Optional[asyncio.Task] = None
+        
+        # Metrics
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+    
+    @property
+    def name(self) -> str:
+        return getattr(self.handler, "__qualname__", repr(self.handler))
+    
+    def start(self):
+        """Start the worker task on the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.loop = loop
+            self.task = None
+            self.not_empty = asyncio.Event()
+            self.not_full = asyncio.Event()
+            self.idle = asyncio.Event()
+            if self.pending:
+                self.not_empty.set()
+            if not self.unfinished:
+                self.idle.set()
+        if self.task is None or self.task.done():
+            self.task = loop.create_task(self.run())
+    
+    async def stop(self):
+        """Cancel the worker task"""
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+    
+    async def put(self, event: Dict[str, Any]):
+        """Enqueue an event, applying the backpressure policy
+        
+        Args:
+            event: Event to deliver
+        """
+        self.start()
+        
+        if self.policy == BackpressurePolicy.COALESCE:
+            key = self.key_func(event)
+            if key in self.pending:
+                # Keep the queue position and original enqueue time, deliver the newest data
+                self.pending[key] = (event, self.pending[key][1])
+                self.coalesced += 1
+                return
+        else:
+            key = next(self._counter)
+        
+        if len(self.pending) >= self.max_queue_size:
+            if self.policy == BackpressurePolicy.BLOCK:
+                while len(self.pending) >= self.max_queue_size:
+                    self.not_full.clear()
+                    await self.not_full.wait()
+            else:
+                self.pending.popitem(last=False)
+                self.dropped += 1
+                self.unfinished -= 1
+        
+        self.pending[key] = (event, time.perf_counter())
+        self.max_depth = max(self.max_depth, len(self.pending))
+        self.unfinished += 1
+        self.idle.clear()
+        self.not_empty.set()
+    
+    async def run(self):
+        """Deliver pending events to the handler one at a time"""
+        while True:
+            while not self.pending:
+                self.not_empty.clear()
+                await self.not_empty.wait()
+            
+            _, (event, enqueued_at) = self.pending.popitem(last=False)
+            self.not_full.set()
+            
+            started = time.perf_counter()
+            try:
+                await self.handler(event)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Error in event handler {self.name}: {str(e)}")
+            finally:
+                self.unfinished -= 1
+                if not self.unfinished:
+                    self.idle.set()
+            finished = time.perf_counter()
+            
+            lag = started - enqueued_at
+            latency = finished - started
+            self.delivered += 1
+            self.total_lag += lag
+            self.max_lag = max(self.max_lag, lag)
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+    
+    async def join(self):
+        """Wait until the handler has finished every queued event (or the worker stops)"""
+        if self.idle is None or self.idle.is_set() or self.task is None or self.task.done():
+            return
+        idle = asyncio.ensure_future(self.idle.wait())
+        try:
+            await asyncio.wait({idle, self.task}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            idle.cancel()
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get lag and latency metrics for this handler"""
+        return {
+            "handler": self.name,
+            "event_type": self.event_type,
+            "policy": self.policy,
+            "queue_depth": len(self.pending),
+            "max_queue_depth": self.max_depth,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "avg_lag_ms": self.total_lag / self.delivered * 1000 if self.delivered else 0.0,
+            "max_lag_ms": self.max_lag * 1000,
+            "avg_latency_ms": self.total_latency / self.delivered * 1000 if self.delivered else 0.0,
+            "max_latency_ms": self.max_latency * 1000
+        }
+
+class EventHistory:
+    """Fixed-capacity ring buffer of events in timestamp order with a per-type index
+    
+    Every appended event gets an absolute sequence number; its slot in the ring is
+    ``seq % capacity``. Time-window lookups bisect over the ring (or over a type's
+    sequence list) instead of scanning it.
+    """
+    
+    def __init__(self, capacity: int = 1000):
+        """Initialize event history
+        
+        Args:
+            capacity: Maximum number of events retained
+        """
+        self.capacity = max(1, capacity)
+        self.slots: List[Optional[Dict[str, Any]]] = [None] * self.capacity
+        # Ordering keys; a timestamp older than its predecessor is clamped to it
+        # so the ring stays sorted even if the clock steps backwards
+        self.order_keys: List[str] = [""] * self.capacity
+        self.next_seq = 0
+        # event type -> ascending absolute sequence numbers (entries before the
+        # start offset have been evicted and are trimmed in bulk)
+        self.type_index: Dict[str, List[int]] = defaultdict(list)
+        self.type_start: Dict[str, int] = defaultdict(int)
+    
+    @property
+    def first_seq(self) -> int:
+        return max(0, self.next_seq - self.capacity)
+    
+    def __len__(self) -> int:
+        return self.next_seq - self.first_seq
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for seq in range(self.first_seq, self.next_seq):
+            yield self.slots[seq % self.capacity]
+    
+    def append(self, event: Dict[str, Any]):
+        """Append an event, evicting the oldest one when full
+        
+        Args:
+            event: Event with "type" and "timestamp" keys
+        """
+        seq = self.next_seq
+        slot = seq % self.capacity
+        
+        if seq >= self.capacity:
+            self._evict(self.slots[slot]["type"], seq - self.capacity)
+        
+        key = event.get("timestamp") or ""
+        if seq > 0:
+            key = max(key, self.order_keys[(seq - 1) % self.capacity])
+        
+        self.slots[slot] = event
+        self.order_keys[slot] = key
+        self.type_index[event["type"]].append(seq)
+        self.next_seq = seq + 1
+    
+    def extend(self, events: Iterable[Dict[str, Any]]):
+        """Append several events in order"""
+        for event in events:
+            self.append(event)
+    
+    def _evict(self, event_type: str, seq: int):
+        """Drop an evicted sequence number from its type index"""
+        seqs = self.type_index[event_type]
+        start = self.type_start[event_type]
+        if start < len(seqs) and seqs[start] == seq:
+            start += 1
+        if start > 64 and start * 2 > len(seqs):
+            del seqs[:start]
+            start = 0
+        if start == len(seqs):
+            del self.type_index[event_type]
+            self.type_start.pop(event_type, None)
+            return
+        self.type_start[event_type] = start
+    
+    def clear(self):
+        """Remove all events"""
+        self.slots = [None] * self.capacity
+        self.order_keys = [""] * self.capacity
+        self.next_seq = 0
+        self.type_index.clear()
+        self.type_start.clear()
+    
+    def _bisect(self, seqs: Any, lo: int, hi: int, key: str, right: bool) -> int:
+        """Binary search positions lo..hi of a sequence-number list by ordering key"""
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_key = self.order_keys[seqs[mid] % self.capacity]
+            if mid_key < key or (right and mid_key == key):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+    
+    def query(
+        self,
+        event_type: Optional[str] = None,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Get events, oldest first, optionally filtered by type and time window
+        
+        Args:
+            event_type: Filter by event type
+            start_time: Earliest ISO timestamp (inclusive)
+            end_time: Latest ISO timestamp (inclusive)
+            
+        Returns:
+            List of events
+        """
+        if event_type is not None:
+            seqs = self.type_index.get(event_type)
+            if not seqs:
+                return []
+            lo, hi = self.type_start[event_type], len(seqs)
+        else:
+            seqs = range(self.first_seq, self.next_seq)
+            lo, hi = 0, len(seqs)
+        
+        if start_time:
+            lo = self._bisect(seqs, lo, hi, start_time, right=False)
+        if end_time:
+            hi = self._bisect(seqs, lo, hi, end_time, right=True)
+        
+        return [self.slots[seqs[i] % self.capacity] for i in range(lo, hi)]
+    
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Get all events, oldest first"""
+        return list(self)
+
 class EventBus:
     """Event bus for handling system events"""
     
@@ -44,10 +367,17 @@ class EventBus:
         
         # Initialize event queue
         self.event_queue = asyncio.Queue()
+        self.queue_running = False
+        
+        # Dispatch mode and per-handler workers (fanout mode)
+        self.dispatch_mode = config.get("dispatch_mode", DispatchMode.INLINE)
+        self.default_queue_size = config.get("handler_queue_size", 1000)
+        self.default_policy = config.get("backpressure_policy", BackpressurePolicy.DROP_OLDEST)
+        self.workers: Dict[str, List[SubscriberWorker]] = defaultdict(list)
         
         # Initialize event history
-        self.event_history = []
         self.max_history_size = config.get("max_history_size", 1000)
+        self.event_history = EventHistory(self.max_history_size)
         
     async def publish(self, event_type: str, event_data: Dict[str, Any]):
         """Publish event to bus
@@ -61,13 +391,14 @@ class EventBus:
             if "timestamp" not in event_data:
                 event_data["timestamp"] = datetime.now().isoformat()
                 
-            # Process event based on type
+            # Process event based on type; sentiment is scored in micro-batches off the loop,
+            # so a burst of concurrent publishes shares model passes instead of blocking the bus
             if event_type == EventType.NEWS:
-                processed_data = self.sentiment_adapter.process_news(event_data)
+                processed_data = await self.sentiment_adapter.process_news_async(event_data)
                 event_data["sentiment"] = processed_data
                 
             elif event_type == EventType.SOCIAL_MEDIA:
-                processed_data = self.sentiment_adapter.process_social_media(event_data)
+                processed_data = await self.sentiment_adapter.process_social_media_async(event_data)
                 event_data["sentiment"] = processed_data
                 
             # Create event
@@ -77,30 +408,49 @@ class EventBus:
                 "timestamp": datetime.now().isoformat()
             }
             
-            # Add to queue
-            await self.event_queue.put(event)
-            
-            # Add to history
+            # Add to history (ring buffer evicts the oldest event)
             self.event_history.append(event)
-            if len(self.event_history) > self.max_history_size:
-                self.event_history.pop(0)
                 
-            # Notify handlers
-            await self._notify_handlers(event)
+            # Deliver exactly once: per-handler workers, the queue processor, or inline
+            if self.dispatch_mode == DispatchMode.FANOUT:
+                await self._fanout(event)
+            elif self.queue_running:
+                await self.event_queue.put(event)
+            else:
+                await self._notify_handlers(event)
             
         except Exception as e:
             logger.error(f"Error publishing event: {str(e)}")
             raise
             
-    def subscribe(self, event_type: str, handler: Callable):
+    def subscribe(
+        self,
+        event_type: str,
+        handler: Callable,
+        max_queue_size: Optional[int] = None,
+        policy: Optional[str] = None,
+        key_func: Optional[Callable[[Dict[str, Any]], Any]] = None
+    ):
         """Subscribe to event type
         
         Args:
             event_type: Type of event to subscribe to
             handler: Handler function
+            max_queue_size: Pending event limit for this handler (fanout mode)
+            policy: Backpressure policy for this handler (fanout mode)
+            key_func: Coalescing key for the COALESCE policy (fanout mode)
         """
         self.handlers[event_type].append(handler)
         
+        if self.dispatch_mode == DispatchMode.FANOUT:
+            self.workers[event_type].append(SubscriberWorker(
+                event_type,
+                handler,
+                max_queue_size=max_queue_size or self.default_queue_size,
+                policy=policy or self.default_policy,
+                key_func=key_func
+            ))
+        
     def unsubscribe(self, event_type: str, handler: Callable):
         """Unsubscribe from event type
         
@@ -111,6 +461,48 @@ class EventBus:
         if handler in self.handlers[event_type]:
             self.handlers[event_type].remove(handler)
             
+        for worker in self.workers.get(event_type, []):
+            if worker.handler == handler:
+                self.workers[event_type].remove(worker)
+                if worker.task is not None:
+                    worker.task.cancel()
+                break
+            
+    async def _fanout(self, event: Dict[str, Any]):
+        """Hand an event to the workers of its type and the wildcard workers
+        
+        Args:
+            event: Event to deliver
+        """
+        for worker in self.workers.get(event["type"], []):
+            await worker.put(event)
+        for worker in self.workers.get("*", []):
+            await worker.put(event)
+            
+    async def drain(self):
+        """Wait until all per-handler queues are empty"""
+        for workers in list(self.workers.values()):
+            for worker in list(workers):
+                await worker.join()
+                
+    async def stop(self):
+        """Stop all per-handler worker tasks"""
+        for workers in list(self.workers.values()):
+            for worker in workers:
+                await worker.stop()
+                
+    def get_handler_metrics(self) -> List[Dict[str, Any]]:
+        """Get per-handler lag and latency metrics (fanout mode)
+        
+        Returns:
+            List of metric dictionaries, one per subscribed handler
+        """
+        return [
+            worker.get_metrics()
+            for workers in self.workers.values()
+            for worker in workers
+        ]
+            
     async def _notify_handlers(self, event: Dict[str, Any]):
         """Notify handlers of event
         
@@ -139,20 +531,27 @@ class EventBus:
             raise
             
     async def process_queue(self):
-        """Process event queue"""
-        while True:
-            try:
-                # Get event from queue
-                event = await self.event_queue.get()
-                
-                # Process event
-                await self._notify_handlers(event)
-                
-                # Mark task as done
-                self.event_queue.task_done()
-                
-            except Exception as e:
-                logger.error(f"Error processing queue: {str(e)}")
+        """Process event queue
+        
+        While this runs, publish enqueues events instead of notifying handlers inline.
+        """
+        self.queue_running = True
+        try:
+            while True:
+                try:
+                    # Get event from queue
+                    event = await self.event_queue.get()
+                    
+                    # Process event
+                    await self._notify_handlers(event)
+                    
+                    # Mark task as done
+                    self.event_queue.task_done()
+                    
+                except Exception as e:
+                    logger.error(f"Error processing queue: {str(e)}")
+        finally:
+            self.queue_running = False
                 
     def get_event_history(
         self,
@@ -171,39 +570,33 @@ class EventBus:
             List of events
         """
         try:
-            # Filter events
-            filtered_events = self.event_history
-            
-            if event_type:
-                filtered_events = [e for e in filtered_events if e["type"] == event_type]
-                
-            if start_time:
-                filtered_events = [
-                    e for e in filtered_events
-                    if e["timestamp"] >= start_time
-                ]
-                
-            if end_time:
-                filtered_events = [
-                    e for e in filtered_events
-                    if e["timestamp"] <= end_time
-                ]
-                
-            return filtered_events
+            return self.event_history.query(event_type, start_time, end_time)
             
         except Exception as e:
             logger.error(f"Error getting event history: {str(e)}")
             raise
             
+    @staticmethod
+    def _open_history_file(filepath: str, mode: str):
+        """Open a history file, gzip-compressed if it ends in .gz"""
+        if filepath.endswith(".gz"):
+            return gzip.open(filepath, mode + "t", encoding="utf-8")
+        return open(filepath, mode, encoding="utf-8")
+    
     def save_event_history(self, filepath: str):
         """Save event history to file
         
+        Events are streamed as JSON Lines, one compact event per line
+        (gzip-compressed when the path ends in .gz).
+        
         Args:
             filepath: Path to save history
         """
         try:
-            with open(filepath, "w") as f:
-                json.dump(self.event_history, f, indent=2)
+            with self._open_history_file(filepath, "w") as f:
+                for event in self.event_history:
+                    f.write(json.dumps(event, separators=(",", ":"), default=str))
+                    f.write("\n")
                 
         except Exception as e:
             logger.error(f"Error saving event history: {str(e)}")
@@ -212,13 +605,28 @@ class EventBus:
     def load_event_history(self, filepath: str):
         """Load event history from file
         
+        Reads JSON Lines files as well as the older single JSON array format.
+        
         Args:
             filepath: Path to load history from
         """
         try:
-            with open(filepath, "r") as f:
-                self.event_history = json.load(f)
+            with self._open_history_file(filepath, "r") as f:
+                first = f.read(1)
+                while first and first.isspace():
+                    first = f.read(1)
+                f.seek(0)
+                
+                if first == "[":
+                    events = json.load(f)
+                else:
+                    events = (json.loads(line) for line in f if line.strip())
+                
+                # Keep the newest events that fit, in timestamp order
+                events = sorted(events, key=lambda e: e.get("timestamp") or "")
+                self.event_history.clear()
+                self.event_history.extend(events[-self.event_history.capacity:])
                 
         except Exception as e:
             logger.error(f"Error loading event history: {str(e)}")
-            raise 
\ No newline at end of file
+            raise
@@ -0,0 +1,206 @@
+"""
+Segmented Event Log
+
+Append-only JSONL persistence split into numbered segment files. Writers only ever
+append one line per record, so the cost of persisting a record does not depend on how
+many records are already stored. Old segments are folded into a single snapshot segment
+by compaction, which can run in a background thread while new records keep arriving.
+"""
+
+import os
+import json
+import glob
+import logging
+import threading
+from typing import Dict, List, Any, Optional, Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+class SegmentedEventLog:
+    """Append-only log of JSON records stored as ``<prefix>-<seq>.jsonl`` segments"""
+
+    def __init__(
+        self,
+        directory: str,
+        prefix: str = "events",
+        segment_max_bytes: int = 16 * 1024 * 1024,
+        max_segments: int = 8,
+        fsync: bool = False
+    ):
+        """
+        Initialize the log
+
+        Args:
+            directory: Directory holding the segment files
+            prefix: File name prefix for segments
+            segment_max_bytes: Size after which the active segment is rolled over
+            max_segments: Number of closed segments that triggers compaction
+            fsync: Whether to fsync after every append (durable but slower)
+        """
+        self.directory = directory
+        self.prefix = prefix
+        self.segment_max_bytes = segment_max_bytes
+        self.max_segments = max_segments
+        self.fsync = fsync
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.compaction_lock = threading.Lock()
+
+        segments = self.list_segments()
+        self.active_seq = segments[-1] + 1 if segments else 1
+        self.first_seq = segments[0] if segments else self.active_seq
+        self._active_file = None
+        self._active_size = 0
+
+    def _segment_path(self, seq: int) -> str:
+        """Get the file path of a segment"""
+        return os.path.join(self.directory, f"{self.prefix}-{seq:08d}.jsonl")
+
+    def list_segments(self) -> List[int]:
+        """List sequence numbers of segments on disk, oldest first"""
+        sequences = []
+        for path in glob.glob(os.path.join(self.directory, f"{self.prefix}-*.jsonl")):
+            name = os.path.basename(path)[len(self.prefix) + 1:-len(".jsonl")]
+            if name.isdigit():
+                sequences.append(int(name))
+        return sorted(sequences)
+
+    def _open_active(self):
+        """Open the active segment for appending"""
+        path = self._segment_path(self.active_seq)
+        self._active_file = open(path, 'a', encoding='utf-8')
+        self._active_size = self._active_file.tell()
+
+    def _write_lines(self, lines: List[str]):
+        """Write encoded lines to the active segment, rolling over when it is full"""
+        if self._active_file is None:
+            self._open_active()
+
+        data = "".join(lines)
+        self._active_file.write(data)
+        self._active_file.flush()
+        if self.fsync:
+            os.fsync(self._active_file.fileno())
+        self._active_size += len(data)
+
+        if self._active_size >= self.segment_max_bytes:
+            self._roll()
+
+    def _roll(self) -> int:
+        """Close the active segment and start a new one. Returns the closed sequence."""
+        closed = self.active_seq
+        if self._active_file is not None:
+            self._active_file.close()
+            self._active_file = None
+        self.active_seq += 1
+        self._active_size = 0
+        return closed
+
+    @staticmethod
+    def _encode(record: Dict[str, Any]) -> str:
+        return json.dumps(record, separators=(',', ':'), default=str) + "\n"
+
+    def append(self, record: Dict[str, Any]):
+        """
+        Append a single record
+
+        Args:
+            record: JSON-serialisable record
+        """
+        line = self._encode(record)
+        with self.lock:
+            self._write_lines([line])
+
+    def append_many(self, records: Iterable[Dict[str, Any]]):
+        """
+        Append several records with a single write
+
+        Args:
+            records: JSON-serialisable records
+        """
+        lines = [self._encode(record) for record in records]
+        if not lines:
+            return
+        with self.lock:
+            self._write_lines(lines)
+
+    def replay(self) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all stored records in append order
+
+        A torn final line (e.g. after a crash mid-write) is skipped with a warning.
+        """
+        for seq in self.list_segments():
+            path = self._segment_path(seq)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line_no, line in enumerate(f, 1):
+                        if not line.strip():
+                            continue
+                        try:
+                            yield json.loads(line)
+                        except json.JSONDecodeError:
+                            logger.warning(f"Skipping corrupt record {path}:{line_no}")
+            except FileNotFoundError:
+                # Removed by a concurrent compaction
+                continue
+
+    def needs_compaction(self) -> bool:
+        """Check whether enough closed segments have piled up to compact"""
+        return self.active_seq - self.first_seq > self.max_segments
+
+    def begin_compaction(self) -> Optional[int]:
+        """
+        Seal the active segment so a snapshot can replace everything up to it
+
+        Callers must take the snapshot of live state while still holding whatever lock
+        guards that state, so that the snapshot and the cut point agree.
+
+        Returns:
+            The sealed sequence number, or None if a compaction is already running
+        """
+        if not self.compaction_lock.acquire(blocking=False):
+            return None
+        with self.lock:
+            return self._roll()
+
+    def finish_compaction(self, cut_seq: int, records: Iterable[Dict[str, Any]]):
+        """
+        Write a snapshot over the sealed segment and drop older segments
+
+        Args:
+            cut_seq: Sequence number returned by ``begin_compaction``
+            records: Records representing the live state at the cut point
+        """
+        try:
+            target = self._segment_path(cut_seq)
+            tmp_path = target + ".tmp"
+            count = 0
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for record in records:
+                    f.write(self._encode(record))
+                    count += 1
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, target)
+
+            removed = 0
+            for seq in self.list_segments():
+                if seq < cut_seq:
+                    os.remove(self._segment_path(seq))
+                    removed += 1
+            self.first_seq = cut_seq
+
+            logger.debug(f"Compacted {removed + 1} segments into {count} records")
+        finally:
+            self.compaction_lock.release()
+
+    def close(self):
+        """Close the active segment"""
+        with self.lock:
+            if self._active_file is not None:
+                self._active_file.close()
+                self._active_file = None
@@ -11,6 +11,7 @@ import json
 import time
 import logging
 import threading
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Union, Set, Callable
 from enum import Enum
@@ -179,6 +180,109 @@ class Subscription:
         
         return subscription
 
+class SubscriptionIndex:
+    """
+    Inverted index from event attributes to matching subscriptions
+    
+    Active subscriptions are filed under category -> symbol -> min priority, with
+    None keys for "all categories" and "all symbols". Resolving an event touches at
+    most four (category, symbol) buckets and one set per priority level at or below
+    the event's priority, so the cost grows with the number of matches rather than
+    the number of subscriptions. Source filters are not indexed and are checked on
+    the candidates.
+    """
+    
+    def __init__(self):
+        """Initialize an empty index"""
+        self.buckets: Dict[Optional[EventCategory], Dict[Optional[str], Dict[int, Set[str]]]] = {}
+        self.entries: Dict[str, List[tuple]] = {}
+        self.source_filtered: Dict[str, Set[str]] = {}
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def add(self, subscription: Subscription):
+        """Index a subscription (replacing any previous entry for it)"""
+        subscriber_id = subscription.subscriber_id
+        self.remove(subscriber_id)
+        if not subscription.is_active:
+            return
+        
+        filter = subscription.filter
+        categories = filter.categories or [None]
+        symbols = filter.symbols or [None]
+        priority = filter.min_priority.value
+        
+        keys = []
+        for category in categories:
+            by_symbol = self.buckets.setdefault(category, {})
+            for symbol in symbols:
+                by_symbol.setdefault(symbol, {}).setdefault(priority, set()).add(subscriber_id)
+                keys.append((category, symbol, priority))
+        self.entries[subscriber_id] = keys
+        
+        if filter.sources:
+            self.source_filtered[subscriber_id] = set(filter.sources)
+    
+    def remove(self, subscriber_id: str):
+        """Remove a subscription from the index"""
+        keys = self.entries.pop(subscriber_id, None)
+        self.source_filtered.pop(subscriber_id, None)
+        if not keys:
+            return
+        
+        for category, symbol, priority in keys:
+            by_symbol = self.buckets.get(category)
+            if by_symbol is None:
+                continue
+            by_priority = by_symbol.get(symbol)
+            if by_priority is None:
+                continue
+            ids = by_priority.get(priority)
+            if ids is None:
+                continue
+            ids.discard(subscriber_id)
+            if not ids:
+                del by_priority[priority]
+                if not by_priority:
+                    del by_symbol[symbol]
+                    if not by_symbol:
+                        del self.buckets[category]
+    
+    def match(self, event: AIEvent) -> Set[str]:
+        """
+        Get the IDs of active subscriptions whose filter matches an event
+        
+        Args:
+            event: The event to route
+            
+        Returns:
+            Set of matching subscriber IDs
+        """
+        matched = set()
+        priority = event.priority.value
+        categories = (event.category, None) if event.category is not None else (None,)
+        symbols = (event.symbol, None) if event.symbol is not None else (None,)
+        
+        for category in categories:
+            by_symbol = self.buckets.get(category)
+            if not by_symbol:
+                continue
+            for symbol in symbols:
+                by_priority = by_symbol.get(symbol)
+                if not by_priority:
+                    continue
+                for min_priority, ids in by_priority.items():
+                    if min_priority <= priority:
+                        matched |= ids
+        
+        if self.source_filtered:
+            for subscriber_id in matched & self.source_filtered.keys():
+                if event.source not in self.source_filtered[subscriber_id]:
+                    matched.discard(subscriber_id)
+        
+        return matched
+
 class DeliveryProvider:
     """Base class for event delivery providers"""
     
@@ -222,9 +326,20 @@ class AIIntelligenceDispatcher:
         self.config = config
         self.event_pool = event_pool
         self.subscriptions = {}
+        self.subscription_index = SubscriptionIndex()
         self.delivery_providers = {}
         self.delivery_thread = None
         self.running = False
+        self.lock = threading.RLock()
+        
+        # Per-provider delivery worker pools, keyed by id(provider)
+        self.delivery_workers = config.get("delivery_workers", 8)
+        self.delivery_pools: Dict[int, ThreadPoolExecutor] = {}
+        
+        # last_delivery changes are written at most once per save interval
+        self.save_interval = config.get("subscription_save_interval", 5.0)
+        self.save_lock = threading.Lock()
+        self.save_timer = None
         
         # 加载订阅
         self._load_subscriptions()
@@ -252,6 +367,7 @@ class AIIntelligenceDispatcher:
                     try:
                         subscription = Subscription.from_dict(subscription_data)
                         self.subscriptions[subscription.subscriber_id] = subscription
+                        self.subscription_index.add(subscription)
                     except Exception as e:
                         logger.error(f"Failed to load subscription: {str(e)}")
                 
@@ -262,16 +378,50 @@ class AIIntelligenceDispatcher:
     def _save_subscriptions(self):
         """Save subscriptions to storage"""
         try:
-            subscriptions_data = [subscription.to_dict() for subscription in self.subscriptions.values()]
+            with self.lock:
+                subscriptions_data = [subscription.to_dict() for subscription in self.subscriptions.values()]
             
             subscriptions_file = os.path.join("data/ai/subscriptions", "subscriptions.json")
-            with open(subscriptions_file, 'w') as f:
-                json.dump(subscriptions_data, f, indent=2)
+            with self.save_lock:
+                os.makedirs(os.path.dirname(subscriptions_file), exist_ok=True)
+                tmp_file = subscriptions_file + ".tmp"
+                with open(tmp_file, 'w') as f:
+                    json.dump(subscriptions_data, f, indent=2)
+                os.replace(tmp_file, subscriptions_file)
             
             logger.debug(f"Saved {len(subscriptions_data)} subscriptions to storage")
         except Exception as e:
             logger.error(f"Error saving subscriptions: {str(e)}")
     
+    def _schedule_save(self):
+        """Save subscriptions after the save interval, folding in any other changes made meanwhile"""
+        with self.save_lock:
+            if self.save_timer is not None:
+                return
+            self.save_timer = threading.Timer(self.save_interval, self._flush_subscriptions)
+            self.save_timer.daemon = True
+            self.save_timer.start()
+    
+    def _flush_subscriptions(self):
+        """Write pending subscription changes"""
+        with self.save_lock:
+            self.save_timer = None
+        self._save_subscriptions()
+    
+    def _get_delivery_pool(self, provider: DeliveryProvider) -> ThreadPoolExecutor:
+        """Get the worker pool for a delivery provider, creating it on first use"""
+        pool = self.delivery_pools.get(id(provider))
+        if pool is None:
+            with self.lock:
+                pool = self.delivery_pools.get(id(provider))
+                if pool is None:
+                    pool = ThreadPoolExecutor(
+                        max_workers=self.delivery_workers,
+                        thread_name_prefix=f"dispatch-{provider.__class__.__name__}"
+                    )
+                    self.delivery_pools[id(provider)] = pool
+        return pool
+    
     def _register_delivery_providers(self):
         """Register event delivery providers"""
         # At minimum, register console provider for testing
@@ -331,9 +481,10 @@ class AIIntelligenceDispatcher:
                 self.subscriptions[subscription.subscriber_id] = subscription
             else:
                 self.subscriptions[subscription.subscriber_id] = subscription
+            self.subscription_index.add(subscription)
             
             # Save to storage
-            self._save_subscriptions()
+            self._schedule_save()
             
             logger.info(f"Added/updated subscription for {subscription.subscriber_id}")
             return True
@@ -354,9 +505,10 @@ class AIIntelligenceDispatcher:
                 return False
             
             del self.subscriptions[subscriber_id]
+            self.subscription_index.remove(subscriber_id)
             
             # Save to storage
-            self._save_subscriptions()
+            self._schedule_save()
             
             logger.info(f"Removed subscription for {subscriber_id}")
             return True
@@ -392,8 +544,10 @@ class AIIntelligenceDispatcher:
             if "is_active" in updates:
                 subscription.is_active = updates["is_active"]
             
+            self.subscription_index.add(subscription)
+            
             # Save to storage
-            self._save_subscriptions()
+            self._schedule_save()
             
             logger.info(f"Updated subscription for {subscriber_id}")
             return True
@@ -421,51 +575,67 @@ class AIIntelligenceDispatcher:
         with self.lock:
             return list(self.subscriptions.values())
     
-    def dispatch_event(self, event: AIEvent) -> int:
+    def get_matching_subscriptions(self, event: AIEvent) -> List[Subscription]:
+        """
+        Get active subscriptions whose filter matches an event
+        
+        Args:
+            event: The event to route
+            
+        Returns:
+            List of matching subscriptions
+        """
+        with self.lock:
+            return [self.subscriptions[subscriber_id] for subscriber_id in self.subscription_index.match(event)]
+    
+    def _deliver_event(self, provider: DeliveryProvider, event: AIEvent, subscription: Subscription) -> bool:
+        """Deliver one event to one subscriber (runs on a delivery worker)"""
+        subscriber_id = subscription.subscriber_id
+        try:
+            if provider.send_event(event, subscription):
+                # Mark as delivered
+                self.event_pool.mark_delivered(event.event_id, subscriber_id)
+                subscription.last_delivery = datetime.now().isoformat()
+                self._schedule_save()
+                logger.debug(f"Delivered event {event.event_id} to {subscriber_id}")
+                return True
+        except Exception as e:
+            logger.error(f"Error delivering event to {subscriber_id}: {str(e)}")
+        return False
+    
+    def dispatch_event(self, event: AIEvent, wait: bool = False) -> int:
         """
         Dispatch an event to all matching subscribers
         
+        Matching subscriptions are looked up in the routing index under the lock;
+        deliveries then run on per-provider worker pools so a slow provider neither
+        holds the lock nor delays the others.
+        
         Args:
             event: The event to dispatch
+            wait: Wait for the deliveries to finish
             
         Returns:
-            Number of subscribers the event was dispatched to
+            Number of subscribers the event was queued for, or successfully
+            delivered to if wait is True
         """
-        delivered_count = 0
+        futures = []
         
-        with self.lock:
-            # Find matching subscriptions
-            for subscriber_id, subscription in self.subscriptions.items():
-                # Skip inactive subscriptions
-                if not subscription.is_active:
-                    continue
-                
-                # Check if event matches subscription filter
-                if not subscription.filter.matches(event):
-                    continue
-                
-                # Get appropriate delivery provider
-                provider = self.delivery_providers.get(subscription.subscriber_type)
-                if not provider:
-                    logger.warning(f"No delivery provider for {subscription.subscriber_type}")
-                    continue
-                
-                # Attempt delivery
-                try:
-                    if provider.send_event(event, subscription):
-                        # Mark as delivered
-                        self.event_pool.mark_delivered(event.event_id, subscriber_id)
-                        subscription.last_delivery = datetime.now().isoformat()
-                        delivered_count += 1
-                        logger.debug(f"Delivered event {event.event_id} to {subscriber_id}")
-                except Exception as e:
-                    logger.error(f"Error delivering event to {subscriber_id}: {str(e)}")
-            
-            # Save subscription updates
-            if delivered_count > 0:
-                self._save_subscriptions()
+        for subscription in self.get_matching_subscriptions(event):
+            # Get appropriate delivery provider
+            provider = self.delivery_providers.get(subscription.subscriber_type)
+            if not provider:
+                logger.warning(f"No delivery provider for {subscription.subscriber_type}")
+                continue
             
-            return delivered_count
+            pool = self._get_delivery_pool(provider)
+            futures.append(pool.submit(self._deliver_event, provider, event, subscription))
+        
+        if not wait:
+            return len(futures)
+        
+        wait_futures(futures)
+        return sum(1 for future in futures if future.result())
     
     def dispatch_batch(self, events: List[AIEvent], subscriber_id: str) -> int:
         """
@@ -478,40 +648,39 @@ class AIIntelligenceDispatcher:
         Returns:
             Number of events successfully dispatched
         """
-        with self.lock:
-            subscription = self.get_subscription(subscriber_id)
-            if not subscription or not subscription.is_active:
-                return 0
-            
-            # Filter events based on subscription filter
-            matching_events = [event for event in events if subscription.filter.matches(event)]
-            if not matching_events:
-                return 0
-            
-            # Get appropriate delivery provider
-            provider = self.delivery_providers.get(subscription.subscriber_type)
-            if not provider:
-                logger.warning(f"No delivery provider for {subscription.subscriber_type}")
-                return 0
-            
-            # Attempt batch delivery
-            try:
-                if provider.send_batch(matching_events, subscription):
-                    # Mark all as delivered
-                    for event in matching_events:
-                        self.event_pool.mark_delivered(event.event_id, subscriber_id)
-                    
-                    subscription.last_delivery = datetime.now().isoformat()
-                    self._save_subscriptions()
-                    
-                    logger.info(f"Delivered batch of {len(matching_events)} events to {subscriber_id}")
-                    return len(matching_events)
-                else:
-                    logger.warning(f"Failed to deliver batch to {subscriber_id}")
-                    return 0
-            except Exception as e:
-                logger.error(f"Error delivering batch to {subscriber_id}: {str(e)}")
+        subscription = self.get_subscription(subscriber_id)
+        if not subscription or not subscription.is_active:
+            return 0
+        
+        # Filter events based on subscription filter
+        matching_events = [event for event in events if subscription.filter.matches(event)]
+        if not matching_events:
+            return 0
+        
+        # Get appropriate delivery provider
+        provider = self.delivery_providers.get(subscription.subscriber_type)
+        if not provider:
+            logger.warning(f"No delivery provider for {subscription.subscriber_type}")
+            return 0
+        
+        # Attempt batch delivery
+        try:
+            if provider.send_batch(matching_events, subscription):
+                # Mark all as delivered
+                for event in matching_events:
+                    self.event_pool.mark_delivered(event.event_id, subscriber_id)
+                
+                subscription.last_delivery = datetime.now().isoformat()
+                self._schedule_save()
+                
+                logger.info(f"Delivered batch of {len(matching_events)} events to {subscriber_id}")
+                return len(matching_events)
+            else:
+                logger.warning(f"Failed to deliver batch to {subscriber_id}")
                 return 0
+        except Exception as e:
+            logger.error(f"Error delivering batch to {subscriber_id}: {str(e)}")
+            return 0
     
     def _delivery_loop(self):
         """Background thread that processes event deliveries"""
@@ -521,17 +690,18 @@ class AIIntelligenceDispatcher:
                 delivered_total = 0
                 
                 # Process each active subscription
-                for subscriber_id, subscription in self.subscriptions.items():
+                with self.lock:
+                    subscriptions = list(self.subscriptions.items())
+                
+                for subscriber_id, subscription in subscriptions:
                     if not subscription.is_active:
                         continue
                     
-                    # Get undelivered events for this subscriber
-                    undelivered = self.event_pool.get_undelivered_events(subscriber_id, limit=20)
-                    if not undelivered:
-                        continue
-                    
-                    # Filter events based on subscription
-                    matching_events = [event for event in undelivered if subscription.filter.matches(event)]
+                    # Get undelivered events matching this subscription; the pool keeps a
+                    # per-subscriber cursor so only events added since the last pass are scanned
+                    matching_events = self.event_pool.get_undelivered_events(
+                        subscriber_id, limit=20, predicate=subscription.filter.matches
+                    )
                     if not matching_events:
                         continue
                     
@@ -552,6 +722,18 @@ class AIIntelligenceDispatcher:
         self.running = False
         if self.delivery_thread.is_alive():
             self.delivery_thread.join(timeout=1.0)
+        
+        # Let queued deliveries finish, then write pending subscription changes
+        for pool in list(self.delivery_pools.values()):
+            pool.shutdown(wait=True)
+        self.delivery_pools.clear()
+        
+        with self.save_lock:
+            timer, self.save_timer = self.save_timer, None
+        if timer is not None:
+            timer.cancel()
+            self._save_subscriptions()
+        
         logger.info("AI Intelligence Dispatcher stopped")
 
     def create_user_subscription(
@@ -0,0 +1,147 @@
+"""
+策略适应度缓存
+按 (评估上下文, 基因组) 的哈希保存适应度，跨代、跨重启复用
+
+评估上下文包括评估器源码、打分权重和行情窗口的指纹；换了行情、改了信号/平仓逻辑
+或打分方式，旧的结果自然不会命中。缓存默认只在内存中，配置 path 后持久化为 SQLite
+文件，超过条目上限时淘汰最久未用的条目。
+"""
+
+import os
+import json
+import time
+import inspect
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, Optional, List, Iterable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 单条 SQL 里 IN (...) 的参数个数上限
+_BATCH = 500
+
+def fingerprint(arrays: Dict[str, np.ndarray], length: int, *extra: Any) -> bytes:
+    """行情前 length 根K线和其它评估参数的指纹"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps([length, *extra], sort_keys=True, default=str).encode('utf-8'))
+    for name in sorted(arrays):
+        digest.update(name.encode('utf-8'))
+        digest.update(np.ascontiguousarray(arrays[name][:length], dtype=np.float64).tobytes())
+    return digest.digest()
+
+def code_digest(cls: type) -> str:
+    """类及其基类的源码摘要，源码取不到时退回到类名"""
+    digest = hashlib.blake2b(digest_size=16)
+    for klass in cls.__mro__:
+        if klass is object:
+            continue
+        digest.update(f"{klass.__module__}.{klass.__qualname__}".encode('utf-8'))
+        try:
+            digest.update(inspect.getsource(klass).encode('utf-8'))
+        except (OSError, TypeError):
+            pass
+    return digest.hexdigest()
+
+def genome_keys(genes: Dict[str, np.ndarray], names: Iterable[str], context: bytes) -> List[bytes]:
+    """每个个体的缓存键：评估上下文 + 按 names 顺序排列的基因取值"""
+    matrix = np.ascontiguousarray(np.column_stack([genes[name] for name in names]), dtype=np.float64)
+    return [hashlib.blake2b(context + row.tobytes(), digest_size=16).digest() for row in matrix]
+
+class FitnessCache:
+    """SQLite 持久化的适应度缓存"""
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            config: 可选 path（默认 ":memory:"，只在内存中）和 max_entries
+        """
+        config = config or {}
+        self.path = config.get('path') or ':memory:'
+        self.max_entries = config.get('max_entries', 1000000)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS fitness (key BLOB PRIMARY KEY, fitness REAL, accessed REAL) WITHOUT ROWID"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS fitness_accessed ON fitness (accessed)")
+        self.entries = self.conn.execute("SELECT COUNT(*) FROM fitness").fetchone()[0]
+    
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, float]:
+        """查询一批键，返回命中的 键 -> 适应度"""
+        found: Dict[bytes, float] = {}
+        unique = list(dict.fromkeys(keys))
+        now = time.time()
+        with self.lock:
+            try:
+                for i in range(0, len(unique), _BATCH):
+                    batch = unique[i:i + _BATCH]
+                    marks = ",".join("?" * len(batch))
+                    rows = self.conn.execute(f"SELECT key, fitness FROM fitness WHERE key IN ({marks})", batch)
+                    # SQLite 把 NaN 存成 NULL
+                    found.update((key, float('nan') if value is None else value) for key, value in rows)
+                    self.conn.execute(f"UPDATE fitness SET accessed = ? WHERE key IN ({marks})", [now, *batch])
+            except sqlite3.Error as e:
+                logger.error(f"Fitness cache lookup failed: {e}")
+            self.hits += len(found)
+            self.misses += len(unique) - len(found)
+        return found
+    
+    def set_many(self, items: Dict[bytes, float]) -> None:
+        """写入一批适应度，超过上限时淘汰最久未用的条目"""
+        if not items:
+            return
+        now = time.time()
+        with self.lock:
+            try:
+                self.conn.execute("BEGIN")
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO fitness VALUES (?, ?, ?)",
+                    [(key, float(value), now) for key, value in items.items()]
+                )
+                self.conn.execute("COMMIT")
+                self.entries = self.conn.execute("SELECT COUNT(*) FROM fitness").fetchone()[0]
+                if self.entries > self.max_entries:
+                    excess = self.entries - self.max_entries
+                    self.conn.execute(
+                        "DELETE FROM fitness WHERE key IN (SELECT key FROM fitness ORDER BY accessed LIMIT ?)",
+                        (excess,)
+                    )
+                    self.entries -= excess
+                    self.evictions += excess
+            except sqlite3.Error as e:
+                if self.conn.in_transaction:
+                    self.conn.execute("ROLLBACK")
+                logger.error(f"Failed to store fitness cache entries: {e}")
+    
+    def clear(self) -> None:
+        """清空缓存（例如信号逻辑改变之后）"""
+        with self.lock:
+            self.conn.execute("DELETE FROM fitness")
+            self.entries = 0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """条目数、命中率和淘汰数"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": self.entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions
+        }
+    
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
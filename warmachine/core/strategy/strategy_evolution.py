@@ -1,21 +1,30 @@
 """
 策略进化系统核心模块
 实现了基于遗传算法的策略优化和进化机制
+
+种群评估是向量化的：整个种群的止损/止盈等基因与行情一起按 (个体 × 时间)
+数组模拟；种群按块分给进程池，行情数组通过共享内存只传一次。
+适应度按基因组哈希缓存（跨代；配置路径后跨重启），参数无效的个体不做模拟，
+其余个体先在一段较短的行情上筛选，只有排名靠前的才跑完整行情。
 """
 
 import os
 import json
+import time
 import random
 import numpy as np
 import logging
 import asyncio
 from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing import shared_memory
 import pandas as pd
 from scipy import stats
 
+from .fitness_cache import FitnessCache, code_digest, fingerprint, genome_keys
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -55,9 +64,76 @@ class StrategyDNA:
         # TODO: 实现基于历史数据的盈利能力计算
         return random.random() * 2 - 1
 
+GENE_NAMES = tuple(field.name for field in fields(StrategyDNA))
+
+def population_genes(population: List[StrategyDNA]) -> Dict[str, np.ndarray]:
+    """把种群转换为 基因名 -> 每个个体取值 的数组"""
+    return {
+        name: np.array([getattr(dna, name) for dna in population], dtype=np.float64)
+        for name in GENE_NAMES
+    }
+
+def market_arrays(market_data: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """取出行情中的数值列（至少包含 price 和 volatility）"""
+    numeric = market_data.select_dtypes(include=[np.number])
+    return {str(column): np.ascontiguousarray(numeric[column].to_numpy(dtype=np.float64)) for column in numeric}
+
+class SharedMarketData:
+    """放在共享内存里的行情数组，进程池的每个工作进程只需挂载一次"""
+    
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        size = sum(array.nbytes for array in arrays.values())
+        self.shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self.layout: Dict[str, Tuple[int, int]] = {}
+        offset = 0
+        for name, array in arrays.items():
+            view = np.ndarray(array.shape, dtype=np.float64, buffer=self.shm.buf, offset=offset)
+            view[:] = array
+            self.layout[name] = (offset, len(array))
+            offset += array.nbytes
+    
+    @property
+    def name(self) -> str:
+        return self.shm.name
+    
+    @staticmethod
+    def attach(name: str, layout: Dict[str, Tuple[int, int]]) -> Tuple[shared_memory.SharedMemory, Dict[str, np.ndarray]]:
+        """在工作进程中挂载共享行情，返回 (共享内存, 只读数组视图)"""
+        # 进程池的工作进程与主进程共用 resource tracker，共享内存由主进程 close() 时释放
+        shm = shared_memory.SharedMemory(name=name)
+        arrays = {}
+        for column, (offset, length) in layout.items():
+            array = np.ndarray((length,), dtype=np.float64, buffer=shm.buf, offset=offset)
+            array.flags.writeable = False
+            arrays[column] = array
+        return shm, arrays
+    
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+# 工作进程状态：评估器和挂载的共享行情
+_worker_state: Dict[str, Any] = {}
+
+def _init_evaluation_worker(evaluator: "StrategyEvaluator", shm_name: str, layout: Dict[str, Tuple[int, int]]):
+    shm, arrays = SharedMarketData.attach(shm_name, layout)
+    _worker_state.update(evaluator=evaluator, shm=shm, arrays=arrays)
+
+def _evaluate_chunk(genes: Dict[str, np.ndarray], length: int) -> np.ndarray:
+    arrays = {name: values[:length] for name, values in _worker_state["arrays"].items()}
+    return _worker_state["evaluator"].evaluate_population(genes, arrays)
+
 class StrategyEvaluator:
     """策略评估器，负责评估策略的表现"""
     
+    # 逐个评估的钩子 -> 对应的向量化实现
+    VECTORIZED_HOOKS = {
+        'evaluate_strategy': 'evaluate_population',
+        '_simulate_strategy': 'simulate_population',
+        '_generate_signal': '_generate_signals',
+        '_should_close_position': 'simulate_population'
+    }
+    
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.metrics = {
@@ -74,26 +150,162 @@ class StrategyEvaluator:
             # 模拟策略执行
             trades = await self._simulate_strategy(dna, market_data)
             
-            # 计算各项指标
-            returns = self._calculate_returns(trades)
-            metrics = {}
-            for metric_name, metric_func in self.metrics.items():
-                metrics[metric_name] = metric_func(returns)
-            
-            # 计算综合得分
-            weights = self.config['strategy_evolution']['evaluation']['metric_weights']
-            score = sum(metrics[metric] * weights[metric] for metric in metrics)
-            
-            # 应用风险惩罚
-            risk_penalty = self._calculate_risk_penalty(metrics)
-            final_score = score * (1 - risk_penalty)
-            
-            return final_score
+            return self._score_returns(self._calculate_returns(trades))
             
         except Exception as e:
             logger.error(f"Strategy evaluation failed: {e}")
             return float('-inf')
     
+    def _score_returns(self, returns: np.ndarray) -> float:
+        """根据交易收益序列计算综合得分"""
+        # 计算各项指标
+        metrics = {}
+        for metric_name, metric_func in self.metrics.items():
+            metrics[metric_name] = metric_func(returns)
+        
+        # 计算综合得分
+        weights = self.config['strategy_evolution']['evaluation']['metric_weights']
+        score = sum(metrics[metric] * weights[metric] for metric in metrics)
+        
+        # 应用风险惩罚
+        risk_penalty = self._calculate_risk_penalty(metrics)
+        return score * (1 - risk_penalty)
+    
+    def supports_vectorized(self) -> bool:
+        """子类覆盖了逐个评估的钩子却没有覆盖对应的向量化实现时，不能向量化评估"""
+        cls = type(self)
+        return all(
+            getattr(cls, hook) is getattr(StrategyEvaluator, hook)
+            or getattr(cls, vectorized) is not getattr(StrategyEvaluator, vectorized)
+            for hook, vectorized in self.VECTORIZED_HOOKS.items()
+        )
+    
+    def evaluate_population(self, genes: Dict[str, np.ndarray], data: Dict[str, np.ndarray]) -> np.ndarray:
+        """向量化评估一组个体，结果与逐个调用 evaluate_strategy 相同
+        
+        Args:
+            genes: 基因名 -> 每个个体的取值
+            data: 行情数值列，至少包含 price 和 volatility
+            
+        Returns:
+            每个个体的适应度
+        """
+        size = len(genes['stop_loss_threshold'])
+        try:
+            signals = self._generate_signals(genes, data)
+            block_size = self.config.get('strategy_evolution', {}).get('evaluation', {}).get('block_size', 64)
+            returns = self.simulate_population(genes, data['price'], data['volatility'], signals, block_size)
+        except Exception as e:
+            logger.error(f"Population evaluation failed: {e}")
+            return np.full(size, float('-inf'))
+        
+        scores = np.empty(size)
+        # 与逐个评估一致：回撤为 0 等情况下的除零产生 inf/nan，不打印警告
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for i in range(size):
+                try:
+                    scores[i] = self._score_returns(returns[i])
+                except Exception as e:
+                    logger.error(f"Strategy evaluation failed: {e}")
+                    scores[i] = float('-inf')
+        return scores
+    
+    def _generate_signals(self, genes: Dict[str, np.ndarray], data: Dict[str, np.ndarray]) -> np.ndarray:
+        """_generate_signal 的向量化版本，子类覆盖 _generate_signal 时需要同时覆盖
+        
+        Returns:
+            (时间,) 全体共用或 (个体 × 时间) 的信号：1 做多，-1 做空，0 不操作
+        """
+        if not self.supports_vectorized():
+            raise NotImplementedError(f"{type(self).__name__} has no vectorized implementation of its row-wise hooks")
+        # 与基类的 _generate_signal 一致：不产生信号
+        return np.zeros(len(data['price']), dtype=np.int8)
+    
+    @staticmethod
+    def simulate_population(genes: Dict[str, np.ndarray], price: np.ndarray, volatility: np.ndarray,
+                            signals: np.ndarray, block_size: int = 64) -> List[np.ndarray]:
+        """按 (个体 × 时间) 数组模拟整个种群，交易规则与 _simulate_strategy 相同
+        
+        行情按 block_size 根K线分块；每一轮里空仓的个体跳到下一个信号开仓，
+        持仓的个体在块内一次算出止损/止盈/波动率条件，找到第一次平仓的位置。
+        
+        Returns:
+            每个个体按时间顺序的平仓收益
+        """
+        size, length = len(genes['stop_loss_threshold']), len(price)
+        stop_loss = genes['stop_loss_threshold']
+        take_profit = genes['take_profit_threshold']
+        lookback = genes['volatility_lookback']
+        
+        signals = np.asarray(signals)
+        shared_signals = signals.ndim == 1
+        if shared_signals:
+            # next_signal[t]: t 及之后第一个非零信号的位置（没有则为 length）
+            nonzero = np.flatnonzero(signals)
+            position_in = np.searchsorted(nonzero, np.arange(length + 1))
+            next_signal = np.full(length + 1, length, dtype=np.int64)
+            found = position_in < len(nonzero)
+            next_signal[found] = nonzero[position_in[found]]
+        
+        position = np.zeros(size, dtype=np.int8)
+        entry = np.zeros(size)
+        cursor = np.zeros(size, dtype=np.int64)  # 下一根待处理K线
+        exited, pnls = [], []
+        
+        for start in range(0, length, block_size):
+            end = min(length, start + block_size)
+            columns = np.arange(start, end)
+            while True:
+                live = np.flatnonzero(cursor < end)
+                if not live.size:
+                    break
+                
+                # 空仓：在下一个信号处开仓
+                flat = live[position[live] == 0]
+                if flat.size:
+                    if shared_signals:
+                        at = next_signal[cursor[flat]]
+                        hit = at < end
+                    else:
+                        mask = (signals[flat, start:end] != 0) & (columns >= cursor[flat][:, None])
+                        hit = mask.any(axis=1)
+                        at = mask.argmax(axis=1) + start
+                    opened, at = flat[hit], at[hit]
+                    position[opened] = signals[at] if shared_signals else signals[opened, at]
+                    entry[opened] = price[at]
+                    cursor[opened] = at + 1
+                    cursor[flat[~hit]] = end
+                
+                # 持仓：找块内第一次触发平仓的K线（开仓当根不检查）
+                held = live[position[live] != 0]
+                held = held[cursor[held] < end]
+                if held.size:
+                    first = cursor[held].min()
+                    entry_price = entry[held][:, None]
+                    pnl_pct = (price[first:end] - entry_price) * position[held][:, None] / entry_price
+                    close = (
+                        (pnl_pct <= -stop_loss[held][:, None])
+                        | (pnl_pct >= take_profit[held][:, None])
+                        | (volatility[first:end] > lookback[held][:, None])
+                    )
+                    close &= columns[first - start:] >= cursor[held][:, None]
+                    hit = close.any(axis=1)
+                    at = close.argmax(axis=1) + first
+                    closed, at = held[hit], at[hit]
+                    exited.append(closed)
+                    pnls.append((price[at] - entry[closed]) * position[closed])
+                    position[closed] = 0
+                    cursor[closed] = at + 1
+                    cursor[held[~hit]] = end
+        
+        if not exited:
+            return [np.array([]) for _ in range(size)]
+        exited, pnls = np.concatenate(exited), np.concatenate(pnls)
+        order = np.argsort(exited, kind='stable')
+        exited, pnls = exited[order], pnls[order]
+        bounds = np.searchsorted(exited, np.arange(size + 1))
+        return [pnls[bounds[i]:bounds[i + 1]] for i in range(size)]
+    
     async def _simulate_strategy(self, dna: StrategyDNA, market_data: pd.DataFrame) -> List[Dict[str, Any]]:
         """模拟策略执行"""
         trades = []
@@ -220,6 +432,29 @@ class StrategyEvolution:
         self.evaluator = StrategyEvaluator(self.config)
         self.history: List[Dict[str, Any]] = []
         self.executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+        self.fitness_scores: List[float] = []
+        self.selection_probabilities: Optional[np.ndarray] = None
+        self.last_evaluation_time = 0.0
+        
+        # 向量化评估与进程池（行情放在共享内存里，换一份行情才重建）
+        evaluation_config = self.config.get('strategy_evolution', {}).get('evaluation', {})
+        self.vectorized = evaluation_config.get('vectorized', True)
+        self.workers = evaluation_config.get('workers', os.cpu_count() or 1)
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.shared_data: Optional[SharedMarketData] = None
+        self.data_source: Optional[pd.DataFrame] = None
+        self.data_arrays: Optional[Dict[str, np.ndarray]] = None
+        self.data_fingerprints: Dict[Tuple, bytes] = {}
+        
+        # 适应度缓存与分阶段评估
+        cache_config = evaluation_config.get('fitness_cache', {})
+        self.fitness_cache = FitnessCache(cache_config) if cache_config.get('enabled', True) else None
+        staging_config = evaluation_config.get('staging', {})
+        self.staging = staging_config.get('enabled', True)
+        self.screen_fraction = staging_config.get('screen_fraction', 0.25)
+        self.keep_fraction = staging_config.get('keep_fraction', 0.5)
+        self.min_candidates = staging_config.get('min_candidates', 20)
+        self.last_evaluation_stats: Dict[str, Any] = {}
         
     def _load_config(self, config_path: str) -> Dict[str, Any]:
         """加载配置文件"""
@@ -305,15 +540,189 @@ class StrategyEvolution:
         logger.info(f"Generation {self.generation} completed. Best fitness: {self.best_fitness}")
     
     async def _evaluate_population(self, market_data: pd.DataFrame) -> List[float]:
-        """并行评估种群中每个策略的适应度"""
+        """评估种群中每个策略的适应度
+        
+        参数无效的个体直接记为 -inf；重复的基因组只评估一次；其余个体先在前
+        screen_fraction 的行情上筛选，只有前 keep_fraction 的个体评估完整行情，
+        被淘汰的个体取筛选得分，且不高于本代完整评估的最低分。缓存里只有完整评估和
+        筛选窗口上的原始得分，命中时只省去模拟；淘汰与否每一代按当代的全部候选重新
+        决定，所以有无缓存得到的适应度相同。
+        """
+        start = time.perf_counter()
+        if self.vectorized and not self.evaluator.supports_vectorized():
+            logger.warning(f"{type(self.evaluator).__name__} only implements row-wise evaluation, "
+                           f"evaluating individuals one by one")
+            self.vectorized = False
+        self._prepare_data(market_data)
+        size, length = len(self.population), len(market_data)
+        genes = population_genes(self.population)
+        scores = np.full(size, np.nan)
+        evaluation_stats = {"individuals": size, "invalid": 0, "cache_hits": 0, "screen_cache_hits": 0,
+                            "duplicates": 0, "screened": 0, "pruned": 0, "full": 0, "bars_simulated": 0}
+        
+        # 参数无效的个体不做模拟
+        valid = np.array([self._validate_strategy(dna) for dna in self.population], dtype=bool)
+        scores[~valid] = float('-inf')
+        evaluation_stats["invalid"] = int(size - valid.sum())
+        
+        # 相同基因组只评估一次
+        keys = genome_keys(genes, GENE_NAMES, self._context(length))
+        groups: Dict[bytes, List[int]] = {}
+        for i in np.flatnonzero(valid):
+            groups.setdefault(keys[i], []).append(int(i))
+        evaluation_stats["duplicates"] = sum(len(group) - 1 for group in groups.values())
+        
+        candidates = np.array([group[0] for group in groups.values()], dtype=np.int64)
+        cached_full = self.fitness_cache.get_many([keys[i] for i in candidates]) if self.fitness_cache else {}
+        
+        # 短窗口筛选；筛选得分就是前 screen_length 根K线上的适应度，与代数无关。
+        # 排名覆盖全部有效的基因组（包括完整得分已缓存的），淘汰结果与缓存冷热无关
+        screen_length = int(length * self.screen_fraction)
+        pruned = np.array([], dtype=np.int64)
+        if self.staging and 0 < screen_length < length and len(candidates) >= self.min_candidates:
+            screen_keys = genome_keys(genes, GENE_NAMES, self._context(screen_length))
+            screen_scores = np.full(len(candidates), np.nan)
+            known = np.zeros(len(candidates), dtype=bool)
+            if self.fitness_cache:
+                cached = self.fitness_cache.get_many([screen_keys[i] for i in candidates])
+                for j, i in enumerate(candidates):
+                    if screen_keys[i] in cached:
+                        screen_scores[j] = cached[screen_keys[i]]
+                        known[j] = True
+                evaluation_stats["screen_cache_hits"] = len(cached)
+            
+            fresh = candidates[~known]
+            if len(fresh):
+                screen_scores[~known] = await self._evaluate_individuals(fresh, genes, screen_length)
+                if self.fitness_cache:
+                    self.fitness_cache.set_many({screen_keys[i]: value for i, value in zip(fresh, screen_scores[~known])})
+                evaluation_stats["screened"] = len(fresh)
+                evaluation_stats["bars_simulated"] += len(fresh) * screen_length
+            
+            order = np.argsort(-np.nan_to_num(screen_scores, nan=float('-inf')), kind='stable')
+            keep = max(1, int(np.ceil(len(candidates) * self.keep_fraction)))
+            pruned = candidates[order[keep:]]
+            scores[pruned] = screen_scores[order[keep:]]
+            candidates = candidates[order[:keep]]
+        
+        # 完整得分已缓存的幸存者不再模拟
+        for i in candidates:
+            if keys[i] in cached_full:
+                scores[i] = cached_full[keys[i]]
+        evaluation_stats["cache_hits"] = sum(keys[i] in cached_full for i in candidates)
+        fresh = np.array([i for i in candidates if keys[i] not in cached_full], dtype=np.int64)
+        if len(fresh):
+            values = await self._evaluate_individuals(fresh, genes, length)
+            scores[fresh] = values
+            if self.fitness_cache:
+                self.fitness_cache.set_many({keys[i]: value for i, value in zip(fresh, values)})
+            evaluation_stats["full"] = len(fresh)
+            evaluation_stats["bars_simulated"] += len(fresh) * length
+        
+        if len(pruned):
+            # 被淘汰的个体不排在本代任何完整评估过的个体前面
+            evaluated = scores[candidates]
+            finite = evaluated[np.isfinite(evaluated)]
+            floor = finite.min() if finite.size else float('-inf')
+            scores[pruned] = np.minimum(np.nan_to_num(scores[pruned], nan=float('-inf')), floor)
+            evaluation_stats["pruned"] = len(pruned)
+        
+        for group in groups.values():
+            scores[group[1:]] = scores[group[0]]
+        
+        # 与不缓存、不筛选时逐个完整评估相比节省的计算量（个体 × K线）
+        baseline = size * length
+        evaluation_stats["bars_baseline"] = baseline
+        evaluation_stats["compute_saved"] = 1 - evaluation_stats["bars_simulated"] / baseline if baseline else 0.0
+        
+        self.fitness_scores = scores.tolist()
+        self.last_evaluation_stats = evaluation_stats
+        self.last_evaluation_time = time.perf_counter() - start
+        return self.fitness_scores
+    
+    async def _evaluate_individuals(self, indices: np.ndarray, genes: Dict[str, np.ndarray],
+                                    length: int) -> np.ndarray:
+        """在前 length 根K线上评估指定个体"""
+        if self.vectorized:
+            return await self._evaluate_vectorized({name: values[indices] for name, values in genes.items()}, length)
+        
+        window = self.data_source.iloc[:length]
         tasks = []
-        for dna in self.population:
+        for i in indices:
             task = asyncio.create_task(
-                self.evaluator.evaluate_strategy(dna, market_data)
+                self.evaluator.evaluate_strategy(self.population[i], window)
             )
             tasks.append(task)
+        return np.array(await asyncio.gather(*tasks), dtype=np.float64)
+    
+    async def _evaluate_vectorized(self, genes: Dict[str, np.ndarray], length: int) -> np.ndarray:
+        """向量化评估；多个工作进程时按块分给进程池"""
+        loop = asyncio.get_running_loop()
+        size = len(genes['stop_loss_threshold'])
+        
+        if self.workers > 1 and size > 1:
+            try:
+                pool = self._get_pool()
+                chunks = np.array_split(np.arange(size), min(self.workers * 2, size))
+                results = await asyncio.gather(*(
+                    loop.run_in_executor(pool, _evaluate_chunk,
+                                         {name: values[chunk] for name, values in genes.items()}, length)
+                    for chunk in chunks
+                ))
+                return np.concatenate(results)
+            except Exception as e:
+                logger.error(f"Process pool evaluation failed, evaluating in-process: {e}")
+                self._release_pool()
         
-        return await asyncio.gather(*tasks)
+        arrays = {name: values[:length] for name, values in self.data_arrays.items()}
+        return await loop.run_in_executor(self.executor, self.evaluator.evaluate_population, genes, arrays)
+    
+    def _prepare_data(self, market_data: pd.DataFrame) -> None:
+        """换了一份行情时重新取数组，旧的进程池和共享内存作废"""
+        if self.data_source is not market_data or self.data_arrays is None:
+            self._release_pool()
+            self.data_source = market_data
+            self.data_arrays = market_arrays(market_data)
+            self.data_fingerprints = {}
+    
+    def _context(self, length: int) -> bytes:
+        """缓存键的评估上下文：评估器源码、打分权重和前 length 根K线"""
+        evaluator = type(self.evaluator)
+        if (length, evaluator) not in self.data_fingerprints:
+            weights = self.config.get('strategy_evolution', {}).get('evaluation', {}).get('metric_weights')
+            self.data_fingerprints[(length, evaluator)] = fingerprint(
+                self.data_arrays, length, code_digest(evaluator), weights
+            )
+        return self.data_fingerprints[(length, evaluator)]
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """获取挂载了当前行情的进程池"""
+        if self.pool is None:
+            self.shared_data = SharedMarketData(self.data_arrays)
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_evaluation_worker,
+                initargs=(self.evaluator, self.shared_data.name, self.shared_data.layout)
+            )
+        return self.pool
+    
+    def _release_pool(self) -> None:
+        """关闭进程池并释放共享行情"""
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        if self.shared_data is not None:
+            self.shared_data.close()
+            self.shared_data = None
+    
+    def close(self) -> None:
+        """关闭进程池、共享行情和适应度缓存"""
+        self._release_pool()
+        self.data_source = None
+        self.data_arrays = None
+        if self.fitness_cache is not None:
+            self.fitness_cache.close()
+            self.fitness_cache = None
     
     def _select_best(self, fitness_scores: List[float]) -> None:
         """选择最优个体"""
@@ -329,9 +738,20 @@ class StrategyEvolution:
         evolution_config = self.config['strategy_evolution']['evolution']
         new_population = []
         
+        # 轮盘赌概率：适应度平移为非负，inf/nan 按最好/最差的有限值处理
+        scores = np.asarray(self.fitness_scores, dtype=np.float64)
+        finite = scores[np.isfinite(scores)]
+        if finite.size:
+            scores = np.nan_to_num(scores, nan=finite.min(), posinf=finite.max(), neginf=finite.min())
+            weights = scores - finite.min()
+        else:
+            weights = np.zeros(len(scores))
+        total = weights.sum()
+        self.selection_probabilities = weights / total if total > 0 else None
+        
         # 保留最优个体
         survival_count = int(len(self.population) * evolution_config['survival_rate'])
-        sorted_indices = np.argsort(self._evaluate_population())[-survival_count:]
+        sorted_indices = np.argsort(scores, kind='stable')[len(scores) - survival_count:]
         for idx in sorted_indices:
             new_population.append(self.population[idx])
         
@@ -354,14 +774,11 @@ class StrategyEvolution:
         return new_population
     
     def _select_parent(self) -> StrategyDNA:
-        """使用轮盘赌选择父代"""
-        fitness_scores = self._evaluate_population()
-        total_fitness = sum(fitness_scores)
-        if total_fitness == 0:
+        """使用轮盘赌选择父代（概率来自本代适应度）"""
+        if self.selection_probabilities is None:
             return random.choice(self.population)
         
-        probabilities = [score/total_fitness for score in fitness_scores]
-        return np.random.choice(self.population, p=probabilities)
+        return self.population[np.random.choice(len(self.population), p=self.selection_probabilities)]
     
     def _crossover(self, parent1: StrategyDNA, parent2: StrategyDNA) -> StrategyDNA:
         """执行两个父代DNA的交叉操作"""
@@ -417,12 +834,17 @@ class StrategyEvolution:
     
     def _record_generation(self, fitness_scores: List[float]) -> None:
         """记录当前代的信息"""
+        # 无效或评估失败的个体为 -inf，不计入均值和标准差
+        fitness_scores = np.asarray(fitness_scores, dtype=np.float64)
+        fitness_scores = fitness_scores[np.isfinite(fitness_scores)]
         generation_info = {
             "generation": self.generation,
             "timestamp": datetime.now().isoformat(),
             "best_fitness": self.best_fitness,
-            "avg_fitness": np.mean(fitness_scores),
-            "std_fitness": np.std(fitness_scores),
+            "avg_fitness": np.mean(fitness_scores) if fitness_scores.size else float('nan'),
+            "std_fitness": np.std(fitness_scores) if fitness_scores.size else float('nan'),
+            "evaluation_time": self.last_evaluation_time,
+            "evaluation": self.last_evaluation_stats,
             "best_strategy": self.get_best_strategy()
         }
         self.history.append(generation_info)
@@ -4,7 +4,7 @@ Alert Engine for managing trading alerts
 
 import logging
 import time
-from typing import Dict, Any, List, Optional, Set, Deque
+from typing import Dict, Any, List, Optional, Set, Deque, Tuple
 from datetime import datetime, timedelta
 from collections import defaultdict, deque
 from ai_event_pool import AIEvent, EventCategory, EventPriority
@@ -13,7 +13,7 @@ from .api import TelegramAPI
 from .alert_templates import AlertTemplateManager
 from .alert_subscription import AlertSubscriptionManager
 from .alert_feedback import AlertFeedbackManager
-from .alert_priority import PriorityManager
+from .alert_priority import PriorityManager, ThresholdIndex
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +41,8 @@ class AlertEngine:
             "volume": {},  # symbol -> {threshold: float, chat_id: str}
             "risk": {}  # strategy -> {threshold: float, chat_id: str}
         }
+        # (alert type, symbol or strategy) -> threshold index over its alerts
+        self._alert_indexes: Dict[Tuple[str, str], ThresholdIndex] = {}
         
         # Initialize Telegram API
         self.telegram_token = self.config.get("telegram", {}).get("token")
@@ -257,16 +259,15 @@ class AlertEngine:
             
             # Adjust priority based on rules
             original_priority = event.priority
-            event.priority = self.priority_manager.adjust_priority(event)
+            event.priority, applied_rules = self.priority_manager.apply_rules(event)
             
             # Update statistics if priority was adjusted
             if event.priority != original_priority:
                 self.metrics["priority_adjustments"]["total"] += 1
-                for rule in self.priority_manager.rules:
-                    if rule.evaluate(event):
-                        self.metrics["priority_adjustments"]["by_rule"][rule.name] = (
-                            self.metrics["priority_adjustments"]["by_rule"].get(rule.name, 0) + 1
-                        )
+                for rule in applied_rules:
+                    self.metrics["priority_adjustments"]["by_rule"][rule.name] = (
+                        self.metrics["priority_adjustments"]["by_rule"].get(rule.name, 0) + 1
+                    )
             
             if event.category == EventCategory.MARKET_ALERT:
                 await self._handle_market_alert(event)
@@ -308,24 +309,21 @@ class AlertEngine:
         
         # Check price alerts
         if symbol in self.alerts["price"]:
-            for alert in self.alerts["price"][symbol]:
-                if self._check_price_alert(symbol, alert, metadata):
-                    await self._trigger_alert(event, alert["chat_id"])
+            for alert in self._match_alerts("price", symbol, metadata.get("price", 0)):
+                await self._trigger_alert(event, alert["chat_id"])
         
         # Check volume alerts
         if symbol in self.alerts["volume"]:
-            for alert in self.alerts["volume"][symbol]:
-                if self._check_volume_alert(symbol, alert, metadata):
-                    await self._trigger_alert(event, alert["chat_id"])
+            for alert in self._match_alerts("volume", symbol, metadata.get("volume", 0)):
+                await self._trigger_alert(event, alert["chat_id"])
     
     async def _handle_risk_alert(self, event: AIEvent):
         """Handle risk-related alerts"""
         strategy = event.metadata.get("strategy", "default")
         
         if strategy in self.alerts["risk"]:
-            for alert in self.alerts["risk"][strategy]:
-                if self._check_risk_alert(strategy, alert, event.metadata):
-                    await self._trigger_alert(event, alert["chat_id"])
+            for alert in self._match_alerts("risk", strategy, event.metadata.get("risk_level", 0)):
+                await self._trigger_alert(event, alert["chat_id"])
     
     async def _handle_trade_signal(self, event: AIEvent):
         """Handle trade signal alerts"""
@@ -336,34 +334,38 @@ class AlertEngine:
                     if event.symbol in alert.get("symbols", [event.symbol]):
                         await self._trigger_alert(event, alert["chat_id"])
     
-    def _check_price_alert(self, symbol: str, alert: Dict[str, Any], 
-                          metadata: Dict[str, Any]) -> bool:
-        """Check if price alert conditions are met"""
-        current_price = metadata.get("price", 0)
-        threshold = alert["threshold"]
-        direction = alert["direction"]
-        
-        if direction == "above" and current_price > threshold:
-            return True
-        elif direction == "below" and current_price < threshold:
-            return True
-        return False
-    
-    def _check_volume_alert(self, symbol: str, alert: Dict[str, Any],
-                           metadata: Dict[str, Any]) -> bool:
-        """Check if volume alert conditions are met"""
-        current_volume = metadata.get("volume", 0)
-        threshold = alert["threshold"]
+    def _match_alerts(self, alert_type: str, identifier: str, value: Any) -> List[Dict[str, Any]]:
+        """
+        Find the alerts of a symbol or strategy triggered by a value
         
-        return current_volume > threshold
-    
-    def _check_risk_alert(self, strategy: str, alert: Dict[str, Any],
-                         metadata: Dict[str, Any]) -> bool:
-        """Check if risk alert conditions are met"""
-        risk_level = metadata.get("risk_level", 0)
-        threshold = alert["threshold"]
+        Price alerts fire above or below their threshold (by direction), volume and
+        risk alerts above it. Alerts are looked up in a threshold index built on
+        first use, so only the triggered ones are visited.
         
-        return risk_level > threshold
+        Args:
+            alert_type: Type of alert (price, volume, risk)
+            identifier: Symbol or strategy name
+            value: Current price, volume or risk level
+            
+        Returns:
+            Triggered alerts, in the order they were added
+        """
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return []
+        
+        key = (alert_type, identifier)
+        index = self._alert_indexes.get(key)
+        if index is None:
+            index = ThresholdIndex()
+            for alert in self.alerts[alert_type].get(identifier, []):
+                direction = alert.get("direction", "above")
+                if direction in ("above", "below"):
+                    index.add(">" if direction == "above" else "<", alert["threshold"], alert)
+            self._alert_indexes[key] = index
+        
+        return [alert for _, alert in sorted(index.match(value), key=lambda match: match[0])]
     
     async def _trigger_alert(self, event: AIEvent, chat_id: str):
         """
@@ -412,6 +414,7 @@ class AlertEngine:
         try:
             if symbol not in self.alerts["price"]:
                 self.alerts["price"][symbol] = []
+            self._alert_indexes.pop(("price", symbol), None)
             
             self.alerts["price"][symbol].append({
                 "threshold": threshold,
@@ -442,6 +445,7 @@ class AlertEngine:
         try:
             if symbol not in self.alerts["volume"]:
                 self.alerts["volume"][symbol] = []
+            self._alert_indexes.pop(("volume", symbol), None)
             
             self.alerts["volume"][symbol].append({
                 "threshold": threshold,
@@ -471,6 +475,7 @@ class AlertEngine:
         try:
             if strategy not in self.alerts["risk"]:
                 self.alerts["risk"][strategy] = []
+            self._alert_indexes.pop(("risk", strategy), None)
             
             self.alerts["risk"][strategy].append({
                 "threshold": threshold,
@@ -712,6 +717,7 @@ class AlertEngine:
             self.alerts[alert_type][identifier] = [
                 alert for alert in alerts if alert["chat_id"] != chat_id
             ]
+            self._alert_indexes.pop((alert_type, identifier), None)
             
             # Remove empty lists
             if not self.alerts[alert_type][identifier]:
@@ -4,13 +4,271 @@ Alert Priority Manager
 Handles dynamic adjustment of alert priorities based on various factors.
 """
 
+import re
 import logging
-from typing import Dict, Any, List, Optional, Set
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Set, Tuple, Callable
 from datetime import datetime, timedelta
 from ai_event_pool import EventCategory, EventPriority
 
 logger = logging.getLogger(__name__)
 
+# Tokens of a condition string: comparison operators, parentheses, quoted strings
+# and bare words (field names, numbers, unquoted string values, and/or/not)
+_TOKEN_PATTERN = re.compile(r"\s*(>=|<=|==|!=|>|<|\(|\)|\"[^\"]*\"|'[^']*'|[^\s()<>=!]+)")
+
+_COMPARISONS = {
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b
+}
+
+
+def _number(value: Any) -> Optional[float]:
+    """Convert a metadata value to float, None if it is not numeric"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _need_field(guards: List[Tuple[str, str, float]]) -> bool:
+    """Check that none of the comparisons holds on a missing field (read as 0)"""
+    return not any(_COMPARISONS[op](0.0, number) for _, op, number in guards)
+
+
+class CompiledCondition:
+    """
+    Rule condition compiled to a predicate over event metadata
+    
+    Supports numeric comparisons (>, >=, <, <=), equality (==, !=), and/or/not and
+    parentheses, e.g. "volume > 1000 and (price_change > 0.05 or risk_level >= 0.8)".
+    Ordering comparisons read missing fields as 0; a value that is not numeric makes
+    the comparison false.
+    """
+    
+    def __init__(self, condition: str):
+        """
+        Compile a condition string
+        
+        Args:
+            condition: Condition string
+            
+        Raises:
+            ValueError: If the condition cannot be parsed
+        """
+        self.condition = condition
+        self.fields: Set[str] = set()
+        self._tokens = self._tokenize(condition)
+        self._pos = 0
+        self.predicate: Callable[[Dict[str, Any]], bool] = self._parse_or()
+        if self._pos != len(self._tokens):
+            raise ValueError(f"Unexpected '{self._tokens[self._pos]}' in condition: {condition}")
+        del self._tokens
+        
+        # A single numeric comparison (field, operator, threshold) can be matched
+        # through a ThresholdIndex instead of being evaluated
+        self.threshold: Optional[Tuple[str, str, float]] = getattr(self.predicate, "threshold", None)
+        
+        # Comparisons at least one of which holds whenever the condition does, so
+        # the condition only needs evaluating when a ThresholdIndex over them
+        # matches. Only usable if they are all false on a missing field.
+        self.guards: Optional[List[Tuple[str, str, float]]] = getattr(self.predicate, "guards", None)
+        if self.guards and not _need_field(self.guards):
+            self.guards = None
+        
+        # Value of the condition for events that carry none of its fields
+        self.default = self.predicate({})
+    
+    def __call__(self, metadata: Dict[str, Any]) -> bool:
+        return self.predicate(metadata)
+    
+    @staticmethod
+    def _tokenize(condition: str) -> List[str]:
+        tokens = []
+        condition = condition.strip()
+        pos = 0
+        while pos < len(condition):
+            match = _TOKEN_PATTERN.match(condition, pos)
+            if not match:
+                raise ValueError(f"Invalid syntax at '{condition[pos:]}' in condition: {condition}")
+            tokens.append(match.group(1))
+            pos = match.end()
+        return tokens
+    
+    def _peek(self) -> Optional[str]:
+        return self._tokens[self._pos] if self._pos < len(self._tokens) else None
+    
+    def _next(self) -> str:
+        token = self._peek()
+        if token is None:
+            raise ValueError(f"Unexpected end of condition: {self.condition}")
+        self._pos += 1
+        return token
+    
+    def _parse_or(self) -> Callable[[Dict[str, Any]], bool]:
+        terms = [self._parse_and()]
+        while self._peek() == "or":
+            self._next()
+            terms.append(self._parse_and())
+        if len(terms) == 1:
+            return terms[0]
+        
+        def predicate(metadata):
+            for term in terms:
+                if term(metadata):
+                    return True
+            return False
+        # The condition needs one of the terms, so one of their guards
+        if all(getattr(term, "guards", None) for term in terms):
+            predicate.guards = [guard for term in terms for guard in term.guards]
+        return predicate
+    
+    def _parse_and(self) -> Callable[[Dict[str, Any]], bool]:
+        terms = [self._parse_not()]
+        while self._peek() == "and":
+            self._next()
+            terms.append(self._parse_not())
+        if len(terms) == 1:
+            return terms[0]
+        
+        def predicate(metadata):
+            for term in terms:
+                if not term(metadata):
+                    return False
+            return True
+        # The condition needs every term, so the guards of any one of them
+        guarded = [term.guards for term in terms if getattr(term, "guards", None) and _need_field(term.guards)]
+        if guarded:
+            predicate.guards = min(guarded, key=len)
+        return predicate
+    
+    def _parse_not(self) -> Callable[[Dict[str, Any]], bool]:
+        if self._peek() == "not":
+            self._next()
+            term = self._parse_not()
+            return lambda metadata: not term(metadata)
+        if self._peek() == "(":
+            self._next()
+            term = self._parse_or()
+            if self._next() != ")":
+                raise ValueError(f"Missing ')' in condition: {self.condition}")
+            return term
+        return self._parse_comparison()
+    
+    def _parse_comparison(self) -> Callable[[Dict[str, Any]], bool]:
+        field = self._next()
+        op = self._next()
+        literal = self._next()
+        if op not in _COMPARISONS or field in _COMPARISONS or literal in _COMPARISONS or "(" in (field, literal):
+            raise ValueError(f"Expected '<field> <operator> <value>' in condition: {self.condition}")
+        self.fields.add(field)
+        compare = _COMPARISONS[op]
+        quoted = literal[0] in "\"'"
+        text = literal[1:-1] if quoted else literal
+        number = None if quoted else _number(text)
+        
+        if op in ("==", "!="):
+            # Numeric literals match numeric values ("count == 5" matches 5 and "5"),
+            # anything else is compared as a string
+            def predicate(metadata, field=field, text=text, number=number, negate=op == "!="):
+                value = metadata.get(field)
+                if number is not None and value is not None:
+                    equal = _number(value) == number
+                else:
+                    equal = value == text
+                return equal != negate
+            return predicate
+        
+        if number is None:
+            raise ValueError(f"Operator '{op}' needs a numeric value in condition: {self.condition}")
+        
+        def predicate(metadata, field=field, compare=compare, number=number):
+            value = _number(metadata.get(field, 0))
+            return value is not None and compare(value, number)
+        predicate.threshold = (field, op, number)
+        predicate.guards = [predicate.threshold]
+        return predicate
+
+
+@lru_cache(maxsize=4096)
+def compile_condition(condition: str) -> CompiledCondition:
+    """
+    Compile a condition string (cached, so rules sharing a condition share one predicate)
+    
+    Args:
+        condition: Condition string
+        
+    Returns:
+        Compiled condition
+        
+    Raises:
+        ValueError: If the condition cannot be parsed
+    """
+    return CompiledCondition(condition)
+
+
+class ThresholdIndex:
+    """
+    Items keyed by (operator, threshold), matched against a value with binary search
+    
+    Finds every item whose "value <operator> threshold" holds in O(log n + matches)
+    instead of testing each threshold.
+    """
+    
+    def __init__(self):
+        self._entries: Dict[str, List[Tuple[float, int, Any]]] = {op: [] for op in (">", ">=", "<", "<=")}
+        self._thresholds: Optional[Dict[str, List[float]]] = None
+        self._count = 0
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def add(self, op: str, threshold: float, item: Any, order: Optional[int] = None) -> None:
+        """
+        Add an item
+        
+        Args:
+            op: One of >, >=, <, <=
+            threshold: Threshold the value is compared with
+            item: Item returned by match
+            order: Sort key of the item in match results (insertion order by default)
+        """
+        self._entries[op].append((float(threshold), self._count if order is None else order, item))
+        self._count += 1
+        self._thresholds = None
+    
+    def _build(self) -> Dict[str, List[float]]:
+        for entries in self._entries.values():
+            entries.sort(key=lambda entry: entry[0])
+        self._thresholds = {op: [entry[0] for entry in entries] for op, entries in self._entries.items()}
+        return self._thresholds
+    
+    def match(self, value: float) -> List[Tuple[int, Any]]:
+        """
+        Find the items whose condition holds for a value
+        
+        Args:
+            value: Value to compare
+            
+        Returns:
+            List of (order, item) for the matching items, unsorted
+        """
+        if value != value:  # NaN compares false with everything
+            return []
+        thresholds = self._thresholds or self._build()
+        # thresholds are ascending: value > t for a prefix, value < t for a suffix
+        matches = self._entries[">"][:bisect_left(thresholds[">"], value)]
+        matches += self._entries[">="][:bisect_right(thresholds[">="], value)]
+        matches += self._entries["<"][bisect_right(thresholds["<"], value):]
+        matches += self._entries["<="][bisect_left(thresholds["<="], value):]
+        return [(order, item) for _, order, item in matches]
+
+
 class PriorityRule:
     """Rule for adjusting alert priority"""
     
@@ -29,6 +287,25 @@ class PriorityRule:
         self.adjustment = max(-2, min(2, adjustment))  # Clamp between -2 and +2
         self.cooldown = cooldown
         self.last_triggered = None
+        try:
+            self.compiled: Optional[CompiledCondition] = compile_condition(condition)
+        except ValueError as e:
+            logger.warning(f"Invalid condition in rule {name}: {str(e)}")
+            self.compiled = None
+    
+    def in_cooldown(self, now: Optional[datetime] = None) -> bool:
+        """
+        Check whether the rule is still cooling down
+        
+        Args:
+            now: Current time (defaults to datetime.now())
+            
+        Returns:
+            True if the rule was triggered less than cooldown seconds ago
+        """
+        if not (self.cooldown and self.last_triggered):
+            return False
+        return ((now or datetime.now()) - self.last_triggered).total_seconds() < self.cooldown
     
     def evaluate(self, event: Any) -> bool:
         """
@@ -41,37 +318,10 @@ class PriorityRule:
             True if condition is met
         """
         try:
-            # Check cooldown
-            if self.cooldown and self.last_triggered:
-                if (datetime.now() - self.last_triggered).total_seconds() < self.cooldown:
-                    return False
-            
-            # Evaluate condition
-            # This is a simple implementation - in practice you'd want to use a proper expression evaluator
-            if ">" in self.condition:
-                field, value = self.condition.split(">")
-                field = field.strip()
-                value = float(value.strip())
-                return float(event.metadata.get(field, 0)) > value
-            elif "<" in self.condition:
-                field, value = self.condition.split("<")
-                field = field.strip()
-                value = float(value.strip())
-                return float(event.metadata.get(field, 0)) < value
-            elif "==" in self.condition:
-                field, value = self.condition.split("==")
-                field = field.strip()
-                value = value.strip()
-                return event.metadata.get(field) == value
-            elif "!=" in self.condition:
-                field, value = self.condition.split("!=")
-                field = field.strip()
-                value = value.strip()
-                return event.metadata.get(field) != value
-            else:
-                logger.warning(f"Unknown condition operator in rule {self.name}")
+            if self.compiled is None or self.in_cooldown():
                 return False
-                
+            return self.compiled(event.metadata)
+            
         except Exception as e:
             logger.error(f"Error evaluating rule {self.name}: {str(e)}")
             return False
@@ -117,6 +367,14 @@ class AlertPriority:
     def set_priority(self, alert_id, priority):
         return {"success": True}
     
+class _FieldRules:
+    """Priority rules reading one metadata field"""
+    
+    def __init__(self):
+        self.exact = ThresholdIndex()  # Single comparisons on the field
+        self.guarded = ThresholdIndex()  # and/or conditions with a guard on the field
+        self.others: List[Tuple[int, PriorityRule]] = []  # Evaluated whenever the field is present
+    
 class PriorityManager:
     """Manager for alert priorities"""
     
@@ -124,6 +382,7 @@ class PriorityManager:
         """Initialize priority manager"""
         self.rules: List[PriorityRule] = []
         self.history: Dict[str, List[Dict[str, Any]]] = {}  # event_id -> list of adjustments
+        self._index = None  # Rules by metadata field, rebuilt after the rules change
     
     def add_rule(self, name: str, condition: str, adjustment: int, cooldown: int = 0) -> PriorityRule:
         """
@@ -140,6 +399,7 @@ class PriorityManager:
         """
         rule = PriorityRule(name, condition, adjustment, cooldown)
         self.rules.append(rule)
+        self._index = None
         logger.info(f"Added priority rule: {name}")
         return rule
     
@@ -157,6 +417,7 @@ class PriorityManager:
             for i, rule in enumerate(self.rules):
                 if rule.name == name:
                     del self.rules[i]
+                    self._index = None
                     logger.info(f"Removed priority rule: {name}")
                     return True
             return False
@@ -165,7 +426,84 @@ class PriorityManager:
             logger.error(f"Error removing rule {name}: {str(e)}")
             return False
     
-    def adjust_priority(self, event: Any) -> EventPriority:
+    def _build_index(self) -> Tuple[Dict[str, "_FieldRules"], List[Tuple[int, PriorityRule]]]:
+        """
+        Group rules by the metadata fields they read
+        
+        Single numeric comparisons go into a ThresholdIndex per field and match
+        without evaluation; and/or conditions over comparisons are indexed by
+        their guards and evaluated when a guard matches; anything else is
+        evaluated whenever one of its fields is present. Rules whose condition
+        holds when none of its fields are present are kept separately.
+        """
+        fields: Dict[str, _FieldRules] = {}
+        defaults: List[Tuple[int, PriorityRule]] = []
+        for position, rule in enumerate(self.rules):
+            compiled = rule.compiled
+            if compiled is None:
+                continue
+            if compiled.threshold:
+                field, op, threshold = compiled.threshold
+                fields.setdefault(field, _FieldRules()).exact.add(op, threshold, rule, position)
+            elif compiled.guards:
+                for field, op, threshold in compiled.guards:
+                    fields.setdefault(field, _FieldRules()).guarded.add(op, threshold, rule, position)
+            else:
+                for field in compiled.fields:
+                    fields.setdefault(field, _FieldRules()).others.append((position, rule))
+            if compiled.default:
+                defaults.append((position, rule))
+        self._index = (fields, defaults)
+        return self._index
+    
+    def match_rules(self, event: Any) -> List[PriorityRule]:
+        """
+        Find the rules whose condition holds for an event
+        
+        Only rules reading a field present in the event metadata are looked at;
+        conditions shared by several rules are evaluated once.
+        
+        Args:
+            event: Event to match
+            
+        Returns:
+            Matching rules that are not cooling down, in the order they were added
+        """
+        fields, defaults = self._index or self._build_index()
+        metadata = event.metadata
+        present = {field for field in metadata if field in fields}
+        matched: Dict[int, PriorityRule] = {}
+        outcomes: Dict[CompiledCondition, bool] = {}
+        
+        def holds(rule: PriorityRule) -> bool:
+            outcome = outcomes.get(rule.compiled)
+            if outcome is None:
+                outcome = outcomes[rule.compiled] = rule.compiled.predicate(metadata)
+            return outcome
+        
+        for field in present:
+            rules = fields[field]
+            value = _number(metadata[field])
+            if value is not None:
+                if len(rules.exact):
+                    matched.update(rules.exact.match(value))
+                if len(rules.guarded):
+                    for position, rule in rules.guarded.match(value):
+                        if position not in matched and holds(rule):
+                            matched[position] = rule
+            for position, rule in rules.others:
+                if position not in matched and holds(rule):
+                    matched[position] = rule
+        
+        # Conditions that hold on missing fields (e.g. "volume < 100")
+        for position, rule in defaults:
+            if position not in matched and present.isdisjoint(rule.compiled.fields):
+                matched[position] = rule
+        
+        now = datetime.now()
+        return [matched[position] for position in sorted(matched) if not matched[position].in_cooldown(now)]
+    
+    def apply_rules(self, event: Any) -> Tuple[EventPriority, List[PriorityRule]]:
         """
         Adjust event priority based on rules
         
@@ -173,16 +511,16 @@ class PriorityManager:
             event: Event to adjust
             
         Returns:
-            Adjusted priority
+            Adjusted priority and the rules that were applied
         """
         try:
             original_priority = event.priority
             adjusted_priority = original_priority
             
-            # Apply each rule
-            for rule in self.rules:
-                if rule.evaluate(event):
-                    adjusted_priority = rule.apply(adjusted_priority)
+            # Apply each matching rule
+            applied = self.match_rules(event)
+            for rule in applied:
+                adjusted_priority = rule.apply(adjusted_priority)
             
             # Record adjustment if changed
             if adjusted_priority != original_priority:
@@ -193,10 +531,7 @@ class PriorityManager:
                     "timestamp": datetime.now().isoformat(),
                     "original_priority": original_priority.name,
                     "adjusted_priority": adjusted_priority.name,
-                    "rules_applied": [
-                        rule.name for rule in self.rules
-                        if rule.evaluate(event)
-                    ]
+                    "rules_applied": [rule.name for rule in applied]
                 })
                 
                 logger.info(
@@ -204,11 +539,23 @@ class PriorityManager:
                     f"{original_priority.name} -> {adjusted_priority.name}"
                 )
             
-            return adjusted_priority
+            return adjusted_priority, applied
             
         except Exception as e:
-            logger.error(f"Error adjusting priority for event {event.id}: {str(e)}")
-            return event.priority
+            logger.error(f"Error adjusting priority for event {getattr(event, 'id', None)}: {str(e)}")
+            return event.priority, []
+    
+    def adjust_priority(self, event: Any) -> EventPriority:
+        """
+        Adjust event priority based on rules
+        
+        Args:
+            event: Event to adjust
+            
+        Returns:
+            Adjusted priority
+        """
+        return self.apply_rules(event)[0]
     
     def get_adjustment_history(self, event_id: str) -> List[Dict[str, Any]]:
         """
@@ -15,6 +15,11 @@ from typing import Dict, Any, Optional, List, Union
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from collections import defaultdict
+from ai_engine.prompt_cache import get_prompt_cache
+from analysis.indicators import (
+    Indicator, IndicatorSet, IndicatorEngine, RSI, MACD, BollingerBands, MovingAverage,
+    ATR, KDJ, OBV, CCI, DMI, Ichimoku
+)
 
 logger = logging.getLogger(__name__)
 
@@ -60,6 +65,14 @@ class TradingHandler:
         self.ai_config = config["ai"]
         self.ai_session = None
         
+        # 提示词缓存：行情快照中的数字按有效位数量化，相近的查询直接复用回答
+        try:
+            self.prompt_cache = get_prompt_cache(self.ai_config.get("prompt_cache"))
+            self.prompt_cache.configure_call_site("trading_handler", ttl=self.ai_config.get("cache_ttl"))
+        except Exception as e:
+            logger.error(f"Error opening prompt cache, caching disabled: {str(e)}")
+            self.prompt_cache = None
+        
         # 初始化预测历史记录
         self.prediction_history = defaultdict(list)
         
@@ -82,6 +95,21 @@ class TradingHandler:
             "Ichimoku": self._calculate_ichimoku
         }
         
+        # 增量指标引擎：每个 (symbol, timeframe) 保留指标状态，新K线 O(1) 更新
+        self.indicator_engine = IndicatorEngine(self._indicator_factory)
+        self.indicator_formatters = {
+            "RSI": self._format_rsi,
+            "MACD": self._format_macd,
+            "BB": self._format_bollinger_bands,
+            "MA": self._format_moving_averages,
+            "ATR": self._format_atr,
+            "KDJ": self._format_kdj,
+            "OBV": self._format_obv,
+            "CCI": self._format_cci,
+            "DMI": self._format_dmi,
+            "Ichimoku": self._format_ichimoku
+        }
+        
         # 风险预警阈值
         self.risk_thresholds = {
             "volatility": 0.02,  # 2% 日内波动
@@ -106,7 +134,21 @@ class TradingHandler:
             )
     
     async def _call_ai_api(self, prompt: str) -> Dict[str, Any]:
-        """调用AI API"""
+        """调用AI API（先查提示词缓存）"""
+        messages = [
+            {"role": "system", "content": self.ai_config["system_prompt"]},
+            {"role": "user", "content": prompt}
+        ]
+        cache_key = None
+        if self.prompt_cache is not None:
+            cache_key = self.prompt_cache.make_key(
+                self.ai_config["model"], messages, self.ai_config["temperature"], "trading_handler",
+                max_tokens=self.ai_config["max_tokens"], top_p=self.ai_config.get("top_p", 0.9)
+            )
+            cached = self.prompt_cache.get(cache_key, "trading_handler")
+            if cached is not None:
+                return cached
+        
         await self._ensure_ai_session()
         
         try:
@@ -114,10 +156,7 @@ class TradingHandler:
                 "/v1/chat/completions",
                 json={
                     "model": self.ai_config["model"],
-                    "messages": [
-                        {"role": "system", "content": self.ai_config["system_prompt"]},
-                        {"role": "user", "content": prompt}
-                    ],
+                    "messages": messages,
                     "temperature": self.ai_config["temperature"],
                     "max_tokens": self.ai_config["max_tokens"],
                     "top_p": self.ai_config.get("top_p", 0.9),
@@ -127,7 +166,10 @@ class TradingHandler:
             ) as response:
                 if response.status == 200:
                     result = await response.json()
-                    return result["choices"][0]["message"]["content"]
+                    content = result["choices"][0]["message"]["content"]
+                    if cache_key is not None:
+                        self.prompt_cache.set(cache_key, content, self.ai_config["model"], "trading_handler")
+                    return content
                 else:
                     error_text = await response.text()
                     logger.error(f"AI API error: {error_text}")
@@ -136,95 +178,160 @@ class TradingHandler:
             logger.error(f"Error calling AI API: {str(e)}")
             raise
     
-    def _calculate_kdj(self, data: pd.DataFrame, n: int = 9, m1: int = 3, m2: int = 3) -> Dict[str, float]:
-        """计算KDJ指标"""
-        low_list = data['Low'].rolling(window=n, min_periods=1).min()
-        high_list = data['High'].rolling(window=n, min_periods=1).max()
-        rsv = (data['Close'] - low_list) / (high_list - low_list) * 100
-        k = rsv.ewm(alpha=1/m1, adjust=False).mean()
-        d = k.ewm(alpha=1/m2, adjust=False).mean()
-        j = 3 * k - 2 * d
+    def _indicator_factory(self) -> Dict[str, Indicator]:
+        """创建一组增量指标（每个 symbol/timeframe 一组）"""
         return {
-            "k": round(k.iloc[-1], 2),
-            "d": round(d.iloc[-1], 2),
-            "j": round(j.iloc[-1], 2)
+            "RSI": RSI(14),
+            "MACD": MACD(12, 26, 9),
+            "BB": BollingerBands(20, 2),
+            "MA20": MovingAverage(20),
+            "MA50": MovingAverage(50),
+            "MA200": MovingAverage(200),
+            "ATR": ATR(14),
+            "KDJ": KDJ(9, 3, 3),
+            "OBV": OBV(),
+            "CCI": CCI(20),
+            "DMI": DMI(14),
+            "Ichimoku": Ichimoku()
         }
     
-    def _calculate_obv(self, data: pd.DataFrame) -> Dict[str, float]:
-        """计算OBV指标"""
-        obv = (np.sign(data['Close'].diff()) * data['Volume']).fillna(0).cumsum()
+    def _calculate_indicators(self, symbol: str, timeframe: str, data: pd.DataFrame) -> Dict[str, Dict[str, float]]:
+        """
+        计算全部技术指标
+        
+        指标状态按 (symbol, timeframe) 保存，只处理上次之后的新K线；
+        最后一根K线视为未完成，不写入状态。
+        """
+        state = self.indicator_engine.sync(symbol, timeframe, data)
         return {
-            "current": round(obv.iloc[-1], 2),
-            "change": round(obv.iloc[-1] - obv.iloc[-2], 2),
-            "trend": "up" if obv.iloc[-1] > obv.iloc[-2] else "down"
+            name: formatter(state.current, state.previous)
+            for name, formatter in self.indicator_formatters.items()
         }
     
-    def _calculate_cci(self, data: pd.DataFrame, period: int = 20) -> Dict[str, float]:
-        """计算CCI指标"""
-        tp = (data['High'] + data['Low'] + data['Close']) / 3
-        tp_ma = tp.rolling(window=period).mean()
-        tp_md = tp.rolling(window=period).apply(lambda x: np.abs(x - x.mean()).mean())
-        cci = (tp - tp_ma) / (0.015 * tp_md)
+    def _format_rsi(self, current: Dict[str, Any], previous: Dict[str, Any]) -> Dict[str, float]:
+        rsi = current["RSI"]
+        prev_rsi = previous.get("RSI", np.nan)
         return {
-            "current": round(cci.iloc[-1], 2),
-            "previous": round(cci.iloc[-2], 2),
-            "change": round(cci.iloc[-1] - cci.iloc[-2], 2)
+            "current": round(rsi, 2),
+            "previous": round(prev_rsi, 2),
+            "change": round(rsi - prev_rsi, 2)
         }
     
-    def _calculate_dmi(self, data: pd.DataFrame, period: int = 14) -> Dict[str, float]:
-        """计算DMI指标"""
-        high = data['High']
-        low = data['Low']
-        close = data['Close']
-        
-        tr = pd.DataFrame()
-        tr['h-l'] = high - low
-        tr['h-pc'] = abs(high - close.shift(1))
-        tr['l-pc'] = abs(low - close.shift(1))
-        tr['tr'] = tr[['h-l', 'h-pc', 'l-pc']].max(axis=1)
-        
-        up_move = high - high.shift(1)
-        down_move = low.shift(1) - low
-        
-        plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0)
-        minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0)
-        
-        plus_di = 100 * pd.Series(plus_dm).rolling(period).mean() / pd.Series(tr['tr']).rolling(period).mean()
-        minus_di = 100 * pd.Series(minus_dm).rolling(period).mean() / pd.Series(tr['tr']).rolling(period).mean()
-        
-        dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di)
-        adx = dx.rolling(period).mean()
-        
+    def _format_macd(self, current: Dict[str, Any], previous: Dict[str, Any]) -> Dict[str, float]:
+        macd = current["MACD"]
         return {
-            "plus_di": round(plus_di.iloc[-1], 2),
-            "minus_di": round(minus_di.iloc[-1], 2),
-            "adx": round(adx.iloc[-1], 2)
+            "macd": round(macd["macd"], 4),
+            "signal": round(macd["signal"], 4),
+            "histogram": round(macd["hist"], 4)
         }
     
-    def _calculate_ichimoku(self, data: pd.DataFrame) -> Dict[str, float]:
-        """计算一目均衡表"""
-        high = data['High']
-        low = data['Low']
-        
-        # 转换线
-        conversion_line = (high.rolling(window=9).max() + low.rolling(window=9).min()) / 2
-        # 基准线
-        base_line = (high.rolling(window=26).max() + low.rolling(window=26).min()) / 2
-        # 先行带A
-        leading_span_a = (conversion_line + base_line) / 2
-        # 先行带B
-        leading_span_b = (high.rolling(window=52).max() + low.rolling(window=52).min()) / 2
-        # 延迟线
-        lagging_span = data['Close'].shift(-26)
-        
+    def _format_bollinger_bands(self, current: Dict[str, Any], previous: Dict[str, Any]) -> Dict[str, float]:
+        bb = current["BB"]
+        return {
+            "upper": round(bb["upper"], 2),
+            "middle": round(bb["middle"], 2),
+            "lower": round(bb["lower"], 2)
+        }
+    
+    def _format_moving_averages(self, current: Dict[str, Any], previous: Dict[str, Any]) -> Dict[str, float]:
+        return {name: round(current[name], 2) for name in ("MA20", "MA50", "MA200")}
+    
+    def _format_atr(self, current: Dict[str, Any], previous: Dict[str, Any]) -> Dict[str, float]:
+        atr = current["ATR"]
+        prev_atr = previous.get("ATR", np.nan)
         return {
-            "conversion_line": round(conversion_line.iloc[-1], 2),
-            "base_line": round(base_line.iloc[-1], 2),
-            "leading_span_a": round(leading_span_a.iloc[-1], 2),
-            "leading_span_b": round(leading_span_b.iloc[-1], 2),
-            "lagging_span": round(lagging_span.iloc[-1], 2)
+            "current": round(atr, 2),
+            "previous": round(prev_atr, 2),
+            "change": round(atr - prev_atr, 2)
         }
     
+    def _format_kdj(self, current: Dict[str, Any], previous: Dict[str, Any]) -> Dict[str, float]:
+        kdj = current["KDJ"]
+        return {
+            "k": round(kdj["k"], 2),
+            "d": round(kdj["d"], 2),
+            "j": round(kdj["j"], 2)
+        }
+    
+    def _format_obv(self, current: Dict[str, Any], previous: Dict[str, Any]) -> Dict[str, float]:
+        obv = current["OBV"]
+        prev_obv = previous.get("OBV", np.nan)
+        return {
+            "current": round(obv, 2),
+            "change": round(obv - prev_obv, 2),
+            "trend": "up" if obv > prev_obv else "down"
+        }
+    
+    def _format_cci(self, current: Dict[str, Any], previous: Dict[str, Any]) -> Dict[str, float]:
+        cci = current["CCI"]
+        prev_cci = previous.get("CCI", np.nan)
+        return {
+            "current": round(cci, 2),
+            "previous": round(prev_cci, 2),
+            "change": round(cci - prev_cci, 2)
+        }
+    
+    def _format_dmi(self, current: Dict[str, Any], previous: Dict[str, Any]) -> Dict[str, float]:
+        dmi = current["DMI"]
+        return {
+            "plus_di": round(dmi["plus_di"], 2),
+            "minus_di": round(dmi["minus_di"], 2),
+            "adx": round(dmi["adx"], 2)
+        }
+    
+    def _format_ichimoku(self, current: Dict[str, Any], previous: Dict[str, Any]) -> Dict[str, float]:
+        return {key: round(value, 2) for key, value in current["Ichimoku"].items()}
+    
+    def _calculate_rsi(self, data: pd.DataFrame, period: int = 14) -> Dict[str, float]:
+        """计算RSI指标"""
+        state = IndicatorSet({"RSI": RSI(period)}).seed(data)
+        return self._format_rsi(state.current, state.previous)
+    
+    def _calculate_macd(self, data: pd.DataFrame, fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, float]:
+        """计算MACD指标"""
+        state = IndicatorSet({"MACD": MACD(fast, slow, signal)}).seed(data)
+        return self._format_macd(state.current, state.previous)
+    
+    def _calculate_bollinger_bands(self, data: pd.DataFrame, window: int = 20, num_std: float = 2) -> Dict[str, float]:
+        """计算布林带"""
+        state = IndicatorSet({"BB": BollingerBands(window, num_std)}).seed(data)
+        return self._format_bollinger_bands(state.current, state.previous)
+    
+    def _calculate_moving_averages(self, data: pd.DataFrame) -> Dict[str, float]:
+        """计算移动平均线"""
+        state = IndicatorSet({f"MA{window}": MovingAverage(window) for window in (20, 50, 200)}).seed(data)
+        return self._format_moving_averages(state.current, state.previous)
+    
+    def _calculate_atr(self, data: pd.DataFrame, period: int = 14) -> Dict[str, float]:
+        """计算ATR指标"""
+        state = IndicatorSet({"ATR": ATR(period)}).seed(data)
+        return self._format_atr(state.current, state.previous)
+    
+    def _calculate_kdj(self, data: pd.DataFrame, n: int = 9, m1: int = 3, m2: int = 3) -> Dict[str, float]:
+        """计算KDJ指标"""
+        state = IndicatorSet({"KDJ": KDJ(n, m1, m2)}).seed(data)
+        return self._format_kdj(state.current, state.previous)
+    
+    def _calculate_obv(self, data: pd.DataFrame) -> Dict[str, float]:
+        """计算OBV指标"""
+        state = IndicatorSet({"OBV": OBV()}).seed(data)
+        return self._format_obv(state.current, state.previous)
+    
+    def _calculate_cci(self, data: pd.DataFrame, period: int = 20) -> Dict[str, float]:
+        """计算CCI指标"""
+        state = IndicatorSet({"CCI": CCI(period)}).seed(data)
+        return self._format_cci(state.current, state.previous)
+    
+    def _calculate_dmi(self, data: pd.DataFrame, period: int = 14) -> Dict[str, float]:
+        """计算DMI指标"""
+        state = IndicatorSet({"DMI": DMI(period)}).seed(data)
+        return self._format_dmi(state.current, state.previous)
+    
+    def _calculate_ichimoku(self, data: pd.DataFrame) -> Dict[str, float]:
+        """计算一目均衡表"""
+        state = IndicatorSet({"Ichimoku": Ichimoku()}).seed(data)
+        return self._format_ichimoku(state.current, state.previous)
+    
     def _analyze_market_sentiment(self, data: pd.DataFrame) -> Dict[str, Any]:
         """分析市场情绪"""
         # 计算价格动量
@@ -463,9 +570,7 @@ class TradingHandler:
                 }
             
             # 计算技术指标
-            indicators = {}
-            for name, calculator in self.technical_indicators.items():
-                indicators[name] = calculator(hist)
+            indicators = self._calculate_indicators(query.symbol, query.timeframe, hist)
             
             # 检查风险预警
             alerts = self._check_risk_alerts(hist, indicators)
@@ -767,9 +872,7 @@ class TradingHandler:
             hist = ticker.history(period="1mo")
             if hist.empty:
                 return {"success": False, "error": f"No data available for {query.symbol}"}
-            indicators = {}
-            for name, calculator in self.technical_indicators.items():
-                indicators[name] = calculator(hist)
+            indicators = self._calculate_indicators(query.symbol, query.timeframe, hist)
             fundamentals = await self.data_processor.get_fundamentals(query.symbol)
             money_flow = await self.data_processor.get_money_flow(query.symbol)
             options_data = await self.data_processor.get_options_data(query.symbol)
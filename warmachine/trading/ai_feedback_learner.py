@@ -411,9 +411,10 @@ class AIFeedbackLearner:
             )
             
             # Get AI analysis
-            ai_response = self.ai_model_router.generate_text(prompt, max_tokens=1000)
+            # Daily analyses of unchanged trade history are answered from the prompt cache
+            ai_response = self.ai_model_router.ask(prompt, call_site="feedback_learner")
             
-            if ai_response:
+            if ai_response and not ai_response.startswith("Error:"):
                 # Save AI analysis
                 today = datetime.now().strftime("%Y-%m-%d")
                 analysis_path = self.insights_dir / f"ai_analysis_{today}.txt"
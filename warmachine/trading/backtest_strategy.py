@@ -2,9 +2,14 @@
 # Strategy Backtesting Module for Trading System
 
 import argparse
+import csv
+import itertools
 import json
 import os
+import shutil
 import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
@@ -13,9 +18,12 @@ from scipy import stats
 
 # Import custom modules
 try:
-    from analyze_market_data import calculate_technical_indicators, generate_signals
+    from analyze_market_data import calculate_technical_indicators, generate_signals, generate_signal_frame
 except ImportError:
-    print("Warning: Could not import analyze_market_data module")
+    try:
+        from analysis.market_analyzer import calculate_technical_indicators, generate_signals, generate_signal_frame
+    except ImportError:
+        print("Warning: Could not import analyze_market_data module")
 
 
 def setup_args():
@@ -31,6 +39,15 @@ def setup_args():
     parser.add_argument('--threshold', type=float, default=0.75, help='Signal threshold (0-1)')
     parser.add_argument('--commission', type=float, default=0.0, help='Commission per trade')
     parser.add_argument('--slippage', type=float, default=0.0, help='Slippage per trade (percentage)')
+    parser.add_argument('--engine', type=str, default='vectorized', choices=['vectorized', 'loop'],
+                       help='Backtest engine (loop re-evaluates signals bar by bar)')
+    parser.add_argument('--sweep', action='store_true',
+                       help='Run a parameter sweep over all symbols in parallel')
+    parser.add_argument('--thresholds', type=float, nargs='+', help='Signal thresholds to sweep')
+    parser.add_argument('--commissions', type=float, nargs='+', help='Commissions to sweep')
+    parser.add_argument('--slippages', type=float, nargs='+', help='Slippages to sweep')
+    parser.add_argument('--workers', type=int, default=None, help='Sweep worker processes (default: CPU count)')
+    parser.add_argument('--output', type=str, default=None, help='CSV file for sweep results')
     parser.add_argument('--plot', action='store_true', help='Generate performance charts')
     parser.add_argument('--verbose', action='store_true', help='Verbose output')
     
@@ -106,9 +123,172 @@ def load_historical_data(symbol, days=90):
     return df
 
 
+def simulate_portfolio(data, actions, initial_capital=10000.0, commission=0.0, slippage=0.0, start=50):
+    """Simulate the long-only portfolio for precomputed per-bar actions
+    
+    Position and cash only change on bars with a BUY (1) or SELL (-1) action, so the
+    sequential part runs over those bars alone; the per-bar Position, Cash, Holdings,
+    Total_Value and Returns columns are then filled in with NumPy in one pass.
+    
+    Args:
+        data: DataFrame with a Close column
+        actions: Action to take on each bar (1 = BUY, -1 = SELL, 0 = none)
+        initial_capital: Starting cash
+        commission: Commission per trade (fraction of value)
+        slippage: Slippage per trade (fraction of value)
+        start: First bar that may trade (warmup before it)
+        
+    Returns:
+        Tuple of (results DataFrame, list of trades)
+    """
+    close = data['Close'].to_numpy(dtype=float)
+    actions = np.asarray(actions)
+    n = len(close)
+    
+    trades = []
+    change_bars = [0]
+    change_positions = [0]
+    change_cash = [initial_capital]
+    position = 0
+    cash = initial_capital
+    
+    for i in np.flatnonzero(actions[start:]) + start:
+        price = close[i]
+        
+        if actions[i] > 0 and position <= 0:
+            # Buy with 90% of cash
+            shares_to_buy = int(cash * 0.9 / price)
+            if shares_to_buy <= 0:
+                continue
+            buy_value = shares_to_buy * price
+            transaction_cost = buy_value * commission + buy_value * slippage
+            cash -= buy_value + transaction_cost
+            position = shares_to_buy
+            trades.append({
+                'date': data.index[i].strftime('%Y-%m-%d'),
+                'action': 'BUY',
+                'price': price,
+                'quantity': shares_to_buy,
+                'value': buy_value,
+                'cost': transaction_cost
+            })
+            
+        elif actions[i] < 0 and position > 0:
+            # Close the long position (no shorting)
+            sell_quantity = position
+            sell_value = sell_quantity * price
+            transaction_cost = sell_value * commission + sell_value * slippage
+            cash += sell_value - transaction_cost
+            position = 0
+            trades.append({
+                'date': data.index[i].strftime('%Y-%m-%d'),
+                'action': 'SELL',
+                'price': price,
+                'quantity': sell_quantity,
+                'value': sell_value,
+                'cost': transaction_cost
+            })
+            
+        else:
+            continue
+        
+        change_bars.append(i)
+        change_positions.append(position)
+        change_cash.append(cash)
+    
+    # Forward-fill position and cash from the bars where they changed
+    marks = np.zeros(n, dtype=np.int64)
+    marks[change_bars[1:]] = np.arange(1, len(change_bars))
+    np.maximum.accumulate(marks, out=marks)
+    positions = np.asarray(change_positions, dtype=np.int64)[marks]
+    cash_values = np.asarray(change_cash, dtype=float)[marks]
+    
+    holdings = positions * close
+    total_value = cash_values + holdings
+    
+    returns = np.zeros(n)
+    if n > start + 1:
+        prev_value = total_value[start:-1]
+        valid = prev_value > 0
+        np.divide(total_value[start + 1:] - prev_value, prev_value,
+                  out=returns[start + 1:], where=valid)
+    
+    results = pd.DataFrame({
+        'Close': close,
+        'Position': positions,
+        'Cash': cash_values,
+        'Holdings': holdings,
+        'Total_Value': total_value,
+        'Returns': returns
+    }, index=data.index)
+    results['Cumulative_Returns'] = (1 + results['Returns']).cumprod() - 1
+    
+    return results, trades
+
+
+def run_backtest_vectorized(data, strategy='technical', initial_capital=10000.0, threshold=0.75,
+                            commission=0.0, slippage=0.0, verbose=False):
+    """Run a backtest with indicators and signals computed once over the whole frame
+    
+    Produces the same results as the bar-by-bar loop in run_backtest: the signal for
+    bar i is the generate_signals output for bars up to i - 1.
+    """
+    
+    if data is None or len(data) < 50:
+        print("Error: Not enough data for backtest")
+        return None
+    
+    # Calculate technical indicators
+    data = calculate_technical_indicators(data)
+    
+    if strategy == 'technical':
+        # Signal computed on bar i - 1 is acted on at bar i
+        signal_actions = generate_signal_frame(data, threshold)['action'].to_numpy()
+        actions = np.zeros(len(data), dtype=np.int8)
+        actions[1:] = signal_actions[:-1]
+    else:
+        actions = np.zeros(len(data), dtype=np.int8)
+    
+    results, trades = simulate_portfolio(data, actions, initial_capital, commission, slippage)
+    
+    return _summarize_backtest(results, trades, initial_capital, verbose)
+
+
+def _summarize_backtest(results, trades, initial_capital, verbose):
+    """Compute performance metrics, print the summary and package the backtest output"""
+    
+    # Calculate strategy performance
+    performance_metrics = calculate_performance(results, trades)
+    
+    # Print summary if verbose
+    if verbose:
+        print("\nBacktest Summary:")
+        print(f"Initial Capital: ${initial_capital:.2f}")
+        print(f"Final Value: ${results['Total_Value'].iloc[-1]:.2f}")
+        print(f"Total Return: {performance_metrics['total_return']:.2f}%")
+        print(f"Annualized Return: {performance_metrics['annualized_return']:.2f}%")
+        print(f"Sharpe Ratio: {performance_metrics['sharpe']:.2f}")
+        print(f"Max Drawdown: {performance_metrics['max_drawdown']:.2f}%")
+        print(f"Win Rate: {performance_metrics['win_rate']:.2f}%")
+        print(f"Total Trades: {len(trades)}")
+    
+    # Format for output capture by PowerShell
+    print(f"PERFORMANCE: {json.dumps(performance_metrics)}")
+    
+    return {
+        'results': results,
+        'trades': trades,
+        'performance': performance_metrics
+    }
+
+
 def run_backtest(data, strategy='technical', initial_capital=10000.0, threshold=0.75, 
                 commission=0.0, slippage=0.0, verbose=False):
-    """Run a backtest on the given data using the specified strategy"""
+    """Run a backtest on the given data using the specified strategy
+    
+    Re-evaluates generate_signals on every bar; O(n^2) on long histories. Kept as the
+    reference implementation for run_backtest_vectorized.
+    """
     
     if data is None or len(data) < 50:
         print("Error: Not enough data for backtest")
@@ -203,7 +383,8 @@ def run_backtest(data, strategy='technical', initial_capital=10000.0, threshold=
                         # Close any long position
                         if portfolio['position'] > 0:
                             # Calculate transaction costs
-                            sell_value = portfolio['position'] * current_day['Close']
+                            sell_quantity = portfolio['position']
+                            sell_value = sell_quantity * current_day['Close']
                             transaction_cost = sell_value * commission + sell_value * slippage
                             
                             # Update portfolio
@@ -215,7 +396,7 @@ def run_backtest(data, strategy='technical', initial_capital=10000.0, threshold=
                                 'date': current_date.strftime('%Y-%m-%d'),
                                 'action': 'SELL',
                                 'price': current_day['Close'],
-                                'quantity': portfolio['position'],
+                                'quantity': sell_quantity,
                                 'value': sell_value,
                                 'cost': transaction_cost
                             })
@@ -242,29 +423,7 @@ def run_backtest(data, strategy='technical', initial_capital=10000.0, threshold=
     # Add cumulative returns
     results['Cumulative_Returns'] = (1 + results['Returns']).cumprod() - 1
     
-    # Calculate strategy performance
-    performance_metrics = calculate_performance(results, portfolio['trades'])
-    
-    # Print summary if verbose
-    if verbose:
-        print("\nBacktest Summary:")
-        print(f"Initial Capital: ${initial_capital:.2f}")
-        print(f"Final Value: ${results['Total_Value'].iloc[-1]:.2f}")
-        print(f"Total Return: {performance_metrics['total_return']:.2f}%")
-        print(f"Annualized Return: {performance_metrics['annualized_return']:.2f}%")
-        print(f"Sharpe Ratio: {performance_metrics['sharpe']:.2f}")
-        print(f"Max Drawdown: {performance_metrics['max_drawdown']:.2f}%")
-        print(f"Win Rate: {performance_metrics['win_rate']:.2f}%")
-        print(f"Total Trades: {len(portfolio['trades'])}")
-    
-    # Format for output capture by PowerShell
-    print(f"PERFORMANCE: {json.dumps(performance_metrics)}")
-    
-    return {
-        'results': results,
-        'trades': portfolio['trades'],
-        'performance': performance_metrics
-    }
+    return _summarize_backtest(results, portfolio['trades'], initial_capital, verbose)
 
 
 def calculate_performance(results, trades):
@@ -439,6 +598,225 @@ def plot_performance(backtest_results, symbol):
         trades_df.to_csv(f'{output_dir}/{symbol}_backtest_trades_{timestamp}.csv', index=False)
 
 
+# Columns shared with sweep workers, in this order, when every symbol has them
+SWEEP_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Per-process sweep state, set up by _init_sweep_worker
+_sweep_bars = None
+_sweep_times = None
+_sweep_layout = None
+_sweep_columns = None
+_sweep_indicators = {}
+_sweep_actions = {}
+
+
+def pack_price_data(data_by_symbol, directory):
+    """Write all symbols' bars into memory-mapped arrays shared by sweep workers
+    
+    Bars are stacked into one float64 (bars x columns) array and one int64 array of
+    timestamps (ns); each symbol owns a contiguous row range. Workers map the files
+    read-only, so the OS page cache holds a single copy of the price data no matter
+    how many workers or jobs there are.
+    
+    Args:
+        data_by_symbol: Dictionary of symbol to OHLCV DataFrame with a DatetimeIndex
+        directory: Directory for the memory-mapped files
+        
+    Returns:
+        Dictionary describing the shared arrays, passed to _init_sweep_worker
+    """
+    columns = [c for c in SWEEP_COLUMNS if all(c in df.columns for df in data_by_symbol.values())]
+    total = sum(len(df) for df in data_by_symbol.values())
+    
+    bars_path = os.path.join(directory, 'bars.f64')
+    times_path = os.path.join(directory, 'times.i64')
+    bars = np.memmap(bars_path, dtype=np.float64, mode='w+', shape=(max(total, 1), len(columns)))
+    times = np.memmap(times_path, dtype=np.int64, mode='w+', shape=(max(total, 1),))
+    
+    layout = {}
+    offset = 0
+    for symbol, df in data_by_symbol.items():
+        end = offset + len(df)
+        bars[offset:end] = df[columns].to_numpy(dtype=np.float64)
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is not None:
+            index = index.tz_convert(None)
+        times[offset:end] = np.asarray(index, dtype='datetime64[ns]').view(np.int64)
+        layout[symbol] = (offset, end)
+        offset = end
+    
+    bars.flush()
+    times.flush()
+    del bars, times
+    
+    return {
+        'bars_path': bars_path,
+        'times_path': times_path,
+        'rows': max(total, 1),
+        'columns': columns,
+        'layout': layout
+    }
+
+
+def _init_sweep_worker(shared):
+    """Map the shared price arrays in a sweep worker process"""
+    global _sweep_bars, _sweep_times, _sweep_layout, _sweep_columns
+    _sweep_columns = shared['columns']
+    _sweep_layout = shared['layout']
+    _sweep_bars = np.memmap(shared['bars_path'], dtype=np.float64, mode='r',
+                            shape=(shared['rows'], len(_sweep_columns)))
+    _sweep_times = np.memmap(shared['times_path'], dtype=np.int64, mode='r', shape=(shared['rows'],))
+    _sweep_indicators.clear()
+    _sweep_actions.clear()
+
+
+def _sweep_symbol_data(symbol):
+    """Get the indicator frame for a symbol, computing it once per worker"""
+    if symbol not in _sweep_indicators:
+        start, end = _sweep_layout[symbol]
+        data = pd.DataFrame(np.asarray(_sweep_bars[start:end]), columns=_sweep_columns,
+                            index=pd.DatetimeIndex(np.asarray(_sweep_times[start:end]).view('datetime64[ns]')))
+        _sweep_indicators[symbol] = calculate_technical_indicators(data)
+    return _sweep_indicators[symbol]
+
+
+def _sweep_job(symbol, param_sets, initial_capital, strategy):
+    """Backtest one symbol for several parameter sets inside a sweep worker
+    
+    Indicators are computed once per symbol and signals once per (symbol, threshold);
+    only the portfolio simulation is repeated for each commission/slippage pair.
+    
+    Returns:
+        Tuple of (result rows, error message or None)
+    """
+    rows = []
+    try:
+        data = _sweep_symbol_data(symbol)
+        if len(data) < 50:
+            return rows, "Not enough data for backtest"
+        
+        for params in param_sets:
+            threshold = params['threshold']
+            key = (symbol, threshold)
+            if key not in _sweep_actions:
+                actions = np.zeros(len(data), dtype=np.int8)
+                if strategy == 'technical':
+                    actions[1:] = generate_signal_frame(data, threshold)['action'].to_numpy()[:-1]
+                _sweep_actions[key] = actions
+            
+            results, trades = simulate_portfolio(data, _sweep_actions[key], initial_capital,
+                                                 params['commission'], params['slippage'])
+            row = {'symbol': symbol}
+            row.update(params)
+            row.update(calculate_performance(results, trades))
+            rows.append(row)
+    except Exception as e:
+        return rows, str(e)
+    
+    return rows, None
+
+
+def build_param_grid(thresholds, commissions, slippages):
+    """Expand lists of parameter values into a list of parameter sets"""
+    return [
+        {'threshold': threshold, 'commission': commission, 'slippage': slippage}
+        for threshold, commission, slippage in itertools.product(thresholds, commissions, slippages)
+    ]
+
+
+def _sweep_tasks(symbols, grid, workers):
+    """Split (symbol x params) jobs into tasks
+    
+    Each task covers one symbol so that workers reuse its indicators; when there are
+    fewer symbols than workers, a symbol's grid is split across several tasks.
+    """
+    chunks = max(1, min(len(grid), -(-2 * workers // max(len(symbols), 1))))
+    size = -(-len(grid) // chunks)
+    return [(symbol, grid[i:i + size]) for symbol in symbols for i in range(0, len(grid), size)]
+
+
+def run_sweep(data_by_symbol, param_grid, strategy='technical', initial_capital=10000.0,
+              workers=None, output=None, verbose=False):
+    """Run (symbol x params) backtests in a process pool
+    
+    Price data is shared with the workers through memory-mapped arrays rather than
+    pickled into each task. Rows are appended to the output CSV as soon as their
+    task finishes, so partial results survive an interrupted sweep.
+    
+    Args:
+        data_by_symbol: Dictionary of symbol to OHLCV DataFrame
+        param_grid: List of dictionaries with threshold, commission and slippage
+        strategy: Strategy to backtest
+        initial_capital: Initial capital per backtest
+        workers: Number of worker processes (default: CPU count)
+        output: Optional CSV path to stream result rows to
+        verbose: Print progress per finished task
+        
+    Returns:
+        DataFrame with one row per (symbol, parameter set), sorted by symbol and Sharpe ratio
+    """
+    workers = workers or os.cpu_count() or 1
+    
+    data_by_symbol = {symbol: df for symbol, df in data_by_symbol.items() if df is not None and len(df) > 0}
+    for symbol, df in list(data_by_symbol.items()):
+        if not isinstance(df.index, pd.DatetimeIndex):
+            try:
+                df = df.copy()
+                df.index = pd.to_datetime(df.index)
+                data_by_symbol[symbol] = df
+            except Exception as e:
+                print(f"Error: Could not read dates for {symbol}: {e}")
+                del data_by_symbol[symbol]
+    
+    rows = []
+    tasks = _sweep_tasks(list(data_by_symbol), param_grid, workers)
+    shared_dir = tempfile.mkdtemp(prefix='backtest_sweep_')
+    output_file = None
+    writer = None
+    
+    try:
+        shared = pack_price_data(data_by_symbol, shared_dir)
+        
+        if output:
+            output_dir = os.path.dirname(output)
+            if output_dir and not os.path.exists(output_dir):
+                os.makedirs(output_dir)
+            output_file = open(output, 'w', newline='')
+        
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_sweep_worker,
+                                 initargs=(shared,)) as executor:
+            futures = {
+                executor.submit(_sweep_job, symbol, param_sets, initial_capital, strategy): symbol
+                for symbol, param_sets in tasks
+            }
+            
+            for done, future in enumerate(as_completed(futures), 1):
+                symbol = futures[future]
+                task_rows, error = future.result()
+                if error:
+                    print(f"Error: Backtest failed for {symbol}: {error}")
+                
+                if task_rows and output_file is not None:
+                    if writer is None:
+                        writer = csv.DictWriter(output_file, fieldnames=list(task_rows[0].keys()))
+                        writer.writeheader()
+                    writer.writerows(task_rows)
+                    output_file.flush()
+                rows.extend(task_rows)
+                
+                if verbose:
+                    print(f"[{done}/{len(tasks)}] {symbol}: {len(task_rows)} backtests")
+    finally:
+        if output_file is not None:
+            output_file.close()
+        shutil.rmtree(shared_dir, ignore_errors=True)
+    
+    table = pd.DataFrame(rows)
+    if not table.empty:
+        table = table.sort_values(['symbol', 'sharpe'], ascending=[True, False]).reset_index(drop=True)
+    return table
+
+
 def main():
     """Main function"""
     args = setup_args()
@@ -447,6 +825,33 @@ def main():
     if not os.path.exists('data/backtests'):
         os.makedirs('data/backtests')
     
+    if args.sweep:
+        data_by_symbol = {}
+        for symbol in args.symbols:
+            data = load_historical_data(symbol, args.days)
+            if data is None:
+                print(f"Error: Could not load data for {symbol}")
+                continue
+            data_by_symbol[symbol] = data
+        
+        param_grid = build_param_grid(
+            args.thresholds or [args.threshold],
+            args.commissions or [args.commission],
+            args.slippages or [args.slippage]
+        )
+        output = args.output or f"data/backtests/sweep_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        
+        table = run_sweep(data_by_symbol, param_grid, strategy=args.strategy,
+                          initial_capital=args.initial_capital, workers=args.workers,
+                          output=output, verbose=args.verbose)
+        
+        if not table.empty:
+            best = table.loc[table.groupby('symbol')['sharpe'].idxmax()]
+            print(best[['symbol', 'threshold', 'commission', 'slippage', 'sharpe',
+                        'max_drawdown', 'win_rate', 'total_return', 'trade_count']].to_string(index=False))
+        print(f"\nSweep completed: {len(table)} backtests, results saved to {output}")
+        return
+    
     # Run backtest for each symbol
     for symbol in args.symbols:
         if args.verbose:
@@ -460,7 +865,8 @@ def main():
             continue
         
         # Run backtest
-        backtest_results = run_backtest(
+        backtest = run_backtest_vectorized if args.engine == 'vectorized' else run_backtest
+        backtest_results = backtest(
             data=data,
             strategy=args.strategy,
             initial_capital=args.initial_capital,
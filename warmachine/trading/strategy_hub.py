@@ -68,7 +68,8 @@ class MainStrategyHub:
     - 市场收盘后生成AI日报总结
     """
     
-    def __init__(self, symbols=None, use_ai_judger=True, knowledge_base_dir="data/knowledge_base"):
+    def __init__(self, symbols=None, use_ai_judger=True, knowledge_base_dir="data/knowledge_base",
+                 use_scanner=False, scanner_config=None):
         """
         初始化主策略调度中心
         
@@ -76,10 +77,16 @@ class MainStrategyHub:
             symbols: 监控的股票代码列表
             use_ai_judger: 是否使用AI交易决策
             knowledge_base_dir: 知识库数据目录
+            use_scanner: 是否先用向量化信号扫描筛选标的
+            scanner_config: 扫描配置 (timeframe, lookback_days, threshold, max_symbols)
         """
         self.symbols = symbols or ["SPY", "QQQ", "AAPL", "MSFT", "META", "NVDA", "GOOGL", "AMZN", "TSLA"]
         self.use_ai_judger = use_ai_judger
         self.knowledge_base_dir = knowledge_base_dir
+        self.use_scanner = use_scanner
+        self.scanner_config = scanner_config or {}
+        self.market_data_hub = None  # 首次扫描时创建
+        self.last_scan = None  # 最近一次扫描的排序结果
         
         # 加载API密钥
         self.deepseek_api_key = os.getenv("DEEPSEEK_API_KEY")
@@ -232,8 +239,14 @@ class MainStrategyHub:
             return
         
         try:
+            # 只对扫描选出的标的执行完整策略
+            symbols = self._scan_universe() if self.use_scanner else self.symbols
+            if not symbols:
+                logger.info("信号扫描没有选出标的")
+                return
+            
             # 执行所有标的的策略
-            results = self.strategy_executor.batch_execute(self.symbols)
+            results = self.strategy_executor.batch_execute(symbols)
             
             # 记录信号
             for symbol, result in results.items():
@@ -256,11 +269,34 @@ class MainStrategyHub:
                             # 保存到知识库
                             self.knowledge_base.save_signals([signal])
             
-            logger.info(f"执行了 {len(self.symbols)} 个标的的策略, 生成 {len(self.daily_signals)} 个信号")
+            logger.info(f"执行了 {len(symbols)} 个标的的策略, 生成 {len(self.daily_signals)} 个信号")
             
         except Exception as e:
             logger.error(f"执行策略失败: {str(e)}")
     
+    def _scan_universe(self):
+        """用向量化信号扫描对全部标的排序，返回有信号的标的（扫描失败时返回全部标的）"""
+        try:
+            from core.data.market_data_hub import MarketDataHub
+            from analysis.market_analyzer import scan_universe
+            
+            if self.market_data_hub is None:
+                self.market_data_hub = MarketDataHub(self.scanner_config.get("market_data", {}))
+            
+            self.last_scan = scan_universe(
+                self.market_data_hub,
+                self.symbols,
+                timeframe=self.scanner_config.get("timeframe", "1d"),
+                lookback_days=self.scanner_config.get("lookback_days", 365),
+                threshold=self.scanner_config.get("threshold", 0.75)
+            )
+            symbols = self.last_scan["symbol"].tolist()[:self.scanner_config.get("max_symbols", 50)]
+            logger.info(f"信号扫描: 从 {len(self.symbols)} 个标的中选出 {len(symbols)} 个")
+            return symbols
+        except Exception as e:
+            logger.error(f"信号扫描失败: {str(e)}")
+            return self.symbols
+    
     def is_market_open(self):
         """检查当前是否是市场交易时间"""
         now = datetime.datetime.now()
@@ -51,6 +51,8 @@ class StrategyScheduler:
         self.config = self._load_config()
         self.running = False
         self.executor = None
+        self.market_data_hub = None  # Created on first universe scan
+        self.last_scan = None  # Ranked table of the last universe scan
         self.last_run_times = {}  # Symbol -> last run time
         self.results_history = {}  # Symbol -> list of results
         
@@ -94,7 +96,14 @@ class StrategyScheduler:
                         'timezone': 'America/New_York'
                     },
                     'preset_strategies': ['trend_following', 'breakout', 'sector_divergence'],
-                    'data_source': 'databento'  # or 'yfinance'
+                    'data_source': 'databento',  # or 'yfinance'
+                    'scanner': {
+                        'enabled': False,  # Pre-filter symbols with the cross-sectional signal scan
+                        'timeframe': '1d',
+                        'lookback_days': 365,
+                        'threshold': 0.75,
+                        'max_symbols': 50
+                    }
                 }
             
             with open(self.config_path, 'r') as f:
@@ -244,6 +253,14 @@ class StrategyScheduler:
             logger.warning("No symbols configured to run")
             return
         
+        # Only run the full strategies on symbols the universe scan flags
+        scanner_config = self.config.get('scanner', {})
+        if scanner_config.get('enabled', False):
+            symbols_to_run = self._scan_universe(symbols_to_run, scanner_config)
+            if not symbols_to_run:
+                logger.info("Universe scan found no signal candidates")
+                return {}
+        
         # Get current time
         now = datetime.now()
         
@@ -270,6 +287,38 @@ class StrategyScheduler:
         logger.info(f"Executed strategies for {len(symbols_to_run)} symbols")
         return results
     
+    def _scan_universe(self, symbols: List[str], scanner_config: Dict[str, Any]) -> List[str]:
+        """
+        Rank symbols with the vectorised signal scanner.
+        
+        Args:
+            symbols (List[str]): Universe to scan
+            scanner_config (Dict[str, Any]): Scanner settings
+            
+        Returns:
+            List[str]: Symbols with a signal, strongest first (all symbols if the scan fails)
+        """
+        try:
+            from core.data.market_data_hub import MarketDataHub
+            from analysis.market_analyzer import scan_universe
+            
+            if self.market_data_hub is None:
+                self.market_data_hub = MarketDataHub(self.config.get('market_data', {}))
+            
+            self.last_scan = scan_universe(
+                self.market_data_hub,
+                symbols,
+                timeframe=scanner_config.get('timeframe', '1d'),
+                lookback_days=scanner_config.get('lookback_days', 365),
+                threshold=scanner_config.get('threshold', 0.75)
+            )
+            candidates = self.last_scan['symbol'].tolist()[:scanner_config.get('max_symbols', 50)]
+            logger.info(f"Universe scan: {len(candidates)} of {len(symbols)} symbols selected")
+            return candidates
+        except Exception as e:
+            logger.error(f"Error scanning universe: {str(e)}")
+            return symbols
+    
     def _schedule_jobs(self):
         """Schedule jobs based on configuration"""
         # Clear existing jobs